@@ -0,0 +1,131 @@
+"""Job search at scale: bigram tsvector index vs. an ILIKE scan.
+
+Seeds only users and jobs (``--jobs`` rows, default 1M) with the datagen rows, so
+the trigger fills ``job_search_index``; then, from ``backend/``::
+
+    DATABASE_URL=postgresql://localhost/worknow_bench \\
+        python -m benchmarks.bench_job_search --jobs 1000000 --reset
+
+Each query runs the first page plus the count, as ``GET /jobs/?q=`` does.
+Use ``--skip-seed`` to re-measure an already seeded database.
+"""
+
+import argparse
+import os
+import random
+import re
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import psycopg2
+
+from services.job_service import JobService, search_terms
+from utils.security import hash_password
+
+from .datagen import BENCH_PASSWORD, TABLE_WEIGHTS, Dataset, copy_rows, introspect
+from .report import build_report, git_commit, summarize, write_report
+
+RESULTS_DIR = Path(__file__).parent / "results"
+QUERIES = ("倉庫", "軽作業", "フォークリフト", "まかない", "倉庫 軽作業", "ホール 未経験")
+PAGE_SIZE = 20
+
+
+def seed_jobs(conn, jobs: int, seed: int, reset: bool) -> None:
+    infos = {table: introspect(conn, table) for table in ("users", "jobs")}
+    missing = [table for table, info in infos.items() if info is None]
+    if missing:
+        raise SystemExit(f"table not found: {', '.join(missing)}")
+    int_id_tables = {table for table, info in infos.items() if "id" in info.columns and info.columns["id"].is_integer}
+    rows = round(jobs / dict(TABLE_WEIGHTS)["jobs"])
+    dataset = Dataset(rows, seed, date(2025, 11, 1), hash_password(BENCH_PASSWORD), int_id_tables)
+    if reset:
+        with conn.cursor() as cursor:
+            cursor.execute("TRUNCATE users, jobs CASCADE")
+        conn.commit()
+    for table, info in infos.items():
+        started = time.perf_counter()
+        written = copy_rows(conn, info, getattr(dataset, table)(random.Random(f"{seed}:{table}")))
+        conn.commit()
+        print(f"{table:<20}{written:>12,} rows {time.perf_counter() - started:>8.1f}s")
+    with conn.cursor() as cursor:
+        cursor.execute("ANALYZE users")
+        cursor.execute("ANALYZE jobs")
+        cursor.execute("ANALYZE job_search_index")
+    conn.commit()
+
+
+def indexed_search(cursor, q: str) -> None:
+    terms = search_terms(q)
+    join, rank, condition = JobService.search_sql(len(terms))
+    where = f"status = 'published' AND {condition}"
+    cursor.execute(f"SELECT COUNT(*) FROM jobs {join} WHERE {where}", terms)
+    cursor.execute(
+        f"SELECT jobs.*{rank} FROM jobs {join} WHERE {where} "
+        "ORDER BY is_urgent DESC, search_rank DESC, created_at DESC LIMIT %s",
+        terms + [PAGE_SIZE],
+    )
+    cursor.fetchall()
+
+
+def ilike_search(cursor, q: str) -> None:
+    terms = search_terms(q)
+    condition = " AND ".join(
+        "(title ILIKE %s OR description ILIKE %s OR array_to_string(tags, ' ') ILIKE %s)" for _ in terms
+    )
+    params = [f"%{term}%" for term in terms for _ in range(3)]
+    where = f"status = 'published' AND {condition}"
+    cursor.execute(f"SELECT COUNT(*) FROM jobs WHERE {where}", params)
+    cursor.execute(
+        f"SELECT jobs.* FROM jobs WHERE {where} ORDER BY is_urgent DESC, created_at DESC LIMIT %s",
+        params + [PAGE_SIZE],
+    )
+    cursor.fetchall()
+
+
+def measure(conn, search: Callable[[Any, str], None], repeat: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    started = time.monotonic()
+    with conn.cursor() as cursor:
+        for q in QUERIES:
+            search(cursor, q)  # warm the cache for this query
+            for _ in range(repeat):
+                began = time.perf_counter()
+                search(cursor, q)
+                latencies.append(time.perf_counter() - began)
+    conn.rollback()
+    return summarize(latencies, 0, time.monotonic() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per query")
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE users and jobs first")
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--out", type=Path, default=None, help="defaults to benchmarks/results/job_search-<commit>.json")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(args.database_url or os.environ["DATABASE_URL"])
+    try:
+        dbname = conn.get_dsn_parameters().get("dbname", "")
+        if args.reset and not re.search(r"bench|test", dbname):
+            parser.error(f"refusing to --reset database {dbname!r}: its name must contain 'bench' or 'test'")
+        if not args.skip_seed:
+            seed_jobs(conn, args.jobs, args.seed, args.reset)
+        results = {"tsvector": measure(conn, indexed_search, args.repeat), "ilike": measure(conn, ilike_search, args.repeat)}
+        for name, stats in results.items():
+            print(f"{name:<12}p50 {stats['p50_ms']:>9.1f}ms p95 {stats['p95_ms']:>9.1f}ms p99 {stats['p99_ms']:>9.1f}ms")
+        report = build_report(results, jobs=args.jobs, seed=args.seed, queries=list(QUERIES))
+    finally:
+        conn.close()
+    out = args.out or RESULTS_DIR / f"job_search-{git_commit()}.json"
+    write_report(report, out)
+    print(f"report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Compare QR rendering before and after the compact renderer.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_qr_render --tokens 200
+"""
+
+import argparse
+import base64
+import io
+import json
+import secrets
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List
+
+import qrcode
+
+from utils.qr_render import render_qr
+
+
+def legacy_payload(token: str, assignment_id: str) -> str:
+    return json.dumps({'token': token, 'assignment_id': assignment_id, 'type': 'check_in'})
+
+
+def compact_payload(token: str, assignment_id: str) -> str:
+    return json.dumps(
+        {"token": token, "assignment_id": assignment_id, "type": "check_in"},
+        separators=(",", ":"),
+    )
+
+
+def legacy_render(data: str) -> bytes:
+    """The previous inline renderer: fixed box size, PNG wrapped in a base64 data URI."""
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    qr.make_image(fill_color="black", back_color="white").save(buffer, format='PNG')
+    return f'data:image/png;base64,{base64.b64encode(buffer.getvalue()).decode()}'.encode()
+
+
+def measure(render: Callable[[str], bytes], payloads: List[str]) -> Dict[str, float]:
+    timings = []
+    sizes = []
+    for payload in payloads:
+        started = time.perf_counter()
+        output = render(payload)
+        timings.append((time.perf_counter() - started) * 1000)
+        sizes.append(len(output))
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings),
+        "p95_ms": timings[int(len(timings) * 0.95) - 1],
+        "mean_bytes": statistics.mean(sizes),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--size", type=int, default=320, help="Target image width in pixels")
+    args = parser.parse_args()
+
+    tokens = [(secrets.token_urlsafe(32), str(uuid.uuid4())) for _ in range(args.tokens)]
+    cases = {
+        "legacy png+base64": (legacy_render, [legacy_payload(*t) for t in tokens]),
+        "png": (lambda d: render_qr(d, "png", args.size), [compact_payload(*t) for t in tokens]),
+        "svg": (lambda d: render_qr(d, "svg", args.size), [compact_payload(*t) for t in tokens]),
+    }
+
+    print(f"{'renderer':<20}{'mean ms':>10}{'p95 ms':>10}{'bytes':>10}")
+    for name, (render, payloads) in cases.items():
+        result = measure(render, payloads)
+        print(f"{name:<20}{result['mean_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['mean_bytes']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
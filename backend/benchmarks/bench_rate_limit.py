@@ -0,0 +1,58 @@
+"""Measure the per-request overhead of RateLimitMiddleware.
+
+Usage (from ``backend/``, with the app's environment configured)::
+
+    python -m benchmarks.bench_rate_limit --requests 20000
+    python -m benchmarks.bench_rate_limit --redis   # shared buckets via REDIS_URL
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from utils.rate_limit_middleware import RateLimitMiddleware
+from utils.security import create_access_token
+
+
+async def _noop_app(scope, receive, send):
+    return None
+
+
+async def _run(middleware, scopes, requests: int) -> list:
+    timings = []
+    for i in range(requests):
+        scope = scopes[i % len(scopes)]
+        started = time.perf_counter()
+        await middleware(scope, None, None)
+        timings.append((time.perf_counter() - started) * 1_000_000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--redis", action="store_true", help="Use Redis instead of the local fallback")
+    args = parser.parse_args()
+
+    middleware = RateLimitMiddleware(_noop_app, limits={"default": (10**9, 10**6)})
+    if not args.redis:
+        middleware._redis_down_until = float("inf")
+
+    token = create_access_token({"sub": "bench-user"}).encode()
+    scopes = [
+        {"type": "http", "method": "GET", "path": "/jobs/", "client": (f"10.0.0.{i}", 1234), "headers": []}
+        for i in range(100)
+    ] + [
+        {"type": "http", "method": "GET", "path": "/messages/unread-count", "client": ("10.0.1.1", 1234),
+         "headers": [(b"authorization", b"Bearer " + token)]}
+    ]
+
+    timings = sorted(asyncio.run(_run(middleware, scopes, args.requests)))
+    print(f"backend: {'redis' if args.redis else 'local'}  requests: {args.requests}")
+    print(f"mean {statistics.mean(timings):.1f} us  "
+          f"p50 {timings[len(timings) // 2]:.1f} us  p99 {timings[int(len(timings) * 0.99)]:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
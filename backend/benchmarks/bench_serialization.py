@@ -0,0 +1,76 @@
+"""Serialization time and bytes on the wire for a job list page.
+
+Usage (from ``backend/``)::
+
+    python -m benchmarks.bench_serialization --items 100
+"""
+
+import argparse
+import gzip
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from schemas.job import JobList, JobRead
+from utils.responses import FastJSONResponse, sparse_response
+
+
+def _jobs(count: int) -> JobList:
+    now = datetime(2025, 11, 10, 9, 0)
+    items = [
+        JobRead(
+            id=str(uuid.uuid4()),
+            company_id=str(uuid.uuid4()),
+            company_name="株式会社サンプル",
+            title=f"倉庫内ピッキング作業 {i}",
+            description="未経験歓迎。倉庫内での軽作業です。" * 110,
+            location="東京都江東区",
+            prefecture="東京都",
+            hourly_rate=1200 + i,
+            tags=["未経験OK", "日払い"],
+            starts_at=now + timedelta(days=i),
+            ends_at=now + timedelta(days=i, hours=8),
+            latitude=35.67,
+            longitude=139.82,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    return JobList(items=items, total=count, page=1, size=count)
+
+
+def _time(render: Callable[[], bytes], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        render()
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    page = _jobs(args.items)
+    slim = {"id", "title", "hourly_rate", "prefecture", "starts_at"}
+    cases = {
+        # the previous path: jsonable_encoder + json.dumps
+        "full / json": lambda: JSONResponse(jsonable_encoder(page)).body,
+        "full / orjson": lambda: FastJSONResponse(page.model_dump(mode="json")).body,
+        "fields= / orjson": lambda: sparse_response(page, JobRead, slim).body,
+    }
+
+    print(f"{'case':<18}{'ms/page':>10}{'bytes':>10}{'gzip bytes':>12}")
+    for name, render in cases.items():
+        body = render()
+        print(f"{name:<18}{_time(render, args.rounds):>10.2f}{len(body):>10}{len(gzip.compress(body, 5)):>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Location ingestion throughput for live delivery tracking.
+
+Calls the ASGI app directly (full middleware stack, no HTTP client in the loop) with
+many workers posting small batches to ``POST /assignments/{id}/locations``, then
+downsamples what was buffered as the flusher would. From ``backend/``::
+
+    python -m benchmarks.bench_track_ingest --points 200000
+    python -m benchmarks.bench_track_ingest --redis   # ring buffers in REDIS_URL
+
+Assignment access is pre-cached and the rate limiter is disabled for the run; the
+target is 10k points/s per process.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from main import app  # noqa: E402
+from services import tracking_service  # noqa: E402
+from services.tracking_service import downsample, get_track_buffer  # noqa: E402
+from utils.config import CFG  # noqa: E402
+from utils.security import create_access_token  # noqa: E402
+from utils.tracking import MemoryTrackBuffer  # noqa: E402
+
+START = datetime(2025, 11, 10, 9, 0, tzinfo=timezone.utc)
+
+
+def _batch(index: int, size: int, interval: float) -> bytes:
+    points = []
+    for offset in range(size):
+        step = index * size + offset
+        points.append({
+            "latitude": 35.68 + step * 0.00005,
+            "longitude": 139.76 + step * 0.00003,
+            "recorded_at": (START + timedelta(seconds=step * interval)).isoformat(),
+            "accuracy_m": 8.0,
+            "speed_mps": 9.5,
+        })
+    return json.dumps({"points": points}).encode()
+
+
+async def _run(args) -> list:
+    assignments = [str(uuid.uuid4()) for _ in range(args.assignments)]
+    headers = {}
+    for assignment_id in assignments:
+        worker_id = str(uuid.uuid4())
+        tracking_service._access_cache[assignment_id] = {
+            "assignment_id": assignment_id, "worker_id": worker_id,
+            "company_id": "bench-company", "status": "in_delivery",
+        }
+        token = create_access_token({"sub": worker_id, "role": "worker"})
+        headers[assignment_id] = [
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"content-type", b"application/json"),
+        ]
+    batches = args.points // args.batch
+    # Pre-serialize so the client side does not dominate the measurement.
+    bodies = [_batch(i // args.assignments, args.batch, args.interval) for i in range(min(batches, 10_000))]
+    timings = []
+
+    async def post(path: str, body: bytes, headers: list) -> int:
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"",
+            "root_path": "", "headers": headers, "client": ("10.0.0.1", 1234), "server": ("bench", 80),
+        }
+        sent = []
+
+        async def receive():
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            sent.append(message)
+
+        await app(scope, receive, send)
+        return sent[0]["status"]
+
+    async def worker(offset: int) -> None:
+        for i in range(offset, batches, args.concurrency):
+            assignment_id = assignments[i % len(assignments)]
+            body = bodies[i % len(bodies)]
+            started = time.perf_counter()
+            code = await post(
+                f"/assignments/{assignment_id}/locations", body,
+                headers[assignment_id] + [(b"content-length", str(len(body)).encode())],
+            )
+            timings.append((time.perf_counter() - started) * 1000)
+            if code != 202:
+                raise SystemExit(f"unexpected status {code}")
+
+    await asyncio.gather(*(worker(offset) for offset in range(args.concurrency)))
+    return timings
+
+
+async def _bench(args) -> None:
+    if args.redis:
+        buffer = await get_track_buffer()
+    else:
+        buffer = tracking_service._buffer = MemoryTrackBuffer(size=CFG["TRACK_BUFFER_SIZE"])
+
+    started = time.perf_counter()
+    timings = sorted(await _run(args))
+    elapsed = time.perf_counter() - started
+    points = len(timings) * args.batch
+    rate = points / elapsed
+
+    buffered = await buffer.recent(await buffer.active(0))
+    started = time.perf_counter()
+    kept = sum(
+        len(downsample(values, None, CFG["TRACK_PERSIST_SECONDS"], CFG["TRACK_PERSIST_METERS"]))
+        for values in buffered.values()
+    )
+    downsample_seconds = time.perf_counter() - started
+    total_buffered = sum(len(values) for values in buffered.values())
+
+    print(f"buffer: {'redis' if args.redis else 'memory'}  batch: {args.batch}  concurrency: {args.concurrency}")
+    print(f"ingest  {points:,} points in {elapsed:.2f}s = {rate:,.0f} points/s  "
+          f"(batch mean {statistics.mean(timings):.2f} ms, p50 {timings[len(timings) // 2]:.2f} ms, "
+          f"p99 {timings[int(len(timings) * 0.99)]:.2f} ms)")
+    print(f"flush   {total_buffered:,} buffered -> {kept:,} persisted "
+          f"({total_buffered / max(downsample_seconds, 1e-9):,.0f} points/s downsampled)")
+    print(f"target  {args.target:,.0f} points/s: {'ok' if rate >= args.target else 'BELOW'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=5, help="Points per request")
+    parser.add_argument("--interval", type=float, default=2.0, help="Seconds between a worker's GPS fixes")
+    parser.add_argument("--assignments", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--target", type=float, default=10_000, help="Points/s to pass")
+    parser.add_argument("--redis", action="store_true", help="Use Redis instead of the in-process buffer")
+    asyncio.run(_bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
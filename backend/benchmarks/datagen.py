@@ -0,0 +1,580 @@
+"""Seeded synthetic data for load tests against a local Postgres.
+
+Usage (from ``backend/``, against a dedicated database)::
+
+    DATABASE_URL=postgresql://localhost/worknow_bench \\
+        python -m benchmarks.datagen --rows 1000000 --seed 42 --reset
+
+The same ``--rows``, ``--seed`` and ``--base-date`` always produce the same rows.
+Row counts are split across users, jobs, applications, assignments, payments, bank
+accounts, withdrawals, conversations, messages and notifications; relationships are
+derived from row indexes, so nothing is kept in memory and 10M rows stream fine.
+
+Columns are read from the target database, so the generator works with either
+schema file: values for missing columns are dropped, NOT NULL columns it does not
+know get a type default, and CHECK (col IN (...)) lists are honoured.
+
+Every seeded user has the password ``BENCH_PASSWORD`` and an ``@bench.worknow.test`` email.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import time
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import psycopg2
+
+from utils.prefectures import PREFECTURES
+from utils.security import hash_password
+
+BENCH_PASSWORD = "bench-password"
+EMAIL_DOMAIN = "bench.worknow.test"
+JST = timezone(timedelta(hours=9))
+BATCH_ROWS = 20_000
+
+# Share of --rows per table, in insert (foreign key) order
+TABLE_WEIGHTS: Tuple[Tuple[str, float], ...] = (
+    ("users", 0.04),
+    ("jobs", 0.08),
+    ("applications", 0.22),
+    ("assignments", 0.08),
+    ("payments", 0.06),
+    ("bank_accounts", 0.01),
+    ("withdrawal_requests", 0.03),
+    ("conversations", 0.03),
+    ("messages", 0.25),
+    ("notifications", 0.20),
+)
+
+# Used when a CHECK constraint does not allow the value we generate (the two schema files differ)
+VALUE_ALIASES = {
+    "company": "client",
+    "hired": "accepted",
+    "withdrawn": "cancelled",
+    "active": "confirmed",
+    "succeeded": "completed",
+    "canceled": "cancelled",
+    "ordinary": "普通",
+    "current": "当座",
+}
+
+JOB_TITLES = ("倉庫内ピッキング", "飲食店ホール", "イベント設営", "引越しアシスタント", "コンビニ品出し", "清掃スタッフ", "配送助手", "データ入力")
+JOB_PHRASES = (
+    "未経験歓迎。丁寧に教えますので安心してご応募ください。",
+    "倉庫での軽作業が中心です。",
+    "重い荷物はありません。",
+    "フォークリフト免許をお持ちの方優遇。",
+    "接客が好きな方にぴったりのお仕事です。",
+    "シフトは週1日・1日3時間からOK。",
+    "制服貸与、髪色自由。",
+    "学生・主婦(夫)・Wワーク歓迎。",
+)
+TAGS = ("未経験OK", "日払い", "交通費支給", "短時間", "週1からOK", "まかない付き", "駅チカ")
+LAST_NAMES = ("佐藤", "鈴木", "高橋", "田中", "伊藤", "渡辺", "山本", "中村", "小林", "加藤")
+FIRST_NAMES = ("翔太", "陽菜", "蓮", "結衣", "大翔", "葵", "悠真", "凛", "湊", "芽依")
+BANKS = (("みずほ銀行", "0001"), ("三菱UFJ銀行", "0005"), ("三井住友銀行", "0009"), ("ゆうちょ銀行", "9900"))
+
+_CHECK_IN = re.compile(r"(\w+)\)?(?:::[\w ]+)?\s*=\s*ANY\s*\(+ARRAY\[([^\]]*)\]")
+_QUOTED = re.compile(r"'((?:[^']|'')*)'")
+
+
+def allowed_values(check_definitions: List[str]) -> Dict[str, List[str]]:
+    """``CHECK ((role = ANY (ARRAY['worker'::text, ...])))`` -> {"role": ["worker", ...]}."""
+    allowed: Dict[str, List[str]] = {}
+    for definition in check_definitions:
+        for match in _CHECK_IN.finditer(definition):
+            allowed[match.group(1)] = [value.replace("''", "'") for value in _QUOTED.findall(match.group(2))]
+    return allowed
+
+
+class Column:
+    def __init__(self, name: str, data_type: str, udt_name: str, nullable: bool, has_default: bool) -> None:
+        self.name = name
+        self.data_type = data_type
+        self.udt_name = udt_name
+        self.nullable = nullable
+        self.has_default = has_default
+
+    @property
+    def is_integer(self) -> bool:
+        return self.udt_name in ("int2", "int4", "int8")
+
+    def fallback(self) -> Any:
+        """A value for a NOT NULL column without default that the generator knows nothing about."""
+        if self.data_type == "ARRAY":
+            return []
+        if self.udt_name in ("json", "jsonb"):
+            return {}
+        if self.udt_name == "bool":
+            return False
+        if self.is_integer or self.udt_name in ("numeric", "float4", "float8"):
+            return 0
+        if self.udt_name in ("timestamp", "timestamptz", "date"):
+            return datetime.now(timezone.utc)
+        if self.udt_name == "uuid":
+            return str(uuid.uuid4())
+        return "bench"
+
+
+class TableInfo:
+    def __init__(self, name: str, columns: List[Column], checks: Dict[str, List[str]]) -> None:
+        self.name = name
+        self.columns = {column.name: column for column in columns}
+        self.checks = checks
+
+    def coerce(self, column: str, value: Any) -> Any:
+        allowed = self.checks.get(column)
+        if allowed is None or value is None or value in allowed:
+            return value
+        alias = VALUE_ALIASES.get(value)
+        return alias if alias in allowed else allowed[0]
+
+
+def introspect(conn, table: str) -> Optional[TableInfo]:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT column_name, data_type, udt_name, is_nullable = 'YES', column_default IS NOT NULL
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s
+            ORDER BY ordinal_position
+            """,
+            (table,),
+        )
+        columns = [Column(*row) for row in cursor.fetchall()]
+        if not columns:
+            return None
+        cursor.execute(
+            """
+            SELECT pg_get_constraintdef(c.oid)
+            FROM pg_constraint c
+            JOIN pg_class t ON t.oid = c.conrelid
+            WHERE t.relname = %s AND t.relnamespace = current_schema()::regnamespace AND c.contype = 'c'
+            """,
+            (table,),
+        )
+        checks = allowed_values([row[0] for row in cursor.fetchall()])
+    return TableInfo(table, columns, checks)
+
+
+def table_counts(rows: int) -> Dict[str, int]:
+    counts = {table: max(1, round(rows * weight)) for table, weight in TABLE_WEIGHTS}
+    counts["users"] = max(counts["users"], 20)
+    return counts
+
+
+class Dataset:
+    """Deterministic rows for every table; ids and foreign keys are pure functions of row indexes."""
+
+    def __init__(self, rows: int, seed: int, base_date: date, password_hash: str, int_id_tables: Set[str] = frozenset()) -> None:
+        self.seed = seed
+        self.counts = table_counts(rows)
+        self.base = datetime(base_date.year, base_date.month, base_date.day, tzinfo=JST)
+        self.password_hash = password_hash
+        self.int_id_tables = int_id_tables
+        self.n_companies = (self.counts["users"] + 9) // 10
+        self.n_workers = self.counts["users"] - self.n_companies
+        self._prefecture_weights = [prefecture.population_10k for prefecture in PREFECTURES]
+
+    # -- index arithmetic -------------------------------------------------------------
+
+    def _mix(self, *parts: Any) -> int:
+        key = ":".join(str(part) for part in (self.seed,) + parts).encode()
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+    def ref(self, table: str, index: int) -> Any:
+        if table in self.int_id_tables:
+            return index + 1
+        return str(uuid.UUID(bytes=hashlib.blake2b(f"{self.seed}:{table}:{index}".encode(), digest_size=16).digest(), version=4))
+
+    def company_user(self, company: int) -> int:
+        return company * 10
+
+    def worker_user(self, worker: int) -> int:
+        return worker + worker // 9 + 1
+
+    def job_company(self, job: int) -> int:
+        return self._mix("jobs", job) % self.n_companies
+
+    def application_target(self, application: int) -> Tuple[int, int]:
+        """(job, worker) of an application; unique per pair while applications per job < workers."""
+        job = application % self.counts["jobs"]
+        round_ = application // self.counts["jobs"]
+        return job, (self._mix("applicants", job) + round_) % self.n_workers
+
+    @property
+    def _hire_stride(self) -> int:
+        return max(1, self.counts["applications"] // self.counts["assignments"])
+
+    def assignment_application(self, assignment: int) -> int:
+        return assignment * self._hire_stride
+
+    def is_hired(self, application: int) -> bool:
+        return application % self._hire_stride == 0 and application // self._hire_stride < self.counts["assignments"]
+
+    def job_start(self, job: int) -> datetime:
+        """Between 60 days before and 30 days after the base date; the past part becomes history."""
+        mixed = self._mix("jobstart", job)
+        return self.base + timedelta(days=mixed % 91 - 60, hours=6 + (mixed >> 8) % 15)
+
+    # -- rows --------------------------------------------------------------------------
+
+    def _point(self, rng: random.Random) -> Tuple[str, float, float]:
+        prefecture = rng.choices(PREFECTURES, weights=self._prefecture_weights)[0]
+        return (
+            prefecture.name,
+            round(prefecture.latitude + rng.gauss(0, 0.12), 6),
+            round(prefecture.longitude + rng.gauss(0, 0.12), 6),
+        )
+
+    def users(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["users"]):
+            is_company = index % 10 == 0
+            prefecture, lat, lng = self._point(rng)
+            created = self.base - timedelta(days=rng.randint(1, 720))
+            name = f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"
+            yield {
+                "id": self.ref("users", index),
+                "email": f"{'company' if is_company else 'worker'}{index // 10 if is_company else index - index // 10 - 1}@{EMAIL_DOMAIN}",
+                "password_hash": self.password_hash,
+                "full_name": f"株式会社{rng.choice(LAST_NAMES)}{index}" if is_company else name,
+                "role": "company" if is_company else "worker",
+                "is_active": True,
+                "phone": f"090{rng.randint(10_000_000, 99_999_999)}",
+                "phone_verified": rng.random() < 0.7,
+                "preferred_prefecture": prefecture,
+                "latitude": lat,
+                "longitude": lng,
+                "qualifications": rng.sample(("フォークリフト", "普通自動車免許", "調理師", "介護職員初任者研修"), k=rng.randint(0, 2)),
+                "is_online": rng.random() < 0.05,
+                "last_online_at": self.base - timedelta(minutes=rng.randint(1, 60 * 24 * 30)),
+                "is_verified": rng.random() < 0.6,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def jobs(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["jobs"]):
+            prefecture, lat, lng = self._point(rng)
+            starts_at = self.job_start(index)
+            rate = rng.randrange(1000, 2000, 50)
+            created = starts_at - timedelta(days=rng.randint(3, 30))
+            status = rng.choices(("published", "closed", "draft"), weights=(70, 20, 10))[0]
+            is_urgent = rng.random() < 0.05
+            yield {
+                "id": self.ref("jobs", index),
+                "company_id": self.ref("users", self.company_user(self.job_company(index))),
+                "title": f"{rng.choice(JOB_TITLES)}スタッフ募集 #{index}",
+                "description": "".join(rng.choices(JOB_PHRASES, k=rng.randint(1, 6))),
+                "location": f"{prefecture}内",
+                "prefecture": prefecture,
+                "latitude": lat,
+                "longitude": lng,
+                "employment_type": "part_time",
+                "hourly_rate": rate,
+                "wage_per_hour": rate,
+                "transportation_allowance": rng.choice((0, 500, 1000)),
+                "currency": "JPY",
+                "status": status,
+                "tags": rng.sample(TAGS, k=rng.randint(0, 3)),
+                "starts_at": starts_at,
+                "ends_at": starts_at + timedelta(hours=rng.randint(3, 9)),
+                "is_urgent": is_urgent,
+                "urgent_deadline": starts_at - timedelta(hours=6) if is_urgent else None,
+                "working_hours": "9:00-18:00",
+                "required_workers": rng.randint(1, 5),
+                "metadata": {},
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def applications(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["applications"]):
+            job, worker = self.application_target(index)
+            created = self.base - timedelta(days=rng.randint(0, 90), minutes=rng.randint(0, 1440))
+            status = "hired" if self.is_hired(index) else rng.choices(("pending", "rejected", "withdrawn"), weights=(70, 20, 10))[0]
+            yield {
+                "id": self.ref("applications", index),
+                "job_id": self.ref("jobs", job),
+                "worker_id": self.ref("users", self.worker_user(worker)),
+                "cover_letter": "よろしくお願いします。",
+                "message": "よろしくお願いします。",
+                "status": status,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def assignments(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["assignments"]):
+            application = self.assignment_application(index)
+            job, worker = self.application_target(application)
+            start = self.job_start(job)
+            done = start < self.base
+            cancelled = rng.random() < 0.03
+            status = "cancelled" if cancelled else ("completed" if done else "active")
+            started = start + timedelta(minutes=rng.randint(-10, 10)) if done and not cancelled else None
+            completed = started + timedelta(hours=rng.randint(3, 9)) if started else None
+            yield {
+                "id": self.ref("assignments", index),
+                "job_id": self.ref("jobs", job),
+                "worker_id": self.ref("users", self.worker_user(worker)),
+                "application_id": self.ref("applications", application),
+                "status": status,
+                "started_at": started,
+                "completed_at": completed,
+                "checked_in_at": started,
+                "checked_out_at": completed,
+                "metadata": {},
+                "created_at": start - timedelta(days=2),
+                "updated_at": completed or start - timedelta(days=2),
+            }
+
+    def payments(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["payments"]):
+            assignment = index % self.counts["assignments"]
+            _, worker = self.application_target(self.assignment_application(assignment))
+            created = self.base - timedelta(days=rng.randint(0, 60))
+            status = rng.choices(("succeeded", "processing", "canceled"), weights=(85, 10, 5))[0]
+            yield {
+                "id": self.ref("payments", index),
+                "assignment_id": self.ref("assignments", assignment),
+                "worker_id": self.ref("users", self.worker_user(worker)),
+                "amount": rng.randrange(3000, 15000, 100),
+                "currency": "jpy",
+                "status": status,
+                "paid_at": created if status == "succeeded" else None,
+                "metadata": {},
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def bank_accounts(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["bank_accounts"]):
+            bank, code = rng.choice(BANKS)
+            yield {
+                "id": self.ref("bank_accounts", index),
+                "user_id": self.ref("users", self.worker_user(index % self.n_workers)),
+                "bank_name": bank,
+                "bank_code": code,
+                "branch_name": "本店営業部",
+                "branch_code": "001",
+                "account_type": "ordinary",
+                "account_number": f"{rng.randint(1_000_000, 9_999_999)}",
+                "account_holder_name": "ベンチ タロウ",
+                "is_default": True,
+                "created_at": self.base - timedelta(days=rng.randint(1, 365)),
+                "updated_at": self.base,
+            }
+
+    def withdrawal_requests(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["withdrawal_requests"]):
+            account = index % self.counts["bank_accounts"]
+            created = self.base - timedelta(days=rng.randint(0, 180))
+            status = rng.choices(("completed", "pending", "processing", "rejected"), weights=(70, 15, 10, 5))[0]
+            yield {
+                "id": self.ref("withdrawal_requests", index),
+                "user_id": self.ref("users", self.worker_user(account % self.n_workers)),
+                "bank_account_id": self.ref("bank_accounts", account),
+                "amount": rng.randrange(1000, 30000, 100),
+                "currency": "JPY",
+                "status": status,
+                "processed_at": created + timedelta(days=2) if status == "completed" else None,
+                "metadata": {},
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def conversation_members(self, conversation: int) -> Tuple[int, int]:
+        """(worker user index, company user index)."""
+        worker = conversation % self.n_workers
+        company = self._mix("conversations", conversation) % self.n_companies
+        return self.worker_user(worker), self.company_user(company)
+
+    def conversations(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["conversations"]):
+            worker, company = self.conversation_members(index)
+            created = self.base - timedelta(days=rng.randint(1, 120))
+            yield {
+                "id": self.ref("conversations", index),
+                "participant_1_id": self.ref("users", worker),
+                "participant_2_id": self.ref("users", company),
+                "last_message_at": self.base - timedelta(minutes=rng.randint(1, 60 * 24 * 30)),
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def conversation_participants(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["conversations"]):
+            for user in self.conversation_members(index):
+                yield {"conversation_id": self.ref("conversations", index), "user_id": self.ref("users", user)}
+
+    def messages(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["messages"]):
+            conversation = self._mix("messages", index) % self.counts["conversations"]
+            members = self.conversation_members(conversation)
+            sender, receiver = members if rng.random() < 0.5 else members[::-1]
+            is_read = rng.random() < 0.8
+            yield {
+                "id": self.ref("messages", index),
+                "conversation_id": self.ref("conversations", conversation),
+                "sender_id": self.ref("users", sender),
+                "receiver_id": self.ref("users", receiver),
+                "content": rng.choice(("よろしくお願いします。", "明日の集合時間は何時ですか？", "承知しました。", "ありがとうございました！")),
+                "is_read": is_read,
+                "read_by": [self.ref("users", receiver)] if is_read else [],
+                "created_at": self.base - timedelta(minutes=rng.randint(1, 60 * 24 * 120)),
+            }
+
+    def notifications(self, rng: random.Random) -> Iterator[Dict[str, Any]]:
+        for index in range(self.counts["notifications"]):
+            created = self.base - timedelta(minutes=rng.randint(1, 60 * 24 * 90))
+            read = rng.random() < 0.6
+            kind = rng.choice(("application", "assignment", "payment", "system"))
+            yield {
+                "id": self.ref("notifications", index),
+                "user_id": self.ref("users", self._mix("notifications", index) % self.counts["users"]),
+                "type": kind,
+                "title": "お知らせ",
+                "body": f"{kind} の更新があります",
+                "data": {},
+                "read_at": created + timedelta(hours=1) if read else None,
+                "is_read": read,
+                "created_at": created,
+                "updated_at": created,
+            }
+
+    def generators(self) -> List[Tuple[str, Callable[[random.Random], Iterator[Dict[str, Any]]]]]:
+        order = [table for table, _ in TABLE_WEIGHTS]
+        order.insert(order.index("messages"), "conversation_participants")
+        return [(table, getattr(self, table)) for table in order]
+
+
+# -- COPY ---------------------------------------------------------------------------------
+
+
+def _array_literal(values: List[Any]) -> str:
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"') for value in values)
+    return "{" + ",".join(f'"{value}"' for value in escaped) + "}"
+
+
+def _csv_value(column: Column, value: Any) -> Any:
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (list, tuple)):
+        if column.data_type == "ARRAY":
+            return _array_literal(value)
+        if column.udt_name in ("json", "jsonb"):
+            return json.dumps(value, ensure_ascii=False)
+        return ",".join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_rows(conn, info: TableInfo, rows: Iterator[Dict[str, Any]]) -> int:
+    """Stream rows into ``info.name`` with COPY, keeping only columns the table has."""
+    columns: Optional[List[Column]] = None
+    written = 0
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> None:
+        buffer.seek(0)
+        names = ", ".join(column.name for column in columns)
+        with conn.cursor() as cursor:
+            cursor.copy_expert(f"COPY {info.name} ({names}) FROM STDIN WITH (FORMAT csv)", buffer)
+        buffer.seek(0)
+        buffer.truncate()
+
+    for row in rows:
+        if columns is None:
+            known = [info.columns[name] for name in row if name in info.columns]
+            extra = [
+                column for name, column in info.columns.items()
+                if name not in row and not column.nullable and not column.has_default
+            ]
+            columns = known + extra
+        writer.writerow([
+            _csv_value(column, info.coerce(column.name, row[column.name] if column.name in row else column.fallback()))
+            for column in columns
+        ])
+        written += 1
+        if written % BATCH_ROWS == 0:
+            flush()
+    if columns is not None and buffer.tell():
+        flush()
+    return written
+
+
+def seed_database(conn, rows: int, seed: int, base_date: date, reset: bool = False) -> Dict[str, int]:
+    infos: Dict[str, TableInfo] = {}
+    for table, _ in TABLE_WEIGHTS + (("conversation_participants", 0),):
+        info = introspect(conn, table)
+        if info is not None:
+            infos[table] = info
+    int_id_tables = {table for table, info in infos.items() if "id" in info.columns and info.columns["id"].is_integer}
+
+    if reset:
+        with conn.cursor() as cursor:
+            cursor.execute(f"TRUNCATE {', '.join(infos)} CASCADE")
+        conn.commit()
+
+    dataset = Dataset(rows, seed, base_date, hash_password(BENCH_PASSWORD), int_id_tables)
+    written: Dict[str, int] = {}
+    for table, generate in dataset.generators():
+        if table not in infos:
+            print(f"{table:<28}skipped (table not found)")
+            continue
+        started = time.perf_counter()
+        written[table] = copy_rows(conn, infos[table], generate(random.Random(f"{seed}:{table}")))
+        conn.commit()
+        print(f"{table:<28}{written[table]:>12,} rows {time.perf_counter() - started:>8.1f}s")
+
+    with conn.cursor() as cursor:
+        for table in int_id_tables:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence(%s, 'id'), (SELECT MAX(id) FROM {table}))",
+                (table,),
+            )
+        for table in written:
+            cursor.execute(f"ANALYZE {table}")
+    conn.commit()
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    parser.add_argument("--rows", type=int, default=10_000, help="approximate total rows (10k-10M)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-date", type=date.fromisoformat, default=date.today(), help="YYYY-MM-DD, 'now' of the dataset")
+    parser.add_argument("--reset", action="store_true", help="TRUNCATE the seeded tables first")
+    args = parser.parse_args()
+
+    dsn = args.database_url or os.environ["DATABASE_URL"]
+    conn = psycopg2.connect(dsn)
+    try:
+        dbname = conn.get_dsn_parameters().get("dbname", "")
+        if args.reset and not re.search(r"bench|test", dbname):
+            parser.error(f"refusing to --reset database {dbname!r}: its name must contain 'bench' or 'test'")
+        started = time.perf_counter()
+        written = seed_database(conn, args.rows, args.seed, args.base_date, reset=args.reset)
+        print(f"{'total':<28}{sum(written.values()):>12,} rows {time.perf_counter() - started:>8.1f}s")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""HTTP load scenarios for the hot endpoints, with JSON reports comparable across commits.
+
+Seed a database with ``benchmarks.datagen``, start the API against it with rate
+limiting off (``RATE_LIMIT_ENABLED=false``), then from ``backend/``::
+
+    python -m benchmarks.loadtest --base-url http://localhost:8000 --concurrency 16 --duration 30
+    python -m benchmarks.loadtest --compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+
+Scenarios: jobs_distance, inbox, unread_count, login, check_in_out, withdrawals.
+One check_in_out sample is the whole flow (check-in QR, check-in, check-out QR,
+check-out) on a fresh assignment; the scenario stops early when those run out.
+Fixtures (user emails, open assignments) are read from DATABASE_URL.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+import psycopg2
+
+from utils.prefectures import PREFECTURES
+
+from .datagen import BENCH_PASSWORD, EMAIL_DOMAIN
+from .report import build_report, format_comparison, git_commit, summarize, write_report
+
+RESULTS_DIR = Path(__file__).parent / "results"
+FIXTURE_USERS = 200
+
+
+class Exhausted(Exception):
+    """The scenario has no fixtures left."""
+
+
+class Context:
+    def __init__(self, client: httpx.AsyncClient, conn, seed: int) -> None:
+        self.client = client
+        self.conn = conn
+        self.rng = random.Random(seed)
+        self._tokens: Dict[str, str] = {}
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self.conn.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    async def login(self, email: str) -> httpx.Response:
+        response = await self.client.post("/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+        response.raise_for_status()
+        return response
+
+    async def headers(self, email: str) -> Dict[str, str]:
+        token = self._tokens.get(email)
+        if token is None:
+            token = self._tokens[email] = (await self.login(email)).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def emails(self, role: str, limit: int = FIXTURE_USERS) -> List[str]:
+        rows = self.query(
+            "SELECT email FROM users WHERE role = %s AND email LIKE %s ORDER BY email LIMIT %s",
+            (role, f"%@{EMAIL_DOMAIN}", limit),
+        )
+        if not rows:
+            raise SystemExit(f"No seeded {role} users found; run benchmarks.datagen first")
+        return [row[0] for row in rows]
+
+
+class Scenario:
+    name = ""
+
+    async def setup(self, ctx: Context) -> None:
+        self.ctx = ctx
+
+    async def prepare(self, worker: int) -> Any:
+        """Untimed per-sample preparation; its result is passed to ``step``."""
+        return None
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        raise NotImplementedError
+
+
+class JobsDistance(Scenario):
+    """Published jobs sorted by distance from a point near a random prefecture office."""
+
+    name = "jobs_distance"
+
+    async def setup(self, ctx: Context) -> None:
+        await super().setup(ctx)
+        self.users = [await ctx.headers(email) for email in ctx.emails("worker", 20)]
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        rng = self.ctx.rng
+        prefecture = rng.choice(PREFECTURES)
+        response = await self.ctx.client.get(
+            "/jobs/",
+            params={
+                "status": "published",
+                "sort": "distance",
+                "user_lat": prefecture.latitude + rng.uniform(-0.1, 0.1),
+                "user_lng": prefecture.longitude + rng.uniform(-0.1, 0.1),
+                "page": rng.randint(1, 5),
+            },
+            headers=self.users[worker % len(self.users)],
+        )
+        response.raise_for_status()
+
+
+class Inbox(Scenario):
+    """Conversation list of the users with the most messages."""
+
+    name = "inbox"
+    path = "/messages/conversations"
+
+    async def setup(self, ctx: Context) -> None:
+        await super().setup(ctx)
+        rows = ctx.query(
+            """
+            SELECT u.email FROM messages m JOIN users u ON u.id::text = m.sender_id::text
+            WHERE u.email LIKE %s GROUP BY u.email ORDER BY COUNT(*) DESC LIMIT %s
+            """,
+            (f"%@{EMAIL_DOMAIN}", 50),
+        )
+        self.users = [await ctx.headers(row[0]) for row in rows]
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        response = await self.ctx.client.get(self.path, headers=self.ctx.rng.choice(self.users))
+        response.raise_for_status()
+
+
+class UnreadCount(Inbox):
+    name = "unread_count"
+    path = "/messages/unread-count"
+
+
+class Login(Scenario):
+    name = "login"
+
+    async def setup(self, ctx: Context) -> None:
+        await super().setup(ctx)
+        self.emails = ctx.emails("worker")
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        await self.ctx.login(self.ctx.rng.choice(self.emails))
+
+
+class CheckInOut(Scenario):
+    name = "check_in_out"
+
+    async def setup(self, ctx: Context) -> None:
+        await super().setup(ctx)
+        self.assignments = ctx.query(
+            """
+            SELECT a.id::text, w.email, c.email
+            FROM assignments a
+            JOIN jobs j ON j.id::text = a.job_id::text
+            JOIN users w ON w.id::text = a.worker_id::text
+            JOIN users c ON c.id::text = j.company_id::text
+            WHERE a.started_at IS NULL AND a.status NOT IN ('cancelled', 'completed')
+            AND w.email LIKE %s
+            LIMIT 5000
+            """,
+            (f"%@{EMAIL_DOMAIN}",),
+        )
+
+    async def prepare(self, worker: int) -> Any:
+        if not self.assignments:
+            raise Exhausted()
+        assignment_id, worker_email, company_email = self.assignments.pop()
+        return assignment_id, await self.ctx.headers(company_email), await self.ctx.headers(worker_email)
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        assignment_id, company, staff = state
+        for kind in ("check-in", "check-out"):
+            qr = await self.ctx.client.get(f"/qr/{kind}/{assignment_id}", params={"inline": "false"}, headers=company)
+            qr.raise_for_status()
+            done = await self.ctx.client.post(
+                f"/qr/{kind}", json={"token": qr.json()["token"], "assignment_id": assignment_id}, headers=staff
+            )
+            done.raise_for_status()
+
+
+class Withdrawals(Scenario):
+    """Balance plus withdrawal history, as the wallet screen loads them."""
+
+    name = "withdrawals"
+
+    async def setup(self, ctx: Context) -> None:
+        await super().setup(ctx)
+        rows = ctx.query(
+            """
+            SELECT DISTINCT u.email FROM withdrawal_requests w JOIN users u ON u.id::text = w.user_id::text
+            WHERE u.email LIKE %s LIMIT %s
+            """,
+            (f"%@{EMAIL_DOMAIN}", 50),
+        )
+        self.users = [await ctx.headers(row[0]) for row in rows]
+
+    async def step(self, worker: int, state: Any = None) -> None:
+        headers = self.ctx.rng.choice(self.users)
+        for path in ("/withdrawals/balance", "/withdrawals/"):
+            response = await self.ctx.client.get(path, headers=headers)
+            response.raise_for_status()
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (JobsDistance, Inbox, UnreadCount, Login, CheckInOut, Withdrawals)}
+
+
+async def run_scenario(scenario: Scenario, concurrency: int, duration: float, warmup: float) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    measuring = False
+
+    async def loop(worker: int, until: float) -> None:
+        nonlocal errors
+        while time.monotonic() < until:
+            try:
+                state = await scenario.prepare(worker)
+                started = time.perf_counter()
+                await scenario.step(worker, state)
+            except Exhausted:
+                return
+            except (httpx.HTTPError, KeyError, ValueError):
+                if measuring:
+                    errors += 1
+                continue
+            if measuring:
+                latencies.append(time.perf_counter() - started)
+
+    if warmup > 0:
+        await asyncio.gather(*(loop(i, time.monotonic() + warmup) for i in range(concurrency)))
+    measuring = True
+    started = time.monotonic()
+    await asyncio.gather(*(loop(i, started + duration) for i in range(concurrency)))
+    return summarize(latencies, errors, time.monotonic() - started)
+
+
+def dataset_size(conn) -> Dict[str, int]:
+    with conn.cursor() as cursor:
+        cursor.execute("SELECT relname, n_live_tup FROM pg_stat_user_tables ORDER BY relname")
+        return {name: count for name, count in cursor.fetchall()}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    conn = psycopg2.connect(args.database_url or os.environ["DATABASE_URL"])
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results: Dict[str, Any] = {}
+    try:
+        async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+            ctx = Context(client, conn, args.seed)
+            for name in args.scenarios:
+                scenario = SCENARIOS[name]()
+                await scenario.setup(ctx)
+                results[name] = await run_scenario(scenario, args.concurrency, args.duration, args.warmup)
+                stats = results[name]
+                print(
+                    f"{name:<16}{stats['requests']:>8} req {stats['throughput_rps']:>9.1f}/s "
+                    f"p50 {stats['p50_ms']:>8.1f}ms p95 {stats['p95_ms']:>8.1f}ms p99 {stats['p99_ms']:>8.1f}ms "
+                    f"errors {stats['errors']}"
+                )
+        return build_report(
+            results,
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            duration_seconds=args.duration,
+            seed=args.seed,
+            dataset=dataset_size(conn),
+        )
+    finally:
+        conn.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--database-url", default=None, help="defaults to DATABASE_URL")
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="measured seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, default=None, help="defaults to benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "HEAD"), help="print the change between two reports")
+    args = parser.parse_args()
+
+    if args.compare:
+        base, head = (json.loads(Path(path).read_text()) for path in args.compare)
+        print(format_comparison(base, head))
+        return
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    report = asyncio.run(run(args))
+    out = args.out or RESULTS_DIR / f"{git_commit()}.json"
+    write_report(report, out)
+    print(f"report written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Machine-readable benchmark reports and commit-to-commit comparison."""
+
+import json
+import math
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+
+
+def percentile(ordered: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    """Latencies in seconds -> counts, throughput and p50/p95/p99 in milliseconds."""
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def build_report(scenarios: Dict[str, Dict[str, Any]], **meta: Any) -> Dict[str, Any]:
+    return {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        **meta,
+        "scenarios": scenarios,
+    }
+
+
+def write_report(report: Dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+
+def compare(base: Dict[str, Any], head: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per scenario and metric: base, head and relative change (positive = larger)."""
+    rows = []
+    for name, head_stats in head["scenarios"].items():
+        base_stats = base["scenarios"].get(name)
+        if base_stats is None:
+            continue
+        for metric in METRICS:
+            before, after = base_stats[metric], head_stats[metric]
+            change = (after - before) / before if before else 0.0
+            rows.append({"scenario": name, "metric": metric, "base": before, "head": after, "change": round(change, 4)})
+    return rows
+
+
+def format_comparison(base: Dict[str, Any], head: Dict[str, Any]) -> str:
+    lines = [
+        f"base {base.get('commit', '?')}  ->  head {head.get('commit', '?')}",
+        f"{'scenario':<16}{'metric':<16}{'base':>12}{'head':>12}{'change':>10}",
+    ]
+    for row in compare(base, head):
+        lines.append(
+            f"{row['scenario']:<16}{row['metric']:<16}{row['base']:>12.2f}{row['head']:>12.2f}{row['change'] * 100:>+9.1f}%"
+        )
+    return "\n".join(lines)
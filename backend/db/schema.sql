@@ -33,6 +33,8 @@ create table if not exists public.users (
     created_at timestamptz not null default now(),
     updated_at timestamptz not null default now()
 );
+-- アバターのリサイズ済みWebP (thumb / small / medium) のURL
+alter table public.users add column if not exists avatar_variants jsonb;
 
 -- =====================================================
 -- JOBS
@@ -56,6 +58,8 @@ create table if not exists public.jobs (
 );
 create index if not exists idx_jobs_company_id on public.jobs (company_id);
 create index if not exists idx_jobs_status on public.jobs (status);
+-- 都道府県 (一覧の絞り込み・ファセット・おすすめのセグメント)
+alter table public.jobs add column if not exists prefecture text;
 
 -- =====================================================
 -- APPLICATIONS
@@ -97,6 +101,30 @@ create index if not exists idx_assignments_job_id on public.assignments (job_id)
 create index if not exists idx_assignments_worker_id on public.assignments (worker_id);
 create index if not exists idx_assignments_status on public.assignments (status);
 
+-- =====================================================
+-- QR TOKENS (チェックイン / チェックアウト)
+-- =====================================================
+create table if not exists public.qr_tokens (
+    id uuid primary key default uuid_generate_v4(),
+    assignment_id uuid not null references public.assignments (id) on delete cascade,
+    company_id uuid not null references public.users (id) on delete cascade,
+    token text not null unique,
+    token_type text not null check (token_type in ('check_in', 'check_out')),
+    expires_at timestamptz not null,
+    used_at timestamptz,
+    created_at timestamptz not null default now()
+);
+create index if not exists idx_qr_tokens_unused on public.qr_tokens (assignment_id, token_type) where used_at is null;
+
+-- 署名付きQRトークン (QR_TOKEN_MODE=signed) の使用記録。nonce の一意制約で再利用を防ぐ
+create table if not exists public.qr_token_uses (
+    nonce text primary key,
+    assignment_id uuid not null references public.assignments (id) on delete cascade,
+    token_type text not null check (token_type in ('check_in', 'check_out')),
+    expires_at timestamptz not null,
+    used_at timestamptz not null default now()
+);
+
 -- =====================================================
 -- PAYMENTS
 -- =====================================================
@@ -124,6 +152,44 @@ create table if not exists public.payments (
 create index if not exists idx_payments_assignment_id on public.payments (assignment_id);
 create index if not exists idx_payments_status on public.payments (status);
 create unique index if not exists idx_payments_intent on public.payments (stripe_payment_intent_id) where stripe_payment_intent_id is not null;
+-- Stripe の event.created (epoch 秒)。古いイベントで状態を巻き戻さないためのガード
+alter table public.payments add column if not exists last_stripe_event_at bigint;
+
+-- =====================================================
+-- STORED FILES (内容アドレス方式のアップロード。ref_count が 0 のものは GC 対象)
+-- =====================================================
+create table if not exists public.stored_files (
+    key text primary key,
+    sha256 text not null,
+    size bigint not null,
+    content_type text not null,
+    ref_count integer not null default 0,
+    created_at timestamptz not null default now(),
+    released_at timestamptz
+);
+create index if not exists idx_stored_files_released on public.stored_files (released_at) where ref_count = 0;
+
+-- =====================================================
+-- STRIPE EVENTS (Webhook 受信箱)
+-- =====================================================
+create table if not exists public.stripe_events (
+    id uuid primary key default uuid_generate_v4(),
+    stripe_event_id text not null unique,
+    type text not null,
+    payment_intent_id text,
+    stripe_created bigint,
+    payload jsonb not null,
+    status text not null default 'pending' check (
+        status in ('pending', 'processed', 'failed', 'skipped')
+    ),
+    attempts integer not null default 0,
+    last_error text,
+    received_at timestamptz not null default now(),
+    processed_at timestamptz
+);
+create index if not exists idx_stripe_events_pending on public.stripe_events (stripe_created, received_at) where status = 'pending';
+create index if not exists idx_stripe_events_intent on public.stripe_events (payment_intent_id);
+create index if not exists idx_stripe_events_status on public.stripe_events (status);
 
 -- =====================================================
 -- REVIEWS
@@ -241,12 +307,12 @@ begin
         select 1 from pg_proc where proname = 'set_updated_at'
     ) then
         create function public.set_updated_at()
-        returns trigger as $$
+        returns trigger as $fn$
         begin
             new.updated_at = now();
             return new;
         end;
-        $$ language plpgsql;
+        $fn$ language plpgsql;
     end if;
 end $$;
 
@@ -316,6 +382,253 @@ begin
     end if;
 end $$;
 
+-- =====================================================
+-- PENALTIES (routers/penalties.py。評価集計と自動マッチングが有効な点数を参照)
+-- =====================================================
+create table if not exists public.penalties (
+    id uuid primary key default uuid_generate_v4(),
+    user_id uuid not null references public.users (id) on delete cascade,
+    type text not null check (type in ('warning', 'suspension', 'ban')),
+    reason text not null,
+    description text,
+    penalty_points integer not null default 0,
+    issued_by uuid references public.users (id) on delete set null,
+    issued_at timestamptz not null default now(),
+    expires_at timestamptz,
+    is_active boolean not null default true,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now()
+);
+create index if not exists idx_penalties_user_active on public.penalties (user_id) where is_active;
+-- 期限切れの検出 (run_reputation_refresher)
+create index if not exists idx_penalties_expires_at on public.penalties (expires_at) where is_active;
+
+-- =====================================================
+-- WORKER REPUTATION (reviews / assignments / penalties の集計。主キー 1 回で読める)
+-- =====================================================
+-- レビュー作成・更新、割当の完了/キャンセル、ペナルティの作成/解除のたびに
+-- 該当ユーザーの行だけ再集計する。全件再構築は python -m scripts.rebuild_reputation
+create table if not exists public.worker_reputation (
+    user_id uuid primary key references public.users (id) on delete cascade,
+    rating_average numeric(3, 2),
+    review_count integer not null default 0,
+    completed_assignments integer not null default 0,
+    cancelled_assignments integer not null default 0,
+    -- チェックインされないまま求人の終了時刻を過ぎた割当
+    no_show_count integer not null default 0,
+    -- 有効かつ期限切れでないペナルティの合計点
+    penalty_points integer not null default 0,
+    updated_at timestamptz not null default now()
+);
+
+-- =====================================================
+-- AUTO MATCH (急募求人のオファーを波状に送信)
+-- =====================================================
+-- 急募求人の公開時に、半径内・オンライン・有効なペナルティなし・勤務時間が
+-- 重複しないワーカーを採点し、定員 × 倍率のオファーを送る。期限切れや辞退で
+-- 枠が空けば次の波を送る (最大 AUTO_MATCH_MAX_WAVES 回)
+alter table public.users add column if not exists is_online boolean not null default false;
+alter table public.users add column if not exists last_online_at timestamptz;
+alter table public.jobs add column if not exists latitude numeric(10, 7);
+alter table public.jobs add column if not exists longitude numeric(10, 7);
+alter table public.jobs add column if not exists is_urgent boolean not null default false;
+alter table public.jobs add column if not exists urgent_deadline timestamptz;
+alter table public.jobs add column if not exists required_workers integer not null default 1;
+
+-- オンラインのワーカーだけを緯度経度の範囲で引く
+create index if not exists idx_users_online_worker_location on public.users (latitude, longitude)
+    where role = 'worker' and is_online;
+-- 勤務予定・勤務中の割当 (時間帯の重複チェック用)
+create index if not exists idx_assignments_open_worker on public.assignments (worker_id, job_id)
+    where status not in ('completed', 'cancelled', 'delivered');
+create index if not exists idx_jobs_urgent_open on public.jobs (urgent_deadline)
+    where is_urgent and status = 'published';
+
+create table if not exists public.job_offers (
+    id uuid primary key default uuid_generate_v4(),
+    job_id uuid not null references public.jobs (id) on delete cascade,
+    worker_id uuid not null references public.users (id) on delete cascade,
+    wave integer not null,
+    score numeric(7, 4) not null,
+    distance_km numeric(7, 2),
+    status text not null default 'offered' check (status in ('offered', 'accepted', 'declined', 'expired')),
+    expires_at timestamptz not null,
+    responded_at timestamptz,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    unique (job_id, worker_id)
+);
+create index if not exists idx_job_offers_open on public.job_offers (job_id, expires_at) where status = 'offered';
+create index if not exists idx_job_offers_worker on public.job_offers (worker_id, status);
+
+-- =====================================================
+-- SHIFT CONFLICTS (同一ワーカーの勤務時間の重複を排他制約で禁止)
+-- =====================================================
+-- 割当ごとに求人の勤務時間帯を shift_range として保持し、未完了の割当どうしで
+-- 同じワーカーの時間帯が重なる INSERT / UPDATE を拒否する (SQLSTATE 23P01)。
+-- 制約の GiST インデックスがワーカー単位の重複検索にも使われる
+create extension if not exists btree_gist;
+
+alter table public.assignments add column if not exists shift_range tstzrange;
+
+-- 終了時刻がない / 開始と同じ求人は 1 分の枠として扱う (services.schedule_service.shift_window と同じ規則)
+create or replace function public.job_shift_range(starts_at timestamptz, ends_at timestamptz)
+returns tstzrange
+language sql
+immutable
+as $$
+    select case
+        when starts_at is null then null
+        else tstzrange(starts_at, greatest(coalesce(ends_at, starts_at), starts_at + interval '1 minute'), '[)')
+    end;
+$$;
+
+create or replace function public.set_assignment_shift_range()
+returns trigger
+language plpgsql
+as $$
+begin
+    select public.job_shift_range(j.starts_at, j.ends_at) into new.shift_range
+    from public.jobs j
+    where j.id = new.job_id;
+    return new;
+end;
+$$;
+
+create or replace function public.sync_assignment_shift_ranges()
+returns trigger
+language plpgsql
+as $$
+begin
+    update public.assignments
+    set shift_range = public.job_shift_range(new.starts_at, new.ends_at)
+    where job_id = new.id;
+    return new;
+end;
+$$;
+
+do $$
+begin
+    perform 1 from information_schema.triggers where trigger_name = 'set_assignment_shift_range';
+    if not found then
+        create trigger set_assignment_shift_range
+        before insert or update of job_id on public.assignments
+        for each row execute function public.set_assignment_shift_range();
+    end if;
+
+    perform 1 from information_schema.triggers where trigger_name = 'sync_assignment_shift_ranges';
+    if not found then
+        create trigger sync_assignment_shift_ranges
+        after update of starts_at, ends_at on public.jobs
+        for each row execute function public.sync_assignment_shift_ranges();
+    end if;
+end $$;
+
+update public.assignments s
+set shift_range = public.job_shift_range(j.starts_at, j.ends_at)
+from public.jobs j
+where j.id = s.job_id and s.shift_range is null and j.starts_at is not null;
+
+-- 既存データに重複がある場合はここで失敗するので、先に片方をキャンセルしてから適用する
+do $$
+begin
+    perform 1 from pg_constraint where conname = 'assignments_no_overlapping_shifts';
+    if not found then
+        alter table public.assignments add constraint assignments_no_overlapping_shifts
+            exclude using gist (worker_id with =, shift_range with &&)
+            where (status not in ('completed', 'cancelled', 'delivered'));
+    end if;
+end $$;
+
+-- =====================================================
+-- DELIVERY TRACKS (配達中の位置履歴。間引いた点だけを保存)
+-- =====================================================
+-- 数秒おきの生の位置は Redis のリングバッファに置き、定期フラッシュで
+-- 一定の時間・距離ごとに間引いた点だけをまとめて書き込む
+create table if not exists public.assignment_track_points (
+    assignment_id uuid not null references public.assignments (id) on delete cascade,
+    recorded_at timestamptz not null,
+    latitude double precision not null,
+    longitude double precision not null,
+    accuracy_m real,
+    speed_mps real,
+    primary key (assignment_id, recorded_at)
+);
+
+-- =====================================================
+-- JOB SEARCH (日本語の全文検索。文字 bigram の tsvector を別テーブルで保持)
+-- =====================================================
+-- NFKC 正規化・小文字化したうえで記号や空白で区切り、各区間を 2 文字ずつの
+-- bigram に分解してスペース区切りで返す (1 文字だけの区間はそのまま)。
+-- 検索語にも同じ関数をかけ、phraseto_tsquery で隣接を要求すると部分一致になる。
+create or replace function public.ja_bigram_text(input text)
+returns text
+language sql
+immutable
+parallel safe
+as $$
+    select coalesce(
+        string_agg(
+            case when char_length(t.token) = 1 then t.token else substr(t.token, g.i, 2) end,
+            ' ' order by t.n, g.i
+        ),
+        ''
+    )
+    from regexp_split_to_table(
+             lower(normalize(coalesce(input, ''), nfkc)),
+             '[^[:alnum:]ぁ-んァ-ヶー一-龯々]+'
+         ) with ordinality as t (token, n)
+    cross join lateral generate_series(1, greatest(char_length(t.token) - 1, 1)) as g (i)
+    where t.token <> ''
+$$;
+
+-- タイトル (A) > タグ (B) > 説明 (D) の重みで ts_rank に効かせる
+create or replace function public.jobs_search_vector(title text, description text, tags text[])
+returns tsvector
+language sql
+immutable
+parallel safe
+as $$
+    select setweight(to_tsvector('simple', public.ja_bigram_text(title)), 'A')
+        || setweight(to_tsvector('simple', public.ja_bigram_text(array_to_string(tags, ' '))), 'B')
+        || setweight(to_tsvector('simple', public.ja_bigram_text(description)), 'D')
+$$;
+
+-- jobs に列を足すと select jobs.* が毎回 tsvector を運ぶため別テーブルにする
+create table if not exists public.job_search_index (
+    job_id uuid primary key references public.jobs (id) on delete cascade,
+    search_vector tsvector not null
+);
+create index if not exists idx_job_search_index_vector on public.job_search_index using gin (search_vector);
+
+create or replace function public.sync_job_search_index()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into public.job_search_index (job_id, search_vector)
+    values (new.id, public.jobs_search_vector(new.title, new.description, new.tags))
+    on conflict (job_id) do update set search_vector = excluded.search_vector;
+    return null;
+end;
+$$;
+
+do $$
+begin
+    perform 1 from information_schema.triggers where trigger_name = 'sync_job_search_index_jobs';
+    if not found then
+        create trigger sync_job_search_index_jobs
+        after insert or update of title, description, tags on public.jobs
+        for each row execute function public.sync_job_search_index();
+    end if;
+end $$;
+
+-- 既存の求人を索引に載せる (未登録のものだけ)
+insert into public.job_search_index (job_id, search_vector)
+select j.id, public.jobs_search_vector(j.title, j.description, j.tags)
+from public.jobs j
+where not exists (select 1 from public.job_search_index s where s.job_id = j.id);
+
 -- =====================================================
 -- SAMPLE RLS POLICIES (コメントアウト)
 -- =====================================================
@@ -1,12 +1,19 @@
+import time
+
+from cachetools import TTLCache
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import OAuth2PasswordBearer
 
 from schemas import UserRead, UserRole
 from services.auth_service import AuthService
 from services.user_service import UserService
+from utils.security import decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# bearer token -> (user id, expiry), so signatures are verified once per token
+_subjects: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
 
 def get_auth_service() -> AuthService:
     return AuthService()
@@ -23,6 +30,23 @@ def get_current_user(
     return auth_service.verify_access_token(token)
 
 
+async def get_token_subject(token: str = Security(oauth2_scheme)) -> str:
+    """User id from the access token without loading the user, for high-frequency endpoints
+    that authorize against a cached row of their own."""
+    cached = _subjects.get(token)
+    if cached is None:
+        try:
+            payload = decode_token(token)
+            cached = (str(payload.get("sub") or ""), float(payload.get("exp") or 0))
+        except ValueError:
+            cached = ("", 0.0)
+        _subjects[token] = cached
+    subject, expires_at = cached
+    if not subject or expires_at <= time.time():
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return subject
+
+
 def require_role(role: UserRole):
     def _checker(user: UserRead = Depends(get_current_user)) -> UserRead:
         if user.role != role:
@@ -1,9 +1,21 @@
+from contextlib import asynccontextmanager
+
+import secrets
+
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pathlib import Path
+from fastapi.middleware.gzip import GZipMiddleware
+from utils.background import start_background_task, stop_background_tasks
 from utils.config import CFG
+from utils.database import close_redis, refresh_pool_metrics
+from utils.executors import shutdown_process_pool
+from utils.metrics import CONTENT_TYPE, render_text
+from utils.metrics_middleware import MetricsMiddleware
+from utils.rate_limit_middleware import RateLimitMiddleware
+from utils.responses import FastJSONResponse
+from utils.static_files import ImmutableStaticFiles
+from services.storage_service import KEY_PATTERN, PRIVATE_PREFIX, UPLOAD_DIR
 from routers import (
     auth,
     jobs,
@@ -25,9 +37,50 @@ from routers import (
     qr,
     penalties,
     workers,
+    offers,
+)
+from services.auto_match_service import run_auto_match_worker
+from services.geocoding_service import close_geocoding_session
+from services.job_service import run_geocode_refiner
+from services.presence_service import run_presence_flusher
+from services.reputation_service import run_reputation_refresher
+from services.stripe_event_service import run_stripe_event_worker
+from services.tracking_service import run_track_flusher
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    if CFG["STRIPE_EVENT_WORKER_ENABLED"]:
+        start_background_task("stripe-events", run_stripe_event_worker)
+    if CFG["AUTO_MATCH_WORKER_ENABLED"]:
+        start_background_task("auto-match", run_auto_match_worker)
+    if CFG["PRESENCE_FLUSH_ENABLED"]:
+        start_background_task("presence-flush", run_presence_flusher)
+    if CFG["TRACK_FLUSH_ENABLED"]:
+        start_background_task("track-flush", run_track_flusher)
+    if CFG["GEOCODE_REFINER_ENABLED"]:
+        start_background_task("geocode-refiner", run_geocode_refiner)
+    if CFG["REPUTATION_REFRESH_ENABLED"]:
+        start_background_task("reputation-refresh", run_reputation_refresher)
+    yield
+    await stop_background_tasks()
+    await close_geocoding_session()
+    await close_redis()
+    shutdown_process_pool()
+
+
+app = FastAPI(
+    title="WORK NOW API",
+    version="1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
-app = FastAPI(title="WORK NOW API", version="1.0")
+app.add_middleware(GZipMiddleware, minimum_size=CFG["GZIP_MIN_SIZE"], compresslevel=CFG["GZIP_LEVEL"])
+
+# Added before CORS so 429 responses still carry CORS headers
+if CFG["RATE_LIMIT_ENABLED"]:
+    app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -37,9 +90,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-UPLOAD_DIR = Path("uploads")
+# Outermost, so latency includes every other middleware and 429s are counted
+if CFG["METRICS_ENABLED"]:
+    app.add_middleware(MetricsMiddleware)
+
 UPLOAD_DIR.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+app.mount(
+    "/uploads",
+    ImmutableStaticFiles(directory=str(UPLOAD_DIR), immutable_pattern=KEY_PATTERN, private_prefix=PRIVATE_PREFIX),
+    name="uploads",
+)
 
 
 @app.get("/health")
@@ -47,6 +107,19 @@ async def health():
     return {"status": "ok", "env": CFG["ENVIRONMENT"]}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not CFG["METRICS_ENABLED"]:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = CFG["METRICS_TOKEN"]
+    if token and not secrets.compare_digest(
+        request.headers.get("authorization", ""), f"Bearer {token}"
+    ):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    refresh_pool_metrics()
+    return Response(render_text(), media_type=CONTENT_TYPE)
+
+
 app.include_router(auth.router, prefix="/auth", tags=["Auth"])
 app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 app.include_router(applications.router, prefix="/applications", tags=["Applications"])
@@ -67,6 +140,7 @@ app.include_router(job_notifications.router, prefix="/job-notifications", tags=[
 app.include_router(qr.router)
 app.include_router(penalties.router)
 app.include_router(workers.router, prefix="/workers", tags=["Workers"])
+app.include_router(offers.router, prefix="/offers", tags=["Offers"])
 
 
 if __name__ == "__main__":
@@ -1,10 +1,11 @@
 from typing import List
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, status
 
 from dependencies import require_role, get_user_service
 from schemas import UserRead, UserRole
 from services.admin_service import AdminService
 from services.user_service import UserService
+from utils.query_profiler import QUERY_PROFILER
 
 router = APIRouter()
 
@@ -39,3 +40,18 @@ async def list_users(
 ):
     """Get all users (admin only)"""
     return user_service.list_users(role=role, limit=limit)
+
+
+@router.get("/query-stats")
+async def query_stats(
+    _: UserRead = Depends(require_role(UserRole.ADMIN)),
+    sort: str = Query(default="total", pattern="^(total|mean|p95|count|rows)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """Per-fingerprint query statistics collected by the query profiler"""
+    return {"enabled": QUERY_PROFILER.enabled, "items": QUERY_PROFILER.snapshot(sort, limit)}
+
+
+@router.delete("/query-stats", status_code=status.HTTP_204_NO_CONTENT)
+async def reset_query_stats(_: UserRead = Depends(require_role(UserRole.ADMIN))):
+    QUERY_PROFILER.reset()
@@ -1,9 +1,10 @@
-from typing import Optional
+from typing import List, Optional, Set
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from dependencies import get_current_user
 from schemas import (
+    ApplicantRanking,
     ApplicationCreate,
     ApplicationList,
     ApplicationRead,
@@ -15,6 +16,7 @@ from schemas import (
 )
 from services.application_service import ApplicationService
 from services.job_service import JobService
+from utils.responses import sparse_fields, sparse_response
 
 router = APIRouter()
 
@@ -33,6 +35,7 @@ async def list_applications(
     status_filter: Optional[ApplicationStatus] = Query(default=None, alias="status"),
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    fields: Optional[Set[str]] = Depends(sparse_fields),
     current_user: UserRead = Depends(get_current_user),
     application_service: ApplicationService = Depends(get_application_service),
     job_service: JobService = Depends(get_job_service),
@@ -47,13 +50,32 @@ async def list_applications(
         job = job_service.get_job(job_id)
         if job.company_id != current_user.id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return application_service.list_applications(
+    applications = application_service.list_applications(
         job_id=job_filter,
         worker_id=worker_id,
         status_filter=status_filter,
         page=page,
         size=size,
     )
+    return sparse_response(applications, ApplicationRead, fields)
+
+
+@router.get("/ranked", response_model=ApplicantRanking)
+async def rank_applicants(
+    job_id: str = Query(...),
+    statuses: Optional[List[ApplicationStatus]] = Query(default=None, alias="status"),
+    limit: int = Query(default=100, ge=1, le=500),
+    current_user: UserRead = Depends(get_current_user),
+    application_service: ApplicationService = Depends(get_application_service),
+    job_service: JobService = Depends(get_job_service),
+) -> ApplicantRanking:
+    """All applicants to a job as scored cards (reviews, track record, penalties, distance, qualifications)."""
+    if current_user.role not in {UserRole.COMPANY, UserRole.ADMIN}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    job = job_service.get_job(job_id)
+    if current_user.role == UserRole.COMPANY and job.company_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return application_service.rank_applicants(job, statuses=statuses, limit=limit)
 
 
 @router.get("/{application_id}", response_model=ApplicationRead)
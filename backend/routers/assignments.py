@@ -1,19 +1,39 @@
-from typing import Optional
+import asyncio
+import json
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 
-from dependencies import get_current_user
+from dependencies import get_current_user, get_token_subject
 from schemas import (
     AssignmentCreate,
     AssignmentList,
     AssignmentRead,
     AssignmentStatus,
+    AssignmentTrack,
     AssignmentUpdate,
+    ShiftCheckRequest,
+    ShiftCheckResult,
+    TrackIngestResult,
+    TrackPointBatch,
     UserRead,
     UserRole,
 )
 from services.assignment_service import AssignmentService
 from services.job_service import JobService
+from services.schedule_service import ScheduleService
+from services.tracking_service import (
+    TRACKABLE_STATUSES,
+    TrackingService,
+    forget_access,
+    from_point,
+    get_track_buffer,
+    to_point,
+)
+from utils.config import CFG
+from utils.tracking import Point, RedisTrackBuffer, decode_batch
 
 router = APIRouter()
 
@@ -26,6 +46,15 @@ def get_job_service() -> JobService:
     return JobService()
 
 
+def get_schedule_service() -> ScheduleService:
+    return ScheduleService()
+
+
+async def get_tracking_service() -> TrackingService:
+    # async so location ingestion, the hottest route, never waits for a threadpool slot
+    return TrackingService()
+
+
 @router.get("/", response_model=AssignmentList)
 async def list_assignments(
     job_id: Optional[str] = Query(default=None),
@@ -90,6 +119,22 @@ async def create_assignment(
     return assignment_service.create_assignment(payload)
 
 
+@router.post("/conflicts/check", response_model=ShiftCheckResult)
+async def check_shift_conflicts(
+    payload: ShiftCheckRequest,
+    current_user: UserRead = Depends(get_current_user),
+    job_service: JobService = Depends(get_job_service),
+    schedule_service: ScheduleService = Depends(get_schedule_service),
+) -> ShiftCheckResult:
+    """Which of the candidate workers are free for the job's shift (one indexed query)."""
+    job = job_service.get_job(payload.job_id)
+    if current_user.role not in {UserRole.COMPANY, UserRole.ADMIN}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    if current_user.role == UserRole.COMPANY and job.company_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return schedule_service.check_shift(job, payload.worker_ids)
+
+
 @router.patch("/{assignment_id}", response_model=AssignmentRead)
 async def update_assignment(
     assignment_id: str,
@@ -127,4 +172,79 @@ async def advance_delivery_status(
     assignment = assignment_service.get_assignment(assignment_id)
     if current_user.role == UserRole.WORKER and assignment.worker_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return assignment_service.advance_delivery_status(assignment_id)
+    advanced = assignment_service.advance_delivery_status(assignment_id)
+    forget_access(assignment_id)
+    return advanced
+
+
+def _ensure_can_view_track(access: dict, current_user: UserRead) -> None:
+    if current_user.role == UserRole.ADMIN:
+        return
+    if current_user.id not in {access["worker_id"], access["company_id"]}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+
+@router.post("/{assignment_id}/locations", response_model=TrackIngestResult, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_locations(
+    assignment_id: str,
+    payload: TrackPointBatch,
+    user_id: str = Depends(get_token_subject),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+    buffer: RedisTrackBuffer = Depends(get_track_buffer),
+) -> TrackIngestResult:
+    access = await tracking_service.fetch_access(assignment_id)
+    if access["worker_id"] != user_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    if access["status"] not in TRACKABLE_STATUSES:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Assignment is not being delivered")
+    points = sorted((to_point(point) for point in payload.points), key=lambda p: p[0])
+    await buffer.append(assignment_id, points)
+    return TrackIngestResult(accepted=len(points))
+
+
+def _event(name: str, points: List[Point]) -> str:
+    data = json.dumps([from_point(point).model_dump(mode="json") for point in points], separators=(",", ":"))
+    return f"event: {name}\ndata: {data}\n\n"
+
+
+async def track_events(
+    assignment_id: str, buffer, tracking_service: TrackingService, keepalive: float
+) -> AsyncIterator[str]:
+    """Buffered points first, then each published batch; ends once the delivery is over."""
+    async with buffer.subscribe(assignment_id) as queue:
+        recent = await buffer.recent([assignment_id])
+        yield _event("snapshot", recent[assignment_id])
+        while (await tracking_service.fetch_access(assignment_id))["status"] in TRACKABLE_STATUSES:
+            try:
+                payload = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _event("points", decode_batch(payload))
+        yield "event: end\ndata: {}\n\n"
+
+
+@router.get("/{assignment_id}/locations/stream")
+async def stream_locations(
+    assignment_id: str,
+    current_user: UserRead = Depends(get_current_user),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+    buffer: RedisTrackBuffer = Depends(get_track_buffer),
+) -> StreamingResponse:
+    _ensure_can_view_track(await tracking_service.fetch_access(assignment_id), current_user)
+    return StreamingResponse(
+        track_events(assignment_id, buffer, tracking_service, CFG["TRACK_STREAM_KEEPALIVE_SECONDS"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{assignment_id}/track", response_model=AssignmentTrack)
+async def get_track(
+    assignment_id: str,
+    since: Optional[datetime] = Query(None),
+    current_user: UserRead = Depends(get_current_user),
+    tracking_service: TrackingService = Depends(get_tracking_service),
+) -> AssignmentTrack:
+    _ensure_can_view_track(await tracking_service.fetch_access(assignment_id), current_user)
+    return tracking_service.get_track(assignment_id, since)
@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from dependencies import get_auth_service, get_current_user, get_user_service
 from schemas import (
@@ -13,9 +13,14 @@ from schemas import (
     UserRead,
     UserUpdate,
 )
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 from services.auth_service import AuthService
+from services.presence_service import PresenceService, get_presence_store
 from services.user_service import UserService
+from utils.config import CFG
+from utils.presence import RedisPresenceStore
+from utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
@@ -25,6 +30,20 @@ class PasswordChangeRequest(BaseModel):
     new_password: str
 
 
+class HeartbeatRequest(BaseModel):
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+
+class PresenceStatus(BaseModel):
+    online: bool
+    ttl_seconds: int
+
+
+def get_presence_service() -> PresenceService:
+    return PresenceService()
+
+
 @router.post("/register", response_model=TokenPair, status_code=status.HTTP_201_CREATED)
 async def register(payload: RegisterRequest, auth_service: AuthService = Depends(get_auth_service)):
     return auth_service.register(payload)
@@ -41,7 +60,11 @@ async def refresh(payload: RefreshTokenRequest, auth_service: AuthService = Depe
 
 
 @router.get("/me", response_model=UserRead)
-async def me(current_user: UserRead = Depends(get_current_user)):
+async def me(request: Request, response: Response, current_user: UserRead = Depends(get_current_user)):
+    etag = make_etag("user", current_user.id, current_user.updated_at)
+    not_modified = conditional_response(request, response, etag, current_user.updated_at)
+    if not_modified:
+        return not_modified
     return current_user
 
 
@@ -68,7 +91,7 @@ async def password_reset_confirm(payload: PasswordResetConfirm):  # pragma: no c
 async def set_online_status(
     is_online: bool,
     current_user: UserRead = Depends(get_current_user),
-    user_service: UserService = Depends(get_user_service),
+    store: RedisPresenceStore = Depends(get_presence_store),
 ):
     """Set worker online/offline status"""
     if current_user.role != "worker":
@@ -76,22 +99,50 @@ async def set_online_status(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only workers can set online status",
         )
-    return user_service.set_online_status(current_user.id, is_online)
+    if is_online:
+        await store.heartbeat(current_user.id, current_user.latitude, current_user.longitude)
+    else:
+        await store.go_offline(current_user.id)
+    return current_user
+
+
+@router.post("/presence/heartbeat", response_model=PresenceStatus)
+async def presence_heartbeat(
+    payload: HeartbeatRequest,
+    current_user: UserRead = Depends(get_current_user),
+    store: RedisPresenceStore = Depends(get_presence_store),
+):
+    """Keep a worker online; send every ``PRESENCE_TTL_SECONDS / 3`` seconds with the current position"""
+    if current_user.role != "worker":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only workers can set online status",
+        )
+    await store.heartbeat(current_user.id, payload.latitude, payload.longitude)
+    return PresenceStatus(online=True, ttl_seconds=CFG["PRESENCE_TTL_SECONDS"])
 
 
 @router.get("/workers/online", response_model=List[UserRead])
 async def get_online_workers(
     limit: int = Query(default=100, ge=1, le=500),
+    lat: Optional[float] = Query(default=None, ge=-90, le=90),
+    lng: Optional[float] = Query(default=None, ge=-180, le=180),
+    radius_km: float = Query(default=10.0, gt=0, le=100),
     current_user: UserRead = Depends(get_current_user),
-    user_service: UserService = Depends(get_user_service),
+    store: RedisPresenceStore = Depends(get_presence_store),
+    presence_service: PresenceService = Depends(get_presence_service),
 ):
-    """Get list of online workers (for companies/admins)"""
+    """Get list of online workers (for companies/admins); nearest first when ``lat``/``lng`` are given"""
     if current_user.role not in ["company", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only companies and admins can view online workers",
         )
-    return user_service.get_online_workers(limit=limit)
+    if lat is not None and lng is not None:
+        user_ids = [user_id for user_id, _ in await store.nearby(lat, lng, radius_km, limit)]
+    else:
+        user_ids = await store.online(limit)
+    return await run_in_threadpool(presence_service.load_workers, user_ids)
 
 
 @router.put("/password/change")
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 
 from dependencies import get_current_user, require_role
 from schemas import UserRead, UserRole
@@ -9,6 +9,7 @@ from schemas.client_settings import (
     InvoiceSettingsUpdate,
 )
 from services.client_settings_service import ClientSettingsService
+from utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
@@ -19,10 +20,18 @@ def get_client_settings_service() -> ClientSettingsService:
 
 @router.get("/notifications", response_model=NotificationPreferencesRead)
 async def get_notification_preferences(
+    request: Request,
+    response: Response,
     current_user: UserRead = Depends(require_role(UserRole.COMPANY)),
     settings_service: ClientSettingsService = Depends(get_client_settings_service),
 ):
     """Get notification preferences for the current client user"""
+    updated_at = settings_service.get_settings_updated_at("client_notification_preferences", current_user.id)
+    if updated_at is not None:
+        etag = make_etag("client_notification_preferences", current_user.id, updated_at)
+        not_modified = conditional_response(request, response, etag, updated_at)
+        if not_modified:
+            return not_modified
     return settings_service.get_notification_preferences(current_user.id)
 
 
@@ -38,10 +47,18 @@ async def update_notification_preferences(
 
 @router.get("/invoice", response_model=InvoiceSettingsRead)
 async def get_invoice_settings(
+    request: Request,
+    response: Response,
     current_user: UserRead = Depends(require_role(UserRole.COMPANY)),
     settings_service: ClientSettingsService = Depends(get_client_settings_service),
 ):
     """Get invoice settings for the current client user"""
+    updated_at = settings_service.get_settings_updated_at("client_invoice_settings", current_user.id)
+    if updated_at is not None:
+        etag = make_etag("client_invoice_settings", current_user.id, updated_at)
+        not_modified = conditional_response(request, response, etag, updated_at)
+        if not_modified:
+            return not_modified
     return settings_service.get_invoice_settings(current_user.id)
 
 
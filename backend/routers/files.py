@@ -1,47 +1,105 @@
-import os
-from datetime import datetime
+import hashlib
+import secrets
 from pathlib import Path
-from typing import Literal
+from typing import NamedTuple, Optional, Set
 
 import aiofiles
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 
 from dependencies import get_current_user, get_user_service
 from schemas import UserRead
+from services.image_service import ImageService
+from services.storage_service import UPLOAD_DIR, StorageService
 from services.user_service import UserService
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
+# In-progress uploads; on the same filesystem as UPLOAD_DIR so moves are atomic renames
+INCOMING_DIR = UPLOAD_DIR / ".incoming"
 
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/png", "image/jpg", "image/webp"}
 ALLOWED_DOCUMENT_TYPES = {"image/jpeg", "image/png", "image/jpg", "application/pdf"}
 MAX_FILE_SIZE = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
 
 
-async def save_upload_file(upload_file: UploadFile, file_type: str, user_id: str) -> str:
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    extension = upload_file.filename.split(".")[-1] if upload_file.filename else "jpg"
-    filename = f"{user_id}_{file_type}_{timestamp}.{extension}"
-    file_path = UPLOAD_DIR / filename
-    
-    async with aiofiles.open(file_path, "wb") as f:
-        content = await upload_file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large. Max size is {MAX_FILE_SIZE / 1024 / 1024}MB",
-            )
-        await f.write(content)
-    
-    domain = os.getenv('REPLIT_DEV_DOMAIN', 'localhost:8008')
-    if 'localhost' in domain:
-        base_url = f"http://{domain}"
-    else:
-        base_url = f"https://{domain}"
-    
-    return f"{base_url}/uploads/{filename}"
+class ReceivedUpload(NamedTuple):
+    path: Path
+    content_type: str
+    sha256: str
+
+
+def get_storage_service() -> StorageService:
+    return StorageService()
+
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Detect the real file type from its first bytes instead of trusting the client."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    return None
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File too large. Max size is {MAX_FILE_SIZE / 1024 / 1024}MB",
+    )
+
+
+async def receive_upload_file(upload_file: UploadFile, allowed_types: Set[str]) -> ReceivedUpload:
+    """Stream the upload to a temp file in CHUNK_SIZE pieces, hashing it on the way.
+
+    Memory use is bounded by the chunk size; the upload is aborted as soon as it
+    exceeds MAX_FILE_SIZE and rejected unless its sniffed type is in ``allowed_types``.
+    """
+    if upload_file.size is not None and upload_file.size > MAX_FILE_SIZE:
+        raise _too_large()
+
+    INCOMING_DIR.mkdir(parents=True, exist_ok=True)
+    tmp_path = INCOMING_DIR / f"{secrets.token_hex(16)}.part"
+    digest = hashlib.sha256()
+    size = 0
+    content_type = None
+    try:
+        async with aiofiles.open(tmp_path, "wb") as f:
+            while chunk := await upload_file.read(CHUNK_SIZE):
+                if content_type is None:
+                    content_type = sniff_content_type(chunk)
+                    if content_type not in allowed_types:
+                        raise HTTPException(
+                            status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Invalid file type. Allowed types: {', '.join(sorted(allowed_types))}",
+                        )
+                size += len(chunk)
+                if size > MAX_FILE_SIZE:
+                    raise _too_large()
+                digest.update(chunk)
+                await f.write(chunk)
+        if content_type is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Empty file")
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return ReceivedUpload(tmp_path, content_type, digest.hexdigest())
+
+
+async def save_upload_file(
+    upload_file: UploadFile, allowed_types: Set[str], storage: StorageService, private: bool = False
+) -> str:
+    """Receive an upload into content-addressed storage and return its URL."""
+    upload = await receive_upload_file(upload_file, allowed_types)
+    try:
+        return await storage.store(upload.path, upload.content_type, upload.sha256, private=private)
+    finally:
+        upload.path.unlink(missing_ok=True)
 
 
 @router.post("/upload/avatar")
@@ -49,19 +107,29 @@ async def upload_avatar(
     file: UploadFile = File(...),
     current_user: UserRead = Depends(get_current_user),
     user_service: UserService = Depends(get_user_service),
+    storage: StorageService = Depends(get_storage_service),
 ):
-    if file.content_type not in ALLOWED_IMAGE_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_IMAGE_TYPES)}",
-        )
-    
-    file_url = await save_upload_file(file, "avatar", current_user.id)
+    upload = await receive_upload_file(file, ALLOWED_IMAGE_TYPES)
+    try:
+        variants = await ImageService(INCOMING_DIR).create_avatar_variants(upload.path)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    finally:
+        # Only the re-encoded variants are kept; the original may carry EXIF/GPS data
+        upload.path.unlink(missing_ok=True)
+
+    avatar_variants = {}
+    for name, filename in variants.items():
+        avatar_variants[name] = await storage.store(INCOMING_DIR / filename, "image/webp")
+    file_url = avatar_variants["medium"]
     
     from schemas import UserUpdate
-    updated_user = user_service.update_user(current_user.id, UserUpdate(avatar_url=file_url))
+    updated_user = user_service.update_user(
+        current_user.id, UserUpdate(avatar_url=file_url, avatar_variants=avatar_variants)
+    )
+    await storage.release([current_user.avatar_url, *(current_user.avatar_variants or {}).values()])
     
-    return {"avatar_url": file_url, "user": updated_user}
+    return {"avatar_url": file_url, "avatar_variants": avatar_variants, "user": updated_user}
 
 
 @router.post("/upload/id-document")
@@ -69,16 +137,12 @@ async def upload_id_document(
     file: UploadFile = File(...),
     current_user: UserRead = Depends(get_current_user),
     user_service: UserService = Depends(get_user_service),
+    storage: StorageService = Depends(get_storage_service),
 ):
-    if file.content_type not in ALLOWED_DOCUMENT_TYPES:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid file type. Allowed types: {', '.join(ALLOWED_DOCUMENT_TYPES)}",
-        )
-    
-    file_url = await save_upload_file(file, "id_document", current_user.id)
+    file_url = await save_upload_file(file, ALLOWED_DOCUMENT_TYPES, storage, private=True)
     
     from schemas import UserUpdate
     updated_user = user_service.update_user(current_user.id, UserUpdate(id_document_url=file_url))
+    await storage.release([current_user.id_document_url])
     
     return {"id_document_url": file_url, "user": updated_user}
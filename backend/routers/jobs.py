@@ -1,10 +1,15 @@
-from typing import Optional
+from typing import Optional, Set
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from starlette.concurrency import run_in_threadpool
 
 from dependencies import get_current_user
-from schemas import JobCreate, JobList, JobRead, JobStatus, JobUpdate, UserRead, UserRole
+from schemas import JobCreate, JobFacets, JobList, JobRead, JobStatus, JobUpdate, UserRead, UserRole
+from services.auto_match_service import start_auto_match
 from services.job_service import JobService
+from services.recommendation_service import RecommendationService
+from utils.http_cache import conditional_response, make_etag
+from utils.responses import sparse_fields, sparse_response
 
 router = APIRouter()
 
@@ -13,34 +18,86 @@ def get_job_service() -> JobService:
     return JobService()
 
 
+def get_recommendation_service() -> RecommendationService:
+    return RecommendationService()
+
+
 @router.get("/", response_model=JobList)
 async def list_jobs(
     status_filter: Optional[JobStatus] = Query(default=None, alias="status"),
     prefecture: Optional[str] = Query(default=None),
     date: Optional[str] = Query(default=None),
-    sort_by: Optional[str] = Query(default="created_at", alias="sort"),
+    min_hourly_rate: Optional[int] = Query(default=None, ge=0),
+    q: Optional[str] = Query(default=None, min_length=2, max_length=100),
+    sort_by: Optional[str] = Query(default=None, alias="sort"),
     user_lat: Optional[float] = Query(default=None),
     user_lng: Optional[float] = Query(default=None),
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
+    fields: Optional[Set[str]] = Depends(sparse_fields),
     job_service: JobService = Depends(get_job_service),
     current_user: Optional[UserRead] = Depends(get_current_user),
 ) -> JobList:
-    return job_service.list_jobs(
+    jobs = job_service.list_jobs(
         status_filter=status_filter,
         prefecture=prefecture,
         date=date,
-        sort_by=sort_by,
+        min_hourly_rate=min_hourly_rate,
+        q=q,
+        sort_by=sort_by or ("relevance" if q else "created_at"),
         user_lat=user_lat,
         user_lng=user_lng,
         user_id=current_user.id if current_user else None,
         page=page,
         size=size
     )
+    return sparse_response(jobs, JobRead, fields)
+
+
+@router.get("/facets", response_model=JobFacets)
+async def job_facets(
+    status_filter: Optional[JobStatus] = Query(default=None, alias="status"),
+    prefecture: Optional[str] = Query(default=None),
+    date: Optional[str] = Query(default=None),
+    min_hourly_rate: Optional[int] = Query(default=None, ge=0),
+    q: Optional[str] = Query(default=None, min_length=2, max_length=100),
+    job_service: JobService = Depends(get_job_service),
+) -> JobFacets:
+    return job_service.job_facets(
+        status_filter=status_filter,
+        prefecture=prefecture,
+        date=date,
+        min_hourly_rate=min_hourly_rate,
+        q=q,
+    )
+
+
+@router.get("/recommended", response_model=JobList)
+async def recommended_jobs(
+    page: int = Query(default=1, ge=1),
+    size: int = Query(default=20, ge=1, le=100),
+    fields: Optional[Set[str]] = Depends(sparse_fields),
+    current_user: UserRead = Depends(get_current_user),
+    recommendation_service: RecommendationService = Depends(get_recommendation_service),
+) -> JobList:
+    if current_user.role != UserRole.WORKER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers have a recommendation feed")
+    jobs = await run_in_threadpool(recommendation_service.feed, current_user, page, size)
+    return sparse_response(jobs, JobRead, fields)
 
 
 @router.get("/{job_id}", response_model=JobRead)
-async def get_job(job_id: str, job_service: JobService = Depends(get_job_service)) -> JobRead:
+async def get_job(
+    job_id: str,
+    request: Request,
+    response: Response,
+    job_service: JobService = Depends(get_job_service),
+) -> JobRead:
+    updated_at = job_service.get_updated_at(job_id)
+    if updated_at is not None:
+        not_modified = conditional_response(request, response, make_etag("job", job_id, updated_at), updated_at)
+        if not_modified:
+            return not_modified
     return job_service.get_job(job_id)
 
 
@@ -59,6 +116,7 @@ async def create_job(
 async def update_job(
     job_id: str,
     payload: JobUpdate,
+    background_tasks: BackgroundTasks,
     current_user: UserRead = Depends(get_current_user),
     job_service: JobService = Depends(get_job_service),
 ) -> JobRead:
@@ -67,12 +125,16 @@ async def update_job(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     if current_user.role == UserRole.COMPANY and job.company_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot edit other companies' jobs")
-    return job_service.update_job(job_id, payload)
+    updated = job_service.update_job(job_id, payload)
+    if updated.is_urgent and updated.status == JobStatus.PUBLISHED:
+        background_tasks.add_task(start_auto_match, job_id)
+    return updated
 
 
 @router.post("/{job_id}/publish", response_model=JobRead)
 async def publish_job(
     job_id: str,
+    background_tasks: BackgroundTasks,
     current_user: UserRead = Depends(get_current_user),
     job_service: JobService = Depends(get_job_service),
 ) -> JobRead:
@@ -81,7 +143,10 @@ async def publish_job(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
     if current_user.role == UserRole.COMPANY and job.company_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot publish other companies' jobs")
-    return job_service.publish_job(job_id)
+    published = job_service.publish_job(job_id)
+    if published.is_urgent:
+        background_tasks.add_task(start_auto_match, job_id)
+    return published
 
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import List, Optional, Set
 from datetime import datetime
 
 from dependencies import get_current_user
 from schemas import UserRead
 from services.message import MessageService
+from utils.responses import sparse_fields, sparse_response
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
@@ -40,12 +41,13 @@ class ConversationResponse(BaseModel):
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 def get_conversations(
+    fields: Optional[Set[str]] = Depends(sparse_fields),
     current_user: UserRead = Depends(get_current_user),
 ):
     """現在のユーザーの全ての会話を取得"""
     message_service = MessageService()
     conversations = message_service.get_user_conversations(current_user.id)
-    return conversations
+    return sparse_response(conversations, ConversationResponse, fields)
 
 
 @router.get("/conversations/{conversation_id}/messages", response_model=List[MessageResponse])
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from dependencies import get_current_user
 from schemas import (
@@ -11,6 +11,7 @@ from schemas import (
     UserRead,
 )
 from services.notification_service import NotificationService
+from utils.http_cache import conditional_response, make_etag
 
 router = APIRouter()
 
@@ -21,11 +22,18 @@ def get_notification_service() -> NotificationService:
 
 @router.get("/", response_model=NotificationList)
 async def list_notifications(
+    request: Request,
+    response: Response,
     page: int = Query(default=1, ge=1),
     size: int = Query(default=20, ge=1, le=100),
     current_user: UserRead = Depends(get_current_user),
     notification_service: NotificationService = Depends(get_notification_service),
 ) -> NotificationList:
+    version = notification_service.get_list_version(current_user.id)
+    etag = make_etag("notifications", current_user.id, page, size, version["total"], version["last_updated"])
+    not_modified = conditional_response(request, response, etag, version["last_updated"])
+    if not_modified:
+        return not_modified
     return notification_service.list_notifications(current_user.id, page=page, size=size)
 
 
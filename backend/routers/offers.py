@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from dependencies import get_current_user
+from schemas import AssignmentRead, JobOfferList, MessageResponse, UserRead, UserRole
+from services.auto_match_service import AutoMatchService
+
+router = APIRouter()
+
+
+def get_auto_match_service() -> AutoMatchService:
+    return AutoMatchService()
+
+
+def _require_worker(user: UserRead) -> None:
+    if user.role != UserRole.WORKER:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers receive offers")
+
+
+@router.get("/", response_model=JobOfferList)
+async def list_offers(
+    page: int = Query(default=1, ge=1),
+    size: int = Query(default=20, ge=1, le=100),
+    current_user: UserRead = Depends(get_current_user),
+    service: AutoMatchService = Depends(get_auto_match_service),
+) -> JobOfferList:
+    _require_worker(current_user)
+    return service.list_offers(current_user.id, page=page, size=size)
+
+
+@router.post("/{offer_id}/accept", response_model=AssignmentRead)
+async def accept_offer(
+    offer_id: str,
+    current_user: UserRead = Depends(get_current_user),
+    service: AutoMatchService = Depends(get_auto_match_service),
+) -> AssignmentRead:
+    _require_worker(current_user)
+    return await run_in_threadpool(service.accept_offer, offer_id, current_user.id)
+
+
+@router.post("/{offer_id}/decline", response_model=MessageResponse)
+async def decline_offer(
+    offer_id: str,
+    current_user: UserRead = Depends(get_current_user),
+    service: AutoMatchService = Depends(get_auto_match_service),
+) -> MessageResponse:
+    _require_worker(current_user)
+    service.decline_offer(offer_id, current_user.id)
+    return MessageResponse(message="Offer declined")
@@ -16,6 +16,7 @@ from schemas import (
 )
 from services.assignment_service import AssignmentService
 from services.payment_service import PaymentService
+from services.stripe_event_service import StripeEventService, notify_stripe_event_worker
 from services.stripe_service import StripeService
 
 router = APIRouter()
@@ -33,6 +34,10 @@ def get_stripe_service() -> StripeService:
     return StripeService()
 
 
+def get_stripe_event_service() -> StripeEventService:
+    return StripeEventService()
+
+
 @router.post("/connect/account")
 async def create_connect_account(
     payload: ConnectAccountRequest,
@@ -41,7 +46,7 @@ async def create_connect_account(
 ):
     if current_user.role != UserRole.WORKER:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only workers can create accounts")
-    return stripe.create_connect_account(payload.email)
+    return await stripe.create_connect_account(payload.email)
 
 
 @router.post("/intent")
@@ -52,7 +57,7 @@ async def create_payment_intent(
 ):
     if current_user.role not in {UserRole.COMPANY, UserRole.ADMIN}:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return stripe.create_payment_intent(payload.amount, payload.worker_stripe_account)
+    return await stripe.create_payment_intent(payload.amount, payload.worker_stripe_account)
 
 
 @router.post("/", response_model=PaymentRead, status_code=status.HTTP_201_CREATED)
@@ -63,7 +68,7 @@ async def create_payment(
 ) -> PaymentRead:
     if current_user.role not in {UserRole.COMPANY, UserRole.ADMIN}:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    return payment_service.create_payment(payload)
+    return await payment_service.create_payment(payload)
 
 
 @router.get("/", response_model=PaymentList)
@@ -119,7 +124,7 @@ async def update_payment(
 async def stripe_webhook(
     request: Request,
     stripe: StripeService = Depends(get_stripe_service),
-    payment_service: PaymentService = Depends(get_payment_service),
+    event_service: StripeEventService = Depends(get_stripe_event_service),
 ):
     payload = await request.body()
     sig_header = request.headers.get("Stripe-Signature")
@@ -127,13 +132,8 @@ async def stripe_webhook(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing Stripe-Signature header")
     event = stripe.webhook(payload, sig_header)
 
-    event_type = event.get("type", "")
-    intent = event.get("data", {}).get("object", {})
-    if event_type.startswith("payment_intent") and intent:
-        intent_id = intent.get("id")
-        status_value = intent.get("status")
-        transfer_id = intent.get("latest_charge")
-        if intent_id and status_value:
-            payment_service.update_by_intent(intent_id, status_value, transfer_id=transfer_id)
-
-    return {"received": True}
+    # Store only; the stripe-events worker applies the event in the background
+    created = event_service.record_event(event)
+    if created:
+        notify_stripe_event_worker()
+    return {"received": True, "duplicate": not created}
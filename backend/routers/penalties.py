@@ -5,6 +5,7 @@ from dependencies import get_current_user
 from schemas import UserRead
 from schemas.penalty import PenaltyCreate, PenaltyRead, PenaltyList
 from services.postgres_base import PostgresService
+from services.reputation_service import refresh_reputation
 
 router = APIRouter(prefix="/penalties", tags=["penalties"])
 
@@ -71,6 +72,7 @@ async def create_penalty(
     data = payload.dict()
     data["issued_by"] = current_user.id
     penalty = service.insert(data)
+    refresh_reputation(penalty["user_id"])
     return penalty
 
 
@@ -89,4 +91,5 @@ async def deactivate_penalty(
         raise HTTPException(status_code=404, detail="Penalty not found")
     
     service.deactivate_penalty(penalty_id)
+    refresh_reputation(penalty["user_id"])
     return {"message": "Penalty deactivated"}
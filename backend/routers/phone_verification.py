@@ -1,14 +1,24 @@
-import random
-from fastapi import APIRouter, Depends, HTTPException, status
+import secrets
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from pydantic import BaseModel
 
 from dependencies import get_current_user, get_user_service
 from schemas import UserRead, UserUpdate
 from services.user_service import UserService
+from utils.config import CFG
+from utils.database import get_redis
+from utils.rate_limit import RedisSlidingWindowLimiter
+from utils.verification_store import EXPIRED, VERIFIED, RedisVerificationStore
 
 router = APIRouter()
 
-verification_codes = {}
+
+async def get_verification_store() -> RedisVerificationStore:
+    return RedisVerificationStore(await get_redis(), prefix="phone-code")
+
+
+async def get_rate_limiter() -> RedisSlidingWindowLimiter:
+    return RedisSlidingWindowLimiter(await get_redis())
 
 
 class PhoneVerificationRequest(BaseModel):
@@ -23,10 +33,27 @@ class PhoneVerificationCode(BaseModel):
 @router.post("/send-code")
 async def send_verification_code(
     payload: PhoneVerificationRequest,
+    request: Request,
     current_user: UserRead = Depends(get_current_user),
+    store: RedisVerificationStore = Depends(get_verification_store),
+    limiter: RedisSlidingWindowLimiter = Depends(get_rate_limiter),
 ):
-    code = str(random.randint(100000, 999999))
-    verification_codes[payload.phone] = code
+    window = CFG["PHONE_SEND_WINDOW_SECONDS"]
+    client_ip = request.client.host if request.client else "unknown"
+    for key, limit in (
+        (f"phone-send:phone:{payload.phone}", CFG["PHONE_SEND_LIMIT_PER_PHONE"]),
+        (f"phone-send:ip:{client_ip}", CFG["PHONE_SEND_LIMIT_PER_IP"]),
+    ):
+        result = await limiter.hit(key, limit, window)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many verification requests. Please try again later.",
+                headers={"Retry-After": str(result.retry_after)},
+            )
+
+    code = str(100000 + secrets.randbelow(900000))
+    await store.save(f"{current_user.id}:{payload.phone}", code, CFG["PHONE_CODE_TTL_SECONDS"])
     
     print(f"[DEV MODE] Verification code for {payload.phone}: {code}")
     
@@ -42,13 +69,18 @@ async def verify_phone_code(
     payload: PhoneVerificationCode,
     current_user: UserRead = Depends(get_current_user),
     user_service: UserService = Depends(get_user_service),
+    store: RedisVerificationStore = Depends(get_verification_store),
 ):
-    stored_code = verification_codes.get(payload.phone)
-    
-    if not stored_code or stored_code != payload.code:
+    result = await store.verify(
+        f"{current_user.id}:{payload.phone}", payload.code, CFG["PHONE_CODE_MAX_ATTEMPTS"]
+    )
+
+    if result != VERIFIED:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid verification code",
+            detail="Verification code expired. Please request a new one."
+            if result == EXPIRED
+            else "Invalid verification code",
         )
     
     updated_user = user_service.update_user(
@@ -56,6 +88,4 @@ async def verify_phone_code(
         UserUpdate(phone=payload.phone, phone_verified=True)
     )
     
-    del verification_codes[payload.phone]
-    
     return updated_user
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
-from services.qr_service import QRService
+from services.qr_service import QRService, QRTokenGone
+from utils.qr_render import MEDIA_TYPES
 from services.postgres_base import PostgresService
 from dependencies import get_current_user
+from schemas import UserRead, UserRole
 
 router = APIRouter(prefix="/qr", tags=["qr"])
 
+
+def get_qr_service() -> QRService:
+    return QRService(PostgresService("qr_tokens"))
+
+
 class CheckInRequest(BaseModel):
     token: str
     assignment_id: str
@@ -17,27 +24,19 @@ class CheckOutRequest(BaseModel):
 @router.get("/check-in/{assignment_id}")
 async def get_check_in_qr(
     assignment_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: PostgresService = Depends()
+    inline: bool = Query(True, description="Embed the PNG as a data URI in addition to qr_code_url"),
+    current_user: UserRead = Depends(get_current_user),
+    qr_service: QRService = Depends(get_qr_service),
 ):
     """Generate check-in QR code for an assignment (company users only)"""
-    if current_user['role'] != 'company':
+    if current_user.role != UserRole.COMPANY:
         raise HTTPException(status_code=403, detail="Only companies can generate QR codes")
-    
-    # Verify assignment belongs to this company
-    verify_query = """
-        SELECT a.id FROM assignments a
-        JOIN jobs j ON a.job_id = j.id
-        WHERE a.id = %s AND j.company_id = %s
-    """
-    assignment = await db.fetchone(verify_query, (assignment_id, current_user['id']))
-    if not assignment:
-        raise HTTPException(status_code=403, detail="Assignment not found or does not belong to your company")
-    
-    qr_service = QRService(db)
+
     try:
-        result = await qr_service.get_check_in_qr(assignment_id)
+        result = await qr_service.get_check_in_qr(assignment_id, current_user.id, inline=inline)
         return result
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -46,46 +45,67 @@ async def get_check_in_qr(
 @router.get("/check-out/{assignment_id}")
 async def get_check_out_qr(
     assignment_id: str,
-    current_user: dict = Depends(get_current_user),
-    db: PostgresService = Depends()
+    inline: bool = Query(True, description="Embed the PNG as a data URI in addition to qr_code_url"),
+    current_user: UserRead = Depends(get_current_user),
+    qr_service: QRService = Depends(get_qr_service),
 ):
     """Generate check-out QR code for an assignment (company users only)"""
-    if current_user['role'] != 'company':
+    if current_user.role != UserRole.COMPANY:
         raise HTTPException(status_code=403, detail="Only companies can generate QR codes")
-    
-    # Verify assignment belongs to this company
-    verify_query = """
-        SELECT a.id FROM assignments a
-        JOIN jobs j ON a.job_id = j.id
-        WHERE a.id = %s AND j.company_id = %s
-    """
-    assignment = await db.fetchone(verify_query, (assignment_id, current_user['id']))
-    if not assignment:
-        raise HTTPException(status_code=403, detail="Assignment not found or does not belong to your company")
-    
-    qr_service = QRService(db)
+
     try:
-        result = await qr_service.get_check_out_qr(assignment_id)
+        result = await qr_service.get_check_out_qr(assignment_id, current_user.id, inline=inline)
         return result
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/image/{token}")
+async def get_qr_image(
+    token: str,
+    request: Request,
+    format: str = Query("png", pattern="^(png|svg)$"),
+    current_user: UserRead = Depends(get_current_user),
+    qr_service: QRService = Depends(get_qr_service),
+):
+    """Serve the QR image of a live token as raw PNG or SVG (company users only)"""
+    if current_user.role != UserRole.COMPANY:
+        raise HTTPException(status_code=403, detail="Only companies can view QR codes")
+
+    try:
+        image, ttl_seconds = await qr_service.get_qr_image(token, current_user.id, format)
+    except PermissionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except QRTokenGone as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # The image for a token never changes, so it can be cached until the token expires
+    headers = {
+        "Cache-Control": f"private, max-age={ttl_seconds}, immutable",
+        "ETag": qr_service.image_etag(token, format),
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=image, media_type=MEDIA_TYPES[format], headers=headers)
+
 @router.post("/check-in")
 async def check_in(
     request: CheckInRequest,
-    current_user: dict = Depends(get_current_user),
-    db: PostgresService = Depends()
+    current_user: UserRead = Depends(get_current_user),
+    qr_service: QRService = Depends(get_qr_service),
 ):
     """Worker checks in using QR code token"""
-    if current_user['role'] != 'worker':
+    if current_user.role != UserRole.WORKER:
         raise HTTPException(status_code=403, detail="Only workers can check in")
-    
-    qr_service = QRService(db)
+
     try:
         result = await qr_service.check_in(
-            current_user['id'],
+            current_user.id,
             request.token,
             request.assignment_id
         )
@@ -98,17 +118,16 @@ async def check_in(
 @router.post("/check-out")
 async def check_out(
     request: CheckOutRequest,
-    current_user: dict = Depends(get_current_user),
-    db: PostgresService = Depends()
+    current_user: UserRead = Depends(get_current_user),
+    qr_service: QRService = Depends(get_qr_service),
 ):
     """Worker checks out using QR code token"""
-    if current_user['role'] != 'worker':
+    if current_user.role != UserRole.WORKER:
         raise HTTPException(status_code=403, detail="Only workers can check out")
-    
-    qr_service = QRService(db)
+
     try:
         result = await qr_service.check_out(
-            current_user['id'],
+            current_user.id,
             request.token,
             request.assignment_id
         )
@@ -3,7 +3,8 @@ from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 
 from dependencies import get_current_user
-from schemas import ReviewCreate, ReviewList, ReviewRead, ReviewUpdate, UserRead, UserRole
+from schemas import ReviewCreate, ReviewList, ReviewRead, ReviewUpdate, UserRead, UserRole, WorkerReputation
+from services.reputation_service import ReputationService
 from services.review_service import ReviewService
 
 router = APIRouter()
@@ -13,6 +14,10 @@ def get_review_service() -> ReviewService:
     return ReviewService()
 
 
+def get_reputation_service() -> ReputationService:
+    return ReputationService()
+
+
 @router.get("/", response_model=ReviewList)
 async def list_reviews(
     assignment_id: Optional[str] = Query(default=None),
@@ -31,6 +36,24 @@ async def list_reviews(
     )
 
 
+@router.get("/reputation/{user_id}", response_model=WorkerReputation)
+async def get_reputation(
+    user_id: str,
+    current_user: UserRead = Depends(get_current_user),
+    reputation_service: ReputationService = Depends(get_reputation_service),
+) -> WorkerReputation:
+    reputation = reputation_service.get_reputation(user_id)
+    can_see_penalties = (
+        current_user.id == user_id
+        or current_user.role == UserRole.ADMIN
+        or (current_user.role == UserRole.COMPANY and reputation_service.is_applicant_of(current_user.id, user_id))
+    )
+    if not can_see_penalties:
+        reputation.no_show_count = None
+        reputation.penalty_points = None
+    return reputation
+
+
 @router.post("/", response_model=ReviewRead, status_code=status.HTTP_201_CREATED)
 async def create_review(
     payload: ReviewCreate,
@@ -33,6 +33,7 @@ async def get_worker_profile(
         full_name=user.full_name,
         email=user.email,
         avatar_url=user.avatar_url,
+        avatar_variants=user.avatar_variants,
         phone=user.phone,
         phone_verified=user.phone_verified,
         gender=user.gender,
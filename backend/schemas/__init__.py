@@ -1,4 +1,6 @@
 from .application import (
+    ApplicantCard,
+    ApplicantRanking,
     ApplicationCreate,
     ApplicationList,
     ApplicationRead,
@@ -22,7 +24,7 @@ from .auth import (
     TokenPair,
 )
 from .base import IdResponse, MessageResponse, PaginatedResponse, TimestampedModel
-from .job import JobCreate, JobList, JobRead, JobStatus, JobUpdate
+from .job import FacetCount, JobCreate, JobFacets, JobList, JobRead, JobStatus, JobUpdate
 from .notification import (
     DeviceTokenCreate,
     DeviceTokenRead,
@@ -32,6 +34,7 @@ from .notification import (
     NotificationType,
     NotificationUpdate,
 )
+from .offer import JobOfferList, JobOfferRead, JobOfferStatus
 from .payment import (
     ConnectAccountRequest,
     PaymentCreate,
@@ -41,10 +44,15 @@ from .payment import (
     PaymentStatus,
     PaymentUpdate,
 )
+from .reputation import WorkerReputation
 from .review import ReviewCreate, ReviewList, ReviewRead, ReviewUpdate
+from .schedule import ShiftCheckRequest, ShiftCheckResult, ShiftConflict, WorkerAvailability
+from .tracking import AssignmentTrack, TrackIngestResult, TrackPoint, TrackPointBatch
 from .user import UserBase, UserCreate, UserRead, UserRole, UserUpdate, WorkerPublicProfile
 
 __all__ = [
+    "ApplicantCard",
+    "ApplicantRanking",
     "ApplicationCreate",
     "ApplicationList",
     "ApplicationRead",
@@ -66,7 +74,9 @@ __all__ = [
     "MessageResponse",
     "PaginatedResponse",
     "TimestampedModel",
+    "FacetCount",
     "JobCreate",
+    "JobFacets",
     "JobList",
     "JobRead",
     "JobStatus",
@@ -78,6 +88,9 @@ __all__ = [
     "NotificationRead",
     "NotificationType",
     "NotificationUpdate",
+    "JobOfferList",
+    "JobOfferRead",
+    "JobOfferStatus",
     "ConnectAccountRequest",
     "PaymentCreate",
     "PaymentIntentCreateRequest",
@@ -89,10 +102,19 @@ __all__ = [
     "ReviewList",
     "ReviewRead",
     "ReviewUpdate",
+    "ShiftCheckRequest",
+    "ShiftCheckResult",
+    "ShiftConflict",
+    "WorkerAvailability",
+    "AssignmentTrack",
+    "TrackIngestResult",
+    "TrackPoint",
+    "TrackPointBatch",
     "UserBase",
     "UserCreate",
     "UserRead",
     "UserRole",
     "UserUpdate",
     "WorkerPublicProfile",
+    "WorkerReputation",
 ]
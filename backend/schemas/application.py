@@ -1,5 +1,6 @@
+from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -44,3 +45,32 @@ class ApplicationRead(ApplicationBase):
 
 class ApplicationList(PaginatedResponse[ApplicationRead]):
     pass
+
+
+class ApplicantCard(BaseModel):
+    application_id: str
+    worker_id: str
+    status: ApplicationStatus
+    applied_at: Optional[datetime] = None
+    cover_letter: Optional[str] = None
+    full_name: Optional[str] = None
+    avatar_url: Optional[str] = None
+    avatar_variants: Optional[Dict[str, str]] = None
+    preferred_prefecture: Optional[str] = None
+    phone_verified: bool = False
+    qualifications: List[str] = []
+    matched_qualifications: List[str] = []
+    rating_average: Optional[float] = None
+    review_count: int = 0
+    completed_assignments: int = 0
+    cancelled_assignments: int = 0
+    no_show_count: int = 0
+    penalty_points: int = 0
+    distance_km: Optional[float] = None
+    score: float
+
+
+class ApplicantRanking(BaseModel):
+    job_id: str
+    items: List[ApplicantCard]
+    total: int
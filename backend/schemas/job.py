@@ -31,6 +31,7 @@ class JobBase(TimestampedModel):
     longitude: Optional[float] = None
     is_urgent: bool = False
     urgent_deadline: Optional[datetime] = None
+    required_workers: int = Field(default=1, ge=1)
     working_hours: Optional[str] = None
     thumbnail: Optional[str] = None
 
@@ -51,6 +52,7 @@ class JobCreate(BaseModel):
     longitude: Optional[float] = None
     is_urgent: bool = False
     urgent_deadline: Optional[datetime] = None
+    required_workers: int = Field(default=1, ge=1)
     working_hours: Optional[str] = None
     thumbnail: Optional[str] = None
 
@@ -72,6 +74,7 @@ class JobUpdate(BaseModel):
     longitude: Optional[float] = None
     is_urgent: Optional[bool] = None
     urgent_deadline: Optional[datetime] = None
+    required_workers: Optional[int] = Field(default=None, ge=1)
     working_hours: Optional[str] = None
     thumbnail: Optional[str] = None
 
@@ -83,3 +86,16 @@ class JobRead(JobBase):
 
 class JobList(PaginatedResponse[JobRead]):
     pass
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class JobFacets(BaseModel):
+    total: int
+    prefecture: List[FacetCount] = []
+    hourly_rate: List[FacetCount] = []  # value is the minimum rate, e.g. "1500" for ¥1,500+
+    start_date: List[FacetCount] = []  # today / tomorrow / this_week / later
+    tags: List[FacetCount] = []
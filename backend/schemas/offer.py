@@ -0,0 +1,29 @@
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from .base import PaginatedResponse, TimestampedModel
+
+
+class JobOfferStatus(str, Enum):
+    OFFERED = "offered"
+    ACCEPTED = "accepted"
+    DECLINED = "declined"
+    EXPIRED = "expired"
+
+
+class JobOfferRead(TimestampedModel):
+    id: str
+    job_id: str
+    worker_id: str
+    wave: int
+    score: float
+    distance_km: Optional[float] = None
+    status: JobOfferStatus = JobOfferStatus.OFFERED
+    expires_at: datetime
+    responded_at: Optional[datetime] = None
+    job_title: Optional[str] = None
+
+
+class JobOfferList(PaginatedResponse[JobOfferRead]):
+    pass
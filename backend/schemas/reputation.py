@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class WorkerReputation(BaseModel):
+    user_id: str
+    rating_average: Optional[float] = None
+    review_count: int = 0
+    completed_assignments: int = 0
+    cancelled_assignments: int = 0
+    # None when the viewer is not the user, an admin or a company they applied to
+    no_show_count: Optional[int] = 0
+    penalty_points: Optional[int] = 0
+    updated_at: Optional[datetime] = None
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class ShiftConflict(BaseModel):
+    assignment_id: str
+    job_id: str
+    job_title: Optional[str] = None
+    starts_at: datetime
+    ends_at: datetime
+
+
+class WorkerAvailability(BaseModel):
+    worker_id: str
+    available: bool
+    conflicts: List[ShiftConflict] = []
+
+
+class ShiftCheckRequest(BaseModel):
+    job_id: str
+    worker_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class ShiftCheckResult(BaseModel):
+    job_id: str
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    items: List[WorkerAvailability]
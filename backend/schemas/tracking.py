@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class TrackPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: datetime
+    accuracy_m: Optional[float] = Field(None, ge=0)
+    speed_mps: Optional[float] = Field(None, ge=0)
+
+
+class TrackPointBatch(BaseModel):
+    points: List[TrackPoint] = Field(..., min_length=1, max_length=100)
+
+
+class TrackIngestResult(BaseModel):
+    accepted: int
+
+
+class AssignmentTrack(BaseModel):
+    assignment_id: str
+    points: List[TrackPoint] = Field(default_factory=list)
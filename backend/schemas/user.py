@@ -1,6 +1,6 @@
 from datetime import date
 from enum import Enum
-from typing import Optional, List
+from typing import Dict, Optional, List
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -25,6 +25,7 @@ class UserBase(TimestampedModel):
     full_name: str
     role: UserRole
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[Dict[str, str]] = None
     is_active: bool = True
     phone: Optional[str] = None
     phone_verified: bool = False
@@ -53,6 +54,7 @@ class UserCreate(BaseModel):
 class UserUpdate(BaseModel):
     full_name: Optional[str] = Field(default=None, max_length=100)
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[Dict[str, str]] = None
     is_active: Optional[bool] = None
     phone: Optional[str] = None
     phone_verified: Optional[bool] = None
@@ -81,6 +83,7 @@ class WorkerPublicProfile(TimestampedModel):
     full_name: str
     email: EmailStr
     avatar_url: Optional[str] = None
+    avatar_variants: Optional[Dict[str, str]] = None
     phone: Optional[str] = None
     phone_verified: bool = False
     gender: Optional[Gender] = None
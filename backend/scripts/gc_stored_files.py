@@ -0,0 +1,30 @@
+"""Delete stored upload files that are no longer referenced.
+
+Usage (from ``backend/``)::
+
+    python -m scripts.gc_stored_files
+    python -m scripts.gc_stored_files --grace-hours 1 --batch-size 200
+"""
+
+import argparse
+
+from services.storage_service import StorageService
+from utils.config import CFG
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--grace-hours", type=int, default=CFG["STORAGE_GC_GRACE_HOURS"],
+                        help="Keep released files at least this long")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    service = StorageService()
+    total = 0
+    while deleted := service.collect_garbage(args.grace_hours, args.batch_size):
+        total += deleted
+    print(f"Deleted {total} unreferenced files")
+
+
+if __name__ == "__main__":
+    main()
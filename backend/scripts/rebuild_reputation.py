@@ -0,0 +1,25 @@
+"""Recompute every row of ``worker_reputation`` from the source tables.
+
+Usage (from ``backend/``)::
+
+    python -m scripts.rebuild_reputation
+    python -m scripts.rebuild_reputation --batch-size 500
+"""
+
+import argparse
+
+from services.reputation_service import ReputationService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="Users recomputed per transaction")
+    args = parser.parse_args()
+
+    total = ReputationService().rebuild(args.batch_size)
+    print(f"Rebuilt reputation for {total} users")
+
+
+if __name__ == "__main__":
+    main()
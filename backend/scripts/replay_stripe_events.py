@@ -0,0 +1,45 @@
+"""Requeue stored Stripe webhook events so the worker applies them again.
+
+Usage (from ``backend/``)::
+
+    python -m scripts.replay_stripe_events                      # all failed events
+    python -m scripts.replay_stripe_events --event-id evt_123 --event-id evt_456
+    python -m scripts.replay_stripe_events --since 2025-11-01 --limit 100 --process
+"""
+
+import argparse
+from datetime import datetime
+
+from services.stripe_event_service import StripeEventService
+from utils.config import CFG
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--event-id", action="append", dest="event_ids", help="Stripe event id (evt_...)")
+    parser.add_argument("--status", default="failed", help="Status to requeue when no event id is given")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only events received after this time")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--process", action="store_true", help="Apply requeued events now instead of waiting for the worker")
+    args = parser.parse_args()
+
+    service = StripeEventService()
+    requeued = service.requeue_events(
+        event_ids=args.event_ids,
+        status_filter=args.status,
+        since=args.since,
+        limit=args.limit,
+    )
+    for row in requeued:
+        print(f"requeued {row['stripe_event_id']} {row['type']} intent={row['payment_intent_id']}")
+    print(f"{len(requeued)} event(s) requeued")
+
+    if args.process:
+        batch_size = int(CFG["STRIPE_EVENT_BATCH_SIZE"])
+        while service.process_pending(batch_size) > 0:
+            pass
+        print("processing finished")
+
+
+if __name__ == "__main__":
+    main()
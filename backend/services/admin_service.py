@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta
 
 from utils.database import get_pg_connection, release_pg_connection
-from psycopg2.extras import RealDictCursor
+from utils.db_instrumentation import InstrumentedCursor
 
 
 class AdminService:
@@ -26,7 +26,7 @@ class AdminService:
         """Get comprehensive platform statistics"""
         conn = get_pg_connection()
         try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=InstrumentedCursor)
             
             cursor.execute("SELECT COUNT(*) as count FROM users")
             total_users = cursor.fetchone()['count']
@@ -65,7 +65,7 @@ class AdminService:
     def _count(self, table: str) -> int:
         conn = get_pg_connection()
         try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=InstrumentedCursor)
             cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
             result = cursor.fetchone()
             return result['count'] if result else 0
@@ -76,7 +76,7 @@ class AdminService:
     def _sum_payments(self) -> int:
         conn = get_pg_connection()
         try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=InstrumentedCursor)
             cursor.execute(
                 "SELECT amount FROM payments WHERE status = 'succeeded'"
             )
@@ -90,7 +90,7 @@ class AdminService:
         last_week = (datetime.utcnow() - timedelta(days=7)).isoformat()
         conn = get_pg_connection()
         try:
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=InstrumentedCursor)
             cursor.execute(
                 f"SELECT * FROM {table} WHERE created_at >= %s ORDER BY created_at DESC LIMIT 5",
                 (last_week,)
@@ -1,27 +1,134 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import math
 
 from fastapi import HTTPException, status
 
 from schemas import (
+    ApplicantCard,
+    ApplicantRanking,
     ApplicationCreate,
     ApplicationList,
     ApplicationRead,
     ApplicationStatus,
     ApplicationUpdate,
+    JobRead,
     JobSummary,
     JobStatus,
 )
 
 from .postgres_base import PostgresService
+from .job_index import tag_list
 from .job_service import JobService
+from .schedule_service import ScheduleService
 from .user_service import UserService
 
+logger = logging.getLogger(__name__)
+
+RANKING_WEIGHTS = {
+    "rating": 3.0,
+    "experience": 2.0,
+    "reliability": 1.5,
+    "qualification": 2.0,
+    "distance": 2.0,
+    "penalty": 3.0,
+}
+RATING_PRIOR = 3.5  # Bayesian prior so one 5-star review does not beat fifty 4.8s
+RATING_PRIOR_WEIGHT = 3
+EXPERIENCE_SCALE = 5.0
+DISTANCE_SCALE_KM = 15.0
+PENALTY_CAP = 10
+
+# One statement: the applicants joined to their maintained ``worker_reputation`` row
+# (see services.reputation_service), so no per-request aggregation over history.
+APPLICANT_RANKING_SQL = """
+    SELECT a.id AS application_id, a.worker_id, a.status, a.cover_letter, a.created_at AS applied_at,
+           u.full_name, u.avatar_url, u.avatar_variants, u.preferred_prefecture, u.phone_verified,
+           u.qualifications, u.latitude, u.longitude,
+           rep.rating_average::float AS rating_average, COALESCE(rep.review_count, 0) AS review_count,
+           COALESCE(rep.completed_assignments, 0) AS completed_assignments,
+           COALESCE(rep.cancelled_assignments, 0) AS cancelled_assignments,
+           COALESCE(rep.no_show_count, 0) AS no_show_count,
+           COALESCE(rep.penalty_points, 0) AS penalty_points
+    FROM applications a
+    JOIN users u ON u.id = a.worker_id
+    LEFT JOIN worker_reputation rep ON rep.user_id = a.worker_id
+    WHERE a.job_id = %s AND a.status = ANY(%s)
+"""
+
+
+def score_worker(row: Dict[str, Any], job: JobRead) -> Tuple[float, Optional[float], List[str], List[str]]:
+    """Score a worker's reputation row for ``job``: (score, distance_km, qualifications, matched)."""
+    qualifications = tag_list(row.get("qualifications"))
+    matched = [tag for tag in job.tags if tag in set(qualifications)]
+    reviews = int(row["review_count"])
+    completed = int(row["completed_assignments"])
+    cancelled = int(row["cancelled_assignments"])
+    no_shows = int(row.get("no_show_count") or 0)
+    penalty_points = int(row["penalty_points"] or 0)
+
+    score = 0.0
+    if reviews:
+        total = float(row["rating_average"]) * reviews
+        bayesian = (RATING_PRIOR * RATING_PRIOR_WEIGHT + total) / (RATING_PRIOR_WEIGHT + reviews)
+        score += RANKING_WEIGHTS["rating"] * (bayesian - 1) / 4
+    else:
+        score += RANKING_WEIGHTS["rating"] * (RATING_PRIOR - 1) / 4
+    score += RANKING_WEIGHTS["experience"] * (1 - math.exp(-completed / EXPERIENCE_SCALE))
+    finished = completed + cancelled + no_shows
+    score += RANKING_WEIGHTS["reliability"] * (completed / finished if finished else 0.5)
+    if job.tags:
+        score += RANKING_WEIGHTS["qualification"] * len(matched) / len(job.tags)
+    score -= RANKING_WEIGHTS["penalty"] * min(penalty_points, PENALTY_CAP) / PENALTY_CAP
+
+    distance_km = None
+    if None not in (row.get("latitude"), row.get("longitude"), job.latitude, job.longitude):
+        distance_km = JobService.calculate_distance(
+            float(row["latitude"]), float(row["longitude"]), job.latitude, job.longitude
+        )
+        score += RANKING_WEIGHTS["distance"] * math.exp(-distance_km / DISTANCE_SCALE_KM)
+    return score, distance_km, qualifications, matched
+
+
+def score_applicant(row: Dict[str, Any], job: JobRead) -> ApplicantCard:
+    """Turn one aggregated applicant row into a scored card for ``job``."""
+    score, distance_km, qualifications, matched = score_worker(row, job)
+    reviews = int(row["review_count"])
+    return ApplicantCard(
+        application_id=str(row["application_id"]),
+        worker_id=str(row["worker_id"]),
+        status=row["status"],
+        applied_at=row.get("applied_at"),
+        cover_letter=row.get("cover_letter"),
+        full_name=row.get("full_name"),
+        avatar_url=row.get("avatar_url"),
+        avatar_variants=row.get("avatar_variants"),
+        preferred_prefecture=row.get("preferred_prefecture"),
+        phone_verified=bool(row.get("phone_verified")),
+        qualifications=qualifications,
+        matched_qualifications=matched,
+        rating_average=round(float(row["rating_average"]), 2) if reviews else None,
+        review_count=reviews,
+        completed_assignments=int(row["completed_assignments"]),
+        cancelled_assignments=int(row["cancelled_assignments"]),
+        no_show_count=int(row.get("no_show_count") or 0),
+        penalty_points=int(row["penalty_points"] or 0),
+        distance_km=round(distance_km, 1) if distance_km is not None else None,
+        score=round(score, 4),
+    )
+
 
 class ApplicationService(PostgresService):
-    def __init__(self, job_service: Optional[JobService] = None, user_service: Optional[UserService] = None) -> None:
+    def __init__(
+        self,
+        job_service: Optional[JobService] = None,
+        user_service: Optional[UserService] = None,
+        schedule_service: Optional[ScheduleService] = None,
+    ) -> None:
         super().__init__("applications")
         self.jobs = job_service or JobService()
         self.users = user_service or UserService()
+        self.schedule = schedule_service or ScheduleService()
 
     def _to_application(self, data: Dict, include_job: bool = True) -> ApplicationRead:
         app_data = {**data}
@@ -84,6 +191,7 @@ class ApplicationService(PostgresService):
             existing = cursor.fetchone()
             if existing:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Already applied")
+        self.schedule.ensure_available(worker_id, job)
         record = payload.dict()
         record["worker_id"] = worker_id
         record["status"] = ApplicationStatus.PENDING.value
@@ -125,3 +233,26 @@ class ApplicationService(PostgresService):
         if not data:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Application not found")
         return self._to_application(data, include_job=True)
+
+    def rank_applicants(
+        self,
+        job: JobRead,
+        *,
+        statuses: Optional[List[ApplicationStatus]] = None,
+        limit: int = 100,
+    ) -> ApplicantRanking:
+        """Score every applicant to ``job`` from one set-based query, best first."""
+        statuses = statuses or [ApplicationStatus.PENDING, ApplicationStatus.INTERVIEW, ApplicationStatus.HIRED]
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute(APPLICANT_RANKING_SQL, (job.id, [item.value for item in statuses]))
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error ranking applicants for job {job.id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to rank applicants"
+            )
+        cards = [score_applicant(dict(row), job) for row in rows]
+        cards.sort(key=lambda card: (-card.score, card.applied_at is None, card.applied_at))
+        return ApplicantRanking(job_id=job.id, items=cards[:limit], total=len(cards))
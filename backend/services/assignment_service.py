@@ -17,6 +17,8 @@ from schemas import (
 from .application_service import ApplicationService
 from .postgres_base import PostgresService
 from .job_service import JobService
+from .reputation_service import refresh_reputation
+from .schedule_service import ScheduleService, is_shift_overlap
 
 
 class AssignmentService(PostgresService):
@@ -24,10 +26,12 @@ class AssignmentService(PostgresService):
         self,
         application_service: Optional[ApplicationService] = None,
         job_service: Optional[JobService] = None,
+        schedule_service: Optional[ScheduleService] = None,
     ) -> None:
         super().__init__("assignments")
         self.applications = application_service or ApplicationService()
         self.jobs = job_service or JobService()
+        self.schedule = schedule_service or ScheduleService()
 
     def _auto_create_payment_if_needed(self, assignment_id: str, assignment_data: Dict) -> None:
         """Automatically create payment for completed assignment if not already created"""
@@ -91,11 +95,17 @@ class AssignmentService(PostgresService):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job closed")
         if application.status not in [ApplicationStatus.INTERVIEW, ApplicationStatus.HIRED]:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Application not ready")
+        self.schedule.ensure_available(application.worker_id, job)
         record = payload.dict()
         record["job_id"] = application.job_id
         record["worker_id"] = application.worker_id
         record["application_id"] = application.id
-        created = self.insert(record)
+        try:
+            created = self.insert(record)
+        except Exception as e:
+            if is_shift_overlap(e):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Shift overlaps another assignment")
+            raise
         self.applications.update_application(
             application.id,
             ApplicationUpdate(status=ApplicationStatus.HIRED),
@@ -106,11 +116,18 @@ class AssignmentService(PostgresService):
         update_data = payload.dict(exclude_unset=True)
         if "status" in update_data and isinstance(update_data["status"], AssignmentStatus):
             update_data["status"] = update_data["status"].value
-        updated = self.update(assignment_id, update_data)
+        try:
+            updated = self.update(assignment_id, update_data)
+        except Exception as e:
+            if is_shift_overlap(e):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Shift overlaps another assignment")
+            raise
         
         # Auto-create payment when assignment is completed (if not already created)
         if updated.get("status") == AssignmentStatus.COMPLETED.value:
             self._auto_create_payment_if_needed(assignment_id, updated)
+        if "status" in update_data:
+            refresh_reputation(updated.get("worker_id"))
         
         return self._to_assignment(updated)
 
@@ -181,5 +198,6 @@ class AssignmentService(PostgresService):
         # Auto-create payment when delivery is completed
         if next_status == AssignmentStatus.DELIVERED:
             self._auto_create_payment_if_needed(assignment_id, updated)
+            refresh_reputation(assignment.worker_id)
         
         return self._to_assignment(updated)
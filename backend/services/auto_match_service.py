@@ -0,0 +1,338 @@
+"""Automatic matching for urgent jobs.
+
+When an urgent job is published, online workers inside ``AUTO_MATCH_RADIUS_KM`` with
+no active penalty and no open assignment overlapping the shift are scored with the
+applicant-ranking weights and offered the shift in waves. A wave offers
+``AUTO_MATCH_WAVE_FACTOR`` times the open slots; declined and expired offers make room
+for the next wave until the job is filled, its urgent deadline passes or
+``AUTO_MATCH_MAX_WAVES`` waves have gone out.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from schemas import (
+    AssignmentRead,
+    JobOfferList,
+    JobOfferRead,
+    JobRead,
+    NotificationCreate,
+    NotificationType,
+)
+from utils.config import CFG
+
+from .application_service import score_worker
+from .notification_service import NotificationService
+from .postgres_base import PostgresService
+from .schedule_service import OPEN_ASSIGNMENT, is_shift_overlap, shift_window
+
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE = 111.32
+
+# Locks the job so concurrent waves / accepts for it serialize.
+JOB_STATE_SQL = """
+    SELECT j.*,
+           (SELECT COUNT(*) FROM assignments s WHERE s.job_id = j.id AND s.status <> 'cancelled') AS filled,
+           (SELECT COUNT(*) FROM job_offers o
+             WHERE o.job_id = j.id AND o.status = 'offered' AND o.expires_at > now()) AS pending,
+           (SELECT COALESCE(MAX(o.wave), 0) FROM job_offers o WHERE o.job_id = j.id) AS last_wave
+    FROM jobs j
+    WHERE j.id = %s
+    FOR UPDATE OF j
+"""
+
+# The bounding box is served by the partial index on online workers; every other
+# check is a per-candidate index probe.
+CANDIDATES_SQL = f"""
+    SELECT u.id::text AS worker_id, u.latitude::float AS latitude, u.longitude::float AS longitude,
+           u.qualifications,
+           rep.rating_average::float AS rating_average, COALESCE(rep.review_count, 0) AS review_count,
+           COALESCE(rep.completed_assignments, 0) AS completed_assignments,
+           COALESCE(rep.cancelled_assignments, 0) AS cancelled_assignments,
+           COALESCE(rep.no_show_count, 0) AS no_show_count,
+           0 AS penalty_points
+    FROM users u
+    LEFT JOIN worker_reputation rep ON rep.user_id = u.id
+    WHERE u.role = 'worker' AND u.is_online
+      AND u.latitude BETWEEN %(min_lat)s AND %(max_lat)s
+      AND u.longitude BETWEEN %(min_lng)s AND %(max_lng)s
+      AND NOT EXISTS (
+          SELECT 1 FROM penalties p
+          WHERE p.user_id = u.id AND p.is_active AND (p.expires_at IS NULL OR p.expires_at > now())
+      )
+      AND NOT EXISTS (SELECT 1 FROM job_offers o WHERE o.job_id = %(job_id)s AND o.worker_id = u.id)
+      AND NOT EXISTS (
+          SELECT 1 FROM assignments s
+          WHERE s.worker_id = u.id AND {OPEN_ASSIGNMENT}
+            AND s.shift_range && tstzrange(%(starts_at)s, %(ends_at)s)
+      )
+    ORDER BY power(u.latitude - %(lat)s, 2) + power((u.longitude - %(lng)s) * %(lng_scale)s, 2)
+    LIMIT %(pool)s
+"""
+
+INSERT_OFFERS_SQL = """
+    INSERT INTO job_offers (job_id, worker_id, wave, score, distance_km, expires_at)
+    SELECT %s, t.worker_id, %s, t.score, t.distance_km, %s
+    FROM unnest(%s::uuid[], %s::float[], %s::float[]) AS t(worker_id, score, distance_km)
+    ON CONFLICT (job_id, worker_id) DO NOTHING
+    RETURNING *
+"""
+
+WORKER_CONFLICT_SQL = f"""
+    SELECT 1 FROM assignments s
+    WHERE s.worker_id = %s AND {OPEN_ASSIGNMENT} AND s.shift_range && tstzrange(%s, %s)
+    LIMIT 1
+"""
+
+
+def _bounding_box(lat: float, lng: float, radius_km: float) -> Dict[str, float]:
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_scale = max(math.cos(math.radians(lat)), 0.01)
+    lng_delta = lat_delta / lng_scale
+    return {
+        "lat": lat,
+        "lng": lng,
+        "lng_scale": lng_scale,
+        "min_lat": lat - lat_delta,
+        "max_lat": lat + lat_delta,
+        "min_lng": lng - lng_delta,
+        "max_lng": lng + lng_delta,
+    }
+
+
+def _to_offer(row: Dict[str, Any]) -> JobOfferRead:
+    data = dict(row)
+    for key in ("id", "job_id", "worker_id"):
+        data[key] = str(data[key])
+    data["score"] = float(data["score"])
+    if data.get("distance_km") is not None:
+        data["distance_km"] = float(data["distance_km"])
+    return JobOfferRead(**data)
+
+
+class AutoMatchService(PostgresService):
+    def __init__(self, notification_service: Optional[NotificationService] = None) -> None:
+        super().__init__("job_offers")
+        self.notifications = notification_service
+
+    def rank_candidates(self, rows: List[Dict[str, Any]], job: JobRead, radius_km: float) -> List[Dict[str, Any]]:
+        """Score the bounding-box candidates, drop those outside the radius, best first."""
+        ranked = []
+        for row in rows:
+            score, distance_km, _, _ = score_worker(row, job)
+            if distance_km is None or distance_km > radius_km:
+                continue
+            ranked.append({"worker_id": row["worker_id"], "score": round(score, 4), "distance_km": round(distance_km, 2)})
+        ranked.sort(key=lambda item: (-item["score"], item["distance_km"]))
+        return ranked
+
+    def send_wave(self, job_id: str) -> List[JobOfferRead]:
+        """Offer the job to the next best workers if open slots are not covered by pending offers."""
+        now = datetime.now(timezone.utc)
+        radius_km = float(CFG["AUTO_MATCH_RADIUS_KM"])
+        with self._get_cursor() as cursor:
+            cursor.execute(JOB_STATE_SQL, (job_id,))
+            state = cursor.fetchone()
+            if not state or state["status"] != "published" or not state.get("is_urgent"):
+                return []
+            if state.get("latitude") is None or state.get("longitude") is None:
+                logger.info(f"Urgent job {job_id} has no location; skipping auto-match")
+                return []
+            deadline = state.get("urgent_deadline")
+            if (deadline and deadline <= now) or state["last_wave"] >= CFG["AUTO_MATCH_MAX_WAVES"]:
+                return []
+            open_slots = int(state.get("required_workers") or 1) - int(state["filled"])
+            need = open_slots * int(CFG["AUTO_MATCH_WAVE_FACTOR"]) - int(state["pending"])
+            if open_slots <= 0 or need <= 0:
+                return []
+
+            starts_at, ends_at = shift_window(state.get("starts_at") or now, state.get("ends_at"))
+            lat, lng = float(state["latitude"]), float(state["longitude"])
+            params = {
+                **_bounding_box(lat, lng, radius_km),
+                "job_id": job_id,
+                "starts_at": starts_at,
+                "ends_at": ends_at,
+                "pool": CFG["AUTO_MATCH_CANDIDATE_POOL"],
+            }
+            cursor.execute(CANDIDATES_SQL, params)
+            job = JobRead(**{**state, "id": str(state["id"]), "company_id": str(state["company_id"])})
+            chosen = self.rank_candidates([dict(row) for row in cursor.fetchall()], job, radius_km)[:need]
+            if not chosen:
+                return []
+
+            expires_at = now + timedelta(seconds=CFG["AUTO_MATCH_OFFER_SECONDS"])
+            if deadline:
+                expires_at = min(expires_at, deadline)
+            cursor.execute(
+                INSERT_OFFERS_SQL,
+                (
+                    job_id,
+                    state["last_wave"] + 1,
+                    expires_at,
+                    [item["worker_id"] for item in chosen],
+                    [item["score"] for item in chosen],
+                    [item["distance_km"] for item in chosen],
+                ),
+            )
+            offers = [_to_offer(row) for row in cursor.fetchall()]
+        self._notify(offers, job)
+        return offers
+
+    def _notify(self, offers: List[JobOfferRead], job: JobRead) -> None:
+        service = self.notifications or NotificationService()
+        for offer in offers:
+            try:
+                service.create_notification(
+                    NotificationCreate(
+                        user_id=offer.worker_id,
+                        type=NotificationType.SYSTEM,
+                        title="急募のお仕事のオファー",
+                        body=f"{job.title} のオファーが届きました",
+                        data={"kind": "job_offer", "offer_id": offer.id, "job_id": offer.job_id},
+                    )
+                )
+            except Exception as e:
+                logger.warning(f"Failed to notify offer {offer.id}: {e}")
+
+    def run_pending_waves(self) -> int:
+        """Expire stale offers and top up every open urgent job that has already started matching."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE job_offers SET status = 'expired', updated_at = now()
+                WHERE status = 'offered' AND expires_at <= now()
+                """
+            )
+            cursor.execute(
+                """
+                SELECT j.id::text AS id
+                FROM jobs j
+                WHERE j.is_urgent AND j.status = 'published'
+                  AND (j.urgent_deadline IS NULL OR j.urgent_deadline > now())
+                  AND EXISTS (SELECT 1 FROM job_offers o WHERE o.job_id = j.id)
+                """
+            )
+            job_ids = [row["id"] for row in cursor.fetchall()]
+        sent = 0
+        for job_id in job_ids:
+            try:
+                sent += len(self.send_wave(job_id))
+            except Exception as e:
+                logger.error(f"Auto-match wave failed for job {job_id}: {e}")
+        return sent
+
+    def list_offers(self, worker_id: str, page: int = 1, size: int = 20) -> JobOfferList:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT o.*, j.title AS job_title, COUNT(*) OVER () AS total_count
+                FROM job_offers o
+                JOIN jobs j ON j.id = o.job_id
+                WHERE o.worker_id = %s AND o.status = 'offered' AND o.expires_at > now()
+                ORDER BY o.expires_at
+                LIMIT %s OFFSET %s
+                """,
+                (worker_id, size, (page - 1) * size),
+            )
+            rows = [dict(row) for row in cursor.fetchall()]
+        total = rows[0]["total_count"] if rows else 0
+        return JobOfferList(items=[_to_offer(row) for row in rows], total=total, page=page, size=size)
+
+    def accept_offer(self, offer_id: str, worker_id: str) -> AssignmentRead:
+        now = datetime.now(timezone.utc)
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT * FROM job_offers WHERE id = %s AND worker_id = %s", (offer_id, worker_id))
+            offer = cursor.fetchone()
+            if not offer:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Offer not found")
+            cursor.execute(JOB_STATE_SQL, (offer["job_id"],))
+            state = cursor.fetchone()
+            if offer["status"] != "offered" or offer["expires_at"] <= now or state["status"] != "published":
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Offer is no longer available")
+            required = int(state.get("required_workers") or 1)
+            if int(state["filled"]) >= required:
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Job already filled")
+            starts_at, ends_at = shift_window(state.get("starts_at") or now, state.get("ends_at"))
+            cursor.execute(WORKER_CONFLICT_SQL, (worker_id, starts_at, ends_at))
+            if cursor.fetchone():
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Overlapping assignment")
+
+            cursor.execute(
+                """
+                INSERT INTO applications (job_id, worker_id, status)
+                VALUES (%s, %s, 'hired')
+                ON CONFLICT (job_id, worker_id) DO UPDATE SET status = 'hired', updated_at = now()
+                RETURNING id
+                """,
+                (offer["job_id"], worker_id),
+            )
+            application_id = cursor.fetchone()["id"]
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO assignments (job_id, worker_id, application_id)
+                    VALUES (%s, %s, %s)
+                    RETURNING *
+                    """,
+                    (offer["job_id"], worker_id, application_id),
+                )
+            except Exception as e:
+                if is_shift_overlap(e):
+                    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Overlapping assignment")
+                raise
+            assignment = dict(cursor.fetchone())
+            cursor.execute(
+                "UPDATE job_offers SET status = 'accepted', responded_at = now(), updated_at = now() WHERE id = %s",
+                (offer_id,),
+            )
+            if int(state["filled"]) + 1 >= required:
+                cursor.execute(
+                    """
+                    UPDATE job_offers SET status = 'expired', updated_at = now()
+                    WHERE job_id = %s AND status = 'offered'
+                    """,
+                    (offer["job_id"],),
+                )
+        for key in ("id", "job_id", "worker_id", "application_id"):
+            assignment[key] = str(assignment[key])
+        return AssignmentRead(**assignment)
+
+    def decline_offer(self, offer_id: str, worker_id: str) -> None:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE job_offers SET status = 'declined', responded_at = now(), updated_at = now()
+                WHERE id = %s AND worker_id = %s AND status = 'offered'
+                RETURNING job_id
+                """,
+                (offer_id, worker_id),
+            )
+            if not cursor.fetchone():
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Offer not found")
+
+
+def start_auto_match(job_id: str) -> None:
+    """First wave right after an urgent job is published; failures are left to the worker loop."""
+    try:
+        AutoMatchService().send_wave(job_id)
+    except Exception as e:
+        logger.error(f"Auto-match failed for job {job_id}: {e}")
+
+
+async def run_auto_match_worker() -> None:
+    interval = float(CFG["AUTO_MATCH_POLL_SECONDS"])
+    service = AutoMatchService()
+    while True:
+        try:
+            await run_in_threadpool(service.run_pending_waves)
+        except Exception as exc:
+            logger.error(f"Auto-match worker error: {exc}")
+        await asyncio.sleep(interval)
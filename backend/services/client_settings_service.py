@@ -19,6 +19,16 @@ class ClientSettingsService(PostgresService):
     def __init__(self) -> None:
         super().__init__("client_notification_preferences")
 
+    def get_settings_updated_at(self, table: str, user_id: str) -> Optional[datetime]:
+        """``updated_at`` of a settings row, or None if defaults have not been created yet"""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                f"SELECT updated_at FROM {table} WHERE user_id = %s LIMIT 1",
+                (user_id,),
+            )
+            result = cursor.fetchone()
+            return result["updated_at"] if result else None
+
     # Notification Preferences Methods
     def _to_notification_prefs(self, data: Dict) -> NotificationPreferencesRead:
         return NotificationPreferencesRead(**data)
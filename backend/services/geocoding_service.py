@@ -1,42 +1,155 @@
-import aiohttp
-from typing import Optional, Tuple
+"""Address geocoding for jobs.
+
+Results are cached in Redis (``utils.geocoding``) under the normalized address, so
+an address seen before never reaches Nominatim again. Nominatim requests share one
+keep-alive session per process and one request slot every
+``GEOCODE_MIN_INTERVAL_SECONDS`` across all processes, as its usage policy asks.
+When Nominatim cannot answer in time or does not know the address, the
+municipality / prefecture centroid from ``utils.prefectures`` stands in, and the
+job is queued so the refiner can retry it at the policy's pace.
+"""
+
+import asyncio
 import logging
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import aiohttp
+
+from utils.config import CFG
+from utils.database import get_redis
+from utils.geocoding import Coordinates, MemoryGeocodeStore, RedisGeocodeStore
+from utils.prefectures import find_centroid
 
 logger = logging.getLogger(__name__)
 
+POSTAL_CODE = re.compile(r"〒?\d{3}-\d{4}")
+DASHES = re.compile(r"[‐‑‒–—―−]|(?<=\d)ー(?=\d)")
+BLOCK_SUFFIX = re.compile(r"(\d+)(?:丁目|番地|番)(?=\d)")
+TRAILING_SUFFIX = re.compile(r"(\d)(?:番地|番|号)$")
+# Upper bound for "wait as long as it takes" (the slot script needs a finite number).
+UNBOUNDED_WAIT = 24 * 3600.0
+
+
+def normalize_address(address: str) -> str:
+    """Cache key for an address: NFKC, no postal code or spaces, ``1丁目2番3号`` as ``1-2-3``."""
+    text = unicodedata.normalize("NFKC", address or "")
+    text = re.sub(r"\s+", "", text)
+    text = POSTAL_CODE.sub("", text)
+    text = DASHES.sub("-", text)
+    text = BLOCK_SUFFIX.sub(r"\1-", text)
+    text = TRAILING_SUFFIX.sub(r"\1", text)
+    return re.sub(r"^日本(国)?", "", text).lower()
+
+
+class GeocodeResult(NamedTuple):
+    latitude: float
+    longitude: float
+    precise: bool  # False for a municipality / prefecture centroid
+
+
+_session: Optional[aiohttp.ClientSession] = None
+# Throttle and cache for this process while Redis is unreachable.
+_local_store = MemoryGeocodeStore()
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Process-wide keep-alive session for Nominatim."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=CFG["GEOCODE_TIMEOUT_SECONDS"]),
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60, ttl_dns_cache=300),
+            headers={"User-Agent": CFG["GEOCODE_USER_AGENT"]},
+        )
+    return _session
+
+
+async def close_geocoding_session() -> None:
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+async def get_geocode_store() -> RedisGeocodeStore:
+    return RedisGeocodeStore(await get_redis())
+
 
 class GeocodingService:
-    NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
-    
-    @staticmethod
-    async def geocode_address(address: str) -> Optional[Tuple[float, float]]:
+    def __init__(self, store=None) -> None:
+        self._store = store
+
+    async def _call(self, method: str, *args: Any) -> Any:
+        if self._store is None:
+            self._store = await get_geocode_store()
         try:
-            async with aiohttp.ClientSession() as session:
-                params = {
-                    'q': address,
-                    'format': 'json',
-                    'limit': 1,
-                    'countrycodes': 'jp',
-                }
-                headers = {
-                    'User-Agent': 'WorkNow/1.0 (Job Matching Platform)'
-                }
-                
-                async with session.get(
-                    GeocodingService.NOMINATIM_URL,
-                    params=params,
-                    headers=headers
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if data and len(data) > 0:
-                            lat = float(data[0]['lat'])
-                            lon = float(data[0]['lon'])
-                            logger.info(f"Geocoded '{address}' to ({lat}, {lon})")
-                            return (lat, lon)
-                    else:
-                        logger.warning(f"Geocoding failed for '{address}': HTTP {response.status}")
-                        return None
-        except Exception as e:
-            logger.error(f"Geocoding error for '{address}': {e}")
+            return await getattr(self._store, method)(*args)
+        except Exception as exc:
+            logger.warning(f"Geocode store unavailable ({method}): {exc}")
+            return await getattr(_local_store, method)(*args)
+
+    async def _query(self, address: str, max_wait: Optional[float]) -> Tuple[bool, Optional[Coordinates]]:
+        """(answered, coordinates) from Nominatim; not answered when no slot was free in time or it failed."""
+        delay = await self._call(
+            "reserve", CFG["GEOCODE_MIN_INTERVAL_SECONDS"], UNBOUNDED_WAIT if max_wait is None else max_wait
+        )
+        if delay is None:
+            return False, None
+        await asyncio.sleep(delay)
+        params = {"q": address, "format": "json", "limit": 1, "countrycodes": "jp"}
+        try:
+            async with get_http_session().get(CFG["GEOCODE_NOMINATIM_URL"], params=params) as response:
+                if response.status != 200:
+                    logger.warning(f"Geocoding failed for '{address}': HTTP {response.status}")
+                    return False, None
+                data = await response.json()
+        except Exception as exc:
+            logger.error(f"Geocoding error for '{address}': {exc}")
+            return False, None
+        if not data:
+            return True, None
+        return True, (float(data[0]["lat"]), float(data[0]["lon"]))
+
+    async def geocode(self, address: str, max_wait: Optional[float] = None) -> Optional[GeocodeResult]:
+        """Coordinates for ``address``, waiting at most ``max_wait`` seconds (None: as long as
+        it takes) for a Nominatim slot before settling for the centroid."""
+        key = normalize_address(address)
+        if not key:
             return None
+        hit, coordinates = await self._call("get", key)
+        if not hit and CFG["GEOCODE_NOMINATIM_ENABLED"]:
+            answered, coordinates = await self._query(address.strip(), max_wait)
+            if answered:
+                ttl = CFG["GEOCODE_CACHE_TTL_SECONDS"] if coordinates else CFG["GEOCODE_NEGATIVE_TTL_SECONDS"]
+                await self._call("set", key, coordinates, ttl)
+        if coordinates:
+            return GeocodeResult(*coordinates, precise=True)
+        centroid = find_centroid(key)
+        return GeocodeResult(*centroid, precise=False) if centroid else None
+
+    async def geocode_many(self, addresses: Iterable[str]) -> Dict[str, Optional[GeocodeResult]]:
+        """Batch lookup: each distinct normalized address is resolved once, at most one
+        Nominatim request per slot."""
+        addresses = list(addresses)
+        originals: Dict[str, str] = {}
+        for address in addresses:
+            originals.setdefault(normalize_address(address), address)
+        resolved = {key: await self.geocode(original) for key, original in originals.items() if key}
+        return {address: resolved.get(normalize_address(address)) for address in addresses}
+
+    async def enqueue(self, job_ids: List[str]) -> None:
+        """Queue jobs with centroid coordinates for the refiner."""
+        await self.requeue([(str(job_id), 0) for job_id in job_ids])
+
+    async def requeue(self, entries: List[Tuple[str, int]]) -> None:
+        """Put ``(job_id, attempt)`` entries back at the end of the queue."""
+        await self._call("push", [f"{job_id}:{attempt}" for job_id, attempt in entries])
+
+    async def dequeue(self, count: int) -> List[Tuple[str, int]]:
+        entries = []
+        for value in await self._call("pop", count):
+            job_id, _, attempt = value.partition(":")
+            entries.append((job_id, int(attempt or 0)))
+        return entries
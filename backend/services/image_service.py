@@ -0,0 +1,48 @@
+from pathlib import Path
+from typing import Dict
+
+from PIL import Image, ImageOps
+
+from utils.executors import run_cpu_bound
+
+# Square edge in pixels for each avatar variant (about 2x the size it is shown at)
+AVATAR_VARIANTS = {"thumb": 96, "small": 256, "medium": 512}
+WEBP_QUALITY = 80
+
+
+def build_avatar_variants(source: str, output_dir: str, stem: str) -> Dict[str, str]:
+    """Decode ``source`` once and write ``{stem}_{variant}.webp`` files. Returns variant -> filename.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    largest = max(AVATAR_VARIANTS.values())
+    with Image.open(source) as img:
+        # Let the JPEG decoder downscale by a power of two instead of decoding full size
+        img.draft("RGB", (largest, largest))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        img = ImageOps.fit(img, (largest, largest), Image.Resampling.LANCZOS)
+
+    filenames = {}
+    for name, edge in sorted(AVATAR_VARIANTS.items(), key=lambda item: -item[1]):
+        if img.width != edge:
+            img = img.resize((edge, edge), Image.Resampling.LANCZOS)
+        filename = f"{stem}_{name}.webp"
+        # Saving a fresh image drops EXIF (GPS, device) and other metadata
+        img.save(Path(output_dir) / filename, "WEBP", quality=WEBP_QUALITY, method=4)
+        filenames[name] = filename
+    return filenames
+
+
+class ImageService:
+    def __init__(self, output_dir: Path) -> None:
+        self.output_dir = output_dir
+
+    async def create_avatar_variants(self, source: Path) -> Dict[str, str]:
+        """Build the avatar variants for an uploaded image off the event loop."""
+        try:
+            return await run_cpu_bound(
+                build_avatar_variants, str(source), str(self.output_dir), source.stem
+            )
+        except (OSError, Image.DecompressionBombError) as exc:
+            raise ValueError("Could not read image") from exc
@@ -0,0 +1,274 @@
+"""In-process column store of published jobs for the recommendation feed.
+
+Candidates are precomputed per segment (a prefecture plus the prefectures whose
+offices lie within ``SEGMENT_RADIUS_KM``) and scored with NumPy in one pass.
+``JobService`` keeps the index current through ``job_published`` / ``job_closed``.
+"""
+
+import math
+import time
+from datetime import datetime
+from threading import RLock
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.prefectures import PREFECTURES, PREFECTURES_BY_NAME
+
+WEIGHTS = {
+    "distance": 3.0,
+    "prefecture": 1.5,
+    "qualification": 2.0,
+    "tag_affinity": 1.5,
+    "company_affinity": 1.0,
+    "wage": 1.0,
+    "urgent": 0.5,
+    "recency": 0.5,
+}
+DISTANCE_SCALE_KM = 15.0
+RECENCY_SCALE_DAYS = 14.0
+SEGMENT_RADIUS_KM = 120.0
+FEED_LENGTH = 500
+ALL_SEGMENT = "*"
+
+_OFFICE_LAT = np.radians([prefecture.latitude for prefecture in PREFECTURES])
+_OFFICE_LNG = np.radians([prefecture.longitude for prefecture in PREFECTURES])
+_PREFECTURE_CODES = {prefecture.name: code for code, prefecture in enumerate(PREFECTURES)}
+
+
+def haversine_km(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Distances in km from one point (degrees) to arrays of points in radians; NaN stays NaN."""
+    lat, lng = math.radians(lat), math.radians(lng)
+    a = np.sin((lats - lat) / 2) ** 2 + math.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 6371.0 * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def nearest_prefecture(lat: float, lng: float) -> int:
+    return int(np.argmin(haversine_km(lat, lng, _OFFICE_LAT, _OFFICE_LNG)))
+
+
+def _neighbour_codes(code: int) -> np.ndarray:
+    prefecture = PREFECTURES[code]
+    distances = haversine_km(prefecture.latitude, prefecture.longitude, _OFFICE_LAT, _OFFICE_LNG)
+    return np.flatnonzero(distances <= SEGMENT_RADIUS_KM)
+
+
+_NEIGHBOURS = [_neighbour_codes(code) for code in range(len(PREFECTURES))]
+
+
+def tag_list(value: Any) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.replace("、", ",").split(",")
+    return [tag.strip() for tag in value if tag and tag.strip()]
+
+
+def _epoch(value: Any) -> float:
+    return value.timestamp() if isinstance(value, datetime) else time.time()
+
+
+class WorkerProfile(NamedTuple):
+    latitude: Optional[float]
+    longitude: Optional[float]
+    prefecture: Optional[str]
+    qualifications: List[str]
+    applied: Set[str]
+    history: List[Tuple[List[str], Optional[str]]]  # (tags, company_id) of applied/favorited jobs
+
+    @property
+    def segment(self) -> str:
+        if self.prefecture in PREFECTURES_BY_NAME:
+            return self.prefecture
+        if self.latitude is not None and self.longitude is not None:
+            return PREFECTURES[nearest_prefecture(self.latitude, self.longitude)].name
+        return ALL_SEGMENT
+
+
+class JobIndex:
+    """Column store of published jobs. Slots are append-only until the next ``load``."""
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self._lock = RLock()
+        self.generation = 0
+        self.loaded_at = 0.0
+        self._reset(capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self.size = 0
+        self.ids: List[Optional[str]] = []
+        self.slots: Dict[str, int] = {}
+        self.companies: Dict[str, int] = {}
+        self.vocab: Dict[str, int] = {}
+        self.active = np.zeros(capacity, dtype=bool)
+        self.lat = np.full(capacity, np.nan)
+        self.lng = np.full(capacity, np.nan)
+        self.rate = np.full(capacity, np.nan)
+        self.created = np.zeros(capacity)
+        self.urgent = np.zeros(capacity, dtype=bool)
+        self.prefecture = np.full(capacity, -1, dtype=np.int16)
+        self.company = np.full(capacity, -1, dtype=np.int32)
+        self.tags = np.zeros((capacity, 16), dtype=bool)
+        self._segments: Dict[str, np.ndarray] = {}
+        self.segment_versions: Dict[str, int] = {}
+
+    def _grow(self) -> None:
+        capacity = len(self.active) * 2
+        for name, fill in (("active", False), ("lat", np.nan), ("lng", np.nan), ("rate", np.nan),
+                           ("created", 0.0), ("urgent", False), ("prefecture", -1), ("company", -1)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        tags = np.zeros((capacity, self.tags.shape[1]), dtype=bool)
+        tags[: len(self.tags)] = self.tags
+        self.tags = tags
+
+    def _tag_column(self, tag: str) -> int:
+        column = self.vocab.get(tag)
+        if column is None:
+            column = self.vocab[tag] = len(self.vocab)
+            if column >= self.tags.shape[1]:
+                wider = np.zeros((len(self.tags), self.tags.shape[1] * 2), dtype=bool)
+                wider[:, : self.tags.shape[1]] = self.tags
+                self.tags = wider
+        return column
+
+    def load(self, rows: Iterable[Dict[str, Any]]) -> None:
+        rows = list(rows)
+        with self._lock:
+            self._reset(max(1024, 1 << max(0, len(rows) - 1).bit_length()))
+            for row in rows:
+                self._append(row)
+            self.generation += 1
+            self.loaded_at = time.monotonic()
+
+    def _append(self, row: Dict[str, Any]) -> int:
+        if self.size == len(self.active):
+            self._grow()
+        slot = self.size
+        self.size += 1
+        job_id = str(row["id"])
+        self.ids.append(job_id)
+        self.slots[job_id] = slot
+        self.active[slot] = True
+        if row.get("latitude") is not None and row.get("longitude") is not None:
+            self.lat[slot] = math.radians(float(row["latitude"]))
+            self.lng[slot] = math.radians(float(row["longitude"]))
+        if row.get("hourly_rate") is not None:
+            self.rate[slot] = float(row["hourly_rate"])
+        self.created[slot] = _epoch(row.get("created_at"))
+        self.urgent[slot] = bool(row.get("is_urgent"))
+        code = _PREFECTURE_CODES.get(row.get("prefecture") or "", -1)
+        if code < 0 and not math.isnan(self.lat[slot]):
+            code = nearest_prefecture(float(row["latitude"]), float(row["longitude"]))
+        self.prefecture[slot] = code
+        if row.get("company_id"):
+            self.company[slot] = self.company_code(str(row["company_id"]))
+        for tag in tag_list(row.get("tags")):
+            self.tags[slot, self._tag_column(tag)] = True
+        return slot
+
+    def company_code(self, company_id: str) -> int:
+        return self.companies.setdefault(company_id, len(self.companies))
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """Add or replace a published job; segments that cover it see a new version."""
+        with self._lock:
+            self._deactivate(str(row["id"]))
+            slot = self._append(row)
+            code = int(self.prefecture[slot])
+            for segment, slots in self._segments.items():
+                if code < 0 or segment == ALL_SEGMENT or code in _NEIGHBOURS[_PREFECTURE_CODES[segment]]:
+                    self._segments[segment] = np.append(slots, slot)
+                    self.segment_versions[segment] += 1
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._deactivate(job_id)
+
+    def _deactivate(self, job_id: str) -> None:
+        slot = self.slots.pop(job_id, None)
+        if slot is not None:
+            self.active[slot] = False
+
+    def is_active(self, job_id: str) -> bool:
+        return job_id in self.slots
+
+    def candidates(self, segment: str) -> Tuple[np.ndarray, int]:
+        """Slots of the segment (active ones only) and the segment version."""
+        with self._lock:
+            slots = self._segments.get(segment)
+            if slots is None:
+                if segment == ALL_SEGMENT:
+                    slots = np.arange(self.size)
+                else:
+                    codes = np.append(_NEIGHBOURS[_PREFECTURE_CODES[segment]], -1)
+                    slots = np.flatnonzero(np.isin(self.prefecture[: self.size], codes))
+                self._segments[segment] = slots
+                self.segment_versions.setdefault(segment, 0)
+            return slots[self.active[slots]], self.segment_versions[segment]
+
+    def rank(self, profile: WorkerProfile, limit: int = FEED_LENGTH, now: Optional[float] = None) -> List[str]:
+        """Score the worker's segment and return the best ``limit`` job ids."""
+        with self._lock:
+            slots, _ = self.candidates(profile.segment)
+            if profile.applied:
+                applied = [self.slots[job_id] for job_id in profile.applied if job_id in self.slots]
+                slots = slots[~np.isin(slots, applied)]
+            if not len(slots):
+                return []
+            score = self._score(slots, profile, time.time() if now is None else now)
+            top = np.argpartition(-score, limit - 1)[:limit] if len(slots) > limit else np.arange(len(slots))
+            top = top[np.lexsort((-self.created[slots[top]], -score[top]))]
+            return [self.ids[slot] for slot in slots[top]]
+
+    def _score(self, slots: np.ndarray, profile: WorkerProfile, now: float) -> np.ndarray:
+        score = np.zeros(len(slots))
+        if profile.latitude is not None and profile.longitude is not None:
+            distance = haversine_km(profile.latitude, profile.longitude, self.lat[slots], self.lng[slots])
+            score += WEIGHTS["distance"] * np.nan_to_num(np.exp(-distance / DISTANCE_SCALE_KM))
+        preferred = _PREFECTURE_CODES.get(profile.prefecture or "", -1)
+        if preferred >= 0:
+            score += WEIGHTS["prefecture"] * (self.prefecture[slots] == preferred)
+
+        tags = self.tags[slots]
+        columns = [self.vocab[tag] for tag in profile.qualifications if tag in self.vocab]
+        if columns:
+            score += WEIGHTS["qualification"] * tags[:, columns].any(axis=1)
+        if profile.history:
+            affinity = np.zeros(tags.shape[1])
+            companies = []
+            for history_tags, company_id in profile.history:
+                for tag in history_tags:
+                    if tag in self.vocab:
+                        affinity[self.vocab[tag]] += 1
+                if company_id in self.companies:
+                    companies.append(self.companies[company_id])
+            if affinity.any():
+                score += WEIGHTS["tag_affinity"] * (tags @ (affinity / affinity.sum()))
+            if companies:
+                score += WEIGHTS["company_affinity"] * np.isin(self.company[slots], companies)
+
+        rate = self.rate[slots]
+        if not np.isnan(rate).all():
+            low, high = np.nanmin(rate), np.nanmax(rate)
+            if high > low:
+                score += WEIGHTS["wage"] * np.nan_to_num((rate - low) / (high - low))
+        score += WEIGHTS["urgent"] * self.urgent[slots]
+        age_days = np.maximum(now - self.created[slots], 0) / 86400
+        score += WEIGHTS["recency"] * np.exp(-age_days / RECENCY_SCALE_DAYS)
+        return score
+
+
+RECOMMENDATION_INDEX = JobIndex()
+
+
+def job_published(row: Dict[str, Any]) -> None:
+    """Hook for JobService: a job became (or stayed) published."""
+    if RECOMMENDATION_INDEX.generation:
+        RECOMMENDATION_INDEX.upsert(row)
+
+
+def job_closed(job_id: str) -> None:
+    RECOMMENDATION_INDEX.remove(str(job_id))
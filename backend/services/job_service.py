@@ -1,19 +1,59 @@
-from typing import Dict, List, Optional
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import logging
 import math
+import re
+import unicodedata
 
+from cachetools import TTLCache
 from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 
-from schemas import JobCreate, JobList, JobRead, JobStatus, JobUpdate
+from schemas import FacetCount, JobCreate, JobFacets, JobList, JobRead, JobStatus, JobUpdate
+from utils.config import CFG
+from utils.prefectures import find_centroid
 
 from .postgres_base import PostgresService
-from .geocoding_service import GeocodingService
+from .geocoding_service import GeocodingService, normalize_address
+from .job_index import job_closed, job_published
+from .schedule_service import is_shift_overlap
 from .user_service import UserService
 
+logger = logging.getLogger(__name__)
+
+MAX_SEARCH_TERMS = 8
+JST = timezone(timedelta(hours=9))
+WAGE_THRESHOLDS = (1000, 1200, 1500, 2000)
+START_BUCKETS = ("today", "tomorrow", "this_week", "later")
+MAX_TAG_FACETS = 30
+
+_facet_cache: TTLCache = TTLCache(maxsize=1024, ttl=CFG["JOB_FACETS_CACHE_SECONDS"])
+_facet_lock = Lock()
+
+
+def search_terms(q: str) -> List[str]:
+    """Split a search string into terms of at least two characters (NFKC, lowercased)."""
+    normalized = unicodedata.normalize("NFKC", q).lower()
+    terms = [term for term in re.split(r"[\W_]+", normalized) if len(term) >= 2]
+    return list(dict.fromkeys(terms))[:MAX_SEARCH_TERMS]
+
+
+def clear_facet_cache() -> None:
+    """Drop this process's facet counts after a job write; other workers expire theirs
+    after ``JOB_FACETS_CACHE_SECONDS``."""
+    with _facet_lock:
+        _facet_cache.clear()
+
 
 class JobService(PostgresService):
-    def __init__(self, user_service: Optional[UserService] = None) -> None:
+    def __init__(
+        self, user_service: Optional[UserService] = None, geocoding_service: Optional[GeocodingService] = None
+    ) -> None:
         super().__init__("jobs")
         self.users = user_service or UserService()
+        self.geocoder = geocoding_service or GeocodingService()
     
     @staticmethod
     def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
@@ -67,22 +107,90 @@ class JobService(PostgresService):
         record["company_id"] = company_id
         record["status"] = JobStatus.DRAFT.value
         
-        # Auto-geocode if location is provided but coordinates are not
+        # Auto-geocode if location is provided but coordinates are not; a centroid (or
+        # nothing) is refined later by the geocode refiner at Nominatim's pace.
+        refine = False
         if record.get("location") and not (record.get("latitude") and record.get("longitude")):
-            coords = await GeocodingService.geocode_address(record["location"])
-            if coords:
-                record["latitude"], record["longitude"] = coords
+            geocoded = await self.geocoder.geocode(
+                record["location"], max_wait=CFG["GEOCODE_INLINE_MAX_WAIT_SECONDS"]
+            )
+            if geocoded:
+                record["latitude"], record["longitude"] = geocoded.latitude, geocoded.longitude
+            refine = not (geocoded and geocoded.precise)
         
         created = self.insert(record)
+        clear_facet_cache()
+        if refine:
+            await self.geocoder.enqueue([created["id"]])
         return self._to_job(created)
 
+    async def refine_coordinates(self, entries: List[Tuple[str, int]]) -> int:
+        """Re-geocode queued ``(job_id, attempt)`` entries whose coordinates are still missing
+        or a centroid; jobs Nominatim could not place are re-queued until
+        ``GEOCODE_REFINER_MAX_ATTEMPTS``. If a job raises, it and the rest of the batch go back
+        on the queue before the error propagates."""
+        refined = 0
+        retry: List[Tuple[str, int]] = []
+        for index, (job_id, attempt) in enumerate(entries):
+            try:
+                outcome = await self._refine_job(job_id)
+            except Exception:
+                failed = [(job_id, attempt + 1)] if attempt + 1 < CFG["GEOCODE_REFINER_MAX_ATTEMPTS"] else []
+                await self.geocoder.requeue(retry + failed + list(entries[index + 1:]))
+                raise
+            if outcome:
+                refined += 1
+            elif outcome is None:
+                if attempt + 1 < CFG["GEOCODE_REFINER_MAX_ATTEMPTS"]:
+                    retry.append((job_id, attempt + 1))
+                else:
+                    logger.warning(f"Giving up geocoding job {job_id} after {attempt + 1} attempts")
+        await self.geocoder.requeue(retry)
+        return refined
+
+    async def _refine_job(self, job_id: str) -> Optional[bool]:
+        """True when refined, False when there is nothing to refine, None when not placed yet."""
+        row = await run_in_threadpool(self.get_by_id, job_id)
+        if not row or not row.get("location"):
+            return False
+        current = (row.get("latitude"), row.get("longitude"))
+        centroid = find_centroid(normalize_address(row["location"]))
+        if None not in current and not (
+            centroid and all(math.isclose(float(a), b, abs_tol=1e-6) for a, b in zip(current, centroid))
+        ):
+            return False  # set by the company in the meantime
+        geocoded = await self.geocoder.geocode(row["location"])
+        if not geocoded or not geocoded.precise:
+            return None
+        updated = await run_in_threadpool(
+            self.update, job_id, {"latitude": geocoded.latitude, "longitude": geocoded.longitude}
+        )
+        if updated.get("status") == JobStatus.PUBLISHED.value:
+            job_published(updated)
+        return True
+
     def publish_job(self, job_id: str) -> JobRead:
         updated = self.update(job_id, {"status": JobStatus.PUBLISHED.value})
+        clear_facet_cache()
+        job_published(updated)
         return self._to_job(updated)
 
     def update_job(self, job_id: str, payload: JobUpdate) -> JobRead:
         update_data = payload.dict(exclude_unset=True)
-        updated = self.update(job_id, update_data)
+        try:
+            updated = self.update(job_id, update_data)
+        except Exception as e:
+            if is_shift_overlap(e):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="New shift overlaps another assignment of an assigned worker",
+                )
+            raise
+        clear_facet_cache()
+        if updated.get("status") == JobStatus.PUBLISHED.value:
+            job_published(updated)
+        else:
+            job_closed(job_id)
         return self._to_job(updated)
 
     def get_job(self, job_id: str) -> JobRead:
@@ -91,6 +199,44 @@ class JobService(PostgresService):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
         return self._to_job(data)
 
+    @staticmethod
+    def search_sql(term_count: int) -> Tuple[str, str, str]:
+        """JOIN, rank column and WHERE condition for ``term_count`` search terms (one param each)."""
+        tsquery = " && ".join(["phraseto_tsquery('simple', public.ja_bigram_text(%s))"] * term_count)
+        join = f"""
+            JOIN job_search_index s ON s.job_id = jobs.id
+            CROSS JOIN (SELECT {tsquery} AS query) AS search
+        """
+        return join, ", ts_rank(s.search_vector, search.query, 1) as search_rank", "s.search_vector @@ search.query"
+
+    @staticmethod
+    def _filter_conditions(
+        *,
+        status_filter: Optional[JobStatus] = None,
+        company_id: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        date: Optional[str] = None,
+        min_hourly_rate: Optional[int] = None,
+    ) -> Tuple[List[str], List]:
+        conditions: List[str] = []
+        params: List = []
+        if status_filter:
+            conditions.append("status = %s")
+            params.append(status_filter.value)
+        if company_id:
+            conditions.append("company_id = %s")
+            params.append(company_id)
+        if prefecture:
+            conditions.append("prefecture = %s")
+            params.append(prefecture)
+        if date:
+            conditions.append("DATE(starts_at) = %s::date")
+            params.append(date)
+        if min_hourly_rate is not None:
+            conditions.append("hourly_rate >= %s")
+            params.append(min_hourly_rate)
+        return conditions, params
+
     def list_jobs(
         self,
         *,
@@ -98,6 +244,8 @@ class JobService(PostgresService):
         company_id: Optional[str] = None,
         prefecture: Optional[str] = None,
         date: Optional[str] = None,
+        min_hourly_rate: Optional[int] = None,
+        q: Optional[str] = None,
         sort_by: str = "created_at",
         user_lat: Optional[float] = None,
         user_lng: Optional[float] = None,
@@ -109,22 +257,25 @@ class JobService(PostgresService):
         try:
             with self._get_cursor() as cursor:
                 # Build dynamic query
-                conditions = []
-                params: List = []
+                conditions, params = self._filter_conditions(
+                    status_filter=status_filter,
+                    company_id=company_id,
+                    prefecture=prefecture,
+                    date=date,
+                    min_hourly_rate=min_hourly_rate,
+                )
                 
-                # Base filters
-                if status_filter:
-                    conditions.append("status = %s")
-                    params.append(status_filter.value)
-                if company_id:
-                    conditions.append("company_id = %s")
-                    params.append(company_id)
-                if prefecture:
-                    conditions.append("prefecture = %s")
-                    params.append(prefecture)
-                if date:
-                    conditions.append("DATE(starts_at) = %s::date")
-                    params.append(date)
+                # Full-text search: every term must appear as a bigram phrase in job_search_index
+                search_join = ""
+                search_params: List = []
+                search_select = ", NULL as search_rank"
+                if q is not None:
+                    terms = search_terms(q)
+                    if not terms:
+                        return JobList(items=[], total=0, page=page, size=size)
+                    search_join, search_select, search_condition = self.search_sql(len(terms))
+                    search_params = terms
+                    conditions.append(search_condition)
                 
                 where_clause = " AND ".join(conditions) if conditions else "1=1"
                 
@@ -156,8 +307,8 @@ class JobService(PostgresService):
                     favorite_select = ", false as is_favorite"
                 
                 # Count query
-                count_query = f"SELECT COUNT(*) as total FROM jobs WHERE {where_clause}"
-                cursor.execute(count_query, params)
+                count_query = f"SELECT COUNT(*) as total FROM jobs {search_join} WHERE {where_clause}"
+                cursor.execute(count_query, search_params + params)
                 total = cursor.fetchone()["total"]
                 
                 # Order by clause - urgent jobs always come first
@@ -166,6 +317,7 @@ class JobService(PostgresService):
                     "hourly_rate": "hourly_rate DESC",
                     "hourly_rate_asc": "hourly_rate ASC",
                     "distance": "distance_km ASC" if user_lat and user_lng else "created_at DESC",
+                    "relevance": "search_rank DESC, created_at DESC" if q is not None else "created_at DESC",
                 }.get(sort_by, "created_at DESC")
                 
                 # Always prioritize urgent jobs, then apply secondary sorting
@@ -174,32 +326,145 @@ class JobService(PostgresService):
                 # Main query
                 offset = (page - 1) * size
                 query = f"""
-                    SELECT jobs.*{distance_select}{favorite_select}
-                    FROM jobs
+                    SELECT jobs.*{distance_select}{favorite_select}{search_select}
+                    FROM jobs {search_join}
                     WHERE {where_clause}
                     ORDER BY {order_clause}
                     LIMIT %s OFFSET %s
                 """
                 params.extend([size, offset])
                 
-                cursor.execute(query, params)
+                cursor.execute(query, search_params + params)
                 rows = cursor.fetchall()
                 
                 items = self._enrich_jobs_with_company([dict(row) for row in rows])
                 return JobList(items=items, total=total, page=page, size=size)
                 
         except Exception as e:
-            self.logger.error(f"Error in list_jobs: {e}")
+            logger.error(f"Error in list_jobs: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to list jobs"
             )
 
+    def job_facets(
+        self,
+        *,
+        status_filter: Optional[JobStatus] = None,
+        company_id: Optional[str] = None,
+        prefecture: Optional[str] = None,
+        date: Optional[str] = None,
+        min_hourly_rate: Optional[int] = None,
+        q: Optional[str] = None,
+    ) -> JobFacets:
+        """Counts per prefecture, wage threshold, start-date bucket and tag for a filter set, in one query.
+
+        The prefecture and wage facets ignore their own filter so the other options keep their counts.
+        Results are cached per filter combination for ``JOB_FACETS_CACHE_SECONDS``.
+        """
+        terms = search_terms(q) if q is not None else []
+        today = datetime.now(JST).date()
+        key = (status_filter, company_id, prefecture, date, min_hourly_rate, tuple(terms), q is not None, today)
+        with _facet_lock:
+            cached = _facet_cache.get(key)
+        if cached is not None:
+            return cached
+        if q is not None and not terms:
+            return JobFacets(total=0)
+
+        conditions, params = self._filter_conditions(status_filter=status_filter, company_id=company_id, date=date)
+        search_join = ""
+        if terms:
+            search_join, _, search_condition = self.search_sql(len(terms))
+            conditions.append(search_condition)
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+        select_params: List = [today]
+        if prefecture:
+            select_params.append(prefecture)
+        if min_hourly_rate is not None:
+            select_params.append(min_hourly_rate)
+
+        query = f"""
+            WITH filtered AS MATERIALIZED (
+                SELECT jobs.prefecture, jobs.hourly_rate, jobs.tags,
+                       (jobs.starts_at AT TIME ZONE 'Asia/Tokyo')::date - %s::date AS start_offset,
+                       {"jobs.prefecture = %s" if prefecture else "true"} AS prefecture_match,
+                       {"jobs.hourly_rate >= %s" if min_hourly_rate is not None else "true"} AS wage_match
+                FROM jobs {search_join}
+                WHERE {where_clause}
+            )
+            SELECT 'total' AS facet, NULL AS value, COUNT(*) AS count
+            FROM filtered WHERE prefecture_match AND wage_match
+            UNION ALL
+            SELECT 'prefecture', prefecture, COUNT(*)
+            FROM filtered WHERE wage_match AND prefecture IS NOT NULL GROUP BY prefecture
+            UNION ALL
+            SELECT 'hourly_rate', t.min_rate::text, COUNT(*)
+            FROM filtered JOIN unnest(%s::int[]) AS t (min_rate) ON filtered.hourly_rate >= t.min_rate
+            WHERE prefecture_match GROUP BY t.min_rate
+            UNION ALL
+            SELECT 'start_date',
+                   CASE WHEN start_offset = 0 THEN 'today' WHEN start_offset = 1 THEN 'tomorrow'
+                        WHEN start_offset < 7 THEN 'this_week' ELSE 'later' END,
+                   COUNT(*)
+            FROM filtered WHERE prefecture_match AND wage_match AND start_offset >= 0 GROUP BY 2
+            UNION ALL
+            (SELECT 'tag', tag, COUNT(*)
+             FROM filtered, unnest(tags) AS tag WHERE prefecture_match AND wage_match
+             GROUP BY tag ORDER BY COUNT(*) DESC, tag LIMIT %s)
+        """
+        all_params = select_params + terms + params + [list(WAGE_THRESHOLDS), MAX_TAG_FACETS]
+        try:
+            with self._get_cursor() as cursor:
+                cursor.execute(query, all_params)
+                rows = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Error in job_facets: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to count jobs"
+            )
+
+        groups: Dict[str, List[FacetCount]] = {"prefecture": [], "hourly_rate": [], "start_date": [], "tags": []}
+        total = 0
+        for row in rows:
+            if row["facet"] == "total":
+                total = row["count"]
+            else:
+                groups["tags" if row["facet"] == "tag" else row["facet"]].append(
+                    FacetCount(value=row["value"], count=row["count"])
+                )
+        groups["prefecture"].sort(key=lambda facet: (-facet.count, facet.value))
+        groups["hourly_rate"].sort(key=lambda facet: int(facet.value))
+        groups["start_date"].sort(key=lambda facet: START_BUCKETS.index(facet.value))
+        facets = JobFacets(total=total, **groups)
+        with _facet_lock:
+            _facet_cache[key] = facets
+        return facets
+
     def archive_job(self, job_id: str) -> None:
         self.update(job_id, {"status": JobStatus.CLOSED.value})
+        clear_facet_cache()
+        job_closed(job_id)
 
     def delete_job(self, job_id: str) -> None:
         job = self.get_by_id(job_id)
         if not job:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
         self.delete(job_id)
+        clear_facet_cache()
+        job_closed(job_id)
+
+
+async def run_geocode_refiner() -> None:
+    """Drain the geocode queue; the shared request slot keeps it to one Nominatim call per interval."""
+    service = JobService()
+    while True:
+        try:
+            entries = await service.geocoder.dequeue(CFG["GEOCODE_REFINER_BATCH_SIZE"])
+            # A batch that refined nothing is likely Nominatim being down; pause before retrying.
+            if entries and await service.refine_coordinates(entries):
+                continue
+        except Exception as exc:
+            logger.error(f"Geocode refiner error: {exc}")
+        await asyncio.sleep(CFG["GEOCODE_REFINER_POLL_SECONDS"])
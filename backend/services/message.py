@@ -97,7 +97,7 @@ class MessageService(PostgresService):
                 query = """
                     SELECT m.*, 
                            u.full_name as sender_name,
-                           u.avatar_url as sender_avatar
+                           COALESCE(u.avatar_variants->>'thumb', u.avatar_url) as sender_avatar
                     FROM messages m
                     JOIN users u ON m.sender_id::text = u.id::text
                     WHERE m.conversation_id = %s
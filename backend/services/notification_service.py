@@ -58,6 +58,19 @@ class NotificationService(PostgresService):
         total = response["count"]
         return NotificationList(items=items, total=total, page=page, size=size)
 
+    def get_list_version(self, user_id: str) -> Dict:
+        """Row count and latest change of a user's notifications; changes whenever a page could."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COUNT(*) AS total, MAX(updated_at) AS last_updated
+                FROM notifications
+                WHERE user_id = %s
+                """,
+                (user_id,),
+            )
+            return dict(cursor.fetchone())
+
     def update_notification(self, notification_id: str, payload: NotificationUpdate) -> NotificationRead:
         update_data: Dict = {}
         if payload.read is not None:
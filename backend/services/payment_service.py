@@ -1,5 +1,6 @@
 from typing import Dict, Optional
 from datetime import datetime
+import uuid
 
 from fastapi import HTTPException, status
 
@@ -23,18 +24,49 @@ class PaymentService(PostgresService):
     def _to_payment(self, data: Dict) -> PaymentRead:
         return PaymentRead(**data)
 
-    def create_payment(self, payload: PaymentCreate) -> PaymentRead:
+    async def create_payment(self, payload: PaymentCreate) -> PaymentRead:
         assignment = self.assignments.get_assignment(payload.assignment_id)
         metadata = assignment.metadata or {}
         worker_stripe_account = metadata.get("worker_stripe_account")
         if not worker_stripe_account:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Worker Stripe account missing")
-        intent = self.stripe.create_payment_intent(payload.amount, worker_stripe_account)
+        intent = await self.stripe.create_payment_intent(
+            payload.amount,
+            worker_stripe_account,
+            idempotency_key=f"payment-{payload.assignment_id}-{payload.amount}",
+        )
         record = payload.dict()
         record["status"] = intent.get("status", PaymentStatus.REQUIRES_PAYMENT_METHOD.value)
         record["stripe_payment_intent_id"] = intent.get("id")
-        inserted = self.insert(record)
-        return self._to_payment(inserted)
+        return self._to_payment(self._insert_for_intent(record))
+
+    def _insert_for_intent(self, record: Dict) -> Dict:
+        """Insert the payment, or return the row already stored for the same intent.
+
+        A retried create within Stripe's idempotency window gets the same intent back,
+        so the second insert would hit ``idx_payments_intent``.
+        """
+        record.setdefault("id", str(uuid.uuid4()))
+        columns = ", ".join(record.keys())
+        placeholders = ", ".join(["%s"] * len(record))
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})
+                ON CONFLICT (stripe_payment_intent_id) WHERE stripe_payment_intent_id IS NOT NULL
+                DO NOTHING
+                RETURNING *
+                """,
+                list(record.values()),
+            )
+            row = cursor.fetchone()
+            if row is None:
+                cursor.execute(
+                    f"SELECT * FROM {self.table_name} WHERE stripe_payment_intent_id = %s",
+                    (record["stripe_payment_intent_id"],),
+                )
+                row = cursor.fetchone()
+        return dict(row)
 
     def update_payment(self, payment_id: str, payload: PaymentUpdate) -> PaymentRead:
         update_data = payload.dict(exclude_unset=True)
@@ -43,19 +75,44 @@ class PaymentService(PostgresService):
         updated = self.update(payment_id, update_data)
         return self._to_payment(updated)
 
-    def update_by_intent(self, intent_id: str, status_value: str, transfer_id: Optional[str] = None) -> None:
+    def update_by_intent(
+        self,
+        intent_id: str,
+        status_value: str,
+        transfer_id: Optional[str] = None,
+        event_created: Optional[int] = None,
+    ) -> bool:
         with self._get_cursor() as cursor:
-            cursor.execute(
-                f"SELECT id FROM {self.table_name} WHERE stripe_payment_intent_id = %s LIMIT 1",
-                (intent_id,)
+            return self.apply_intent_status(
+                cursor, intent_id, status_value, transfer_id=transfer_id, event_created=event_created
             )
-            result = cursor.fetchone()
-            if not result:
-                return
-            update_data: Dict = {"status": status_value}
-            if transfer_id:
-                update_data["stripe_transfer_id"] = transfer_id
-            self.update(result["id"], update_data)
+
+    def apply_intent_status(
+        self,
+        cursor,
+        intent_id: str,
+        status_value: str,
+        transfer_id: Optional[str] = None,
+        event_created: Optional[int] = None,
+    ) -> bool:
+        """Update a payment by intent id in one statement on the caller's cursor.
+
+        Events older than the last one applied are ignored so that retried or
+        out-of-order deliveries never roll the status back.
+        """
+        cursor.execute(
+            f"""
+            UPDATE {self.table_name}
+            SET status = %s,
+                stripe_transfer_id = COALESCE(%s, stripe_transfer_id),
+                last_stripe_event_at = COALESCE(%s, last_stripe_event_at),
+                updated_at = NOW()
+            WHERE stripe_payment_intent_id = %s
+            AND (%s IS NULL OR last_stripe_event_at IS NULL OR last_stripe_event_at <= %s)
+            """,
+            (status_value, transfer_id, event_created, intent_id, event_created, event_created),
+        )
+        return cursor.rowcount > 0
 
     def list_payments(
         self,
@@ -1,9 +1,12 @@
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 from contextlib import contextmanager
 import uuid
 
-from psycopg2.extras import RealDictCursor
+from starlette.concurrency import run_in_threadpool
 from utils.database import get_pg_connection, release_pg_connection
+from utils.db_instrumentation import InstrumentedCursor
+
+QueryParams = Union[Sequence[Any], Dict[str, Any], None]
 
 
 class PostgresService:
@@ -18,7 +21,7 @@ class PostgresService:
         cursor = None
         try:
             conn = get_pg_connection()
-            cursor = conn.cursor(cursor_factory=RealDictCursor)
+            cursor = conn.cursor(cursor_factory=InstrumentedCursor)
             yield cursor
             conn.commit()
         except Exception as e:
@@ -37,6 +40,27 @@ class PostgresService:
             if conn:
                 release_pg_connection(conn)
 
+    def _run_query(self, query: str, params: QueryParams, fetch: Optional[str]) -> Any:
+        with self._get_cursor() as cursor:
+            cursor.execute(query, params)
+            if fetch == "one":
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            if fetch == "all":
+                return [dict(row) for row in cursor.fetchall()]
+            return cursor.rowcount
+
+    async def fetchone(self, query: str, params: QueryParams = None) -> Optional[Dict[str, Any]]:
+        """Run one statement in its own transaction off the event loop and return the first row."""
+        return await run_in_threadpool(self._run_query, query, params, "one")
+
+    async def fetchall(self, query: str, params: QueryParams = None) -> List[Dict[str, Any]]:
+        return await run_in_threadpool(self._run_query, query, params, "all")
+
+    async def execute(self, query: str, params: QueryParams = None) -> int:
+        """Run one statement in its own transaction off the event loop and return the row count."""
+        return await run_in_threadpool(self._run_query, query, params, None)
+
     def get_by_id(self, record_id: str) -> Optional[Dict[str, Any]]:
         with self._get_cursor() as cursor:
             cursor.execute(
@@ -46,6 +70,16 @@ class PostgresService:
             result = cursor.fetchone()
             return dict(result) if result else None
 
+    def get_updated_at(self, record_id: str) -> Optional[Any]:
+        """``updated_at`` of one row, for conditional GET checks before the full fetch."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                f"SELECT updated_at FROM {self.table_name} WHERE id = %s",
+                (record_id,)
+            )
+            result = cursor.fetchone()
+            return result["updated_at"] if result else None
+
     def list(
         self,
         filters: Optional[Dict[str, Any]] = None,
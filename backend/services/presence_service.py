@@ -0,0 +1,94 @@
+"""Online presence of workers.
+
+Heartbeats only touch Redis (``utils.presence``); a member that stops sending them
+drops out after ``PRESENCE_TTL_SECONDS``. Every ``PRESENCE_FLUSH_SECONDS`` the
+transitions since the previous flush are written to ``users.is_online`` /
+``last_online_at`` (used by SQL-side matching), and every
+``PRESENCE_RECONCILE_SECONDS`` the whole flag column is re-aligned with Redis so
+flags lost to a crash or a Redis restart cannot stick.
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from schemas import UserRead
+from utils.config import CFG
+from utils.database import get_redis
+from utils.presence import RedisPresenceStore
+
+from .postgres_base import PostgresService
+
+logger = logging.getLogger(__name__)
+
+
+class PresenceService(PostgresService):
+    def __init__(self) -> None:
+        super().__init__("users")
+
+    def persist(self, joined: List[str], left: List[str]) -> None:
+        if not joined and not left:
+            return
+        with self._get_cursor() as cursor:
+            if joined:
+                cursor.execute(
+                    "UPDATE users SET is_online = true, last_online_at = now() WHERE id = ANY(%s::uuid[])",
+                    (joined,),
+                )
+            if left:
+                cursor.execute(
+                    "UPDATE users SET is_online = false, last_online_at = now() WHERE id = ANY(%s::uuid[])",
+                    (left,),
+                )
+
+    def reconcile(self, online_ids: List[str]) -> None:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                "UPDATE users SET is_online = false WHERE role = 'worker' AND is_online AND NOT (id = ANY(%s::uuid[]))",
+                (online_ids,),
+            )
+            cursor.execute(
+                "UPDATE users SET is_online = true, last_online_at = now() WHERE NOT is_online AND id = ANY(%s::uuid[])",
+                (online_ids,),
+            )
+
+    def load_workers(self, user_ids: List[str]) -> List[UserRead]:
+        """Worker rows for ``user_ids`` in the given order (non-workers and unknown ids dropped)."""
+        if not user_ids:
+            return []
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                "SELECT * FROM users WHERE id = ANY(%s::uuid[]) AND role = 'worker'",
+                (user_ids,),
+            )
+            by_id = {str(row["id"]): dict(row) for row in cursor.fetchall()}
+        return [UserRead(**by_id[user_id]) for user_id in user_ids if user_id in by_id]
+
+    async def flush(self, store, reconcile: bool = False) -> None:
+        joined, left = await store.sweep()
+        await run_in_threadpool(self.persist, joined, left)
+        if reconcile:
+            await run_in_threadpool(self.reconcile, await store.all_online())
+
+
+async def get_presence_store() -> RedisPresenceStore:
+    return RedisPresenceStore(await get_redis(), ttl_seconds=CFG["PRESENCE_TTL_SECONDS"])
+
+
+async def run_presence_flusher(store: Optional[RedisPresenceStore] = None) -> None:
+    interval = float(CFG["PRESENCE_FLUSH_SECONDS"])
+    service = PresenceService()
+    last_reconcile = 0.0
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            store = store or await get_presence_store()
+            due = time.monotonic() - last_reconcile >= CFG["PRESENCE_RECONCILE_SECONDS"]
+            await service.flush(store, reconcile=due)
+            if due:
+                last_reconcile = time.monotonic()
+        except Exception as exc:
+            logger.error(f"Presence flush failed: {exc}")
@@ -1,288 +1,461 @@
-import qrcode
-import io
 import base64
+import hashlib
+import json
+import logging
 import secrets
-from typing import Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
+from typing import Optional, Tuple
+
+from cachetools import LRUCache
+from starlette.concurrency import run_in_threadpool
+
+from utils.config import CFG
+from utils.executors import run_cpu_bound
+from utils.qr_render import render_qr
+from utils.security import create_qr_token, decode_qr_token, is_signed_qr_token
 from .postgres_base import PostgresService
+from .reputation_service import refresh_reputation
+
+logger = logging.getLogger(__name__)
+
+
+# Invalidate the previous unused tokens of the same type and issue a new one in one statement
+ISSUE_TOKEN_SQL = """
+    WITH invalidated AS (
+        UPDATE qr_tokens
+        SET used_at = NOW()
+        WHERE assignment_id = %(assignment_id)s
+        AND token_type = %(token_type)s
+        AND used_at IS NULL
+    )
+    INSERT INTO qr_tokens (assignment_id, company_id, token, token_type, expires_at)
+    VALUES (
+        %(assignment_id)s, %(company_id)s, %(token)s, %(token_type)s,
+        NOW() + make_interval(mins => %(validity_minutes)s)
+    )
+    RETURNING id, token, expires_at
+"""
+
+TOKEN_IMAGE_SQL = """
+    SELECT assignment_id, company_id, token_type, used_at,
+           GREATEST(0, FLOOR(EXTRACT(EPOCH FROM expires_at - NOW())))::int AS ttl_seconds
+    FROM qr_tokens
+    WHERE token = %s
+"""
+
+ASSIGNMENT_SQL = """
+    SELECT a.*, j.company_id, u.full_name as company_name
+    FROM assignments a
+    JOIN jobs j ON a.job_id = j.id
+    JOIN users u ON j.company_id = u.id
+    WHERE a.id = %s
+"""
+
+# Validate and consume the token and start the assignment atomically.
+# `target` is a snapshot used to explain failures; the guarded UPDATEs re-check
+# their conditions on the latest row versions, so concurrent scans of the same
+# token cannot both succeed.
+CHECK_IN_SQL = """
+    WITH target AS (
+        SELECT qt.id AS token_id, qt.used_at, qt.expires_at <= NOW() AS expired,
+               a.worker_id, a.started_at, u.full_name AS company_name
+        FROM qr_tokens qt
+        JOIN assignments a ON qt.assignment_id = a.id
+        JOIN jobs j ON a.job_id = j.id
+        JOIN users u ON j.company_id = u.id
+        WHERE qt.token = %(token)s
+        AND qt.assignment_id = %(assignment_id)s
+        AND qt.token_type = 'check_in'
+    ),
+    consumed AS (
+        UPDATE qr_tokens qt
+        SET used_at = NOW()
+        FROM target t
+        WHERE qt.id = t.token_id
+        AND qt.used_at IS NULL
+        AND qt.expires_at > NOW()
+        AND t.worker_id = %(worker_id)s
+        AND t.started_at IS NULL
+        RETURNING qt.assignment_id
+    ),
+    checked_in AS (
+        UPDATE assignments a
+        SET started_at = NOW(), status = 'active'
+        FROM consumed c
+        WHERE a.id = c.assignment_id
+        AND a.started_at IS NULL
+        RETURNING a.started_at
+    )
+    SELECT t.*, (SELECT started_at FROM checked_in) AS checked_in_at
+    FROM target t
+"""
+
+CHECK_OUT_SQL = """
+    WITH target AS (
+        SELECT qt.id AS token_id, qt.used_at, qt.expires_at <= NOW() AS expired,
+               a.worker_id, a.started_at, a.completed_at,
+               j.hourly_rate, u.full_name AS company_name
+        FROM qr_tokens qt
+        JOIN assignments a ON qt.assignment_id = a.id
+        JOIN jobs j ON a.job_id = j.id
+        JOIN users u ON j.company_id = u.id
+        WHERE qt.token = %(token)s
+        AND qt.assignment_id = %(assignment_id)s
+        AND qt.token_type = 'check_out'
+    ),
+    consumed AS (
+        UPDATE qr_tokens qt
+        SET used_at = NOW()
+        FROM target t
+        WHERE qt.id = t.token_id
+        AND qt.used_at IS NULL
+        AND qt.expires_at > NOW()
+        AND t.worker_id = %(worker_id)s
+        AND t.started_at IS NOT NULL
+        AND t.completed_at IS NULL
+        RETURNING qt.assignment_id
+    ),
+    checked_out AS (
+        UPDATE assignments a
+        SET completed_at = NOW(), status = 'completed'
+        FROM consumed c
+        WHERE a.id = c.assignment_id
+        AND a.started_at IS NOT NULL
+        AND a.completed_at IS NULL
+        RETURNING a.started_at, a.completed_at
+    )
+    SELECT t.*,
+           (SELECT started_at FROM checked_out) AS checked_in_at,
+           (SELECT completed_at FROM checked_out) AS checked_out_at
+    FROM target t
+"""
+# Signed tokens (QR_TOKEN_MODE=signed) carry their own expiry and are never stored
+# at issue time; consuming one records its nonce, whose primary key rejects replays.
+# Expiry and signature are checked before the statement runs.
+SIGNED_CHECK_IN_SQL = """
+    WITH target AS (
+        SELECT qu.used_at, false AS expired,
+               a.worker_id, a.started_at, u.full_name AS company_name
+        FROM assignments a
+        JOIN jobs j ON a.job_id = j.id
+        JOIN users u ON j.company_id = u.id
+        LEFT JOIN qr_token_uses qu ON qu.nonce = %(nonce)s
+        WHERE a.id = %(assignment_id)s
+    ),
+    consumed AS (
+        INSERT INTO qr_token_uses (nonce, assignment_id, token_type, expires_at)
+        SELECT %(nonce)s, %(assignment_id)s::uuid, 'check_in', to_timestamp(%(expires_at)s)
+        FROM target t
+        WHERE t.worker_id = %(worker_id)s
+        AND t.started_at IS NULL
+        ON CONFLICT (nonce) DO NOTHING
+        RETURNING assignment_id
+    ),
+    checked_in AS (
+        UPDATE assignments a
+        SET started_at = NOW(), status = 'active'
+        FROM consumed c
+        WHERE a.id = c.assignment_id
+        AND a.started_at IS NULL
+        RETURNING a.started_at
+    )
+    SELECT t.*, (SELECT started_at FROM checked_in) AS checked_in_at
+    FROM target t
+"""
+
+SIGNED_CHECK_OUT_SQL = """
+    WITH target AS (
+        SELECT qu.used_at, false AS expired,
+               a.worker_id, a.started_at, a.completed_at,
+               j.hourly_rate, u.full_name AS company_name
+        FROM assignments a
+        JOIN jobs j ON a.job_id = j.id
+        JOIN users u ON j.company_id = u.id
+        LEFT JOIN qr_token_uses qu ON qu.nonce = %(nonce)s
+        WHERE a.id = %(assignment_id)s
+    ),
+    consumed AS (
+        INSERT INTO qr_token_uses (nonce, assignment_id, token_type, expires_at)
+        SELECT %(nonce)s, %(assignment_id)s::uuid, 'check_out', to_timestamp(%(expires_at)s)
+        FROM target t
+        WHERE t.worker_id = %(worker_id)s
+        AND t.started_at IS NOT NULL
+        AND t.completed_at IS NULL
+        ON CONFLICT (nonce) DO NOTHING
+        RETURNING assignment_id
+    ),
+    checked_out AS (
+        UPDATE assignments a
+        SET completed_at = NOW(), status = 'completed'
+        FROM consumed c
+        WHERE a.id = c.assignment_id
+        AND a.started_at IS NOT NULL
+        AND a.completed_at IS NULL
+        RETURNING a.started_at, a.completed_at
+    )
+    SELECT t.*,
+           (SELECT started_at FROM checked_out) AS checked_in_at,
+           (SELECT completed_at FROM checked_out) AS checked_out_at
+    FROM target t
+"""
+
+
+# Rendered images keyed by (payload, format, size); a token is usually rendered
+# once at issue time and then fetched again through /qr/image/{token}.
+_image_cache: LRUCache = LRUCache(maxsize=512)
+
+
+class QRTokenGone(ValueError):
+    """The token exists but was already used or has expired."""
+
+
+def _qr_payload(token: str, assignment_id: str, token_type: str) -> str:
+    return json.dumps(
+        {"token": token, "assignment_id": assignment_id, "type": token_type},
+        separators=(",", ":"),
+    )
+
+
+async def render_qr_image(payload: str, fmt: str = "png") -> bytes:
+    """Render a QR image on the CPU pool, reusing recently rendered images."""
+    key = (payload, fmt, CFG["QR_IMAGE_SIZE_PX"])
+    image = _image_cache.get(key)
+    if image is None:
+        image = await run_cpu_bound(render_qr, payload, fmt, CFG["QR_IMAGE_SIZE_PX"])
+        _image_cache[key] = image
+    return image
+
 
 class QRService:
     def __init__(self, db: PostgresService):
         self.db = db
         self.token_validity_minutes = 30  # QR code valid for 30 minutes
-        
-    def _create_payment_for_assignment(self, assignment_id: str, hours_worked: float) -> None:
+        self.signed_tokens = CFG["QR_TOKEN_MODE"] == "signed"
+
+    def _create_payment_for_assignment(
+        self, assignment_id: str, hours_worked: float, hourly_rate: Optional[int]
+    ) -> None:
         """Create payment record for completed assignment based on hours worked"""
         from .payment_service import PaymentService
-        
-        with self.db._get_cursor() as cursor:
-            cursor.execute("""
-                SELECT j.hourly_rate
-                FROM assignments a
-                JOIN jobs j ON a.job_id = j.id
-                WHERE a.id = %s
-            """, (assignment_id,))
-            result = cursor.fetchone()
-            
-            if result and result['hourly_rate']:
-                hourly_rate = result['hourly_rate']
-                amount = int(hours_worked * hourly_rate)
-                
-                payment_service = PaymentService()
-                payment_service.create_internal_payment(assignment_id, amount)
-    
+
+        if hourly_rate:
+            amount = int(hours_worked * hourly_rate)
+            payment_service = PaymentService()
+            payment_service.create_internal_payment(assignment_id, amount)
+
     async def generate_qr_token(
-        self, 
-        assignment_id: str, 
-        company_id: str, 
-        token_type: str
+        self,
+        assignment_id: str,
+        company_id: str,
+        token_type: str,
+        inline: bool = True,
     ) -> dict:
-        """Generate a time-limited, single-use QR token for an assignment"""
-        # Generate a secure random token
-        token = secrets.token_urlsafe(32)
-        expires_at = datetime.utcnow() + timedelta(minutes=self.token_validity_minutes)
-        
-        # Store token in database
-        query = """
-            INSERT INTO qr_tokens (assignment_id, company_id, token, token_type, expires_at)
-            VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, token, expires_at
+        """Generate a time-limited, single-use QR token for an assignment.
+
+        The image is served from ``qr_code_url``; ``inline`` also embeds it as a data URI.
         """
-        result = await self.db.fetchone(
-            query, 
-            (assignment_id, company_id, token, token_type, expires_at)
-        )
-        
-        # Generate QR code image with JSON data
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        import json
-        qr_data = {
-            'token': token,
-            'assignment_id': assignment_id,
-            'type': token_type
-        }
-        qr.add_data(json.dumps(qr_data))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        
-        return {
+        if self.signed_tokens:
+            # Stateless: nothing is written until the token is consumed
+            token, expires_ts = create_qr_token(
+                assignment_id, token_type, self.token_validity_minutes * 60
+            )
+            expires_at = datetime.fromtimestamp(expires_ts, timezone.utc)
+        else:
+            # Generate a secure random token
+            token = secrets.token_urlsafe(32)
+
+            # Store token in database, replacing the previous unused one
+            result = await self.db.fetchone(
+                ISSUE_TOKEN_SQL,
+                {
+                    "assignment_id": assignment_id,
+                    "company_id": company_id,
+                    "token": token,
+                    "token_type": token_type,
+                    "validity_minutes": self.token_validity_minutes,
+                },
+            )
+            expires_at = result['expires_at']
+
+        token_data = {
             'token': token,
-            'qr_code_image': f'data:image/png;base64,{img_str}',
+            'qr_code_url': f'/qr/image/{token}',
             'expires_at': expires_at.isoformat(),
             'assignment_id': assignment_id,
             'token_type': token_type
         }
-    
-    async def get_check_in_qr(self, assignment_id: str) -> dict:
-        """Generate check-in QR code for an assignment"""
-        # Verify assignment exists and get company
-        query = """
-            SELECT a.*, j.company_id, u.full_name as company_name
-            FROM assignments a
-            JOIN jobs j ON a.job_id = j.id
-            JOIN users u ON j.company_id = u.id
-            WHERE a.id = %s
-        """
-        assignment = await self.db.fetchone(query, (assignment_id,))
-        
-        if not assignment:
-            raise ValueError("Assignment not found")
-        
+
+        if inline:
+            png = await render_qr_image(_qr_payload(token, assignment_id, token_type))
+            token_data['qr_code_image'] = f'data:image/png;base64,{base64.b64encode(png).decode()}'
+
+        return token_data
+
+    async def get_qr_image(self, token: str, company_id: str, fmt: str = "png") -> Tuple[bytes, int]:
+        """Return the rendered QR image of a live token and its remaining lifetime in seconds"""
+        if is_signed_qr_token(token):
+            return await self._get_signed_qr_image(token, company_id, fmt)
+
+        row = await self.db.fetchone(TOKEN_IMAGE_SQL, (token,))
+        if not row or str(row['company_id']) != company_id:
+            raise PermissionError("QR code not found or does not belong to your company")
+        if row['used_at'] is not None or row['ttl_seconds'] <= 0:
+            raise QRTokenGone("QR code has been used or has expired")
+
+        payload = _qr_payload(token, str(row['assignment_id']), row['token_type'])
+        return await render_qr_image(payload, fmt), row['ttl_seconds']
+
+    async def _get_signed_qr_image(self, token: str, company_id: str, fmt: str) -> Tuple[bytes, int]:
+        try:
+            claims = decode_qr_token(token, verify_expiry=False)
+        except ValueError:
+            raise PermissionError("QR code not found or does not belong to your company")
+        assignment = await self._get_company_assignment(claims['a'], company_id)
+        # A consumed token moved the assignment on, so it no longer applies
+        done_column = 'started_at' if claims['t'] == 'check_in' else 'completed_at'
+        ttl_seconds = int(claims['e'] - datetime.now(timezone.utc).timestamp())
+        if assignment[done_column] is not None or ttl_seconds <= 0:
+            raise QRTokenGone("QR code has been used or has expired")
+
+        payload = _qr_payload(token, claims['a'], claims['t'])
+        return await render_qr_image(payload, fmt), ttl_seconds
+
+    @staticmethod
+    def image_etag(token: str, fmt: str) -> str:
+        digest = hashlib.sha256(f"{token}:{fmt}:{CFG['QR_IMAGE_SIZE_PX']}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+    async def _get_company_assignment(self, assignment_id: str, company_id: str) -> dict:
+        assignment = await self.db.fetchone(ASSIGNMENT_SQL, (assignment_id,))
+        if not assignment or str(assignment['company_id']) != company_id:
+            raise PermissionError("Assignment not found or does not belong to your company")
+        return assignment
+
+    async def get_check_in_qr(self, assignment_id: str, company_id: str, inline: bool = True) -> dict:
+        """Generate check-in QR code for an assignment owned by the company"""
+        assignment = await self._get_company_assignment(assignment_id, company_id)
+
         if assignment['started_at'] is not None:
             raise ValueError("Assignment already started")
-        
-        # Invalidate any existing unused check-in tokens for this assignment
-        await self.db.execute(
-            """
-            UPDATE qr_tokens 
-            SET used_at = NOW() 
-            WHERE assignment_id = %s 
-            AND token_type = 'check_in' 
-            AND used_at IS NULL
-            """,
-            (assignment_id,)
-        )
-        
-        # Generate new token
+
         token_data = await self.generate_qr_token(
             assignment_id,
-            assignment['company_id'],
-            'check_in'
+            company_id,
+            'check_in',
+            inline=inline,
         )
-        
+
         token_data['company_name'] = assignment['company_name']
         return token_data
-    
-    async def get_check_out_qr(self, assignment_id: str) -> dict:
-        """Generate check-out QR code for an assignment"""
-        # Verify assignment exists and is checked in
-        query = """
-            SELECT a.*, j.company_id, u.full_name as company_name
-            FROM assignments a
-            JOIN jobs j ON a.job_id = j.id
-            JOIN users u ON j.company_id = u.id
-            WHERE a.id = %s
-        """
-        assignment = await self.db.fetchone(query, (assignment_id,))
-        
-        if not assignment:
-            raise ValueError("Assignment not found")
-        
+
+    async def get_check_out_qr(self, assignment_id: str, company_id: str, inline: bool = True) -> dict:
+        """Generate check-out QR code for an assignment owned by the company"""
+        assignment = await self._get_company_assignment(assignment_id, company_id)
+
         if assignment['started_at'] is None:
             raise ValueError("Assignment not checked in yet")
-        
+
         if assignment['completed_at'] is not None:
             raise ValueError("Assignment already completed")
-        
-        # Invalidate any existing unused check-out tokens for this assignment
-        await self.db.execute(
-            """
-            UPDATE qr_tokens 
-            SET used_at = NOW() 
-            WHERE assignment_id = %s 
-            AND token_type = 'check_out' 
-            AND used_at IS NULL
-            """,
-            (assignment_id,)
-        )
-        
-        # Generate new token
+
         token_data = await self.generate_qr_token(
             assignment_id,
-            assignment['company_id'],
-            'check_out'
+            company_id,
+            'check_out',
+            inline=inline,
         )
-        
+
         token_data['company_name'] = assignment['company_name']
         return token_data
-    
-    async def check_in(self, worker_id: str, token: str, assignment_id: str) -> dict:
-        """Worker checks in using time-limited QR token"""
-        # Verify token exists, is valid, and unused
-        token_query = """
-            SELECT qt.*, a.worker_id, a.started_at, j.company_id, u.full_name as company_name
-            FROM qr_tokens qt
-            JOIN assignments a ON qt.assignment_id = a.id
-            JOIN jobs j ON a.job_id = j.id
-            JOIN users u ON j.company_id = u.id
-            WHERE qt.token = %s 
-            AND qt.assignment_id = %s
-            AND qt.token_type = 'check_in'
-        """
-        token_data = await self.db.fetchone(token_query, (token, assignment_id))
-        
+
+    @staticmethod
+    def _raise_token_error(token_data: Optional[dict], worker_id: str) -> None:
         if not token_data:
             raise ValueError("Invalid QR code or assignment")
-        
-        # Verify worker
-        if token_data['worker_id'] != worker_id:
+        if str(token_data['worker_id']) != worker_id:
             raise ValueError("This assignment is not assigned to you")
-        
-        # Check if already used
         if token_data['used_at'] is not None:
             raise ValueError("QR code has already been used")
-        
-        # Check if expired
-        if datetime.utcnow() > token_data['expires_at']:
+        if token_data['expired']:
             raise ValueError("QR code has expired. Please request a new one.")
-        
-        # Check if already checked in
-        if token_data['started_at'] is not None:
-            raise ValueError("Already checked in")
-        
-        # Mark token as used
-        await self.db.execute(
-            "UPDATE qr_tokens SET used_at = NOW() WHERE id = %s",
-            (token_data['id'],)
-        )
-        
-        # Update assignment with check-in time
-        update_query = """
-            UPDATE assignments 
-            SET started_at = NOW(), status = 'active' 
-            WHERE id = %s
-            RETURNING *
-        """
-        updated = await self.db.fetchone(update_query, (assignment_id,))
-        
+
+    @staticmethod
+    def _signed_params(token: str, assignment_id: str, token_type: str, worker_id: str) -> dict:
+        claims = decode_qr_token(token)
+        if claims['a'] != assignment_id or claims['t'] != token_type:
+            raise ValueError("Invalid QR code or assignment")
+        return {
+            "nonce": claims['n'],
+            "expires_at": claims['e'],
+            "assignment_id": assignment_id,
+            "worker_id": worker_id,
+        }
+
+    async def check_in(self, worker_id: str, token: str, assignment_id: str) -> dict:
+        """Worker checks in using time-limited QR token (single atomic statement)"""
+        if is_signed_qr_token(token):
+            token_data = await self.db.fetchone(
+                SIGNED_CHECK_IN_SQL,
+                self._signed_params(token, assignment_id, 'check_in', worker_id),
+            )
+        else:
+            token_data = await self.db.fetchone(
+                CHECK_IN_SQL,
+                {"token": token, "assignment_id": assignment_id, "worker_id": worker_id},
+            )
+
+        if not token_data or token_data['checked_in_at'] is None:
+            self._raise_token_error(token_data, worker_id)
+            if token_data['started_at'] is not None:
+                raise ValueError("Already checked in")
+            # Lost a race against a concurrent scan
+            raise ValueError("QR code has already been used")
+
         return {
             'success': True,
             'assignment_id': assignment_id,
-            'checked_in_at': updated['started_at'].isoformat(),
+            'checked_in_at': token_data['checked_in_at'].isoformat(),
             'company_name': token_data['company_name']
         }
-    
+
     async def check_out(self, worker_id: str, token: str, assignment_id: str) -> dict:
-        """Worker checks out using time-limited QR token"""
-        # Verify token exists, is valid, and unused
-        token_query = """
-            SELECT qt.*, a.worker_id, a.started_at, a.completed_at, 
-                   j.company_id, u.full_name as company_name
-            FROM qr_tokens qt
-            JOIN assignments a ON qt.assignment_id = a.id
-            JOIN jobs j ON a.job_id = j.id
-            JOIN users u ON j.company_id = u.id
-            WHERE qt.token = %s 
-            AND qt.assignment_id = %s
-            AND qt.token_type = 'check_out'
-        """
-        token_data = await self.db.fetchone(token_query, (token, assignment_id))
-        
-        if not token_data:
-            raise ValueError("Invalid QR code or assignment")
-        
-        # Verify worker
-        if token_data['worker_id'] != worker_id:
-            raise ValueError("This assignment is not assigned to you")
-        
-        # Check if already used
-        if token_data['used_at'] is not None:
+        """Worker checks out using time-limited QR token (single atomic statement)"""
+        if is_signed_qr_token(token):
+            token_data = await self.db.fetchone(
+                SIGNED_CHECK_OUT_SQL,
+                self._signed_params(token, assignment_id, 'check_out', worker_id),
+            )
+        else:
+            token_data = await self.db.fetchone(
+                CHECK_OUT_SQL,
+                {"token": token, "assignment_id": assignment_id, "worker_id": worker_id},
+            )
+
+        if not token_data or token_data['checked_out_at'] is None:
+            self._raise_token_error(token_data, worker_id)
+            if token_data['started_at'] is None:
+                raise ValueError("Not checked in yet")
+            if token_data['completed_at'] is not None:
+                raise ValueError("Already checked out")
             raise ValueError("QR code has already been used")
-        
-        # Check if expired
-        if datetime.utcnow() > token_data['expires_at']:
-            raise ValueError("QR code has expired. Please request a new one.")
-        
-        # Check if checked in
-        if token_data['started_at'] is None:
-            raise ValueError("Not checked in yet")
-        
-        # Check if already checked out
-        if token_data['completed_at'] is not None:
-            raise ValueError("Already checked out")
-        
-        # Mark token as used
-        await self.db.execute(
-            "UPDATE qr_tokens SET used_at = NOW() WHERE id = %s",
-            (token_data['id'],)
-        )
-        
-        # Update assignment with check-out time
-        update_query = """
-            UPDATE assignments 
-            SET completed_at = NOW(), status = 'completed' 
-            WHERE id = %s
-            RETURNING *
-        """
-        updated = await self.db.fetchone(update_query, (assignment_id,))
-        
+
         # Calculate hours worked
-        started_at = updated['started_at']
-        completed_at = updated['completed_at']
+        started_at = token_data['checked_in_at']
+        completed_at = token_data['checked_out_at']
         hours_worked = (completed_at - started_at).total_seconds() / 3600
-        
+
         # Automatically create payment for completed assignment
         try:
-            self._create_payment_for_assignment(assignment_id, hours_worked)
+            await run_in_threadpool(
+                self._create_payment_for_assignment,
+                assignment_id,
+                hours_worked,
+                token_data['hourly_rate'],
+            )
         except Exception as e:
-            print(f"Failed to create payment for assignment {assignment_id}: {str(e)}")
-        
+            logger.error(f"Failed to create payment for assignment {assignment_id}: {str(e)}")
+        await run_in_threadpool(refresh_reputation, worker_id)
+
         return {
             'success': True,
             'assignment_id': assignment_id,
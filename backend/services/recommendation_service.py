@@ -0,0 +1,120 @@
+"""Personalized "for you" job feed.
+
+Ranked job ids come from ``services.job_index`` and are cached per worker; pages are
+sliced from the cache. A cached feed is rebuilt when the index is reloaded (every
+``RECOMMENDATION_RELOAD_SECONDS``, which also picks up changes made by other
+processes) or when a job is published into the worker's segment.
+"""
+
+import logging
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+from fastapi import HTTPException, status
+
+from schemas import JobList, UserRead
+from utils.config import CFG
+
+from .job_index import RECOMMENDATION_INDEX, JobIndex, WorkerProfile, tag_list
+from .job_service import JobService
+from .postgres_base import PostgresService
+
+logger = logging.getLogger(__name__)
+
+# worker id -> (index generation, segment, segment version, ranked job ids)
+_feed_cache: TTLCache = TTLCache(maxsize=10_000, ttl=CFG["RECOMMENDATION_CACHE_SECONDS"])
+_feed_lock = Lock()
+
+
+class RecommendationService(PostgresService):
+    def __init__(self, index: JobIndex = RECOMMENDATION_INDEX, job_service: Optional[JobService] = None) -> None:
+        super().__init__("jobs")
+        self.index = index
+        self.jobs = job_service or JobService()
+
+    def _ensure_index(self) -> None:
+        age = time.monotonic() - self.index.loaded_at
+        if self.index.generation and age < CFG["RECOMMENDATION_RELOAD_SECONDS"]:
+            return
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id, company_id, prefecture, latitude, longitude, hourly_rate, tags, is_urgent, created_at
+                FROM jobs WHERE status = 'published'
+                """
+            )
+            self.index.load(cursor.fetchall())
+
+    def _profile(self, user: UserRead) -> WorkerProfile:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT j.id::text AS job_id, j.company_id::text AS company_id, j.tags, h.applied
+                FROM (
+                    SELECT job_id, bool_or(applied) AS applied
+                    FROM (
+                        SELECT job_id, true AS applied FROM applications WHERE worker_id = %s
+                        UNION ALL
+                        SELECT job_id, false FROM worker_favorites WHERE user_id = %s::uuid
+                    ) AS history
+                    GROUP BY job_id
+                    LIMIT 500
+                ) AS h
+                JOIN jobs j ON j.id = h.job_id
+                """,
+                (user.id, user.id),
+            )
+            rows = cursor.fetchall()
+        return WorkerProfile(
+            latitude=user.latitude,
+            longitude=user.longitude,
+            prefecture=user.preferred_prefecture,
+            qualifications=user.qualifications or [],
+            applied={row["job_id"] for row in rows if row["applied"]},
+            history=[(tag_list(row["tags"]), row["company_id"]) for row in rows],
+        )
+
+    def _ranked_ids(self, user: UserRead) -> List[str]:
+        with _feed_lock:
+            cached = _feed_cache.get(user.id)
+        if cached is not None:
+            generation, segment, version, ids = cached
+            if generation == self.index.generation and self.index.candidates(segment)[1] == version:
+                return ids
+        profile = self._profile(user)
+        segment = profile.segment
+        version = self.index.candidates(segment)[1]
+        ids = self.index.rank(profile)
+        with _feed_lock:
+            _feed_cache[user.id] = (self.index.generation, segment, version, ids)
+        return ids
+
+    def feed(self, user: UserRead, page: int = 1, size: int = 20) -> JobList:
+        try:
+            self._ensure_index()
+            ids = [job_id for job_id in self._ranked_ids(user) if self.index.is_active(job_id)]
+            page_ids = ids[(page - 1) * size: page * size]
+            rows: List[Dict] = []
+            if page_ids:
+                with self._get_cursor() as cursor:
+                    cursor.execute(
+                        "SELECT * FROM jobs WHERE id = ANY(%s::uuid[]) AND status = 'published'", (page_ids,)
+                    )
+                    by_id = {str(row["id"]): dict(row) for row in cursor.fetchall()}
+                rows = [by_id[job_id] for job_id in page_ids if job_id in by_id]
+                # Closed or archived by another process since the last reload.
+                for job_id in page_ids:
+                    if job_id not in by_id:
+                        self.index.remove(job_id)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error building recommendations: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to load recommendations"
+            )
+        items = self.jobs._enrich_jobs_with_company(rows)
+        return JobList(items=items, total=len(ids), page=page, size=size)
@@ -0,0 +1,175 @@
+"""Maintained per-user reputation aggregates (``worker_reputation``).
+
+Writers call ``refresh_reputation`` for the users an event touched; the row is
+recomputed from reviews, assignments and penalties for those users only, so a
+repeated or out-of-order event cannot double count. Reads are one primary-key lookup.
+No-shows and penalty expiry change with time rather than with a write, so
+``run_reputation_refresher`` re-checks every ``REPUTATION_REFRESH_SECONDS`` the users
+whose shifts ended or whose penalties expired since its previous pass.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from schemas import WorkerReputation
+from utils.config import CFG
+
+from .postgres_base import PostgresService
+
+logger = logging.getLogger(__name__)
+
+FIRST_UUID = "00000000-0000-0000-0000-000000000000"
+
+REFRESH_SQL = """
+    WITH targets AS (
+        SELECT id AS user_id FROM users WHERE id = ANY(%(user_ids)s::uuid[])
+    ),
+    ratings AS (
+        SELECT reviewee_id AS user_id, ROUND(AVG(rating), 2) AS rating_average, COUNT(*) AS review_count
+        FROM reviews
+        WHERE reviewee_id IN (SELECT user_id FROM targets)
+        GROUP BY reviewee_id
+    ),
+    work AS (
+        SELECT s.worker_id AS user_id,
+               COUNT(*) FILTER (WHERE s.status IN ('completed', 'delivered')) AS completed_assignments,
+               COUNT(*) FILTER (WHERE s.status = 'cancelled') AS cancelled_assignments,
+               COUNT(*) FILTER (
+                   WHERE s.started_at IS NULL AND s.status <> 'cancelled'
+                   AND COALESCE(j.ends_at, j.starts_at) < now()
+               ) AS no_show_count
+        FROM assignments s
+        JOIN jobs j ON j.id = s.job_id
+        WHERE s.worker_id IN (SELECT user_id FROM targets)
+        GROUP BY s.worker_id
+    ),
+    active_penalties AS (
+        SELECT user_id, SUM(penalty_points) AS penalty_points
+        FROM penalties
+        WHERE user_id IN (SELECT user_id FROM targets)
+          AND is_active AND (expires_at IS NULL OR expires_at > now())
+        GROUP BY user_id
+    )
+    INSERT INTO worker_reputation (
+        user_id, rating_average, review_count, completed_assignments,
+        cancelled_assignments, no_show_count, penalty_points, updated_at
+    )
+    SELECT t.user_id, r.rating_average, COALESCE(r.review_count, 0),
+           COALESCE(w.completed_assignments, 0), COALESCE(w.cancelled_assignments, 0),
+           COALESCE(w.no_show_count, 0), COALESCE(p.penalty_points, 0), now()
+    FROM targets t
+    LEFT JOIN ratings r ON r.user_id = t.user_id
+    LEFT JOIN work w ON w.user_id = t.user_id
+    LEFT JOIN active_penalties p ON p.user_id = t.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        rating_average = excluded.rating_average,
+        review_count = excluded.review_count,
+        completed_assignments = excluded.completed_assignments,
+        cancelled_assignments = excluded.cancelled_assignments,
+        no_show_count = excluded.no_show_count,
+        penalty_points = excluded.penalty_points,
+        updated_at = excluded.updated_at
+"""
+
+
+# Users whose no-show count or active penalty points changed by the clock alone.
+DUE_SQL = """
+    SELECT s.worker_id::text AS user_id
+    FROM assignments s
+    JOIN jobs j ON j.id = s.job_id
+    WHERE s.started_at IS NULL AND s.status <> 'cancelled'
+      AND COALESCE(j.ends_at, j.starts_at) > %(since)s
+      AND COALESCE(j.ends_at, j.starts_at) <= %(until)s
+    UNION
+    SELECT user_id::text
+    FROM penalties
+    WHERE is_active AND expires_at > %(since)s AND expires_at <= %(until)s
+"""
+
+
+class ReputationService(PostgresService):
+    def __init__(self) -> None:
+        super().__init__("worker_reputation")
+
+    def refresh(self, user_ids: Iterable[str]) -> int:
+        ids = sorted({str(user_id) for user_id in user_ids if user_id})
+        if not ids:
+            return 0
+        with self._get_cursor() as cursor:
+            cursor.execute(REFRESH_SQL, {"user_ids": ids})
+            return cursor.rowcount
+
+    def refresh_due(self, since: datetime, until: datetime) -> int:
+        """Refresh users with a shift that ended or a penalty that expired in ``(since, until]``."""
+        with self._get_cursor() as cursor:
+            cursor.execute(DUE_SQL, {"since": since, "until": until})
+            ids = [row["user_id"] for row in cursor.fetchall()]
+        return self.refresh(ids)
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """Recompute every user's row, ``batch_size`` users per transaction."""
+        total = 0
+        last_id = FIRST_UUID
+        while True:
+            with self._get_cursor() as cursor:
+                cursor.execute(
+                    "SELECT id::text AS id FROM users WHERE id > %s::uuid ORDER BY id LIMIT %s",
+                    (last_id, batch_size),
+                )
+                ids: List[str] = [row["id"] for row in cursor.fetchall()]
+            if not ids:
+                return total
+            total += self.refresh(ids)
+            last_id = ids[-1]
+
+    def is_applicant_of(self, company_id: str, worker_id: str) -> bool:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM applications a JOIN jobs j ON j.id = a.job_id
+                    WHERE a.worker_id = %s AND j.company_id = %s
+                ) AS applied
+                """,
+                (worker_id, company_id),
+            )
+            return bool(cursor.fetchone()["applied"])
+
+    def get_reputation(self, user_id: str) -> WorkerReputation:
+        with self._get_cursor() as cursor:
+            cursor.execute("SELECT * FROM worker_reputation WHERE user_id = %s", (user_id,))
+            row = cursor.fetchone()
+        if not row:
+            return WorkerReputation(user_id=user_id)
+        data = dict(row)
+        data["user_id"] = str(data["user_id"])
+        if data.get("rating_average") is not None:
+            data["rating_average"] = float(data["rating_average"])
+        return WorkerReputation(**data)
+
+
+def refresh_reputation(*user_ids: Optional[str]) -> None:
+    """Best-effort refresh after a write; a failure is logged and left to the next rebuild."""
+    try:
+        ReputationService().refresh(user_id for user_id in user_ids if user_id)
+    except Exception as e:
+        logger.warning(f"Failed to refresh reputation for {user_ids}: {e}")
+
+
+async def run_reputation_refresher() -> None:
+    interval = float(CFG["REPUTATION_REFRESH_SECONDS"])
+    service = ReputationService()
+    # Refresh is idempotent, so the first pass looks back a day to cover downtime.
+    since = datetime.now(timezone.utc) - timedelta(days=1)
+    while True:
+        until = datetime.now(timezone.utc)
+        try:
+            await run_in_threadpool(service.refresh_due, since, until)
+            since = until
+        except Exception as exc:
+            logger.error(f"Reputation refresh failed: {exc}")
+        await asyncio.sleep(interval)
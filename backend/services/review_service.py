@@ -7,6 +7,7 @@ from schemas import ReviewCreate, ReviewList, ReviewRead, ReviewUpdate
 from .assignment_service import AssignmentService
 from .postgres_base import PostgresService
 from .job_service import JobService
+from .reputation_service import refresh_reputation
 
 
 class ReviewService(PostgresService):
@@ -33,6 +34,7 @@ class ReviewService(PostgresService):
         record["reviewer_id"] = reviewer_id
         record["reviewee_id"] = company_id if reviewer_id == worker_id else worker_id
         created = self.insert(record)
+        refresh_reputation(record["reviewee_id"])
         return self._to_review(created)
 
     def update_review(self, review_id: str, payload: ReviewUpdate, reviewer_id: str) -> ReviewRead:
@@ -40,6 +42,7 @@ class ReviewService(PostgresService):
         if review.reviewer_id != reviewer_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Cannot edit others' review")
         updated = self.update(review_id, payload.dict(exclude_unset=True))
+        refresh_reputation(review.reviewee_id)
         return self._to_review(updated)
 
     def list_reviews(
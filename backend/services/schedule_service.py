@@ -0,0 +1,90 @@
+"""Shift conflict detection.
+
+Each assignment carries its job's ``shift_range`` (kept by triggers, see db/schema.sql)
+and an exclusion constraint over ``(worker_id, shift_range)`` rejects two open
+assignments of one worker whose shifts overlap. The constraint's GiST index is the
+interval index behind every lookup here: one probe per worker, O(log n) in the
+worker's assignments.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from psycopg2 import errorcodes
+
+from schemas import JobRead, ShiftCheckResult, ShiftConflict, WorkerAvailability
+
+from .postgres_base import PostgresService
+
+MIN_SHIFT = timedelta(minutes=1)
+
+# Must match the WHERE clause of the assignments_no_overlapping_shifts constraint.
+OPEN_ASSIGNMENT = "s.status NOT IN ('completed', 'cancelled', 'delivered')"
+
+CONFLICTS_SQL = f"""
+    SELECT s.worker_id::text AS worker_id, s.id::text AS assignment_id, s.job_id::text AS job_id,
+           j.title AS job_title, lower(s.shift_range) AS starts_at, upper(s.shift_range) AS ends_at
+    FROM assignments s
+    JOIN jobs j ON j.id = s.job_id
+    WHERE s.worker_id = ANY(%s::uuid[]) AND {OPEN_ASSIGNMENT}
+      AND s.shift_range && tstzrange(%s, %s)
+    ORDER BY s.worker_id, lower(s.shift_range)
+"""
+
+
+def shift_window(starts_at: Optional[datetime], ends_at: Optional[datetime]) -> Optional[Tuple[datetime, datetime]]:
+    """Half-open shift interval, same rule as ``public.job_shift_range``; None when unscheduled."""
+    if starts_at is None:
+        return None
+    return starts_at, max(ends_at or starts_at, starts_at + MIN_SHIFT)
+
+
+def is_shift_overlap(exc: Exception) -> bool:
+    return getattr(exc, "pgcode", None) == errorcodes.EXCLUSION_VIOLATION
+
+
+class ScheduleService(PostgresService):
+    def __init__(self) -> None:
+        super().__init__("assignments")
+
+    def find_conflicts(
+        self, worker_ids: Iterable[str], starts_at: datetime, ends_at: datetime
+    ) -> Dict[str, List[ShiftConflict]]:
+        ids = sorted({str(worker_id) for worker_id in worker_ids})
+        if not ids:
+            return {}
+        with self._get_cursor() as cursor:
+            cursor.execute(CONFLICTS_SQL, (ids, starts_at, ends_at))
+            rows = cursor.fetchall()
+        conflicts: Dict[str, List[ShiftConflict]] = {}
+        for row in rows:
+            data = dict(row)
+            conflicts.setdefault(data.pop("worker_id"), []).append(ShiftConflict(**data))
+        return conflicts
+
+    def check_shift(self, job: JobRead, worker_ids: List[str]) -> ShiftCheckResult:
+        """Availability of each candidate for ``job``'s shift, in request order."""
+        window = shift_window(job.starts_at, job.ends_at)
+        conflicts = self.find_conflicts(worker_ids, *window) if window else {}
+        items = [
+            WorkerAvailability(
+                worker_id=worker_id,
+                available=worker_id not in conflicts,
+                conflicts=conflicts.get(worker_id, []),
+            )
+            for worker_id in dict.fromkeys(worker_ids)
+        ]
+        starts_at, ends_at = window or (None, None)
+        return ShiftCheckResult(job_id=job.id, starts_at=starts_at, ends_at=ends_at, items=items)
+
+    def ensure_available(self, worker_id: str, job: JobRead) -> None:
+        window = shift_window(job.starts_at, job.ends_at)
+        if not window:
+            return
+        conflicts = self.find_conflicts([worker_id], *window).get(str(worker_id))
+        if conflicts:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Shift overlaps another assignment ({conflicts[0].job_title or conflicts[0].job_id})",
+            )
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from utils.config import CFG
+
+from .postgres_base import PostgresService
+
+UPLOAD_DIR = Path("uploads")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Identity documents and other personal uploads: never kept by shared or browser caches
+PRIVATE_PREFIX = "private/"
+PRIVATE_CACHE_CONTROL = "private, no-store"
+
+EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/webp": "webp",
+    "application/pdf": "pdf",
+}
+
+# [private/]<2 hex>/<2 hex>/<sha256>.<ext>
+KEY_PATTERN = re.compile(r"((?:private/)?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.[a-z0-9]+)$")
+
+
+def content_key(digest: str, content_type: str, private: bool = False) -> str:
+    key = f"{digest[:2]}/{digest[2:4]}/{digest}.{EXTENSIONS[content_type]}"
+    return PRIVATE_PREFIX + key if private else key
+
+
+def cache_control(key: str) -> str:
+    return PRIVATE_CACHE_CONTROL if key.startswith(PRIVATE_PREFIX) else IMMUTABLE_CACHE_CONTROL
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LocalStorageBackend:
+    """Stores objects under the upload directory, served by the /uploads mount."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def put(self, key: str, source: Path, content_type: str) -> None:
+        target = self.root / key
+        if target.exists():
+            # Identical content is already stored
+            source.unlink(missing_ok=True)
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source, target)
+
+    def delete(self, key: str) -> None:
+        (self.root / key).unlink(missing_ok=True)
+
+    def url(self, key: str) -> str:
+        domain = os.getenv('REPLIT_DEV_DOMAIN', 'localhost:8008')
+        if 'localhost' in domain:
+            base_url = f"http://{domain}"
+        else:
+            base_url = f"https://{domain}"
+        return f"{base_url}/uploads/{key}"
+
+
+class S3StorageBackend:
+    """S3-compatible object storage (AWS S3, MinIO, Cloudflare R2, ...)."""
+
+    def __init__(
+        self, bucket: str, endpoint_url: Optional[str] = None, public_url: Optional[str] = None, client=None
+    ) -> None:
+        if client is None:
+            try:
+                import boto3
+            except ImportError as exc:
+                raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package") from exc
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=CFG["STORAGE_S3_REGION"])
+
+        self.bucket = bucket
+        self.client = client
+        base = public_url or f"{(endpoint_url or 'https://s3.amazonaws.com').rstrip('/')}/{bucket}"
+        self.public_url = base.rstrip("/")
+
+    def put(self, key: str, source: Path, content_type: str) -> None:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+            source.unlink(missing_ok=True)
+            return
+        except Exception as exc:
+            # botocore's ClientError; matched by shape so an injected client works too
+            code = (getattr(exc, "response", None) or {}).get("Error", {}).get("Code")
+            if code not in ("404", "NoSuchKey", "NotFound"):
+                raise
+        try:
+            self.client.upload_file(
+                str(source),
+                self.bucket,
+                key,
+                ExtraArgs={"ContentType": content_type, "CacheControl": cache_control(key)},
+            )
+        finally:
+            source.unlink(missing_ok=True)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def url(self, key: str) -> str:
+        return f"{self.public_url}/{key}"
+
+
+@lru_cache()
+def get_storage_backend():
+    if CFG["STORAGE_BACKEND"] == "s3":
+        return S3StorageBackend(
+            CFG["STORAGE_S3_BUCKET"],
+            endpoint_url=CFG["STORAGE_S3_ENDPOINT_URL"],
+            public_url=CFG["STORAGE_PUBLIC_URL"],
+        )
+    return LocalStorageBackend(UPLOAD_DIR)
+
+
+class StorageService(PostgresService):
+    """Content-addressed file storage with reference counts in ``stored_files``.
+
+    Identical content is stored once. A file whose ref_count drops to zero is
+    removed by ``scripts.gc_stored_files`` after a grace period.
+    """
+
+    def __init__(self, backend=None) -> None:
+        super().__init__("stored_files")
+        self.backend = backend or get_storage_backend()
+
+    def _store(self, source: Path, content_type: str, digest: Optional[str], private: bool = False) -> str:
+        digest = digest or file_sha256(source)
+        key = content_key(digest, content_type, private)
+        size = source.stat().st_size
+        # Take the reference before the object exists so a concurrent GC run, which
+        # locks the row while deleting, can never remove a file that is being reused.
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO stored_files (key, sha256, size, content_type, ref_count)
+                VALUES (%s, %s, %s, %s, 1)
+                ON CONFLICT (key) DO UPDATE
+                SET ref_count = stored_files.ref_count + 1, released_at = NULL
+                """,
+                (key, digest, size, content_type),
+            )
+        try:
+            self.backend.put(key, source, content_type)
+        except Exception:
+            self._release([key])
+            raise
+        return key
+
+    async def store(
+        self, source: Path, content_type: str, digest: Optional[str] = None, private: bool = False
+    ) -> str:
+        """Move ``source`` into storage and return its URL; ``private`` files are served uncacheable."""
+        key = await run_in_threadpool(self._store, source, content_type, digest, private)
+        return self.backend.url(key)
+
+    def _release(self, keys: List[str]) -> None:
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE stored_files
+                SET ref_count = GREATEST(ref_count - 1, 0),
+                    released_at = CASE WHEN ref_count <= 1 THEN NOW() ELSE released_at END
+                WHERE key = ANY(%s)
+                """,
+                (keys,),
+            )
+
+    async def release(self, urls: List[Optional[str]]) -> None:
+        """Drop one reference for each distinct stored file URL; other URLs are ignored."""
+        keys = [match.group(1) for url in urls if url and (match := KEY_PATTERN.search(url))]
+        if keys:
+            await run_in_threadpool(self._release, keys)
+
+    def collect_garbage(self, grace_hours: int, limit: int = 500) -> int:
+        """Delete unreferenced files released more than ``grace_hours`` ago."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT key FROM stored_files
+                WHERE ref_count = 0
+                AND released_at < NOW() - make_interval(hours => %s)
+                ORDER BY released_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (grace_hours, limit),
+            )
+            keys = [row["key"] for row in cursor.fetchall()]
+            for key in keys:
+                self.backend.delete(key)
+            if keys:
+                cursor.execute("DELETE FROM stored_files WHERE key = ANY(%s)", (keys,))
+        return len(keys)
@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import asyncio
+import logging
+
+from psycopg2.extras import Json
+from starlette.concurrency import run_in_threadpool
+
+from schemas import PaymentStatus
+from utils.config import CFG
+
+from .payment_service import PaymentService
+from .postgres_base import PostgresService
+
+
+logger = logging.getLogger(__name__)
+
+PAYMENT_STATUSES = {item.value for item in PaymentStatus}
+
+
+class StripeEventService(PostgresService):
+    """Inbox for Stripe webhook events.
+
+    The webhook only stores the raw event; a background worker applies stored
+    events in order per payment intent.
+    """
+
+    def __init__(self, payment_service: Optional[PaymentService] = None) -> None:
+        super().__init__("stripe_events")
+        self.payments = payment_service or PaymentService()
+        self.max_attempts = int(CFG["STRIPE_EVENT_MAX_ATTEMPTS"])
+
+    @staticmethod
+    def _intent_id(event: Dict[str, Any]) -> Optional[str]:
+        if not event.get("type", "").startswith("payment_intent"):
+            return None
+        return event.get("data", {}).get("object", {}).get("id")
+
+    def record_event(self, event: Dict[str, Any]) -> bool:
+        """Store a verified event. Returns False when the event id was already received."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO stripe_events (stripe_event_id, type, payment_intent_id, stripe_created, payload)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (stripe_event_id) DO NOTHING
+                RETURNING id
+                """,
+                (
+                    event["id"],
+                    event.get("type", ""),
+                    self._intent_id(event),
+                    event.get("created"),
+                    Json(event),
+                ),
+            )
+            return cursor.fetchone() is not None
+
+    def process_pending(self, limit: int = 50) -> int:
+        """Apply up to ``limit`` pending events and return how many were claimed.
+
+        Rows are claimed with ``FOR UPDATE SKIP LOCKED`` so several workers can
+        drain the inbox concurrently. When an event fails, later events for the
+        same payment intent in the batch are left pending to keep their order.
+        """
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT * FROM stripe_events
+                WHERE status = 'pending'
+                ORDER BY stripe_created NULLS LAST, received_at
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+                """,
+                (limit,),
+            )
+            events = cursor.fetchall()
+            blocked_intents = set()
+            for event in events:
+                intent_id = event["payment_intent_id"]
+                if intent_id and intent_id in blocked_intents:
+                    continue
+                cursor.execute("SAVEPOINT stripe_event")
+                try:
+                    outcome = self._apply_event(cursor, event)
+                    cursor.execute("RELEASE SAVEPOINT stripe_event")
+                    cursor.execute(
+                        """
+                        UPDATE stripe_events
+                        SET status = %s, attempts = attempts + 1, last_error = NULL, processed_at = NOW()
+                        WHERE id = %s
+                        """,
+                        (outcome, event["id"]),
+                    )
+                except Exception as exc:
+                    cursor.execute("ROLLBACK TO SAVEPOINT stripe_event")
+                    logger.error(f"Failed to apply Stripe event {event['stripe_event_id']}: {exc}")
+                    next_status = "failed" if event["attempts"] + 1 >= self.max_attempts else "pending"
+                    cursor.execute(
+                        """
+                        UPDATE stripe_events
+                        SET status = %s, attempts = attempts + 1, last_error = %s
+                        WHERE id = %s
+                        """,
+                        (next_status, str(exc), event["id"]),
+                    )
+                    if intent_id:
+                        blocked_intents.add(intent_id)
+            return len(events)
+
+    def _apply_event(self, cursor, event: Dict[str, Any]) -> str:
+        intent = event["payload"].get("data", {}).get("object", {})
+        if not event["payment_intent_id"] or not intent:
+            return "skipped"
+        status_value = intent.get("status")
+        if status_value not in PAYMENT_STATUSES:
+            return "skipped"
+        self.payments.apply_intent_status(
+            cursor,
+            event["payment_intent_id"],
+            status_value,
+            transfer_id=intent.get("latest_charge"),
+            event_created=event["stripe_created"],
+        )
+        return "processed"
+
+    def requeue_events(
+        self,
+        *,
+        event_ids: Optional[List[str]] = None,
+        status_filter: str = "failed",
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Reset matching events to ``pending`` so the worker applies them again."""
+        conditions = []
+        params: List[Any] = []
+        if event_ids:
+            conditions.append("stripe_event_id = ANY(%s)")
+            params.append(event_ids)
+        else:
+            conditions.append("status = %s")
+            params.append(status_filter)
+        if since:
+            conditions.append("received_at >= %s")
+            params.append(since)
+        limit_sql = ""
+        if limit:
+            limit_sql = "LIMIT %s"
+            params.append(limit)
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE stripe_events
+                SET status = 'pending', attempts = 0, last_error = NULL, processed_at = NULL
+                WHERE id IN (
+                    SELECT id FROM stripe_events
+                    WHERE {' AND '.join(conditions)}
+                    ORDER BY received_at
+                    {limit_sql}
+                )
+                RETURNING stripe_event_id, type, payment_intent_id, received_at
+                """,
+                params,
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def notify_stripe_event_worker() -> None:
+    """Wake the worker so freshly stored events are applied without waiting for the next poll."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def run_stripe_event_worker() -> None:
+    global _wakeup
+    _wakeup = asyncio.Event()
+    interval = float(CFG["STRIPE_EVENT_POLL_SECONDS"])
+    batch_size = int(CFG["STRIPE_EVENT_BATCH_SIZE"])
+    service = StripeEventService()
+    while True:
+        try:
+            claimed = await run_in_threadpool(service.process_pending, batch_size)
+        except Exception as exc:
+            logger.error(f"Stripe event worker error: {exc}")
+            claimed = 0
+        if claimed >= batch_size:
+            continue
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
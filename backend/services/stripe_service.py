@@ -1,45 +1,115 @@
-import json
+from functools import lru_cache
+from typing import Any, Awaitable, Optional
+import logging
+import time
 
+import anyio
 import stripe
 from fastapi import HTTPException
 
 from utils.config import CFG
+from utils.metrics import Counter, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+STRIPE_LATENCY = Histogram(
+    "stripe_request_duration_seconds",
+    "Latency of Stripe API calls, including SDK retries",
+    ("operation", "outcome"),
+)
+STRIPE_ERRORS = Counter(
+    "stripe_request_errors_total",
+    "Stripe API calls that failed or timed out",
+    ("operation", "outcome"),
+)
+
+
+@lru_cache()
+def get_stripe_client() -> stripe.StripeClient:
+    """Process-wide Stripe client backed by a pooled keep-alive ``httpx.AsyncClient``."""
+    base_addresses = {}
+    if CFG["STRIPE_API_BASE"]:
+        base_addresses["api"] = CFG["STRIPE_API_BASE"]
+    return stripe.StripeClient(
+        CFG["STRIPE_API_KEY"],
+        http_client=stripe.HTTPXClient(timeout=CFG["STRIPE_TIMEOUT_SECONDS"]),
+        max_network_retries=CFG["STRIPE_MAX_NETWORK_RETRIES"],
+        base_addresses=base_addresses,
+    )
 
 
 class StripeService:
-    def __init__(self) -> None:
-        stripe.api_key = CFG["STRIPE_API_KEY"]
+    def __init__(self, client: Optional[stripe.StripeClient] = None) -> None:
+        self.client = client or get_stripe_client()
+        self.call_timeout = float(CFG["STRIPE_CALL_TIMEOUT_SECONDS"])
 
-    def create_connect_account(self, email: str):
+    async def _call(self, operation: str, request: Awaitable[Any]) -> Any:
+        """Await a Stripe request under an overall deadline and record its latency."""
+        outcome = "ok"
+        start = time.perf_counter()
         try:
-            account = stripe.Account.create(
-                type="express",
-                country="JP",
-                email=email,
-                capabilities={"transfers": {"requested": True}},
-                business_type="individual",
-            )
-            link = stripe.AccountLink.create(
-                account=account.id,
-                refresh_url=f"{CFG['DOMAIN']}/reauth",
-                return_url=f"{CFG['DOMAIN']}/complete",
-                type="account_onboarding",
-            )
-            return {"account_id": account.id, "onboard_url": link.url}
-        except Exception as exc:  # pragma: no cover - passthrough error
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
+            with anyio.fail_after(self.call_timeout):
+                return await request
+        except TimeoutError as exc:
+            outcome = "timeout"
+            raise HTTPException(status_code=504, detail="Stripe request timed out") from exc
+        except stripe.StripeError as exc:
+            outcome = "error"
+            raise HTTPException(status_code=400, detail=exc.user_message or str(exc)) from exc
+        finally:
+            STRIPE_LATENCY.observe(time.perf_counter() - start, operation=operation, outcome=outcome)
+            if outcome != "ok":
+                STRIPE_ERRORS.inc(operation=operation, outcome=outcome)
+                logger.warning(f"Stripe {operation} failed: {outcome}")
 
-    def create_payment_intent(self, amount: int, worker_stripe_account: str):
-        try:
-            return stripe.PaymentIntent.create(
-                amount=amount,
-                currency="jpy",
-                payment_method_types=["card"],
-                application_fee_amount=int(amount * CFG["STRIPE_PLATFORM_FEE"] / 100),
-                transfer_data={"destination": worker_stripe_account},
-            )
-        except Exception as exc:  # pragma: no cover - passthrough error
-            raise HTTPException(status_code=400, detail=str(exc)) from exc
+    async def create_connect_account(self, email: str):
+        account = await self._call(
+            "account.create",
+            self.client.v1.accounts.create_async(
+                params={
+                    "type": "express",
+                    "country": "JP",
+                    "email": email,
+                    "capabilities": {"transfers": {"requested": True}},
+                    "business_type": "individual",
+                },
+                options={"idempotency_key": f"connect-account-{email}"},
+            ),
+        )
+        link = await self._call(
+            "account_link.create",
+            self.client.v1.account_links.create_async(
+                params={
+                    "account": account.id,
+                    "refresh_url": f"{CFG['DOMAIN']}/reauth",
+                    "return_url": f"{CFG['DOMAIN']}/complete",
+                    "type": "account_onboarding",
+                },
+            ),
+        )
+        return {"account_id": account.id, "onboard_url": link.url}
+
+    async def create_payment_intent(
+        self,
+        amount: int,
+        worker_stripe_account: str,
+        idempotency_key: Optional[str] = None,
+    ):
+        options = {"idempotency_key": idempotency_key} if idempotency_key else {}
+        return await self._call(
+            "payment_intent.create",
+            self.client.v1.payment_intents.create_async(
+                params={
+                    "amount": amount,
+                    "currency": "jpy",
+                    "payment_method_types": ["card"],
+                    "application_fee_amount": int(amount * CFG["STRIPE_PLATFORM_FEE"] / 100),
+                    "transfer_data": {"destination": worker_stripe_account},
+                },
+                options=options,
+            ),
+        )
 
     def webhook(self, payload: bytes, sig_header: str) -> dict:
         try:
@@ -48,5 +118,5 @@ class StripeService:
             )
         except Exception as exc:  # pragma: no cover - passthrough error
             raise HTTPException(status_code=400, detail=str(exc)) from exc
-        print(json.dumps(event, indent=2))  # noqa: T201 - debug logging
+        logger.debug(f"Stripe event {event.get('id')} ({event.get('type')}) received")
         return event
@@ -0,0 +1,194 @@
+"""Live delivery tracking.
+
+Workers post batches of GPS points every few seconds while a delivery is under way.
+A batch only touches Redis (``utils.tracking``): it is appended to the assignment's
+ring buffer and published to the company's live viewers. Every
+``TRACK_FLUSH_SECONDS`` the buffers that moved are downsampled (one point per
+``TRACK_PERSIST_SECONDS`` or ``TRACK_PERSIST_METERS``, whichever comes first) and
+written to ``assignment_track_points`` in one statement.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from cachetools import TTLCache
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from schemas import AssignmentStatus, AssignmentTrack, TrackPoint
+from utils.config import CFG
+from utils.database import get_redis
+from utils.tracking import Point, RedisTrackBuffer
+
+from .postgres_base import PostgresService
+
+logger = logging.getLogger(__name__)
+
+TRACKABLE_STATUSES = {
+    AssignmentStatus.PENDING_PICKUP.value,
+    AssignmentStatus.PICKING_UP.value,
+    AssignmentStatus.IN_DELIVERY.value,
+}
+
+ACCESS_SQL = """
+    SELECT s.id::text AS assignment_id, s.worker_id::text AS worker_id,
+           j.company_id::text AS company_id, s.status
+    FROM assignments s
+    JOIN jobs j ON j.id = s.job_id
+    WHERE s.id = %s
+"""
+
+INSERT_POINTS_SQL = """
+    INSERT INTO assignment_track_points (assignment_id, recorded_at, latitude, longitude, accuracy_m, speed_mps)
+    SELECT * FROM unnest(%s::uuid[], %s::timestamptz[], %s::float8[], %s::float8[], %s::real[], %s::real[])
+    ON CONFLICT (assignment_id, recorded_at) DO NOTHING
+"""
+
+# A batch arrives every few seconds per worker; the owner/status lookup is cached so
+# ingestion stays off Postgres. A status change is seen within the cache TTL.
+_access_cache: TTLCache = TTLCache(maxsize=10_000, ttl=CFG["TRACK_ACCESS_CACHE_SECONDS"])
+
+METERS_PER_DEGREE = 111_320.0
+
+
+def forget_access(assignment_id: str) -> None:
+    _access_cache.pop(assignment_id, None)
+
+
+def _meters(a: Point, b: Point) -> float:
+    # Equirectangular approximation; accurate to well under a meter at these distances.
+    x = (b[2] - a[2]) * math.cos(math.radians((a[1] + b[1]) / 2))
+    return math.hypot(b[1] - a[1], x) * METERS_PER_DEGREE
+
+
+def downsample(points: List[Point], last: Optional[Point], min_seconds: float, min_meters: float) -> List[Point]:
+    """Points at least ``min_seconds`` or ``min_meters`` apart, continuing from ``last``."""
+    kept = []
+    for point in sorted(points, key=lambda p: p[0]):
+        if last is not None and point[0] <= last[0]:
+            continue
+        if last is None or point[0] - last[0] >= min_seconds or _meters(last, point) >= min_meters:
+            kept.append(point)
+            last = point
+    return kept
+
+
+def to_point(point: TrackPoint) -> Point:
+    return point.recorded_at.timestamp(), point.latitude, point.longitude, point.accuracy_m, point.speed_mps
+
+
+def from_point(point: Point) -> TrackPoint:
+    ts, lat, lng, accuracy, speed = point
+    return TrackPoint(
+        latitude=lat, longitude=lng, recorded_at=datetime.fromtimestamp(ts, timezone.utc),
+        accuracy_m=accuracy, speed_mps=speed,
+    )
+
+
+class TrackingService(PostgresService):
+    def __init__(self) -> None:
+        super().__init__("assignment_track_points")
+
+    def get_access(self, assignment_id: str) -> Dict[str, Any]:
+        """Worker, company and status of an assignment (cached)."""
+        cached = _access_cache.get(assignment_id)
+        if cached is not None:
+            return cached
+        with self._get_cursor() as cursor:
+            cursor.execute(ACCESS_SQL, (assignment_id,))
+            row = cursor.fetchone()
+        if not row:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Assignment not found")
+        access = dict(row)
+        _access_cache[assignment_id] = access
+        return access
+
+    async def fetch_access(self, assignment_id: str) -> Dict[str, Any]:
+        """``get_access`` for async callers: the query runs off the event loop on a cache miss."""
+        cached = _access_cache.get(assignment_id)
+        if cached is not None:
+            return cached
+        return await run_in_threadpool(self.get_access, assignment_id)
+
+    def get_track(self, assignment_id: str, since: Optional[datetime] = None) -> AssignmentTrack:
+        """Persisted (downsampled) track in time order."""
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT latitude, longitude, recorded_at, accuracy_m, speed_mps
+                FROM assignment_track_points
+                WHERE assignment_id = %s AND (%s::timestamptz IS NULL OR recorded_at > %s)
+                ORDER BY recorded_at
+                """,
+                (assignment_id, since, since),
+            )
+            rows = cursor.fetchall()
+        return AssignmentTrack(assignment_id=assignment_id, points=[TrackPoint(**dict(row)) for row in rows])
+
+    def persist(self, rows: Dict[str, List[Point]]) -> int:
+        flat = [(assignment_id, point) for assignment_id, points in rows.items() for point in points]
+        if not flat:
+            return 0
+        with self._get_cursor() as cursor:
+            cursor.execute(
+                INSERT_POINTS_SQL,
+                (
+                    [assignment_id for assignment_id, _ in flat],
+                    [datetime.fromtimestamp(point[0], timezone.utc) for _, point in flat],
+                    [point[1] for _, point in flat],
+                    [point[2] for _, point in flat],
+                    [point[3] for _, point in flat],
+                    [point[4] for _, point in flat],
+                ),
+            )
+        return len(flat)
+
+    async def flush(self, buffer, since: float) -> int:
+        """Persist the downsampled points buffered for assignments active after ``since``."""
+        assignment_ids = await buffer.active(since)
+        if not assignment_ids:
+            return 0
+        markers = await buffer.markers(assignment_ids)
+        recent = await buffer.recent(assignment_ids)
+        rows = {
+            assignment_id: downsample(
+                points, markers.get(assignment_id), CFG["TRACK_PERSIST_SECONDS"], CFG["TRACK_PERSIST_METERS"]
+            )
+            for assignment_id, points in recent.items()
+        }
+        rows = {assignment_id: points for assignment_id, points in rows.items() if points}
+        written = await run_in_threadpool(self.persist, rows)
+        await buffer.set_markers({assignment_id: points[-1] for assignment_id, points in rows.items()})
+        return written
+
+
+_buffer: Optional[RedisTrackBuffer] = None
+
+
+async def get_track_buffer() -> RedisTrackBuffer:
+    # One instance per process: it owns the pub/sub connection shared by all viewers.
+    global _buffer
+    if _buffer is None:
+        _buffer = RedisTrackBuffer(
+            await get_redis(), size=CFG["TRACK_BUFFER_SIZE"], ttl_seconds=CFG["TRACK_BUFFER_TTL_SECONDS"]
+        )
+    return _buffer
+
+
+async def run_track_flusher(buffer: Optional[RedisTrackBuffer] = None) -> None:
+    interval = float(CFG["TRACK_FLUSH_SECONDS"])
+    service = TrackingService()
+    since = 0.0
+    while True:
+        await asyncio.sleep(interval)
+        started = time.time()
+        try:
+            buffer = buffer or await get_track_buffer()
+            await service.flush(buffer, since)
+            since = started
+        except Exception as exc:
+            logger.error(f"Track flush failed: {exc}")
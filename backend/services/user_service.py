@@ -1,7 +1,7 @@
 from typing import Dict, Optional, List
-from datetime import datetime
 
 from fastapi import HTTPException, status
+from psycopg2.extras import Json
 
 from schemas import UserCreate, UserRead, UserUpdate
 from utils.security import hash_password
@@ -45,6 +45,8 @@ class UserService(PostgresService):
 
     def update_user(self, user_id: str, payload: UserUpdate) -> UserRead:
         update_data = payload.dict(exclude_unset=True)
+        if update_data.get("avatar_variants") is not None:
+            update_data["avatar_variants"] = Json(update_data["avatar_variants"])
         updated = self.update(user_id, update_data)
         return self._to_user(updated)
 
@@ -54,45 +56,6 @@ class UserService(PostgresService):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return self._to_user(data)
 
-    def set_online_status(self, user_id: str, is_online: bool) -> UserRead:
-        """Set user online/offline status
-        
-        Always updates last_online_at to preserve audit trail.
-        This timestamp shows when the user was last online, 
-        regardless of their current status.
-        """
-        with self._get_cursor() as cursor:
-            cursor.execute(
-                """
-                UPDATE users 
-                SET is_online = %s, last_online_at = %s
-                WHERE id = %s
-                RETURNING *
-                """,
-                (is_online, datetime.utcnow(), user_id),
-            )
-            result = cursor.fetchone()
-            if not result:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
-                )
-            return self._to_user(dict(result))
-
-    def get_online_workers(self, limit: int = 100) -> List[UserRead]:
-        """Get all online workers"""
-        with self._get_cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT * FROM users 
-                WHERE role = 'worker' AND is_online = true
-                ORDER BY last_online_at DESC
-                LIMIT %s
-                """,
-                (limit,),
-            )
-            results = cursor.fetchall()
-            return [self._to_user(dict(row)) for row in results]
-
     def list_users(self, role: Optional[str] = None, limit: int = 100) -> List[UserRead]:
         """List all users with optional role filter (admin only)"""
         with self._get_cursor() as cursor:
@@ -1,4 +1,5 @@
 import os
+from contextlib import contextmanager
 
 import pytest
 
@@ -15,3 +16,56 @@ def _configure_env():
     os.environ.setdefault("DOMAIN", "http://testserver")
     os.environ.setdefault("ADMIN_EMAIL", "admin@test.local")
     os.environ.setdefault("CORS_ORIGINS", "[\"http://testserver\"]")
+
+
+class FakeCursor:
+    """Stand-in for the RealDictCursor that ``PostgresService._get_cursor`` yields.
+
+    Records ``(sql, params)`` with whitespace collapsed. Each statement is answered by the
+    first ``(fragment, rows)`` in ``results`` whose fragment occurs in it, else by ``rows``;
+    ``rows`` may be a callable taking ``(sql, params)``.
+    """
+
+    def __init__(self, rows=(), results=()):
+        self.rows = rows
+        self.results = list(results)
+        self.executed = []
+        self.result = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        sql = " ".join(query.split())
+        self.executed.append((sql, params))
+        rows = next((rows for fragment, rows in self.results if fragment in sql), self.rows)
+        self.result = list(rows(sql, params) if callable(rows) else rows)
+        self.rowcount = len(self.result)
+
+    def fetchone(self):
+        return self.result[0] if self.result else None
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def fake_cursor():
+    """Factory for ``FakeCursor``."""
+    return FakeCursor
+
+
+@pytest.fixture
+def service_with_cursor():
+    """Point a service's ``_get_cursor`` at ``cursor`` (a new ``FakeCursor`` by default)."""
+
+    def attach(service, cursor=None):
+        cursor = FakeCursor() if cursor is None else cursor
+
+        @contextmanager
+        def get_cursor():
+            yield cursor
+
+        service._get_cursor = get_cursor
+        service.cursor = cursor
+        return service
+
+    return attach
@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.applications import get_application_service, get_job_service
+from schemas import JobRead, UserRead, UserRole
+from services.application_service import ApplicationService
+
+JOB = JobRead(
+    id="job-1", company_id="c1", title="倉庫内作業", description="x",
+    tags=["フォークリフト", "未経験OK"], latitude=35.69, longitude=139.70,
+)
+
+
+def _row(worker, **values):
+    row = {
+        "application_id": f"app-{worker}",
+        "worker_id": worker,
+        "status": "pending",
+        "cover_letter": None,
+        "applied_at": datetime(2025, 11, 1, tzinfo=timezone.utc),
+        "full_name": worker,
+        "avatar_url": None,
+        "avatar_variants": None,
+        "preferred_prefecture": "東京都",
+        "phone_verified": True,
+        "qualifications": [],
+        "latitude": None,
+        "longitude": None,
+        "rating_average": None,
+        "review_count": 0,
+        "completed_assignments": 0,
+        "cancelled_assignments": 0,
+        "no_show_count": 0,
+        "penalty_points": 0,
+    }
+    row.update(values)
+    return row
+
+
+ROWS = [
+    _row("newcomer"),
+    _row("veteran", rating_average=4.8, review_count=40, completed_assignments=42, cancelled_assignments=1,
+         qualifications="フォークリフト,玉掛け", latitude=35.70, longitude=139.71),
+    _row("one-review", rating_average=5.0, review_count=1, completed_assignments=1),
+    _row("penalized", rating_average=4.8, review_count=40, completed_assignments=42, penalty_points=10),
+]
+
+
+@pytest.fixture
+def service(fake_cursor, service_with_cursor):
+    return service_with_cursor(ApplicationService(job_service=object(), user_service=object()), fake_cursor(rows=ROWS))
+
+
+def test_applicants_are_ranked_from_maintained_reputation(service):
+    ranking = service.rank_applicants(JOB)
+
+    assert [card.worker_id for card in ranking.items] == ["veteran", "one-review", "penalized", "newcomer"]
+    veteran = ranking.items[0]
+    assert veteran.matched_qualifications == ["フォークリフト"]
+    assert veteran.qualifications == ["フォークリフト", "玉掛け"]
+    assert veteran.distance_km == 1.4 and veteran.rating_average == 4.8
+    assert ranking.items[-1].rating_average is None
+
+    (_, params), = service.cursor.executed
+    assert params == ("job-1", ["pending", "interview", "hired"])
+
+
+def test_only_the_owning_company_can_rank(service):
+    class FakeJobs:
+        def get_job(self, job_id):
+            return JOB
+
+    def _get(user):
+        app.dependency_overrides.update({
+            get_current_user: lambda: user,
+            get_application_service: lambda: service,
+            get_job_service: FakeJobs,
+        })
+        try:
+            return TestClient(app).get("/applications/ranked", params={"job_id": "job-1", "limit": 2})
+        finally:
+            app.dependency_overrides.clear()
+
+    owner = UserRead(id="c1", email="c1@example.com", full_name="C1", role=UserRole.COMPANY)
+    other = UserRead(id="c2", email="c2@example.com", full_name="C2", role=UserRole.COMPANY)
+
+    response = _get(owner)
+    assert response.status_code == 200
+    assert response.json()["total"] == 4 and len(response.json()["items"]) == 2
+    assert _get(other).status_code == 403
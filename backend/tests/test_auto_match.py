@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from services.auto_match_service import AutoMatchService, _bounding_box
+
+NOW = datetime.now(timezone.utc)
+
+
+def _job(**values):
+    job = {
+        "id": "job-1", "company_id": "c1", "title": "急募 倉庫内作業", "description": "x",
+        "status": "published", "is_urgent": True, "urgent_deadline": NOW + timedelta(hours=2),
+        "latitude": 35.69, "longitude": 139.70, "tags": ["フォークリフト"], "required_workers": 2,
+        "starts_at": NOW + timedelta(hours=3), "ends_at": NOW + timedelta(hours=8),
+        "filled": 0, "pending": 0, "last_wave": 0,
+    }
+    job.update(values)
+    return job
+
+
+def _worker(worker_id, lat, lng, **values):
+    row = {
+        "worker_id": worker_id, "latitude": lat, "longitude": lng, "qualifications": [],
+        "rating_average": None, "review_count": 0, "completed_assignments": 0,
+        "cancelled_assignments": 0, "no_show_count": 0, "penalty_points": 0,
+    }
+    row.update(values)
+    return row
+
+
+WORKERS = [
+    _worker("near-newcomer", 35.69, 139.71),
+    _worker("veteran", 35.72, 139.75, rating_average=4.9, review_count=30, completed_assignments=30,
+            qualifications=["フォークリフト"]),
+    _worker("mid", 35.70, 139.72, rating_average=4.2, review_count=5, completed_assignments=6),
+    _worker("far", 35.69, 139.99),
+    _worker("regular", 35.70, 139.70, rating_average=4.5, review_count=10, completed_assignments=10),
+    _worker("extra", 35.71, 139.71, rating_average=4.0, review_count=2, completed_assignments=2),
+    _worker("seventh", 35.71, 139.72),
+]
+
+
+def _offers(sql, params):
+    _, wave, expires_at, ids, scores, distances = params
+    return [
+        {"id": f"offer-{w}", "job_id": "job-1", "worker_id": w, "wave": wave, "score": s,
+         "distance_km": d, "status": "offered", "expires_at": expires_at}
+        for w, s, d in zip(ids, scores, distances)
+    ]
+
+
+def _assignment(sql, params):
+    return [{"id": "as-1", "job_id": params[0], "worker_id": params[1], "application_id": params[2],
+             "status": "active"}]
+
+
+class FakeNotifications:
+    def __init__(self):
+        self.sent = []
+
+    def create_notification(self, payload):
+        self.sent.append(payload)
+
+
+@pytest.fixture
+def service_for(fake_cursor, service_with_cursor):
+    def build(job, offer=None, conflict=False):
+        cursor = fake_cursor(results=[
+            ("FOR UPDATE OF j", [job]),
+            ("FROM users u", WORKERS),
+            ("INSERT INTO job_offers", _offers),
+            ("SELECT * FROM job_offers", [offer] if offer else []),
+            ("SELECT 1 FROM assignments", [{"?column?": 1}] if conflict else []),
+            ("INSERT INTO applications", [{"id": "app-1"}]),
+            ("INSERT INTO assignments", _assignment),
+        ])
+        return service_with_cursor(AutoMatchService(notification_service=FakeNotifications()), cursor)
+
+    return build
+
+
+def test_wave_offers_the_best_workers_inside_the_radius(service_for):
+    service = service_for(_job())
+
+    offers = service.send_wave("job-1")
+
+    # 2 open slots x wave factor 3; "far" is outside the 15 km radius
+    assert len(offers) == 6 and "far" not in {offer.worker_id for offer in offers}
+    assert offers[0].worker_id == "veteran" and offers[0].wave == 1
+    assert offers[0].expires_at <= _job()["urgent_deadline"]
+    assert len(service.notifications.sent) == 6
+    assert service.notifications.sent[0].data["offer_id"] == "offer-veteran"
+
+    (_, state), (_, params), (_, inserted) = service.cursor.executed
+    assert state == ("job-1",)
+    assert params["min_lat"] < 35.69 < params["max_lat"]
+    assert params["starts_at"] == _job()["starts_at"]
+    assert inserted[3] == [offer.worker_id for offer in offers]
+
+
+def test_no_wave_while_pending_offers_cover_the_slots(service_for):
+    assert service_for(_job(pending=6)).send_wave("job-1") == []
+    assert service_for(_job(filled=2)).send_wave("job-1") == []
+    assert service_for(_job(last_wave=5)).send_wave("job-1") == []
+    assert service_for(_job(urgent_deadline=NOW - timedelta(minutes=1))).send_wave("job-1") == []
+    assert service_for(_job(pending=3, filled=1)).send_wave("job-1") == []
+
+
+def test_top_up_wave_sends_only_the_missing_offers(service_for):
+    offers = service_for(_job(pending=1, filled=1, last_wave=2)).send_wave("job-1")
+
+    assert len(offers) == 2 and {offer.wave for offer in offers} == {3}
+
+
+def test_accepting_the_last_slot_creates_the_assignment_and_closes_other_offers(service_for):
+    offer = {"id": "offer-1", "job_id": "job-1", "worker_id": "w1", "status": "offered",
+             "expires_at": NOW + timedelta(minutes=3)}
+    service = service_for(_job(filled=1), offer=offer)
+
+    assignment = service.accept_offer("offer-1", "w1")
+
+    assert assignment.id == "as-1" and assignment.application_id == "app-1"
+    # assignment inserted, this offer accepted, the job's other offers expired
+    assert [params for _, params in service.cursor.executed[-3:]] == [
+        ("job-1", "w1", "app-1"),
+        ("offer-1",),
+        ("job-1",),
+    ]
+
+
+def test_accept_rejects_filled_jobs_and_overlapping_shifts(service_for):
+    offer = {"id": "offer-1", "job_id": "job-1", "worker_id": "w1", "status": "offered",
+             "expires_at": NOW + timedelta(minutes=3)}
+
+    with pytest.raises(HTTPException) as filled:
+        service_for(_job(filled=2), offer=offer).accept_offer("offer-1", "w1")
+    with pytest.raises(HTTPException) as overlap:
+        service_for(_job(), offer=offer, conflict=True).accept_offer("offer-1", "w1")
+    with pytest.raises(HTTPException) as expired:
+        service_for(_job(), offer={**offer, "status": "expired"}).accept_offer("offer-1", "w1")
+
+    assert filled.value.detail == "Job already filled"
+    assert overlap.value.detail == "Overlapping assignment"
+    assert expired.value.status_code == 409
+
+
+def test_bounding_box_widens_longitude_with_latitude():
+    box = _bounding_box(43.0, 141.35, 15)
+    assert box["max_lng"] - box["min_lng"] > box["max_lat"] - box["min_lat"]
@@ -0,0 +1,101 @@
+import csv
+import io
+import random
+from datetime import date
+
+from benchmarks.datagen import Column, Dataset, TableInfo, allowed_values, copy_rows
+from benchmarks.report import compare, summarize
+
+
+class FakeCopyCursor:
+    def __init__(self, copied):
+        self.copied = copied
+
+    def copy_expert(self, statement, buffer):
+        self.copied.append((statement, buffer.read()))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeConnection:
+    def __init__(self):
+        self.copied = []
+
+    def cursor(self):
+        return FakeCopyCursor(self.copied)
+
+
+def _dataset(seed=7):
+    return Dataset(rows=5_000, seed=seed, base_date=date(2025, 11, 1), password_hash="hash")
+
+
+def _rows(dataset, table):
+    return list(getattr(dataset, table)(random.Random(f"{dataset.seed}:{table}")))
+
+
+def test_check_constraints_are_parsed_for_both_schema_styles():
+    checks = allowed_values([
+        "CHECK ((role = ANY (ARRAY['worker'::text, 'company'::text, 'admin'::text])))",
+        "CHECK (((status)::text = ANY ((ARRAY['pending'::character varying, 'accepted'::character varying])::text[])))",
+        "CHECK (((rating >= 1) AND (rating <= 5)))",
+    ])
+
+    assert checks == {"role": ["worker", "company", "admin"], "status": ["pending", "accepted"]}
+
+
+def test_dataset_is_deterministic_and_foreign_keys_line_up():
+    first, second = _dataset(), _dataset()
+    assert _rows(first, "jobs") == _rows(second, "jobs")
+    assert _rows(first, "jobs")[0]["id"] != _rows(_dataset(seed=8), "jobs")[0]["id"]
+
+    users = {row["id"]: row for row in _rows(first, "users")}
+    applications = {row["id"]: row for row in _rows(first, "applications")}
+    jobs = {row["id"]: row for row in _rows(first, "jobs")}
+    assert len({(row["job_id"], row["worker_id"]) for row in applications.values()}) == len(applications)
+
+    for assignment in _rows(first, "assignments"):
+        application = applications[assignment["application_id"]]
+        assert application["status"] == "hired"
+        assert application["worker_id"] == assignment["worker_id"]
+        assert users[assignment["worker_id"]]["role"] == "worker"
+        assert users[jobs[assignment["job_id"]]["company_id"]]["role"] == "company"
+        assert (assignment["started_at"] is None) == (jobs[assignment["job_id"]]["starts_at"] >= first.base or assignment["status"] == "cancelled")
+
+    hired = sum(row["status"] == "hired" for row in applications.values())
+    assert hired == first.counts["assignments"]
+    assert {row["email"] for row in users.values()} >= {"worker0@bench.worknow.test", "company0@bench.worknow.test"}
+
+
+def test_copy_rows_adapts_values_to_the_target_table():
+    info = TableInfo(
+        "users",
+        [
+            Column("id", "character varying", "varchar", False, True),
+            Column("role", "character varying", "varchar", False, False),
+            Column("qualifications", "text", "text", True, False),
+            Column("legacy_flag", "boolean", "bool", False, False),
+        ],
+        {"role": ["worker", "client", "admin"]},
+    )
+    conn = FakeConnection()
+    rows = [{"id": "u1", "role": "company", "qualifications": ["調理師", "普通自動車免許"], "email": "dropped"}]
+
+    assert copy_rows(conn, info, iter(rows)) == 1
+    statement, data = conn.copied[0]
+    assert statement == "COPY users (id, role, qualifications, legacy_flag) FROM STDIN WITH (FORMAT csv)"
+    assert next(csv.reader(io.StringIO(data))) == ["u1", "client", "調理師,普通自動車免許", "f"]
+
+
+def test_report_percentiles_and_comparison():
+    stats = summarize([i / 1000 for i in range(1, 101)], errors=2, elapsed=2.0)
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (50.0, 95.0, 99.0)
+    assert stats["throughput_rps"] == 50.0
+
+    base = {"scenarios": {"login": {"p50_ms": 100.0, "p95_ms": 200.0, "p99_ms": 300.0, "throughput_rps": 10.0}}}
+    head = {"scenarios": {"login": {"p50_ms": 50.0, "p95_ms": 200.0, "p99_ms": 330.0, "throughput_rps": 20.0}}}
+    changes = {row["metric"]: row["change"] for row in compare(base, head)}
+    assert changes == {"p50_ms": -0.5, "p95_ms": 0.0, "p99_ms": 0.1, "throughput_rps": 1.0}
@@ -0,0 +1,196 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from schemas import JobCreate
+from services.geocoding_service import GeocodingService, close_geocoding_session, normalize_address
+from services.job_service import JobService
+from utils.config import CFG
+from utils.geocoding import MemoryGeocodeStore
+from utils.prefectures import find_centroid
+
+KNOWN = {"東京都渋谷区道玄坂1-2-3": [{"lat": "35.6581", "lon": "139.6975"}]}
+
+
+class FakeNominatim:
+    """Local stand-in for the Nominatim search endpoint."""
+
+    def __init__(self, answers=None, status=200):
+        self.answers = KNOWN if answers is None else answers
+        self.status = status
+        self.requests = []
+
+    async def search(self, request):
+        self.requests.append((time.monotonic(), request.query["q"], request.headers.get("User-Agent")))
+        if self.status != 200:
+            return web.Response(status=self.status)
+        return web.json_response(self.answers.get(normalize_address(request.query["q"]), []))
+
+    async def run(self, monkeypatch, scenario):
+        app = web.Application()
+        app.router.add_get("/search", self.search)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        monkeypatch.setitem(CFG, "GEOCODE_NOMINATIM_URL", f"http://127.0.0.1:{port}/search")
+        try:
+            return await scenario()
+        finally:
+            await close_geocoding_session()
+            await runner.cleanup()
+
+
+def _settings(monkeypatch, interval=0.05):
+    monkeypatch.setitem(CFG, "GEOCODE_NOMINATIM_ENABLED", True)
+    monkeypatch.setitem(CFG, "GEOCODE_MIN_INTERVAL_SECONDS", interval)
+
+
+def test_normalize_address_and_centroids():
+    assert normalize_address("〒150-0043 東京都渋谷区道玄坂１丁目２番３号") == "東京都渋谷区道玄坂1-2-3"
+    assert normalize_address("東京都 渋谷区 道玄坂1‐2‐3") == "東京都渋谷区道玄坂1-2-3"
+    assert find_centroid("東京都渋谷区道玄坂1-2-3") == (35.6640, 139.6982)
+    assert find_centroid("横浜市中区1-1") == (35.4437, 139.6380)
+    assert find_centroid("長野県松本市") == (36.6513, 138.1810)
+    assert find_centroid("どこか") is None
+
+
+def test_cache_serves_repeat_addresses_without_a_request(monkeypatch):
+    _settings(monkeypatch)
+    server = FakeNominatim()
+    service = GeocodingService(MemoryGeocodeStore())
+
+    async def scenario():
+        first = await service.geocode("東京都渋谷区道玄坂1丁目2番3号")
+        second = await service.geocode("〒150-0043 東京都渋谷区道玄坂１－２－３")
+        missing = await service.geocode("東京都渋谷区存在しない町")
+        again = await service.geocode("東京都渋谷区存在しない町")
+        return first, second, missing, again
+
+    first, second, missing, again = asyncio.run(server.run(monkeypatch, scenario))
+
+    assert first == second and first.precise and first.latitude == 35.6581
+    assert missing == again and not missing.precise  # negative result cached, centroid served
+    assert len(server.requests) == 2
+    assert server.requests[0][2] == CFG["GEOCODE_USER_AGENT"]
+
+
+def test_batch_geocoding_dedupes_and_keeps_the_request_interval(monkeypatch):
+    _settings(monkeypatch, interval=0.1)
+    server = FakeNominatim()
+    service = GeocodingService(MemoryGeocodeStore())
+    addresses = ["東京都渋谷区道玄坂1-2-3", "東京都渋谷区道玄坂1丁目2-3", "大阪府大阪市北区", "福岡県福岡市中央区"]
+
+    results = asyncio.run(server.run(monkeypatch, lambda: service.geocode_many(addresses)))
+
+    assert results[addresses[0]] == results[addresses[1]]
+    assert results[addresses[2]] == (34.6937, 135.5023, False)
+    assert len(server.requests) == 3
+    gaps = [b[0] - a[0] for a, b in zip(server.requests, server.requests[1:])]
+    assert min(gaps) >= 0.09
+
+
+def test_falls_back_to_the_centroid_when_no_slot_or_server_is_available(monkeypatch):
+    _settings(monkeypatch, interval=10.0)
+    server = FakeNominatim()
+    service = GeocodingService(MemoryGeocodeStore())
+
+    async def scenario():
+        first = await service.geocode("東京都渋谷区道玄坂1-2-3", max_wait=0.5)
+        throttled = await service.geocode("東京都新宿区西新宿2-8-1", max_wait=0.5)
+        return first, throttled
+
+    first, throttled = asyncio.run(server.run(monkeypatch, scenario))
+    assert first.precise
+    assert throttled == (35.6938, 139.7035, False)
+    assert len(server.requests) == 1
+
+    _settings(monkeypatch)
+    failing = FakeNominatim(status=503)
+    service = GeocodingService(MemoryGeocodeStore())
+    result = asyncio.run(failing.run(monkeypatch, lambda: service.geocode("東京都渋谷区道玄坂1-2-3")))
+    assert result == (35.6640, 139.6982, False)
+    # a failure is not cached: the next lookup asks again
+    asyncio.run(failing.run(monkeypatch, lambda: service.geocode("東京都渋谷区道玄坂1-2-3")))
+    assert len(failing.requests) == 2
+
+
+def test_create_job_queues_centroids_for_the_refiner(monkeypatch):
+    _settings(monkeypatch, interval=10.0)
+    monkeypatch.setitem(CFG, "GEOCODE_INLINE_MAX_WAIT_SECONDS", 0.0)
+    server = FakeNominatim()
+    store = MemoryGeocodeStore()
+    service = JobService(user_service=object(), geocoding_service=GeocodingService(store))
+    rows = {}
+
+    def insert(record):
+        job_id = f"job-{len(rows) + 1}"
+        rows[job_id] = {**record, "id": job_id}
+        return rows[job_id]
+
+    def update(job_id, payload):
+        rows[job_id].update(payload)
+        return rows[job_id]
+
+    published = []
+    monkeypatch.setattr(service, "insert", insert)
+    monkeypatch.setattr(service, "update", update)
+    monkeypatch.setattr(service, "get_by_id", rows.get)
+    monkeypatch.setattr(service, "_to_job", lambda row: row)
+    monkeypatch.setattr("services.job_service.job_published", published.append)
+
+    def payload(location, **extra):
+        return JobCreate(title="倉庫作業", description="ピッキング", location=location, hourly_rate=1200, **extra)
+
+    async def scenario():
+        await store.reserve(10.0, 0.0)  # another process holds the slot
+        first = dict(await service.create_job("c1", payload("東京都渋谷区道玄坂1-2-3")))
+        await service.create_job("c1", payload("東京都新宿区西新宿2-8-1", latitude=35.69, longitude=139.69))
+        queued = await service.geocoder.dequeue(10)
+        rows["job-1"]["status"] = "published"
+        monkeypatch.setitem(CFG, "GEOCODE_MIN_INTERVAL_SECONDS", 0.01)
+        store._next_slot = 0.0
+        refined = await service.refine_coordinates(queued)
+        return first, queued, refined
+
+    first, queued, refined = asyncio.run(server.run(monkeypatch, scenario))
+
+    assert (first["latitude"], first["longitude"]) == (35.6640, 139.6982)
+    assert queued == [("job-1", 0)]
+    assert refined == 1
+    assert (rows["job-1"]["latitude"], rows["job-1"]["longitude"]) == (35.6581, 139.6975)
+    assert published == [rows["job-1"]]
+    assert len(server.requests) == 1
+
+
+def test_refiner_requeues_jobs_it_could_not_place(monkeypatch):
+    _settings(monkeypatch, interval=0.01)
+    monkeypatch.setitem(CFG, "GEOCODE_REFINER_MAX_ATTEMPTS", 2)
+    server = FakeNominatim(status=503)
+    geocoder = GeocodingService(MemoryGeocodeStore())
+    service = JobService(user_service=object(), geocoding_service=geocoder)
+    rows = {
+        job_id: {"id": job_id, "location": "東京都渋谷区道玄坂1-2-3", "latitude": None, "longitude": None}
+        for job_id in ("job-1", "job-2", "job-3")
+    }
+    monkeypatch.setattr(service, "get_by_id", rows.get)
+
+    async def scenario():
+        await service.refine_coordinates([("job-1", 0), ("job-2", 1)])
+        after_failure = await geocoder.dequeue(10)
+        rows["job-1"].update(latitude=35.0, longitude=139.0)  # placed by the company meanwhile
+        del rows["job-2"]
+        monkeypatch.setattr(service, "get_by_id", rows.__getitem__)  # job-2 raises KeyError
+        with pytest.raises(KeyError):
+            await service.refine_coordinates([("job-1", 0), ("job-2", 0), ("job-3", 0)])
+        return after_failure, await geocoder.dequeue(10)
+
+    after_failure, after_error = asyncio.run(server.run(monkeypatch, scenario))
+
+    # job-2 used up its attempts; job-1 goes round again
+    assert after_failure == [("job-1", 1)]
+    # job-2 raised: it and the rest of the batch are back, the failing job one attempt further
+    assert after_error == [("job-2", 1), ("job-3", 0)]
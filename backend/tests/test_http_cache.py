@@ -0,0 +1,55 @@
+from datetime import datetime, timezone
+
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.jobs import get_job_service
+from schemas import JobRead, UserRead, UserRole
+
+UPDATED = datetime(2025, 11, 10, 9, 0, 0, 123456, tzinfo=timezone.utc)
+USER = UserRead(id="u1", email="worker@example.com", full_name="Worker", role=UserRole.WORKER, updated_at=UPDATED)
+
+
+class FakeJobService:
+    def __init__(self):
+        self.full_fetches = 0
+
+    def get_updated_at(self, job_id):
+        return UPDATED
+
+    def get_job(self, job_id):
+        self.full_fetches += 1
+        return JobRead(id=job_id, company_id="c1", title="Job", description="desc", updated_at=UPDATED)
+
+
+def test_job_304_is_decided_before_the_full_fetch():
+    jobs = FakeJobService()
+    app.dependency_overrides[get_job_service] = lambda: jobs
+    try:
+        client = TestClient(app)
+        first = client.get("/jobs/j1")
+        etag = first.headers["etag"]
+        revalidated = client.get("/jobs/j1", headers={"If-None-Match": etag})
+        by_date = client.get("/jobs/j1", headers={"If-Modified-Since": first.headers["last-modified"]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200 and first.json()["id"] == "j1"
+    assert first.headers["last-modified"] == "Mon, 10 Nov 2025 09:00:00 GMT"
+    assert revalidated.status_code == 304 and revalidated.headers["etag"] == etag
+    assert by_date.status_code == 304
+    assert jobs.full_fetches == 1
+
+
+def test_me_changes_etag_when_user_is_updated():
+    app.dependency_overrides[get_current_user] = lambda: USER
+    try:
+        client = TestClient(app)
+        etag = client.get("/auth/me").headers["etag"]
+        assert client.get("/auth/me", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+
+        app.dependency_overrides[get_current_user] = lambda: USER.model_copy(update={"updated_at": datetime.now(timezone.utc)})
+        assert client.get("/auth/me", headers={"If-None-Match": etag}).status_code == 200
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,23 @@
+import asyncio
+
+from PIL import Image
+
+from services.image_service import AVATAR_VARIANTS, ImageService
+from utils.config import CFG
+
+
+def test_avatar_variants_are_square_webp_without_exif(tmp_path, monkeypatch):
+    monkeypatch.setitem(CFG, "CPU_POOL_WORKERS", 0)
+    source = tmp_path / "u1_avatar.jpg"
+    exif = Image.Exif()
+    exif[0x0112] = 6  # rotate 90 degrees on display
+    Image.new("RGB", (1200, 800), "red").save(source, "JPEG", exif=exif.tobytes())
+
+    variants = asyncio.run(ImageService(tmp_path).create_avatar_variants(source))
+
+    assert set(variants) == set(AVATAR_VARIANTS)
+    for name, filename in variants.items():
+        with Image.open(tmp_path / filename) as img:
+            assert img.format == "WEBP"
+            assert img.size == (AVATAR_VARIANTS[name], AVATAR_VARIANTS[name])
+            assert not img.getexif()
@@ -0,0 +1,81 @@
+import pytest
+from fastapi import HTTPException
+
+from schemas import JobStatus, JobUpdate
+from services import job_service as job_service_module
+from services.job_service import JobService, clear_facet_cache
+
+ROWS = [
+    {"facet": "total", "value": None, "count": 42},
+    {"facet": "prefecture", "value": "大阪府", "count": 7},
+    {"facet": "prefecture", "value": "東京都", "count": 35},
+    {"facet": "hourly_rate", "value": "1500", "count": 12},
+    {"facet": "hourly_rate", "value": "1000", "count": 40},
+    {"facet": "start_date", "value": "later", "count": 20},
+    {"facet": "start_date", "value": "today", "count": 3},
+    {"facet": "tag", "value": "日払い", "count": 9},
+]
+
+
+@pytest.fixture
+def service(fake_cursor, service_with_cursor):
+    clear_facet_cache()
+    yield service_with_cursor(JobService(user_service=object()), fake_cursor(rows=ROWS))
+    clear_facet_cache()
+
+
+def test_facets_come_from_one_query_and_are_sorted(service):
+    facets = service.job_facets(status_filter=JobStatus.PUBLISHED, prefecture="東京都", min_hourly_rate=1200, q="倉庫")
+
+    assert facets.total == 42
+    assert [(f.value, f.count) for f in facets.prefecture] == [("東京都", 35), ("大阪府", 7)]
+    assert [f.value for f in facets.hourly_rate] == ["1000", "1500"]
+    assert [f.value for f in facets.start_date] == ["today", "later"]
+    assert facets.tags[0].value == "日払い"
+
+    (_, params), = service.cursor.executed
+    assert params[1:] == ["東京都", 1200, "倉庫", "published", [1000, 1200, 1500, 2000], 30]
+
+
+def test_facet_query_failures_become_a_500(service):
+    def fail(sql, params):
+        raise RuntimeError("db down")
+
+    service.cursor.rows = fail
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.job_facets(status_filter=JobStatus.PUBLISHED)
+
+    assert exc_info.value.status_code == 500
+    assert job_service_module._facet_cache == {}
+
+
+def test_facets_are_cached_per_filter_set(service):
+    service.job_facets(status_filter=JobStatus.PUBLISHED)
+    service.job_facets(status_filter=JobStatus.PUBLISHED)
+    assert len(service.cursor.executed) == 1
+
+    service.job_facets(status_filter=JobStatus.PUBLISHED, prefecture="大阪府")
+    assert len(service.cursor.executed) == 2
+
+    clear_facet_cache()
+    service.job_facets(status_filter=JobStatus.PUBLISHED)
+    assert len(service.cursor.executed) == 3
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda service: service.publish_job("job-1"),
+    lambda service: service.update_job("job-1", JobUpdate(hourly_rate=1500)),
+    lambda service: service.archive_job("job-1"),
+    lambda service: service.delete_job("job-1"),
+])
+def test_job_writes_clear_the_cache(service, monkeypatch, mutate):
+    service.job_facets(status_filter=JobStatus.PUBLISHED)
+    monkeypatch.setattr(service, "update", lambda job_id, data: {"id": job_id, "status": "closed"})
+    monkeypatch.setattr(service, "get_by_id", lambda job_id: {"id": job_id})
+    monkeypatch.setattr(service, "delete", lambda job_id: None)
+    monkeypatch.setattr(service, "_to_job", lambda data: None)
+
+    mutate(service)
+
+    assert len(job_service_module._facet_cache) == 0
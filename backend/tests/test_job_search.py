@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.jobs import get_job_service
+from schemas import JobList, JobStatus
+from services.job_service import JobService, search_terms
+
+
+class FakeUsers:
+    def get_user(self, user_id):
+        return SimpleNamespace(full_name="倉庫株式会社")
+
+
+@pytest.fixture
+def service(fake_cursor, service_with_cursor):
+    cursor = fake_cursor(
+        rows=[{"id": "job-1", "company_id": "c1", "title": "倉庫内軽作業", "description": "x", "search_rank": 0.5}],
+        results=[("COUNT(*)", [{"total": 1}])],
+    )
+    return service_with_cursor(JobService(user_service=FakeUsers()), cursor)
+
+
+def test_search_terms_are_normalized_and_short_terms_dropped():
+    assert search_terms("ＦＯＲＫ　倉庫・軽作業 a 倉庫") == ["fork", "倉庫", "軽作業"]
+
+
+def test_search_binds_each_term_before_the_filters(service):
+    result = service.list_jobs(status_filter=JobStatus.PUBLISHED, prefecture="東京都", q="倉庫 軽作業", sort_by="relevance")
+
+    assert result.total == 1 and result.items[0].title == "倉庫内軽作業"
+    assert result.items[0].company_name == "倉庫株式会社"
+    (_, count_params), (_, params) = service.cursor.executed
+    assert list(count_params) == ["倉庫", "軽作業", "published", "東京都"]
+    assert list(params) == ["倉庫", "軽作業", "published", "東京都", 20, 0]
+
+
+def test_query_without_usable_terms_returns_nothing(service):
+    assert service.list_jobs(q="a b").total == 0
+    assert service.cursor.executed == []
+
+
+def test_router_defaults_to_relevance_when_searching():
+    calls = []
+
+    class RecordingJobService:
+        def list_jobs(self, **kwargs):
+            calls.append(kwargs)
+            return JobList(items=[], total=0, page=1, size=20)
+
+    app.dependency_overrides.update({get_current_user: lambda: None, get_job_service: RecordingJobService})
+    try:
+        client = TestClient(app)
+        assert client.get("/jobs/", params={"q": "倉庫"}).status_code == 200
+        assert client.get("/jobs/").status_code == 200
+        assert client.get("/jobs/", params={"q": "倉"}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+    assert [(call["q"], call["sort_by"]) for call in calls] == [("倉庫", "relevance"), (None, "created_at")]
@@ -0,0 +1,85 @@
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+from main import app
+from utils.config import CFG
+from utils.db_instrumentation import record_query
+from utils.metrics import Counter, Gauge, Histogram, render_text
+from utils.metrics_middleware import REQUEST_DB_QUERIES, REQUEST_LATENCY, MetricsMiddleware
+
+
+def test_render_text_uses_prometheus_exposition_format():
+    counter = Counter("test_events_total", "Events", ("kind",))
+    gauge = Gauge("test_depth", "Depth")
+    histogram = Histogram("test_seconds", "Latency", buckets=(0.1, 1.0))
+    counter.inc(kind='a"b')
+    gauge.set(3)
+    histogram.observe(0.05)
+    histogram.observe(5)
+
+    text = render_text([counter, gauge, histogram])
+
+    assert "# TYPE test_events_total counter" in text
+    assert 'test_events_total{kind="a\\"b"} 1.0' in text
+    assert "test_depth 3.0" in text
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 1' in text
+    assert 'test_seconds_bucket{le="+Inf"} 2' in text
+    assert "test_seconds_count 2" in text
+
+
+def _instrumented_app(threshold: int) -> TestClient:
+    inner = FastAPI()
+
+    @inner.get("/items/{item_id}")
+    async def item(item_id: str):
+        for _ in range(3):
+            # services run their queries in the threadpool
+            await run_in_threadpool(record_query, "SELECT * FROM items WHERE id = %s", 0.001)
+        return {"id": item_id}
+
+    return TestClient(MetricsMiddleware(inner, query_log_threshold=threshold))
+
+
+def test_middleware_labels_by_route_template_and_counts_queries():
+    client = _instrumented_app(threshold=0)
+    before = REQUEST_LATENCY.count(method="GET", route="/items/{item_id}")
+    queries_before = REQUEST_DB_QUERIES.count(route="/items/{item_id}")
+
+    assert client.get("/items/1").status_code == 200
+    assert client.get("/items/2").status_code == 200
+    assert client.get("/nope").status_code == 404
+
+    assert REQUEST_LATENCY.count(method="GET", route="/items/{item_id}") == before + 2
+    assert REQUEST_DB_QUERIES.count(route="/items/{item_id}") == queries_before + 2
+    assert REQUEST_LATENCY.count(method="GET", route="unmatched") >= 1
+    counts, _ = REQUEST_DB_QUERIES._values[("/items/{item_id}",)]
+    # three queries land in the (2, 3] bucket
+    assert counts[REQUEST_DB_QUERIES.buckets.index(3)] >= 2
+
+
+def test_requests_over_query_threshold_are_logged(caplog):
+    client = _instrumented_app(threshold=2)
+
+    with caplog.at_level(logging.WARNING, logger="utils.metrics_middleware"):
+        client.get("/items/1")
+
+    assert "ran 3 queries" in caplog.text
+    assert "3x" in caplog.text and "SELECT * FROM items WHERE id = %s" in caplog.text
+
+
+def test_metrics_endpoint_requires_token_when_configured(monkeypatch):
+    client = TestClient(app)
+    client.get("/health")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health"}' in response.text
+
+    monkeypatch.setitem(CFG, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
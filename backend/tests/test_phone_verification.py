@@ -0,0 +1,61 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user, get_user_service
+from main import app
+from routers.phone_verification import get_rate_limiter, get_verification_store
+from schemas import UserRead, UserRole
+from utils.config import CFG
+from utils.rate_limit import MemorySlidingWindowLimiter
+from utils.verification_store import EXPIRED, INVALID, MemoryVerificationStore
+
+USER = UserRead(id="u1", email="worker@example.com", full_name="Worker", role=UserRole.WORKER)
+
+
+class FakeUserService:
+    def update_user(self, user_id, payload):
+        return USER.model_copy(update=payload.model_dump(exclude_unset=True))
+
+
+def test_sliding_window_blocks_and_reports_retry_after():
+    limiter = MemorySlidingWindowLimiter()
+    results = [limiter.hit_sync("k", 3, 60) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert 1 <= results[-1].retry_after <= 120
+    assert limiter.hit_sync("other", 3, 60).allowed
+
+
+def test_code_is_burnt_after_max_attempts():
+    store = MemoryVerificationStore()
+    asyncio.run(store.save("u1:+81", "123456", 60))
+
+    assert asyncio.run(store.verify("u1:+81", "000000", 2)) == INVALID
+    assert asyncio.run(store.verify("u1:+81", "000000", 2)) == INVALID
+    assert asyncio.run(store.verify("u1:+81", "123456", 2)) == EXPIRED
+
+
+def test_code_sent_by_one_worker_verifies_on_another(monkeypatch):
+    monkeypatch.setitem(CFG, "PHONE_SEND_LIMIT_PER_PHONE", 1)
+    store = MemoryVerificationStore()  # stands in for the shared Redis store
+    limiter = MemorySlidingWindowLimiter()
+    app.dependency_overrides.update({
+        get_current_user: lambda: USER,
+        get_user_service: FakeUserService,
+        get_verification_store: lambda: store,
+        get_rate_limiter: lambda: limiter,
+    })
+    try:
+        client = TestClient(app)
+        sent = client.post("/phone/send-code", json={"phone": "+819012345678"})
+        resend = client.post("/phone/send-code", json={"phone": "+819012345678"})
+        verified = client.post("/phone/verify-code", json={"phone": "+819012345678", "code": sent.json()["code"]})
+        reused = client.post("/phone/verify-code", json={"phone": "+819012345678", "code": sent.json()["code"]})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert sent.status_code == 200
+    assert resend.status_code == 429 and int(resend.headers["Retry-After"]) > 0
+    assert verified.status_code == 200 and verified.json()["phone_verified"] is True
+    assert reused.status_code == 400
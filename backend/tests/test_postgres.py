@@ -0,0 +1,174 @@
+"""The hand-written SQL against a real database: set DATABASE_URL to a scratch Postgres with btree_gist.
+
+db/schema.sql is applied inside a transaction that is rolled back at the end, so nothing is left behind.
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from schemas import JobStatus
+from services.assignment_service import AssignmentService
+from services.job_service import JobService, clear_facet_cache
+from services.reputation_service import ReputationService
+from services.schedule_service import is_shift_overlap
+
+psycopg2 = pytest.importorskip("psycopg2")
+from psycopg2.extras import RealDictCursor  # noqa: E402
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL not set")
+
+SCHEMA = Path(__file__).resolve().parents[1] / "db" / "schema.sql"
+NOW = datetime.now(timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def connection():
+    conn = psycopg2.connect(os.environ["DATABASE_URL"])
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(SCHEMA.read_text())
+        yield conn
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+@pytest.fixture
+def cursor(connection):
+    cursor = connection.cursor(cursor_factory=RealDictCursor)
+    cursor.execute("SAVEPOINT test")
+    yield cursor
+    cursor.execute("ROLLBACK TO SAVEPOINT test")
+    cursor.close()
+
+
+def _insert(cursor, table, **values):
+    columns = ", ".join(values)
+    placeholders = ", ".join(["%s"] * len(values))
+    cursor.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) RETURNING id", list(values.values()))
+    return str(cursor.fetchone()["id"])
+
+
+def _user(cursor, name, role="worker"):
+    return _insert(cursor, "users", email=f"{name}@example.com", password_hash="x", full_name=name, role=role)
+
+
+def _job(cursor, company_id, title, days, status="published", **values):
+    starts_at = NOW + timedelta(days=days)
+    return _insert(
+        cursor, "jobs", company_id=company_id, title=title, description=values.pop("description", "詳細"),
+        status=status, starts_at=starts_at, ends_at=starts_at + timedelta(hours=8), **values,
+    )
+
+
+def _assignment(cursor, job_id, worker_id, **values):
+    application_id = _insert(cursor, "applications", job_id=job_id, worker_id=worker_id, status="hired")
+    return _insert(cursor, "assignments", job_id=job_id, worker_id=worker_id, application_id=application_id, **values)
+
+
+class FakeUsers:
+    def get_user(self, user_id):
+        return SimpleNamespace(full_name="倉庫株式会社")
+
+
+@pytest.fixture
+def jobs(cursor, service_with_cursor):
+    clear_facet_cache()
+    company = _user(cursor, "company", role="company")
+    ids = {
+        "warehouse": _job(cursor, company, "倉庫内軽作業スタッフ", 10, prefecture="東京都", hourly_rate=1300, tags=["日払い"]),
+        "picking": _job(cursor, company, "物流倉庫でのピッキング", 10, prefecture="大阪府", hourly_rate=1600,
+                        tags=["日払い", "週払い"]),
+        "cafe": _job(cursor, company, "カフェのホール", 10, prefecture="東京都", hourly_rate=1100,
+                     description="倉庫ではなく店舗での接客です"),
+        "draft": _job(cursor, company, "倉庫内軽作業(下書き)", 10, status="draft", prefecture="東京都", hourly_rate=1300),
+    }
+    yield service_with_cursor(JobService(user_service=FakeUsers()), cursor), ids
+    clear_facet_cache()
+
+
+def test_refresh_aggregates_reviews_assignments_and_live_penalties(cursor, service_with_cursor):
+    company = _user(cursor, "company", role="company")
+    worker = _user(cursor, "worker")
+    newcomer = _user(cursor, "newcomer")
+    done = _assignment(cursor, _job(cursor, company, "前回の勤務", -5), worker, status="completed", started_at=NOW)
+    missed = _assignment(cursor, _job(cursor, company, "来なかった勤務", -4), worker)
+    _assignment(cursor, _job(cursor, company, "キャンセルした勤務", -3), worker, status="cancelled")
+    for assignment_id, rating in ((done, 5), (missed, 4)):
+        _insert(cursor, "reviews", assignment_id=assignment_id, reviewer_id=company, reviewee_id=worker, rating=rating)
+    _insert(cursor, "penalties", user_id=worker, type="warning", reason="遅刻", penalty_points=3)
+    _insert(cursor, "penalties", user_id=worker, type="warning", reason="期限切れ", penalty_points=5,
+            expires_at=NOW - timedelta(days=1))
+    _insert(cursor, "penalties", user_id=worker, type="suspension", reason="解除済み", penalty_points=7,
+            is_active=False)
+    service = service_with_cursor(ReputationService(), cursor)
+
+    assert service.refresh([worker, newcomer]) == 2
+    assert service.refresh([worker]) == 1  # upsert, not a second row
+
+    reputation = service.get_reputation(worker)
+    assert reputation.rating_average == 4.5 and reputation.review_count == 2
+    assert (reputation.completed_assignments, reputation.cancelled_assignments) == (1, 1)
+    assert reputation.no_show_count == 1
+    assert reputation.penalty_points == 3
+    fresh = service.get_reputation(newcomer)
+    assert fresh.rating_average is None and fresh.review_count == 0 and fresh.penalty_points == 0
+
+
+def test_facets_count_each_dimension_without_its_own_filter(jobs):
+    service, _ = jobs
+
+    facets = service.job_facets(status_filter=JobStatus.PUBLISHED, prefecture="東京都")
+
+    assert facets.total == 2
+    assert [(f.value, f.count) for f in facets.prefecture] == [("東京都", 2), ("大阪府", 1)]
+    assert [(f.value, f.count) for f in facets.hourly_rate] == [("1000", 2), ("1200", 1)]
+    assert [(f.value, f.count) for f in facets.start_date] == [("later", 2)]
+    assert [(f.value, f.count) for f in facets.tags] == [("日払い", 1)]
+
+    searched = service.job_facets(status_filter=JobStatus.PUBLISHED, prefecture="東京都", min_hourly_rate=1200, q="倉庫")
+    assert searched.total == 1
+    assert [(f.value, f.count) for f in searched.prefecture] == [("大阪府", 1), ("東京都", 1)]
+
+
+def test_search_matches_every_term_and_ranks_titles_first(jobs):
+    service, ids = jobs
+
+    both = service.list_jobs(status_filter=JobStatus.PUBLISHED, q="倉庫 軽作業", sort_by="relevance")
+    assert [job.id for job in both.items] == [ids["warehouse"]] and both.total == 1
+
+    ranked = service.list_jobs(status_filter=JobStatus.PUBLISHED, q="倉庫", sort_by="relevance")
+    assert ranked.total == 3
+    assert {job.id for job in ranked.items[:2]} == {ids["warehouse"], ids["picking"]}
+    assert ranked.items[2].id == ids["cafe"]  # description-only match
+    assert service.list_jobs(status_filter=JobStatus.PUBLISHED, q="ＰＩＣＫＩＮＧ 倉庫").total == 0
+
+
+def test_overlapping_assignment_insert_fails_with_an_exclusion_violation(cursor, service_with_cursor):
+    company = _user(cursor, "company", role="company")
+    worker = _user(cursor, "worker")
+    day = _job(cursor, company, "日勤", 10)
+    evening = _insert(
+        cursor, "jobs", company_id=company, title="夕方の勤務", description="詳細", status="published",
+        starts_at=NOW + timedelta(days=10, hours=6), ends_at=NOW + timedelta(days=10, hours=12),
+    )
+    next_day = _job(cursor, company, "翌日の勤務", 11)
+    service = service_with_cursor(AssignmentService(object(), object(), object()), cursor)
+
+    def assign(job_id):
+        application_id = _insert(cursor, "applications", job_id=job_id, worker_id=worker, status="hired")
+        return service.insert({"job_id": job_id, "worker_id": worker, "application_id": application_id})
+
+    assert assign(day)["shift_range"] is not None
+    assert assign(next_day)
+
+    cursor.execute("SAVEPOINT overlap")
+    with pytest.raises(psycopg2.Error) as exc_info:
+        assign(evening)
+    cursor.execute("ROLLBACK TO SAVEPOINT overlap")
+
+    assert exc_info.value.pgcode == "23P01" and is_shift_overlap(exc_info.value)
@@ -0,0 +1,133 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.auth import get_presence_service
+from schemas import UserRead, UserRole
+from services.presence_service import PresenceService, get_presence_store
+from utils.presence import MemoryPresenceStore
+
+WORKER = UserRead(id="w1", email="w1@example.com", full_name="W1", role=UserRole.WORKER)
+COMPANY = UserRead(id="c1", email="c1@example.com", full_name="C1", role=UserRole.COMPANY)
+
+
+def _clock(monkeypatch, start=1000.0):
+    clock = [start]
+    monkeypatch.setattr("utils.presence.time.time", lambda: clock[0])
+    return clock
+
+
+def test_heartbeats_expire_and_only_transitions_are_flushed(monkeypatch):
+    clock = _clock(monkeypatch)
+    store = MemoryPresenceStore(ttl_seconds=90)
+
+    async def scenario():
+        assert await store.heartbeat("w1", 35.69, 139.70)
+        assert not await store.heartbeat("w1", 35.69, 139.70)
+        await store.heartbeat("w2")
+        first = await store.sweep()
+        clock[0] += 60
+        await store.heartbeat("w1")
+        clock[0] += 60  # w2 missed its heartbeats
+        second = await store.sweep()
+        await store.go_offline("w1")
+        third = await store.sweep()
+        return first, second, third, await store.online(10)
+
+    first, second, third, online = asyncio.run(scenario())
+
+    assert first == (["w1", "w2"], [])
+    assert second == ([], ["w2"])
+    assert third == ([], ["w1"])
+    assert online == []
+
+
+def test_nearby_returns_live_workers_nearest_first(monkeypatch):
+    clock = _clock(monkeypatch)
+    store = MemoryPresenceStore(ttl_seconds=90)
+
+    async def scenario():
+        await store.heartbeat("shinjuku", 35.69, 139.70)
+        await store.heartbeat("shibuya", 35.66, 139.70)
+        await store.heartbeat("osaka", 34.69, 135.50)
+        await store.heartbeat("stale", 35.69, 139.71)
+        clock[0] += 60
+        await store.heartbeat("shinjuku", 35.69, 139.70)
+        await store.heartbeat("shibuya", 35.66, 139.70)
+        await store.heartbeat("osaka", 34.69, 135.50)
+        clock[0] += 60
+        return await store.nearby(35.69, 139.70, 10, 10), await store.online(2)
+
+    nearby, online = asyncio.run(scenario())
+
+    assert [user_id for user_id, _ in nearby] == ["shinjuku", "shibuya"]
+    assert nearby[1][1] > 3
+    assert len(online) == 2 and "stale" not in online
+
+
+def test_flush_writes_transitions_and_reconciles(monkeypatch):
+    store = MemoryPresenceStore(ttl_seconds=90)
+    service = PresenceService()
+    calls = []
+    monkeypatch.setattr(service, "persist", lambda joined, left: calls.append(("persist", joined, left)))
+    monkeypatch.setattr(service, "reconcile", lambda online_ids: calls.append(("reconcile", online_ids)))
+
+    async def scenario():
+        await store.heartbeat("w1")
+        await service.flush(store)
+        await service.flush(store)
+        await service.flush(store, reconcile=True)
+
+    asyncio.run(scenario())
+
+    assert calls == [
+        ("persist", ["w1"], []),
+        ("persist", [], []),
+        ("persist", [], []),
+        ("reconcile", ["w1"]),
+    ]
+
+
+def test_persist_skips_the_database_when_nothing_changed(fake_cursor, service_with_cursor):
+    service = service_with_cursor(PresenceService())
+
+    service.persist([], [])
+    service.persist(["w1"], ["w2", "w3"])
+
+    assert [params for _, params in service.cursor.executed] == [(["w1"],), (["w2", "w3"],)]
+
+
+def test_online_endpoint_reads_presence_not_the_users_flag(fake_cursor, service_with_cursor):
+    store = MemoryPresenceStore(ttl_seconds=90)
+    rows = [
+        {"id": "w2", "email": "w2@example.com", "full_name": "W2", "role": "worker"},
+        {"id": "w1", "email": "w1@example.com", "full_name": "W1", "role": "worker"},
+    ]
+    service = service_with_cursor(PresenceService(), fake_cursor(rows=rows))
+
+    def _call(user, method, path, **kwargs):
+        app.dependency_overrides.update({
+            get_current_user: lambda: user,
+            get_presence_store: lambda: store,
+            get_presence_service: lambda: service,
+        })
+        try:
+            return getattr(TestClient(app), method)(path, **kwargs)
+        finally:
+            app.dependency_overrides.clear()
+
+    assert _call(WORKER, "post", "/auth/presence/heartbeat", json={"latitude": 35.69, "longitude": 139.70}).json() == {
+        "online": True, "ttl_seconds": 90,
+    }
+    asyncio.run(store.heartbeat("w2", 35.70, 139.70))
+
+    near = _call(COMPANY, "get", "/auth/workers/online", params={"lat": 35.69, "lng": 139.70, "radius_km": 5})
+    assert [user["id"] for user in near.json()] == ["w1", "w2"]
+    # the ids come from the presence store, nearest first; the users table only fills in the rows
+    assert service.cursor.executed[-1][1] == (["w1", "w2"],)
+    assert _call(WORKER, "get", "/auth/workers/online").status_code == 403
+
+    _call(WORKER, "put", "/auth/online-status", params={"is_online": False})
+    assert [user_id for user_id, _ in asyncio.run(store.nearby(35.69, 139.70, 5, 10))] == ["w2"]
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.qr_service import SIGNED_CHECK_IN_SQL, QRService, QRTokenGone
+from utils.config import CFG
+from utils.security import create_qr_token, decode_qr_token
+
+
+class FakeDB:
+    def __init__(self, row):
+        self.row = row
+        self.queries = []
+
+    async def fetchone(self, query, params=None):
+        self.queries.append((query, params))
+        return self.row
+
+
+def _token_row(**overrides):
+    row = {
+        "token_id": "t1",
+        "used_at": None,
+        "expired": False,
+        "worker_id": "w1",
+        "started_at": None,
+        "company_name": "SIN JAPAN",
+        "checked_in_at": None,
+    }
+    row.update(overrides)
+    return row
+
+
+def test_check_in_is_a_single_statement():
+    now = datetime(2025, 11, 10, 9, 0)
+    db = FakeDB(_token_row(checked_in_at=now))
+
+    result = asyncio.run(QRService(db).check_in("w1", "tok", "a1"))
+
+    assert len(db.queries) == 1
+    assert db.queries[0][1] == {"token": "tok", "assignment_id": "a1", "worker_id": "w1"}
+    assert result["checked_in_at"] == now.isoformat()
+    assert result["company_name"] == "SIN JAPAN"
+
+
+@pytest.mark.parametrize(
+    "row, message",
+    [
+        (None, "Invalid QR code or assignment"),
+        (_token_row(worker_id="someone-else"), "This assignment is not assigned to you"),
+        (_token_row(used_at=datetime(2025, 11, 10)), "QR code has already been used"),
+        (_token_row(expired=True), "QR code has expired. Please request a new one."),
+        (_token_row(started_at=datetime(2025, 11, 10)), "Already checked in"),
+        (_token_row(), "QR code has already been used"),
+    ],
+)
+def test_check_in_failures_are_explained(row, message):
+    with pytest.raises(ValueError, match=message):
+        asyncio.run(QRService(FakeDB(row)).check_in("w1", "tok", "a1"))
+
+
+def test_check_out_reports_hours():
+    started = datetime(2025, 11, 10, 9, 0)
+    db = FakeDB(_token_row(
+        started_at=started,
+        completed_at=None,
+        hourly_rate=None,
+        checked_in_at=started,
+        checked_out_at=started + timedelta(hours=7, minutes=30),
+    ))
+
+    result = asyncio.run(QRService(db).check_out("w1", "tok", "a1"))
+
+    assert len(db.queries) == 1
+    assert result["hours_worked"] == 7.5
+
+
+def test_qr_image_is_rendered_off_loop_and_cached(monkeypatch):
+    monkeypatch.setitem(CFG, "CPU_POOL_WORKERS", 0)
+    calls = []
+    monkeypatch.setattr(
+        "services.qr_service.render_qr",
+        lambda *args: calls.append(args) or b"\x89PNG",
+    )
+    db = FakeDB({"assignment_id": "a1", "company_id": "c1", "token_type": "check_in",
+                 "used_at": None, "ttl_seconds": 120})
+    service = QRService(db)
+
+    for _ in range(2):
+        image, ttl = asyncio.run(service.get_qr_image("tok-cached", "c1"))
+
+    assert image == b"\x89PNG" and ttl == 120
+    assert len(calls) == 1
+    assert calls[0][0] == '{"token":"tok-cached","assignment_id":"a1","type":"check_in"}'
+
+
+def test_qr_image_of_used_token_is_gone():
+    db = FakeDB({"assignment_id": "a1", "company_id": "c1", "token_type": "check_in",
+                 "used_at": datetime(2025, 11, 10), "ttl_seconds": 60})
+    with pytest.raises(QRTokenGone):
+        asyncio.run(QRService(db).get_qr_image("tok", "c1"))
+    with pytest.raises(PermissionError):
+        asyncio.run(QRService(db).get_qr_image("tok", "other-company"))
+
+
+def test_signed_qr_token_round_trip_and_tampering():
+    token, expires_at = create_qr_token("a1", "check_in", 60)
+    claims = decode_qr_token(token)
+    assert (claims["a"], claims["t"], claims["e"]) == ("a1", "check_in", expires_at)
+
+    signature = token.split(".")[1]
+    forged = create_qr_token("a2", "check_in", 60)[0].split(".")[0]
+    with pytest.raises(ValueError, match="Invalid QR code"):
+        decode_qr_token(f"{forged}.{signature}")
+
+    expired, _ = create_qr_token("a1", "check_in", -1)
+    with pytest.raises(ValueError, match="expired"):
+        decode_qr_token(expired)
+
+
+def test_signed_mode_issues_without_writes(monkeypatch):
+    monkeypatch.setitem(CFG, "QR_TOKEN_MODE", "signed")
+    db = FakeDB(None)
+
+    result = asyncio.run(QRService(db).generate_qr_token("a1", "c1", "check_in", inline=False))
+
+    assert db.queries == []
+    assert decode_qr_token(result["token"])["a"] == "a1"
+    assert result["qr_code_url"] == f"/qr/image/{result['token']}"
+
+
+def test_signed_check_in_records_the_nonce():
+    token, expires_at = create_qr_token("a1", "check_in", 60)
+    now = datetime(2025, 11, 10, 9, 0)
+    db = FakeDB(_token_row(checked_in_at=now))
+
+    asyncio.run(QRService(db).check_in("w1", token, "a1"))
+
+    query, params = db.queries[0]
+    assert query == SIGNED_CHECK_IN_SQL
+    assert params == {"nonce": decode_qr_token(token)["n"], "expires_at": expires_at,
+                      "assignment_id": "a1", "worker_id": "w1"}
+
+    with pytest.raises(ValueError, match="Invalid QR code or assignment"):
+        asyncio.run(QRService(db).check_in("w1", token, "another-assignment"))
@@ -0,0 +1,114 @@
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from schemas import UserRead, UserRole
+from utils.query_profiler import QUERY_PROFILER, QueryProfiler, fingerprint
+
+ADMIN = UserRead(id="a1", email="admin@example.com", full_name="Admin", role=UserRole.ADMIN)
+
+
+class FakeConnection:
+    autocommit = False
+
+    def __init__(self):
+        self.executed = []
+
+    def cursor(self):
+        return FakeExplainCursor(self)
+
+
+class FakeExplainCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, statement, params=None):
+        self.conn.executed.append((statement, params))
+
+    def fetchall(self):
+        return [("Seq Scan on jobs",), ("Buffers: shared hit=12",)]
+
+    def close(self):
+        pass
+
+
+class FakeCursor:
+    def __init__(self, rowcount=1):
+        self.rowcount = rowcount
+        self.connection = FakeConnection()
+
+
+def test_fingerprint_strips_literals_from_fstring_sql():
+    first = fingerprint(
+        "SELECT jobs.*, 6371 * acos(cos(radians(35.68))) as distance_km FROM jobs\n"
+        "WHERE status = %s AND worker_favorites.user_id = 'a-b'::uuid LIMIT 20 OFFSET 40"
+    )
+    second = fingerprint(
+        "select jobs.*, 6371 * acos(cos(radians(34.1))) as distance_km from jobs "
+        "where status = %s and worker_favorites.user_id = 'c-d'::uuid limit 10 offset 0"
+    )
+
+    assert first == second
+    assert first == (
+        "select jobs.*, ? * acos(cos(radians(?))) as distance_km from jobs "
+        "where status = ? and worker_favorites.user_id = ?::uuid limit ? offset ?"
+    )
+    assert fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3)") == "select * from t where id in (?+)"
+    assert fingerprint("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)") == "insert into t (a, b) values (?+), ..."
+
+
+def test_stats_aggregate_per_fingerprint_in_a_bounded_table():
+    profiler = QueryProfiler(enabled=True, max_fingerprints=2, slow_ms=1000)
+    for ms in range(1, 21):
+        profiler.observe(FakeCursor(rowcount=2), f"SELECT * FROM jobs LIMIT {ms}", None, ms / 1000)
+    profiler.observe(FakeCursor(), "SELECT 1 FROM users", None, 0.001)
+    profiler.observe(FakeCursor(), "SELECT 1 FROM payments", None, 0.001)
+
+    stats = {item["fingerprint"]: item for item in profiler.snapshot()}
+
+    assert set(stats) == {"select ? from users", "select ? from payments"}  # least recently seen evicted
+
+    profiler.reset()
+    for ms in range(1, 21):
+        profiler.observe(FakeCursor(rowcount=2), f"SELECT * FROM jobs LIMIT {ms}", None, ms / 1000)
+    (jobs,) = profiler.snapshot(sort="p95")
+    assert jobs["count"] == 20
+    assert jobs["rows"] == 40
+    assert jobs["mean_ms"] == 10.5
+    assert jobs["p95_ms"] == 19.0
+
+
+def test_slow_selects_are_explained_inside_a_savepoint(monkeypatch):
+    monkeypatch.setattr("utils.query_profiler.random.random", lambda: 0.0)
+    profiler = QueryProfiler(enabled=True, slow_ms=10, explain_rate=1.0)
+    cursor = FakeCursor()
+
+    profiler.observe(cursor, "SELECT * FROM jobs WHERE id = %s", ("j1",), 0.5)
+    profiler.observe(cursor, "SELECT * FROM jobs WHERE id = %s", ("j1",), 0.5)  # rate limited
+    profiler.observe(cursor, "UPDATE jobs SET title = %s", ("x",), 0.5)  # never re-run writes
+
+    executed = [statement for statement, _ in cursor.connection.executed]
+    assert executed == [
+        "SAVEPOINT query_profiler_explain",
+        "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM jobs WHERE id = %s",
+        "RELEASE SAVEPOINT query_profiler_explain",
+    ]
+    plans = {item["fingerprint"]: item["plan"] for item in profiler.snapshot()}
+    assert plans["select * from jobs where id = ?"] == "Seq Scan on jobs\nBuffers: shared hit=12"
+
+
+def test_admin_query_stats_endpoint(monkeypatch):
+    monkeypatch.setattr(QUERY_PROFILER, "enabled", True)
+    QUERY_PROFILER.reset()
+    QUERY_PROFILER.observe(FakeCursor(), "SELECT COUNT(*) as count FROM users", None, 0.002)
+    app.dependency_overrides[get_current_user] = lambda: ADMIN
+    try:
+        client = TestClient(app)
+        body = client.get("/admin/query-stats?sort=mean").json()
+        assert body["enabled"] is True
+        assert body["items"][0]["fingerprint"] == "select count(*) as count from users"
+        assert client.get("/admin/query-stats?sort=bogus").status_code == 422
+        assert client.delete("/admin/query-stats").status_code == 204
+        assert client.get("/admin/query-stats").json()["items"] == []
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,52 @@
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from utils.rate_limit import MemoryTokenBucket
+from utils.rate_limit_middleware import RATE_LIMITED, RateLimitMiddleware, parse_limits
+from utils.security import create_access_token
+
+
+def _client(spec: str) -> TestClient:
+    async def ok(_request):
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[Route(path, ok, methods=["GET", "OPTIONS"]) for path in ("/jobs/", "/health", "/other")])
+    middleware = RateLimitMiddleware(inner, limits=parse_limits(spec))
+    middleware._redis_down_until = float("inf")  # exercise the local fallback, no Redis here
+    return TestClient(middleware)
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("utils.rate_limit.time.time", lambda: clock[0])
+    bucket = MemoryTokenBucket()
+
+    assert [bucket.take("k", 2, 1.0).allowed for _ in range(3)] == [True, True, False]
+    clock[0] += 1.0
+    assert bucket.take("k", 2, 1.0).allowed
+
+
+def test_search_group_is_throttled_per_identity():
+    client = _client("search=2/60,default=100/60")
+    before = RATE_LIMITED.value(group="search")
+
+    statuses = [client.get("/jobs/").status_code for _ in range(3)]
+    blocked = client.get("/jobs/")
+    other_user = client.get("/jobs/", headers={"Authorization": f"Bearer {create_access_token({'sub': 'u2'})}"})
+
+    assert statuses == [200, 200, 429]
+    assert int(blocked.headers["retry-after"]) >= 1
+    assert other_user.status_code == 200
+    assert client.get("/other").status_code == 200
+    assert RATE_LIMITED.value(group="search") == before + 2
+
+
+def test_exempt_paths_and_preflight_are_not_counted():
+    client = _client("default=1/60")
+
+    assert all(client.get("/health").status_code == 200 for _ in range(3))
+    assert all(client.options("/other").status_code == 200 for _ in range(3))
+    assert client.get("/other").status_code == 200
+    assert client.get("/other").status_code == 429
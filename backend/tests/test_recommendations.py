@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from schemas import JobRead, UserRead, UserRole
+from services import recommendation_service
+from services.job_index import JobIndex, WorkerProfile
+from services.recommendation_service import RecommendationService
+
+NOW = datetime(2025, 11, 1, 9, tzinfo=timezone.utc)
+
+
+def _job(job_id, prefecture, lat, lng, rate=1200, tags=(), company="c1", urgent=False, age_days=1):
+    return {
+        "id": job_id,
+        "company_id": company,
+        "prefecture": prefecture,
+        "latitude": lat,
+        "longitude": lng,
+        "hourly_rate": rate,
+        "tags": list(tags),
+        "is_urgent": urgent,
+        "created_at": NOW - timedelta(days=age_days),
+    }
+
+
+JOBS = [
+    _job("near", "東京都", 35.69, 139.70),
+    _job("forklift", "東京都", 35.72, 139.75, tags=["フォークリフト"]),
+    _job("well-paid", "東京都", 35.75, 139.80, rate=2000),
+    _job("yokohama", "神奈川県", 35.45, 139.64),
+    _job("osaka", "大阪府", 34.69, 135.52, rate=3000, tags=["フォークリフト"]),
+    _job("applied", "東京都", 35.69, 139.70),
+]
+
+
+def _profile(**overrides):
+    values = dict(
+        latitude=35.69,
+        longitude=139.70,
+        prefecture="東京都",
+        qualifications=["フォークリフト"],
+        applied={"applied"},
+        history=[],
+    )
+    values.update(overrides)
+    return WorkerProfile(**values)
+
+
+def _index():
+    index = JobIndex(capacity=2)
+    index.load(JOBS)
+    return index
+
+
+def test_feed_is_limited_to_the_segment_and_skips_applied_jobs():
+    ranked = _index().rank(_profile(), now=NOW.timestamp())
+
+    assert ranked == ["forklift", "near", "well-paid", "yokohama"]
+
+
+def test_history_affinity_and_missing_location():
+    profile = _profile(latitude=None, longitude=None, qualifications=[], history=[(["フォークリフト"], "c9")])
+
+    assert _index().rank(profile, now=NOW.timestamp())[0] == "forklift"
+    assert _profile(prefecture=None, latitude=34.7, longitude=135.5).segment == "大阪府"
+    assert _profile(prefecture=None, latitude=None, longitude=None).segment == "*"
+
+
+def test_incremental_publish_and_close():
+    index = _index()
+    _, version = index.candidates("東京都")
+
+    index.upsert(_job("new", "東京都", 35.69, 139.70, tags=["フォークリフト"], urgent=True, age_days=0))
+    _, new_version = index.candidates("東京都")
+    assert new_version == version + 1
+    assert index.rank(_profile(), now=NOW.timestamp())[0] == "new"
+
+    index.upsert(_job("new", "北海道", 43.06, 141.35))
+    index.remove("near")
+    assert set(index.rank(_profile(), now=NOW.timestamp())) == {"forklift", "well-paid", "yokohama"}
+    assert not index.is_active("near")
+
+
+def _page(closed=()):
+    def rows(sql, params):
+        return [
+            {**job, "title": job["id"], "description": "x", "created_at": None}
+            for job in JOBS
+            if job["id"] in params[0] and job["id"] not in closed
+        ]
+
+    return rows
+
+
+class FakeJobService:
+    def _enrich_jobs_with_company(self, rows):
+        return [JobRead(**row) for row in rows]
+
+
+USER = UserRead(
+    id="w1", email="w@example.com", full_name="W", role=UserRole.WORKER,
+    latitude=35.69, longitude=139.70, preferred_prefecture="東京都", qualifications=["フォークリフト"],
+)
+
+
+@pytest.fixture
+def feed_service(monkeypatch, fake_cursor, service_with_cursor):
+    monkeypatch.setattr(recommendation_service, "_feed_cache", {})
+
+    def build(closed=()):
+        cursor = fake_cursor(
+            rows=[{"job_id": "applied", "company_id": "c1", "tags": [], "applied": True}],
+            results=[("id = ANY", _page(closed)), ("status = 'published'", JOBS)],
+        )
+        return service_with_cursor(RecommendationService(index=JobIndex(), job_service=FakeJobService()), cursor)
+
+    return build
+
+
+def test_feed_is_cached_per_worker(feed_service):
+    service = feed_service()
+
+    first = service.feed(USER, page=1, size=2)
+    second = service.feed(USER, page=2, size=2)
+
+    assert first.total == 4 and [job.id for job in first.items] == ["forklift", "near"]
+    assert [job.id for job in second.items] == ["well-paid", "yokohama"]
+    # index load and profile once, then one lookup per page
+    assert [params for _, params in service.cursor.executed] == [
+        None,
+        ("w1", "w1"),
+        (["forklift", "near"],),
+        (["well-paid", "yokohama"],),
+    ]
+
+
+def test_jobs_closed_elsewhere_drop_out_of_the_feed(feed_service):
+    service = feed_service(closed={"forklift"})
+
+    first = service.feed(USER, page=1, size=2)
+    again = service.feed(USER, page=1, size=2)
+
+    assert [job.id for job in first.items] == ["near"]
+    assert not service.index.is_active("forklift")
+    assert again.total == 3 and [job.id for job in again.items] == ["near", "well-paid"]
+
+
+def test_feed_failures_become_a_500(feed_service):
+    service = feed_service()
+
+    def fail(sql, params):
+        raise RuntimeError("db down")
+
+    service.cursor.rows = fail
+
+    with pytest.raises(HTTPException) as exc_info:
+        service.feed(USER)
+
+    assert exc_info.value.status_code == 500
@@ -0,0 +1,103 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.reviews import get_reputation_service
+from schemas import UserRead, UserRole
+from services import reputation_service as reputation_module
+from services.reputation_service import ReputationService, refresh_reputation
+
+
+def _reputation_cursor(fake_cursor, users=(), applied=False):
+    return fake_cursor(
+        rows=[{"user_id": "w1", "rating_average": 4.5, "review_count": 2, "no_show_count": 1}],
+        results=[
+            ("INSERT INTO worker_reputation", lambda sql, params: params["user_ids"]),
+            ("FROM penalties", [{"user_id": user} for user in users]),
+            ("SELECT id::text", lambda sql, params: [{"id": u} for u in users if u > params[0]][: params[1]]),
+            ("FROM applications", [{"applied": applied}]),
+        ],
+    )
+
+
+def test_refresh_recomputes_only_the_touched_users(fake_cursor, service_with_cursor):
+    service = service_with_cursor(ReputationService(), _reputation_cursor(fake_cursor))
+
+    assert service.refresh(["w2", None, "w1", "w2"]) == 2
+    assert service.cursor.executed[0][1] == {"user_ids": ["w1", "w2"]}
+    assert service.refresh([None]) == 0 and len(service.cursor.executed) == 1
+
+
+def test_rebuild_walks_users_in_keyset_batches(fake_cursor, service_with_cursor):
+    cursor = _reputation_cursor(fake_cursor, users=["u1", "u2", "u3", "u4", "u5"])
+
+    assert service_with_cursor(ReputationService(), cursor).rebuild(batch_size=2) == 5
+
+    pages = [params for sql, params in cursor.executed if sql.startswith("SELECT id::text")]
+    assert pages == [(reputation_module.FIRST_UUID, 2), ("u2", 2), ("u4", 2), ("u5", 2)]
+    assert [params["user_ids"] for sql, params in cursor.executed if isinstance(params, dict)] == [
+        ["u1", "u2"],
+        ["u3", "u4"],
+        ["u5"],
+    ]
+
+
+def test_refresh_due_picks_up_ended_shifts_and_expired_penalties(fake_cursor, service_with_cursor):
+    cursor = _reputation_cursor(fake_cursor, users=["w3", "w1"])
+    since = datetime(2025, 11, 10, 9, 0, tzinfo=timezone.utc)
+    until = datetime(2025, 11, 10, 9, 5, tzinfo=timezone.utc)
+
+    assert service_with_cursor(ReputationService(), cursor).refresh_due(since, until) == 2
+
+    (_, window), (_, refreshed) = cursor.executed
+    assert window == {"since": since, "until": until}
+    assert refreshed == {"user_ids": ["w1", "w3"]}
+
+
+def test_refresh_failures_do_not_break_the_write(monkeypatch, caplog):
+    def boom(self, user_ids):
+        raise RuntimeError("db down")
+
+    monkeypatch.setattr(ReputationService, "refresh", boom)
+
+    refresh_reputation("w1")
+
+    assert "Failed to refresh reputation" in caplog.text
+
+
+@pytest.fixture
+def get_reputation(fake_cursor, service_with_cursor):
+    def get(viewer, applied=False):
+        service = service_with_cursor(ReputationService(), _reputation_cursor(fake_cursor, applied=applied))
+        overrides = {get_reputation_service: lambda: service}
+        if viewer is not None:
+            overrides[get_current_user] = lambda: viewer
+        app.dependency_overrides.update(overrides)
+        try:
+            return TestClient(app).get("/reviews/reputation/w1")
+        finally:
+            app.dependency_overrides.clear()
+
+    return get
+
+
+def test_reputation_endpoint_reads_one_row(get_reputation):
+    response = get_reputation(UserRead(id="w1", email="w1@example.com", full_name="W1", role=UserRole.WORKER))
+
+    assert response.status_code == 200
+    assert response.json()["rating_average"] == 4.5 and response.json()["no_show_count"] == 1
+
+
+def test_penalty_fields_are_limited_to_the_user_admins_and_hiring_companies(get_reputation):
+    company = UserRead(id="c1", email="c1@example.com", full_name="C1", role=UserRole.COMPANY)
+    admin = UserRead(id="a1", email="a1@example.com", full_name="A1", role=UserRole.ADMIN)
+
+    assert get_reputation(None).status_code == 401
+    assert get_reputation(admin).json()["no_show_count"] == 1
+    assert get_reputation(company, applied=True).json()["no_show_count"] == 1
+    other = get_reputation(company).json()
+    assert other["rating_average"] == 4.5
+    assert other["no_show_count"] is None and other["penalty_points"] is None
@@ -0,0 +1,45 @@
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.jobs import get_job_service
+from schemas import JobList, JobRead, UserRead, UserRole
+
+USER = UserRead(id="u1", email="worker@example.com", full_name="Worker", role=UserRole.WORKER)
+
+
+class FakeJobService:
+    def list_jobs(self, **_):
+        items = [
+            JobRead(id=f"job-{i}", company_id="c1", title=f"Job {i}", description="x" * 2000, hourly_rate=1200)
+            for i in range(5)
+        ]
+        return JobList(items=items, total=5, page=1, size=20)
+
+
+def _get(path: str, **kwargs):
+    app.dependency_overrides.update({get_current_user: lambda: USER, get_job_service: FakeJobService})
+    try:
+        return TestClient(app).get(path, **kwargs)
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_sparse_fieldset_on_job_list():
+    response = _get("/jobs/?fields=title,hourly_rate")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 5
+    assert body["items"][0] == {"id": "job-0", "title": "Job 0", "hourly_rate": 1200}
+
+
+def test_unknown_field_is_rejected():
+    assert _get("/jobs/?fields=title,password_hash").status_code == 400
+
+
+def test_large_list_is_gzipped():
+    response = _get("/jobs/", headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"][0]["description"]) == 2000
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.assignments import get_job_service, get_schedule_service
+from schemas import AssignmentCreate, ApplicationStatus, JobRead, JobStatus, UserRead, UserRole
+from services.assignment_service import AssignmentService
+from services.schedule_service import ScheduleService, shift_window
+
+START = datetime(2025, 11, 3, 9, tzinfo=timezone.utc)
+JOB = JobRead(
+    id="job-1", company_id="c1", title="倉庫内作業", description="x", status=JobStatus.PUBLISHED,
+    starts_at=START, ends_at=START + timedelta(hours=8),
+)
+
+
+def _conflict(worker, job_id, hours):
+    return {
+        "worker_id": worker, "assignment_id": f"as-{worker}-{job_id}", "job_id": job_id, "job_title": job_id,
+        "starts_at": START + timedelta(hours=hours[0]), "ends_at": START + timedelta(hours=hours[1]),
+    }
+
+
+@pytest.fixture
+def schedule(fake_cursor, service_with_cursor):
+    def build(rows):
+        return service_with_cursor(ScheduleService(), fake_cursor(rows=rows))
+
+    return build
+
+
+def test_shift_window_matches_the_sql_range_rule():
+    assert shift_window(None, None) is None
+    assert shift_window(START, None) == (START, START + timedelta(minutes=1))
+    assert shift_window(START, START + timedelta(hours=2)) == (START, START + timedelta(hours=2))
+
+
+def test_bulk_check_is_one_query_and_keeps_request_order(schedule):
+    schedule = schedule([_conflict("w2", "early", (-2, 1)), _conflict("w2", "late", (7, 10))])
+
+    result = schedule.check_shift(JOB, ["w3", "w2", "w1", "w3"])
+
+    assert [(item.worker_id, item.available) for item in result.items] == [("w3", True), ("w2", False), ("w1", True)]
+    assert [c.job_id for c in result.items[1].conflicts] == ["early", "late"]
+    (_, params), = schedule.cursor.executed
+    assert params == (["w1", "w2", "w3"], START, START + timedelta(hours=8))
+
+
+def test_unscheduled_jobs_never_conflict(schedule):
+    schedule = schedule([_conflict("w1", "other", (0, 1))])
+
+    result = schedule.check_shift(JOB.model_copy(update={"starts_at": None}), ["w1"])
+
+    assert result.items[0].available and schedule.cursor.executed == []
+
+
+class FakeApplications:
+    def get_application(self, application_id):
+        return SimpleNamespace(id=application_id, job_id="job-1", worker_id="w1", status=ApplicationStatus.HIRED)
+
+    def update_application(self, application_id, payload):
+        return None
+
+
+class FakeJobs:
+    def get_job(self, job_id):
+        return JOB
+
+
+class ExclusionViolation(Exception):
+    pgcode = "23P01"
+
+
+def test_create_assignment_rejects_overlapping_shifts(monkeypatch, schedule):
+    busy = AssignmentService(FakeApplications(), FakeJobs(), schedule([_conflict("w1", "夜勤", (6, 12))]))
+    with pytest.raises(HTTPException) as precheck:
+        busy.create_assignment(AssignmentCreate(application_id="app-1"))
+    assert precheck.value.status_code == 409 and "夜勤" in precheck.value.detail
+
+    # a concurrent insert that slips past the pre-check hits the exclusion constraint
+    racing = AssignmentService(FakeApplications(), FakeJobs(), schedule([]))
+
+    def insert(record):
+        raise ExclusionViolation()
+
+    monkeypatch.setattr(racing, "insert", insert)
+    with pytest.raises(HTTPException) as constraint:
+        racing.create_assignment(AssignmentCreate(application_id="app-1"))
+    assert constraint.value.status_code == 409
+
+
+def test_check_endpoint_is_limited_to_the_owning_company(schedule):
+    def _post(user):
+        app.dependency_overrides.update({
+            get_current_user: lambda: user,
+            get_job_service: FakeJobs,
+            get_schedule_service: lambda: schedule([_conflict("w2", "other", (1, 2))]),
+        })
+        try:
+            return TestClient(app).post("/assignments/conflicts/check", json={"job_id": "job-1", "worker_ids": ["w1", "w2"]})
+        finally:
+            app.dependency_overrides.clear()
+
+    owner = UserRead(id="c1", email="c1@example.com", full_name="C1", role=UserRole.COMPANY)
+    other = UserRead(id="c2", email="c2@example.com", full_name="C2", role=UserRole.COMPANY)
+
+    response = _post(owner)
+    assert response.status_code == 200
+    assert [item["available"] for item in response.json()["items"]] == [True, False]
+    assert _post(other).status_code == 403
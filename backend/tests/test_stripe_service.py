@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+import stripe
+from fastapi import HTTPException
+
+from schemas import PaymentCreate
+from services.payment_service import PaymentService
+from services.stripe_service import STRIPE_LATENCY, StripeService
+
+
+class FakeStripeHandler(BaseHTTPRequestHandler):
+    """Local stand-in for api.stripe.com; the first call per path fails with a retryable 500."""
+
+    requests = []
+    failed_once = set()
+    delay = 0.0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode())
+        type(self).requests.append((self.path, self.headers.get("Idempotency-Key"), form))
+        if self.delay:
+            threading.Event().wait(self.delay)
+        if self.path not in self.failed_once:
+            self.failed_once.add(self.path)
+            self._send(500, {"error": {"type": "api_error", "message": "try again"}}, retry=True)
+            return
+        self._send(200, {
+            "id": "pi_fake_1",
+            "object": "payment_intent",
+            "amount": int(form["amount"][0]),
+            "status": "requires_payment_method",
+        })
+
+    def _send(self, code, body, retry=False):
+        data = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if retry:
+            self.send_header("Stripe-Should-Retry", "true")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def fake_stripe():
+    FakeStripeHandler.requests = []
+    FakeStripeHandler.failed_once = set()
+    FakeStripeHandler.delay = 0.0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStripeHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _service(base_url: str, call_timeout: float = 10.0) -> StripeService:
+    client = stripe.StripeClient(
+        "sk_test_fake",
+        http_client=stripe.HTTPXClient(timeout=5),
+        max_network_retries=2,
+        base_addresses={"api": base_url},
+    )
+    service = StripeService(client=client)
+    service.call_timeout = call_timeout
+    return service
+
+
+def test_payment_intent_retries_with_same_idempotency_key(fake_stripe):
+    service = _service(fake_stripe)
+    before = STRIPE_LATENCY.count(operation="payment_intent.create", outcome="ok")
+
+    intent = asyncio.run(service.create_payment_intent(1500, "acct_123", idempotency_key="payment-a1-1500"))
+
+    assert intent.id == "pi_fake_1"
+    assert intent.amount == 1500
+    keys = [key for path, key, _ in FakeStripeHandler.requests]
+    assert len(keys) == 2
+    assert keys == ["payment-a1-1500", "payment-a1-1500"]
+    form = FakeStripeHandler.requests[-1][2]
+    assert form["application_fee_amount"] == ["150"]
+    assert form["transfer_data[destination]"] == ["acct_123"]
+    assert STRIPE_LATENCY.count(operation="payment_intent.create", outcome="ok") == before + 1
+
+
+def test_payment_intent_call_timeout(fake_stripe):
+    FakeStripeHandler.delay = 1.0
+    service = _service(fake_stripe, call_timeout=0.2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(service.create_payment_intent(1500, "acct_123"))
+
+    assert exc_info.value.status_code == 504
+
+
+def _payments_table():
+    """payments rows keyed by intent, with the unique intent index."""
+    rows = {}
+
+    def insert(sql, params):
+        columns = [c.strip() for c in sql.split("(", 1)[1].split(")", 1)[0].split(",")]
+        record = dict(zip(columns, params))
+        if record["stripe_payment_intent_id"] in rows:
+            return []
+        rows[record["stripe_payment_intent_id"]] = record
+        return [record]
+
+    def select(sql, params):
+        return [rows[params[0]]] if params[0] in rows else []
+
+    return rows, [("INSERT INTO payments", insert), ("SELECT * FROM payments", select)]
+
+
+class FakeAssignments:
+    def get_assignment(self, assignment_id):
+        return type("Assignment", (), {"metadata": {"worker_stripe_account": "acct_123"}})()
+
+
+def test_retried_payment_create_returns_the_existing_row(fake_stripe, fake_cursor, service_with_cursor):
+    FakeStripeHandler.failed_once.add("/v1/payment_intents")
+    rows, results = _payments_table()
+    service = service_with_cursor(
+        PaymentService(stripe_service=_service(fake_stripe), assignment_service=FakeAssignments()),
+        fake_cursor(results=results),
+    )
+    payload = PaymentCreate(assignment_id="a1", amount=1500)
+
+    first = asyncio.run(service.create_payment(payload))
+    second = asyncio.run(service.create_payment(payload))
+
+    assert first.id == second.id
+    assert second.stripe_payment_intent_id == "pi_fake_1"
+    assert len(rows) == 1
+    assert service.cursor.executed[-1][1] == ("pi_fake_1",)
@@ -0,0 +1,67 @@
+import hashlib
+import hmac
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+from main import app
+from routers.payments import get_stripe_event_service
+from utils.config import CFG
+
+
+class FakeEventService:
+    def __init__(self):
+        self.seen = {}
+
+    def record_event(self, event):
+        if event["id"] in self.seen:
+            return False
+        self.seen[event["id"]] = event
+        return True
+
+
+def _signed(payload: bytes) -> str:
+    timestamp = int(time.time())
+    signed_payload = f"{timestamp}.".encode() + payload
+    signature = hmac.new(CFG["STRIPE_WEBHOOK_SECRET"].encode(), signed_payload, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={signature}"
+
+
+def test_webhook_stores_event_once():
+    events = FakeEventService()
+    app.dependency_overrides[get_stripe_event_service] = lambda: events
+    try:
+        client = TestClient(app)
+        payload = json.dumps({
+            "id": "evt_test_1",
+            "object": "event",
+            "type": "payment_intent.succeeded",
+            "created": 1700000000,
+            "data": {"object": {"id": "pi_1", "object": "payment_intent", "status": "succeeded"}},
+        }).encode()
+
+        first = client.post("/payments/webhook", content=payload, headers={"Stripe-Signature": _signed(payload)})
+        retry = client.post("/payments/webhook", content=payload, headers={"Stripe-Signature": _signed(payload)})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    assert first.json() == {"received": True, "duplicate": False}
+    assert retry.status_code == 200
+    assert retry.json()["duplicate"] is True
+    assert list(events.seen) == ["evt_test_1"]
+
+
+def test_webhook_rejects_bad_signature():
+    app.dependency_overrides[get_stripe_event_service] = FakeEventService
+    try:
+        client = TestClient(app)
+        response = client.post(
+            "/payments/webhook",
+            content=b'{"id": "evt_x"}',
+            headers={"Stripe-Signature": "t=1,v1=deadbeef"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 400
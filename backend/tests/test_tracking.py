@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from dependencies import get_current_user
+from main import app
+from routers.assignments import get_tracking_service, track_events
+from schemas import UserRead, UserRole
+from services.tracking_service import TrackingService, downsample, forget_access, get_track_buffer
+from utils.security import create_access_token
+from utils.tracking import MemoryTrackBuffer
+
+ACCESS = {"assignment_id": "as-1", "worker_id": "w1", "company_id": "c1", "status": "in_delivery"}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_access_cache(monkeypatch):
+    monkeypatch.setattr("services.tracking_service._access_cache", {})
+
+
+def _walk(start, count, step_seconds=2.0, step_degrees=0.0001):
+    # ~11 m north per fix
+    return [(start + i * step_seconds, 35.68 + i * step_degrees, 139.76, 5.0, None) for i in range(count)]
+
+
+def test_downsample_keeps_a_point_per_interval_or_distance():
+    walking = _walk(1000.0, 30)
+    kept = downsample(list(reversed(walking)), None, min_seconds=30, min_meters=50)
+    assert [p[0] for p in kept] == [1000.0, 1010.0, 1020.0, 1030.0, 1040.0, 1050.0]
+
+    parked = [(1000.0 + i * 2, 35.68, 139.76, 5.0, None) for i in range(40)]
+    assert [p[0] for p in downsample(parked, None, min_seconds=30, min_meters=50)] == [1000.0, 1030.0, 1060.0]
+
+    # a repeated fix with and without optional fields does not break the ordering
+    assert len(downsample([(1000.0, 35.68, 139.76, None, None), (1000.0, 35.68, 139.76, 5.0, 2.0)], None, 30, 50)) == 1
+
+    # continues from the last persisted point and ignores anything not newer
+    assert [p[0] for p in downsample(walking, walking[20], 30, 50)] == [1050.0]
+
+
+@pytest.fixture
+def service_for(fake_cursor, service_with_cursor):
+    def build(access=None):
+        return service_with_cursor(TrackingService(), fake_cursor(rows=[access] if access else []))
+
+    return build
+
+
+def test_flush_bulk_inserts_downsampled_points_once(service_for):
+    buffer = MemoryTrackBuffer(size=500)
+    service = service_for()
+
+    async def scenario():
+        await buffer.append("as-1", _walk(1000.0, 15))
+        await buffer.append("as-2", _walk(1000.0, 3))
+        first = await service.flush(buffer, since=0)
+        second = await service.flush(buffer, since=0)
+        await buffer.append("as-1", _walk(1000.0, 30)[15:])
+        third = await service.flush(buffer, since=0)
+        return first, second, third
+
+    assert asyncio.run(scenario()) == (4, 0, 3)
+    (_, params), (_, later) = service.cursor.executed
+    assert params[0] == ["as-1", "as-1", "as-1", "as-2"]
+    assert [ts.timestamp() for ts in later[1]] == [1030.0, 1040.0, 1050.0]
+
+
+def test_ingest_is_limited_to_the_assigned_worker_during_delivery(service_for):
+    buffer = MemoryTrackBuffer(size=10)
+    access = dict(ACCESS)
+    service = service_for(access)
+    app.dependency_overrides.update({get_tracking_service: lambda: service, get_track_buffer: lambda: buffer})
+    batch = {"points": [
+        {"latitude": 35.68, "longitude": 139.76, "recorded_at": "2025-11-10T09:00:02Z"},
+        {"latitude": 35.69, "longitude": 139.76, "recorded_at": "2025-11-10T09:00:00Z", "speed_mps": 8.5},
+        {"latitude": 35.69, "longitude": 139.76, "recorded_at": "2025-11-10T09:00:00Z"},  # duplicate fix
+    ]}
+
+    def _post(worker_id):
+        token = create_access_token({"sub": worker_id, "role": "worker"})
+        return TestClient(app).post(
+            "/assignments/as-1/locations", json=batch, headers={"Authorization": f"Bearer {token}"}
+        )
+
+    try:
+        assert _post("w1").json() == {"accepted": 3}
+        assert _post("w2").status_code == 403
+        access["status"] = "delivered"
+        assert _post("w1").status_code == 202  # served from the access cache
+        forget_access("as-1")
+        assert _post("w1").status_code == 409
+    finally:
+        app.dependency_overrides.clear()
+
+    points = asyncio.run(buffer.recent(["as-1"]))["as-1"]
+    assert [p[1] for p in points[:3]] == [35.69, 35.69, 35.68]
+    # one access lookup per cache miss, bound to the assignment
+    assert [params for _, params in service.cursor.executed] == [("as-1",), ("as-1",)]
+
+
+def test_stream_sends_snapshot_then_live_batches_until_delivery_ends(service_for):
+    buffer = MemoryTrackBuffer(size=10)
+    access = dict(ACCESS)
+    service = service_for(access)
+
+    async def scenario():
+        await buffer.append("as-1", _walk(1000.0, 2))
+        events = track_events("as-1", buffer, service, keepalive=0.01)
+        received = [await events.__anext__()]
+        await buffer.append("as-1", _walk(1004.0, 1))
+        received.append(await events.__anext__())
+        received.append(await events.__anext__())  # keepalive while idle
+        access["status"] = "delivered"
+        forget_access("as-1")
+        received.extend([event async for event in events])
+        return received
+
+    snapshot, live, idle, end = asyncio.run(scenario())
+
+    assert snapshot.startswith("event: snapshot") and len(json.loads(snapshot.split("data: ")[1])) == 2
+    assert live.startswith("event: points")
+    assert json.loads(live.split("data: ")[1])[0]["recorded_at"].startswith("1970-01-01T00:16:44")
+    assert idle == ": keepalive\n\n"
+    assert end.startswith("event: end")
+    assert buffer._fanout.queues == {}
+
+
+def test_stream_is_limited_to_the_company_and_worker(service_for):
+    buffer = MemoryTrackBuffer(size=10)
+
+    def _get(user):
+        app.dependency_overrides.update({
+            get_current_user: lambda: user,
+            get_tracking_service: lambda: service_for({**ACCESS, "status": "delivered"}),
+            get_track_buffer: lambda: buffer,
+        })
+        try:
+            return TestClient(app).get("/assignments/as-1/locations/stream")
+        finally:
+            app.dependency_overrides.clear()
+
+    owner = UserRead(id="c1", email="c1@example.com", full_name="C1", role=UserRole.COMPANY)
+    other = UserRead(id="c2", email="c2@example.com", full_name="C2", role=UserRole.COMPANY)
+
+    response = _get(owner)
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text.endswith("event: end\ndata: {}\n\n")
+    assert _get(other).status_code == 403
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from routers import files
+from services.storage_service import KEY_PATTERN, LocalStorageBackend, S3StorageBackend, content_key
+from utils.static_files import ImmutableStaticFiles
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
+
+
+@pytest.fixture
+def incoming_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(files, "INCOMING_DIR", tmp_path)
+    return tmp_path
+
+
+def _upload(content: bytes, filename: str = "photo.jpg") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def test_upload_is_hashed_and_typed_while_streaming(incoming_dir):
+    upload = asyncio.run(files.receive_upload_file(_upload(PNG), files.ALLOWED_IMAGE_TYPES))
+
+    assert upload.content_type == "image/png"
+    assert upload.sha256 == hashlib.sha256(PNG).hexdigest()
+    assert upload.path.read_bytes() == PNG
+
+
+def test_oversized_upload_is_aborted_without_leftovers(incoming_dir, monkeypatch):
+    monkeypatch.setattr(files, "MAX_FILE_SIZE", 64)
+    monkeypatch.setattr(files, "CHUNK_SIZE", 16)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(files.receive_upload_file(_upload(PNG), files.ALLOWED_IMAGE_TYPES))
+
+    assert exc.value.status_code == 413
+    assert list(incoming_dir.iterdir()) == []
+
+
+def test_upload_with_disallowed_content_is_rejected(incoming_dir):
+    pdf = _upload(b"%PDF-1.7 ...", filename="avatar.png")
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(files.receive_upload_file(pdf, files.ALLOWED_IMAGE_TYPES))
+
+    assert exc.value.status_code == 400
+    assert list(incoming_dir.iterdir()) == []
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    backend = LocalStorageBackend(tmp_path / "store")
+    key = content_key(hashlib.sha256(PNG).hexdigest(), "image/png")
+    for name in ("a.part", "b.part"):
+        source = tmp_path / name
+        source.write_bytes(PNG)
+        backend.put(key, source, "image/png")
+        assert not source.exists()
+
+    assert KEY_PATTERN.search(key)
+    assert [p.name for p in (tmp_path / "store").rglob("*") if p.is_file()] == [key.split("/")[-1]]
+
+
+def test_stored_files_are_served_immutable_with_etag_and_range(tmp_path):
+    key = content_key(hashlib.sha256(PNG).hexdigest(), "image/png")
+    (tmp_path / key).parent.mkdir(parents=True)
+    (tmp_path / key).write_bytes(PNG)
+    (tmp_path / "legacy_avatar.png").write_bytes(PNG)
+    (tmp_path / ".incoming").mkdir()
+    (tmp_path / ".incoming" / "x.part").write_bytes(PNG)
+    app = Starlette(routes=[Mount("/uploads", ImmutableStaticFiles(directory=tmp_path, immutable_pattern=KEY_PATTERN))])
+    client = TestClient(app)
+
+    response = client.get(f"/uploads/{key}")
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+
+    assert client.get(f"/uploads/{key}", headers={"If-None-Match": etag}).status_code == 304
+    partial = client.get(f"/uploads/{key}", headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206 and partial.content == PNG[:8]
+    assert client.get("/uploads/legacy_avatar.png").headers["cache-control"] == "no-cache"
+
+    private_key = content_key(hashlib.sha256(PNG).hexdigest(), "image/png", private=True)
+    (tmp_path / private_key).parent.mkdir(parents=True)
+    (tmp_path / private_key).write_bytes(PNG)
+    assert KEY_PATTERN.search(f"/uploads/{private_key}").group(1) == private_key
+    assert client.get(f"/uploads/{private_key}").headers["cache-control"] == "private, no-store"
+    assert client.get("/uploads/.incoming/x.part").status_code == 404
+
+
+class FakeS3Client:
+    """boto3 S3 client stand-in recording the calls the backend makes."""
+
+    class NotFound(Exception):
+        response = {"Error": {"Code": "404"}}
+
+    def __init__(self):
+        self.objects = {}
+        self.calls = []
+
+    def head_object(self, Bucket, Key):
+        self.calls.append(("head", Bucket, Key))
+        if (Bucket, Key) not in self.objects:
+            raise self.NotFound()
+        return {}
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs):
+        self.calls.append(("upload", Bucket, Key, ExtraArgs))
+        with open(Filename, "rb") as f:
+            self.objects[(Bucket, Key)] = f.read()
+
+    def delete_object(self, Bucket, Key):
+        self.calls.append(("delete", Bucket, Key))
+        self.objects.pop((Bucket, Key), None)
+
+
+def _put_twice(backend, key, tmp_path):
+    for name in ("a.part", "b.part"):
+        source = tmp_path / name
+        source.write_bytes(PNG)
+        backend.put(key, source, "image/png")
+        assert not source.exists()
+
+
+def test_s3_backend_uploads_once_with_cache_headers(tmp_path):
+    client = FakeS3Client()
+    backend = S3StorageBackend("uploads", public_url="https://cdn.example.com/", client=client)
+    digest = hashlib.sha256(PNG).hexdigest()
+    key = content_key(digest, "image/png")
+    private_key = content_key(digest, "image/png", private=True)
+
+    _put_twice(backend, key, tmp_path)
+    _put_twice(backend, private_key, tmp_path)
+    backend.delete(key)
+
+    assert key == f"{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert [call[0] for call in client.calls] == ["head", "upload", "head", "head", "upload", "head", "delete"]
+    uploads = {call[2]: call[3] for call in client.calls if call[0] == "upload"}
+    assert uploads[key] == {"ContentType": "image/png", "CacheControl": "public, max-age=31536000, immutable"}
+    assert uploads[private_key]["CacheControl"] == "private, no-store"
+    assert list(client.objects) == [("uploads", private_key)]
+    assert backend.url(key) == f"https://cdn.example.com/{key}"
+
+
+def test_s3_backend_against_moto(tmp_path, monkeypatch):
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="uploads")
+        backend = S3StorageBackend("uploads", client=client)
+        key = content_key(hashlib.sha256(PNG).hexdigest(), "image/png")
+
+        _put_twice(backend, key, tmp_path)
+        stored = client.get_object(Bucket="uploads", Key=key)
+        assert stored["Body"].read() == PNG
+        assert stored["CacheControl"] == "public, max-age=31536000, immutable"
+        backend.delete(key)
+        assert client.list_objects_v2(Bucket="uploads").get("KeyCount") == 0
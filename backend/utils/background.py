@@ -0,0 +1,28 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List
+
+logger = logging.getLogger(__name__)
+
+_tasks: List[asyncio.Task] = []
+
+
+def start_background_task(name: str, factory: Callable[[], Awaitable[None]]) -> None:
+    """Run a long-lived coroutine for the lifetime of the app process."""
+
+    async def _runner() -> None:
+        try:
+            await factory()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error(f"Background task {name} stopped: {exc}")
+
+    _tasks.append(asyncio.create_task(_runner(), name=name))
+
+
+async def stop_background_tasks() -> None:
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from pydantic import Field, field_validator
@@ -15,8 +15,73 @@ class Settings(BaseSettings):
     STRIPE_CONNECT_CLIENT_ID: str = Field(..., env="STRIPE_CONNECT_CLIENT_ID")
     STRIPE_WEBHOOK_SECRET: str = Field(..., env="STRIPE_WEBHOOK_SECRET")
     STRIPE_PLATFORM_FEE: int = Field(10, env="STRIPE_PLATFORM_FEE")
+    STRIPE_API_BASE: Optional[str] = Field(None, env="STRIPE_API_BASE")
+    STRIPE_TIMEOUT_SECONDS: float = Field(10.0, env="STRIPE_TIMEOUT_SECONDS")
+    STRIPE_CALL_TIMEOUT_SECONDS: float = Field(30.0, env="STRIPE_CALL_TIMEOUT_SECONDS")
+    STRIPE_MAX_NETWORK_RETRIES: int = Field(2, env="STRIPE_MAX_NETWORK_RETRIES")
+    STRIPE_EVENT_WORKER_ENABLED: bool = Field(True, env="STRIPE_EVENT_WORKER_ENABLED")
+    STRIPE_EVENT_POLL_SECONDS: float = Field(5.0, env="STRIPE_EVENT_POLL_SECONDS")
+    STRIPE_EVENT_BATCH_SIZE: int = Field(50, env="STRIPE_EVENT_BATCH_SIZE")
+    STRIPE_EVENT_MAX_ATTEMPTS: int = Field(5, env="STRIPE_EVENT_MAX_ATTEMPTS")
     FIREBASE_KEY: str = Field(..., env="FIREBASE_KEY")
     REDIS_URL: str = Field("redis://localhost:6379/0", env="REDIS_URL")
+    GZIP_MIN_SIZE: int = Field(1000, env="GZIP_MIN_SIZE")
+    GZIP_LEVEL: int = Field(5, env="GZIP_LEVEL")
+    RATE_LIMIT_ENABLED: bool = Field(True, env="RATE_LIMIT_ENABLED")
+    RATE_LIMITS: str = Field(
+        "auth=10/60,search=120/60,messaging=120/60,uploads=20/60,default=600/60",
+        env="RATE_LIMITS",
+    )
+    RATE_LIMIT_REDIS_TIMEOUT_SECONDS: float = Field(0.05, env="RATE_LIMIT_REDIS_TIMEOUT_SECONDS")
+    RATE_LIMIT_REDIS_RETRY_SECONDS: float = Field(5.0, env="RATE_LIMIT_REDIS_RETRY_SECONDS")
+    METRICS_ENABLED: bool = Field(True, env="METRICS_ENABLED")
+    METRICS_TOKEN: Optional[str] = Field(None, env="METRICS_TOKEN")
+    DB_QUERY_LOG_THRESHOLD: int = Field(20, env="DB_QUERY_LOG_THRESHOLD")
+    QUERY_PROFILER_ENABLED: bool = Field(False, env="QUERY_PROFILER_ENABLED")
+    QUERY_PROFILER_MAX_FINGERPRINTS: int = Field(500, env="QUERY_PROFILER_MAX_FINGERPRINTS")
+    QUERY_PROFILER_SLOW_MS: float = Field(200.0, env="QUERY_PROFILER_SLOW_MS")
+    QUERY_PROFILER_EXPLAIN_RATE: float = Field(0.0, env="QUERY_PROFILER_EXPLAIN_RATE")
+    JOB_FACETS_CACHE_SECONDS: int = Field(60, env="JOB_FACETS_CACHE_SECONDS")
+    RECOMMENDATION_CACHE_SECONDS: int = Field(300, env="RECOMMENDATION_CACHE_SECONDS")
+    RECOMMENDATION_RELOAD_SECONDS: int = Field(600, env="RECOMMENDATION_RELOAD_SECONDS")
+    AUTO_MATCH_WORKER_ENABLED: bool = Field(True, env="AUTO_MATCH_WORKER_ENABLED")
+    AUTO_MATCH_POLL_SECONDS: float = Field(15.0, env="AUTO_MATCH_POLL_SECONDS")
+    AUTO_MATCH_RADIUS_KM: float = Field(15.0, env="AUTO_MATCH_RADIUS_KM")
+    AUTO_MATCH_OFFER_SECONDS: int = Field(180, env="AUTO_MATCH_OFFER_SECONDS")
+    AUTO_MATCH_WAVE_FACTOR: int = Field(3, env="AUTO_MATCH_WAVE_FACTOR")
+    AUTO_MATCH_MAX_WAVES: int = Field(5, env="AUTO_MATCH_MAX_WAVES")
+    AUTO_MATCH_CANDIDATE_POOL: int = Field(2000, env="AUTO_MATCH_CANDIDATE_POOL")
+    PRESENCE_TTL_SECONDS: int = Field(90, env="PRESENCE_TTL_SECONDS")
+    PRESENCE_FLUSH_ENABLED: bool = Field(True, env="PRESENCE_FLUSH_ENABLED")
+    PRESENCE_FLUSH_SECONDS: float = Field(60.0, env="PRESENCE_FLUSH_SECONDS")
+    PRESENCE_RECONCILE_SECONDS: int = Field(900, env="PRESENCE_RECONCILE_SECONDS")
+    REPUTATION_REFRESH_ENABLED: bool = Field(True, env="REPUTATION_REFRESH_ENABLED")
+    REPUTATION_REFRESH_SECONDS: float = Field(300.0, env="REPUTATION_REFRESH_SECONDS")
+    TRACK_BUFFER_SIZE: int = Field(120, env="TRACK_BUFFER_SIZE")
+    TRACK_BUFFER_TTL_SECONDS: int = Field(3600, env="TRACK_BUFFER_TTL_SECONDS")
+    TRACK_ACCESS_CACHE_SECONDS: int = Field(30, env="TRACK_ACCESS_CACHE_SECONDS")
+    TRACK_FLUSH_ENABLED: bool = Field(True, env="TRACK_FLUSH_ENABLED")
+    TRACK_FLUSH_SECONDS: float = Field(15.0, env="TRACK_FLUSH_SECONDS")
+    TRACK_PERSIST_SECONDS: float = Field(30.0, env="TRACK_PERSIST_SECONDS")
+    TRACK_PERSIST_METERS: float = Field(50.0, env="TRACK_PERSIST_METERS")
+    TRACK_STREAM_KEEPALIVE_SECONDS: float = Field(15.0, env="TRACK_STREAM_KEEPALIVE_SECONDS")
+    GEOCODE_NOMINATIM_ENABLED: bool = Field(True, env="GEOCODE_NOMINATIM_ENABLED")
+    GEOCODE_NOMINATIM_URL: str = Field("https://nominatim.openstreetmap.org/search", env="GEOCODE_NOMINATIM_URL")
+    GEOCODE_USER_AGENT: str = Field("WorkNow/1.0 (Job Matching Platform)", env="GEOCODE_USER_AGENT")
+    GEOCODE_TIMEOUT_SECONDS: float = Field(10.0, env="GEOCODE_TIMEOUT_SECONDS")
+    GEOCODE_MIN_INTERVAL_SECONDS: float = Field(1.0, env="GEOCODE_MIN_INTERVAL_SECONDS")
+    GEOCODE_INLINE_MAX_WAIT_SECONDS: float = Field(2.0, env="GEOCODE_INLINE_MAX_WAIT_SECONDS")
+    GEOCODE_CACHE_TTL_SECONDS: int = Field(90 * 24 * 3600, env="GEOCODE_CACHE_TTL_SECONDS")
+    GEOCODE_NEGATIVE_TTL_SECONDS: int = Field(24 * 3600, env="GEOCODE_NEGATIVE_TTL_SECONDS")
+    GEOCODE_REFINER_ENABLED: bool = Field(True, env="GEOCODE_REFINER_ENABLED")
+    GEOCODE_REFINER_POLL_SECONDS: float = Field(30.0, env="GEOCODE_REFINER_POLL_SECONDS")
+    GEOCODE_REFINER_BATCH_SIZE: int = Field(20, env="GEOCODE_REFINER_BATCH_SIZE")
+    GEOCODE_REFINER_MAX_ATTEMPTS: int = Field(5, env="GEOCODE_REFINER_MAX_ATTEMPTS")
+    PHONE_CODE_TTL_SECONDS: int = Field(300, env="PHONE_CODE_TTL_SECONDS")
+    PHONE_CODE_MAX_ATTEMPTS: int = Field(5, env="PHONE_CODE_MAX_ATTEMPTS")
+    PHONE_SEND_LIMIT_PER_PHONE: int = Field(3, env="PHONE_SEND_LIMIT_PER_PHONE")
+    PHONE_SEND_LIMIT_PER_IP: int = Field(10, env="PHONE_SEND_LIMIT_PER_IP")
+    PHONE_SEND_WINDOW_SECONDS: int = Field(3600, env="PHONE_SEND_WINDOW_SECONDS")
     JWT_SECRET: str = Field(..., env="JWT_SECRET")
     JWT_EXPIRE_MINUTES: int = Field(60, env="JWT_EXPIRE_MINUTES")
     DOMAIN: str = Field(..., env="DOMAIN")
@@ -24,6 +89,16 @@ class Settings(BaseSettings):
     CORS_ORIGINS: str = Field("", env="CORS_ORIGINS")
     ENVIRONMENT: str = Field("production", env="ENVIRONMENT")
     PORT: int = Field(8000, env="PORT")
+    CPU_POOL_WORKERS: int = Field(2, env="CPU_POOL_WORKERS")
+    QR_IMAGE_SIZE_PX: int = Field(320, env="QR_IMAGE_SIZE_PX")
+    QR_TOKEN_MODE: str = Field("table", env="QR_TOKEN_MODE")
+    QR_TOKEN_SECRET: Optional[str] = Field(None, env="QR_TOKEN_SECRET")
+    STORAGE_BACKEND: str = Field("local", env="STORAGE_BACKEND")
+    STORAGE_S3_BUCKET: Optional[str] = Field(None, env="STORAGE_S3_BUCKET")
+    STORAGE_S3_ENDPOINT_URL: Optional[str] = Field(None, env="STORAGE_S3_ENDPOINT_URL")
+    STORAGE_S3_REGION: Optional[str] = Field(None, env="STORAGE_S3_REGION")
+    STORAGE_PUBLIC_URL: Optional[str] = Field(None, env="STORAGE_PUBLIC_URL")
+    STORAGE_GC_GRACE_HOURS: int = Field(24, env="STORAGE_GC_GRACE_HOURS")
 
     @field_validator("CORS_ORIGINS", mode="after")
     @classmethod
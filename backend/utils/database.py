@@ -1,14 +1,32 @@
 from functools import lru_cache
 from typing import Optional
 import os
+import time
 
 import psycopg2
 from psycopg2.extras import RealDictCursor
-from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.pool import PoolError, ThreadedConnectionPool
 import redis.asyncio as aioredis
 from supabase import Client, create_client
 
 from .config import CFG
+from .metrics import Counter, Gauge, Histogram
+
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections", "Postgres pool connections by state (in_use, idle, max)", ("state",)
+)
+DB_POOL_WAITING = Gauge(
+    "db_pool_waiting", "Threads currently acquiring a pooled connection (checkout plus health check)"
+)
+DB_POOL_ACQUIRE_SECONDS = Histogram(
+    "db_pool_acquire_seconds", "Time to check out a healthy pooled connection"
+)
+DB_POOL_BROKEN = Counter(
+    "db_pool_broken_connections_total", "Pooled connections discarded because they were broken"
+)
+DB_POOL_EXHAUSTED = Counter(
+    "db_pool_exhausted_total", "Checkouts that failed because every pooled connection was in use"
+)
 
 
 @lru_cache()
@@ -35,7 +53,32 @@ def get_pg_pool() -> ThreadedConnectionPool:
     return _pg_pool
 
 
+def refresh_pool_metrics() -> None:
+    """Copy the current pool occupancy into the pool gauges (called at scrape time)."""
+    pool = _pg_pool
+    if pool is None:
+        return
+    DB_POOL_CONNECTIONS.set(len(pool._used), state="in_use")
+    DB_POOL_CONNECTIONS.set(len(pool._pool), state="idle")
+    DB_POOL_CONNECTIONS.set(pool.maxconn, state="max")
+
+
 def get_pg_connection():
+    # ThreadedConnectionPool never queues: "waiting" is the number of checkouts in
+    # progress and an exhausted pool raises PoolError immediately.
+    DB_POOL_WAITING.inc()
+    start = time.perf_counter()
+    try:
+        return _checkout_pg_connection()
+    except PoolError:
+        DB_POOL_EXHAUSTED.inc()
+        raise
+    finally:
+        DB_POOL_WAITING.dec()
+        DB_POOL_ACQUIRE_SECONDS.observe(time.perf_counter() - start)
+
+
+def _checkout_pg_connection():
     pool = get_pg_pool()
     max_retries = 3
     
@@ -51,6 +94,7 @@ def get_pg_connection():
                 return conn
             except (psycopg2.OperationalError, psycopg2.InterfaceError):
                 # Connection is bad, close it
+                DB_POOL_BROKEN.inc()
                 try:
                     pool.putconn(conn, close=True)
                 except:
@@ -94,6 +138,7 @@ def release_pg_connection(conn):
     pool = get_pg_pool()
     try:
         if conn.closed:
+            DB_POOL_BROKEN.inc()
             pool.putconn(conn, close=True)
         else:
             # Defensive rollback to clean up any leftover transaction
@@ -101,6 +146,7 @@ def release_pg_connection(conn):
                 conn.rollback()
             except (psycopg2.InterfaceError, psycopg2.OperationalError):
                 # Connection is bad, close it
+                DB_POOL_BROKEN.inc()
                 pool.putconn(conn, close=True)
                 return
             pool.putconn(conn)
@@ -0,0 +1,93 @@
+"""Per-request database accounting.
+
+``InstrumentedCursor`` times every statement and appends it to the ``QueryLog`` of
+the current request. The log lives in a context variable, which Starlette copies
+into threadpool workers, so queries run via ``run_in_threadpool`` are attributed
+to the request that issued them.
+"""
+
+import time
+from collections import Counter as _Tally
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from psycopg2.extras import RealDictCursor
+
+from .query_profiler import QUERY_PROFILER
+
+
+class QueryLog:
+    def __init__(self) -> None:
+        # (statement, seconds); list.append is atomic, so concurrent threads may share it
+        self.queries: List[Tuple[str, float]] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def summary(self, limit: int = 20) -> List[str]:
+        """Distinct statements, most repeated first, e.g. ``"12x 3.1ms SELECT ..."``."""
+        tally = _Tally()
+        seconds = {}
+        for statement, duration in self.queries:
+            key = " ".join(statement.split())[:300]
+            tally[key] += 1
+            seconds[key] = seconds.get(key, 0.0) + duration
+        return [
+            f"{count}x {seconds[key] * 1000:.1f}ms {key}"
+            for key, count in tally.most_common(limit)
+        ]
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryLog]:
+    log = QueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+
+
+def record_query(statement, seconds: float) -> None:
+    log = _current_log.get()
+    if log is not None:
+        if isinstance(statement, bytes):
+            statement = statement.decode("utf-8", "replace")
+        log.queries.append((str(statement), seconds))
+
+
+class InstrumentedCursor(RealDictCursor):
+    """RealDictCursor that reports each statement's duration to the current QueryLog
+    and, when enabled, to the query profiler."""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        finally:
+            elapsed = time.perf_counter() - start
+            record_query(query, elapsed)
+        if QUERY_PROFILER.enabled:
+            QUERY_PROFILER.observe(self, query, vars, elapsed)
+        return result
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        finally:
+            elapsed = time.perf_counter() - start
+            record_query(query, elapsed)
+        if QUERY_PROFILER.enabled:
+            # no EXPLAIN for batches: there is no single parameter set to replay
+            QUERY_PROFILER.observe(self, query, None, elapsed, explain=False)
+        return result
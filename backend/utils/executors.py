@@ -0,0 +1,40 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import CFG
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Bounded pool for CPU-bound work (image rendering/processing) that must not run on the event loop."""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=int(CFG["CPU_POOL_WORKERS"]),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+async def run_cpu_bound(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a picklable, module-level function in the CPU pool and await its result.
+
+    With CPU_POOL_WORKERS=0 the work runs on the thread pool instead.
+    """
+    if int(CFG["CPU_POOL_WORKERS"]) <= 0:
+        return await run_in_threadpool(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_process_pool(), partial(func, *args, **kwargs))
+
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
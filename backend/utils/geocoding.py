@@ -0,0 +1,101 @@
+import hashlib
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from redis.asyncio import Redis
+
+Coordinates = Tuple[float, float]
+
+# Hands out request slots ``interval`` apart to every caller on every process. The
+# caller sleeps for the returned delay; a slot further away than ARGV[3] is refused
+# (-1) and nothing is reserved. Floats go back as strings, Lua numbers would truncate.
+RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local interval = tonumber(ARGV[2])
+local start = math.max(now, tonumber(redis.call('GET', KEYS[1]) or '0'))
+if start - now > tonumber(ARGV[3]) then
+    return '-1'
+end
+redis.call('SET', KEYS[1], tostring(start + interval), 'PX', math.ceil((start - now + interval) * 1000) + 1000)
+return tostring(start - now)
+"""
+
+NOT_FOUND = ""
+
+
+def _encode(coordinates: Optional[Coordinates]) -> str:
+    return NOT_FOUND if coordinates is None else f"{coordinates[0]:.7f},{coordinates[1]:.7f}"
+
+
+def _decode(value: str) -> Optional[Coordinates]:
+    if value == NOT_FOUND:
+        return None
+    lat, lng = value.split(",")
+    return float(lat), float(lng)
+
+
+class RedisGeocodeStore:
+    """Geocode results by normalized address, the shared request slot and the refinement queue."""
+
+    def __init__(self, redis: Redis, prefix: str = "geocode") -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self.slot_key = f"{prefix}:slot"
+        self.queue_key = f"{prefix}:queue"
+        self._reserve = redis.register_script(RESERVE_SCRIPT)
+
+    def _key(self, address: str) -> str:
+        return f"{self.prefix}:addr:{hashlib.sha1(address.encode()).hexdigest()}"
+
+    async def get(self, address: str) -> Tuple[bool, Optional[Coordinates]]:
+        """(hit, coordinates); a hit with None coordinates is a cached "not found"."""
+        value = await self.redis.get(self._key(address))
+        return (False, None) if value is None else (True, _decode(value))
+
+    async def set(self, address: str, coordinates: Optional[Coordinates], ttl_seconds: int) -> None:
+        await self.redis.set(self._key(address), _encode(coordinates), ex=ttl_seconds)
+
+    async def reserve(self, interval: float, max_wait: float) -> Optional[float]:
+        """Seconds to wait before the reserved request, or None if that would exceed ``max_wait``."""
+        delay = float(await self._reserve(keys=[self.slot_key], args=[time.time(), interval, max_wait]))
+        return None if delay < 0 else delay
+
+    async def push(self, job_ids: List[str]) -> None:
+        if job_ids:
+            await self.redis.rpush(self.queue_key, *job_ids)
+
+    async def pop(self, count: int) -> List[str]:
+        return await self.redis.lpop(self.queue_key, count) or []
+
+
+class MemoryGeocodeStore:
+    """In-process store with the same semantics, for tests and as the fallback when Redis is down."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Tuple[float, str]] = {}
+        self._next_slot = 0.0
+        self._queue: Deque[str] = deque()
+
+    async def get(self, address: str) -> Tuple[bool, Optional[Coordinates]]:
+        entry = self._values.get(address)
+        if entry is None or entry[0] <= time.time():
+            return False, None
+        return True, _decode(entry[1])
+
+    async def set(self, address: str, coordinates: Optional[Coordinates], ttl_seconds: int) -> None:
+        self._values[address] = (time.time() + ttl_seconds, _encode(coordinates))
+
+    async def reserve(self, interval: float, max_wait: float) -> Optional[float]:
+        now = time.time()
+        start = max(now, self._next_slot)
+        if start - now > max_wait:
+            return None
+        self._next_slot = start + interval
+        return start - now
+
+    async def push(self, job_ids: List[str]) -> None:
+        self._queue.extend(job_ids)
+
+    async def pop(self, count: int) -> List[str]:
+        return [self._queue.popleft() for _ in range(min(count, len(self._queue)))]
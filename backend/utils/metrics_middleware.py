@@ -0,0 +1,82 @@
+import logging
+import time
+from typing import Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .config import CFG
+from .db_instrumentation import track_queries
+from .metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Request latency by route template", ("method", "route")
+)
+REQUESTS = Counter(
+    "http_requests_total", "Requests by route template and status", ("method", "route", "status")
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled")
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database statements executed per request",
+    ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250),
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent in database statements per request", ("route",)
+)
+
+# Requests that did not match a route share one label so paths can't blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def _route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Records latency, status and per-request DB usage, labelled by route template
+    (``/jobs/{job_id}``), and logs requests that run more than ``DB_QUERY_LOG_THRESHOLD``
+    statements together with their query list."""
+
+    def __init__(self, app: ASGIApp, query_log_threshold: Optional[int] = None) -> None:
+        self.app = app
+        self.query_log_threshold = (
+            CFG["DB_QUERY_LOG_THRESHOLD"] if query_log_threshold is None else query_log_threshold
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT.inc()
+        start = time.perf_counter()
+        with track_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+                IN_FLIGHT.dec()
+                route = _route_template(scope)
+                method = scope["method"]
+                REQUEST_LATENCY.observe(elapsed, method=method, route=route)
+                REQUESTS.inc(method=method, route=route, status=str(status))
+                REQUEST_DB_QUERIES.observe(queries.count, route=route)
+                REQUEST_DB_SECONDS.observe(queries.total_seconds, route=route)
+                if 0 < self.query_log_threshold < queries.count:
+                    summary = "\n  ".join(queries.summary())
+                    logger.warning(
+                        f"{method} {scope['path']} ran {queries.count} queries "
+                        f"({queries.total_seconds * 1000:.1f}ms in DB, {elapsed * 1000:.1f}ms total):\n  {summary}"
+                    )
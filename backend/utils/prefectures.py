@@ -0,0 +1,137 @@
+"""The 47 prefectures with the coordinates of their prefectural office and population.
+
+Also the city / ward office of each designated city and of Tokyo's 23 wards, which
+with the prefectures serve as the offline fallback for geocoding.
+"""
+
+from typing import Dict, NamedTuple, Optional, Tuple
+
+
+class Prefecture(NamedTuple):
+    name: str
+    latitude: float
+    longitude: float
+    population_10k: int  # 万人, rounded
+
+
+PREFECTURES: Tuple[Prefecture, ...] = (
+    Prefecture("北海道", 43.0642, 141.3469, 522),
+    Prefecture("青森県", 40.8244, 140.7400, 124),
+    Prefecture("岩手県", 39.7036, 141.1527, 121),
+    Prefecture("宮城県", 38.2688, 140.8721, 230),
+    Prefecture("秋田県", 39.7186, 140.1024, 96),
+    Prefecture("山形県", 38.2404, 140.3633, 107),
+    Prefecture("福島県", 37.7500, 140.4678, 183),
+    Prefecture("茨城県", 36.3418, 140.4468, 287),
+    Prefecture("栃木県", 36.5657, 139.8836, 193),
+    Prefecture("群馬県", 36.3911, 139.0608, 194),
+    Prefecture("埼玉県", 35.8569, 139.6489, 734),
+    Prefecture("千葉県", 35.6051, 140.1233, 628),
+    Prefecture("東京都", 35.6895, 139.6917, 1405),
+    Prefecture("神奈川県", 35.4478, 139.6425, 924),
+    Prefecture("新潟県", 37.9022, 139.0236, 220),
+    Prefecture("富山県", 36.6953, 137.2113, 103),
+    Prefecture("石川県", 36.5947, 136.6256, 113),
+    Prefecture("福井県", 36.0652, 136.2216, 77),
+    Prefecture("山梨県", 35.6642, 138.5684, 81),
+    Prefecture("長野県", 36.6513, 138.1810, 205),
+    Prefecture("岐阜県", 35.3912, 136.7223, 198),
+    Prefecture("静岡県", 34.9769, 138.3831, 363),
+    Prefecture("愛知県", 35.1802, 136.9066, 754),
+    Prefecture("三重県", 34.7303, 136.5086, 177),
+    Prefecture("滋賀県", 35.0045, 135.8686, 141),
+    Prefecture("京都府", 35.0214, 135.7556, 258),
+    Prefecture("大阪府", 34.6863, 135.5200, 884),
+    Prefecture("兵庫県", 34.6913, 135.1830, 547),
+    Prefecture("奈良県", 34.6851, 135.8328, 133),
+    Prefecture("和歌山県", 34.2260, 135.1675, 92),
+    Prefecture("鳥取県", 35.5039, 134.2377, 55),
+    Prefecture("島根県", 35.4723, 133.0505, 67),
+    Prefecture("岡山県", 34.6618, 133.9344, 189),
+    Prefecture("広島県", 34.3966, 132.4596, 280),
+    Prefecture("山口県", 34.1859, 131.4714, 134),
+    Prefecture("徳島県", 34.0657, 134.5593, 72),
+    Prefecture("香川県", 34.3401, 134.0434, 95),
+    Prefecture("愛媛県", 33.8416, 132.7657, 133),
+    Prefecture("高知県", 33.5597, 133.5311, 69),
+    Prefecture("福岡県", 33.6064, 130.4181, 513),
+    Prefecture("佐賀県", 33.2494, 130.2988, 81),
+    Prefecture("長崎県", 32.7448, 129.8737, 131),
+    Prefecture("熊本県", 32.7898, 130.7417, 174),
+    Prefecture("大分県", 33.2382, 131.6126, 112),
+    Prefecture("宮崎県", 31.9111, 131.4239, 107),
+    Prefecture("鹿児島県", 31.5602, 130.5581, 159),
+    Prefecture("沖縄県", 26.2124, 127.6809, 147),
+)
+
+PREFECTURES_BY_NAME: Dict[str, Prefecture] = {prefecture.name: prefecture for prefecture in PREFECTURES}
+
+MUNICIPALITIES: Dict[str, Dict[str, Tuple[float, float]]] = {
+    "北海道": {"札幌市": (43.0621, 141.3544)},
+    "宮城県": {"仙台市": (38.2682, 140.8694)},
+    "埼玉県": {"さいたま市": (35.8617, 139.6455)},
+    "千葉県": {"千葉市": (35.6073, 140.1063)},
+    "東京都": {
+        "千代田区": (35.6940, 139.7536),
+        "中央区": (35.6706, 139.7720),
+        "港区": (35.6581, 139.7514),
+        "新宿区": (35.6938, 139.7035),
+        "文京区": (35.7080, 139.7524),
+        "台東区": (35.7127, 139.7800),
+        "墨田区": (35.7107, 139.8015),
+        "江東区": (35.6730, 139.8171),
+        "品川区": (35.6092, 139.7302),
+        "目黒区": (35.6414, 139.6982),
+        "大田区": (35.5613, 139.7160),
+        "世田谷区": (35.6464, 139.6533),
+        "渋谷区": (35.6640, 139.6982),
+        "中野区": (35.7074, 139.6637),
+        "杉並区": (35.6995, 139.6364),
+        "豊島区": (35.7263, 139.7168),
+        "北区": (35.7528, 139.7335),
+        "荒川区": (35.7361, 139.7834),
+        "板橋区": (35.7512, 139.7093),
+        "練馬区": (35.7356, 139.6517),
+        "足立区": (35.7750, 139.8044),
+        "葛飾区": (35.7435, 139.8472),
+        "江戸川区": (35.7067, 139.8683),
+    },
+    "神奈川県": {
+        "横浜市": (35.4437, 139.6380),
+        "川崎市": (35.5308, 139.7029),
+        "相模原市": (35.5714, 139.3734),
+    },
+    "新潟県": {"新潟市": (37.9162, 139.0364)},
+    "静岡県": {"静岡市": (34.9756, 138.3827), "浜松市": (34.7108, 137.7261)},
+    "愛知県": {"名古屋市": (35.1815, 136.9066)},
+    "京都府": {"京都市": (35.0116, 135.7681)},
+    "大阪府": {"大阪市": (34.6937, 135.5023), "堺市": (34.5733, 135.4830)},
+    "兵庫県": {"神戸市": (34.6901, 135.1955)},
+    "岡山県": {"岡山市": (34.6551, 133.9195)},
+    "広島県": {"広島市": (34.3853, 132.4553)},
+    "福岡県": {"北九州市": (33.8834, 130.8752), "福岡市": (33.5902, 130.4017)},
+    "熊本県": {"熊本市": (32.8031, 130.7079)},
+}
+
+# Designated-city names are unique nationwide, so an address may omit its prefecture.
+_CITY_PREFECTURES: Dict[str, str] = {
+    city: prefecture
+    for prefecture, cities in MUNICIPALITIES.items()
+    for city in cities
+    if city.endswith("市")
+}
+
+
+def find_centroid(address: str) -> Optional[Tuple[float, float]]:
+    """Municipality centroid for a normalized address, else its prefecture's; None when neither is known."""
+    prefecture = next((name for name in PREFECTURES_BY_NAME if address.startswith(name)), None)
+    rest = address[len(prefecture):] if prefecture else address
+    if prefecture is None:
+        prefecture = next((_CITY_PREFECTURES[city] for city in _CITY_PREFECTURES if rest.startswith(city)), None)
+    if prefecture is None:
+        return None
+    for name, coordinates in MUNICIPALITIES.get(prefecture, {}).items():
+        if rest.startswith(name):
+            return coordinates
+    office = PREFECTURES_BY_NAME[prefecture]
+    return office.latitude, office.longitude
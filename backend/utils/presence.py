@@ -0,0 +1,156 @@
+import math
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+
+# Members that came online / went offline since the last flush are collected in two
+# sets so the users table only sees transitions, never individual heartbeats.
+HEARTBEAT_SCRIPT = """
+local added = redis.call('ZADD', KEYS[1], ARGV[2], ARGV[1])
+if added == 1 then
+    redis.call('SADD', KEYS[3], ARGV[1])
+end
+redis.call('SREM', KEYS[4], ARGV[1])
+if ARGV[3] ~= '' then
+    redis.call('GEOADD', KEYS[2], ARGV[3], ARGV[4], ARGV[1])
+end
+return added
+"""
+
+OFFLINE_SCRIPT = """
+local removed = redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+if removed == 1 then
+    redis.call('SREM', KEYS[3], ARGV[1])
+    redis.call('SADD', KEYS[4], ARGV[1])
+end
+return removed
+"""
+
+# Drop members not seen since ARGV[1], then hand over (and reset) the transition sets.
+SWEEP_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for i = 1, #expired, 1000 do
+    local chunk = {unpack(expired, i, math.min(i + 999, #expired))}
+    redis.call('ZREM', KEYS[1], unpack(chunk))
+    redis.call('ZREM', KEYS[2], unpack(chunk))
+    redis.call('SREM', KEYS[3], unpack(chunk))
+    redis.call('SADD', KEYS[4], unpack(chunk))
+end
+local joined = redis.call('SMEMBERS', KEYS[3])
+local left = redis.call('SMEMBERS', KEYS[4])
+redis.call('DEL', KEYS[3], KEYS[4])
+return {joined, left}
+"""
+
+
+class RedisPresenceStore:
+    """Last-seen times in a sorted set plus a GEO set of positions, shared by all workers."""
+
+    def __init__(self, redis: Redis, ttl_seconds: int, prefix: str = "presence") -> None:
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.keys = [f"{prefix}:seen", f"{prefix}:geo", f"{prefix}:joined", f"{prefix}:left"]
+        self._heartbeat = redis.register_script(HEARTBEAT_SCRIPT)
+        self._offline = redis.register_script(OFFLINE_SCRIPT)
+        self._sweep = redis.register_script(SWEEP_SCRIPT)
+
+    async def heartbeat(self, user_id: str, latitude: Optional[float] = None, longitude: Optional[float] = None) -> bool:
+        """Record a heartbeat; True when the user was not online before."""
+        position = ["", ""] if latitude is None or longitude is None else [longitude, latitude]
+        return bool(await self._heartbeat(keys=self.keys, args=[user_id, time.time(), *position]))
+
+    async def go_offline(self, user_id: str) -> bool:
+        return bool(await self._offline(keys=self.keys, args=[user_id]))
+
+    async def online(self, limit: int) -> List[str]:
+        """Most recently seen first."""
+        cutoff = time.time() - self.ttl_seconds
+        return await self.redis.zrevrangebyscore(self.keys[0], "+inf", cutoff, start=0, num=limit)
+
+    async def nearby(self, latitude: float, longitude: float, radius_km: float, limit: int) -> List[Tuple[str, float]]:
+        """(user_id, distance_km) of live members inside the radius, nearest first."""
+        found = await self.redis.geosearch(
+            self.keys[1], longitude=longitude, latitude=latitude, radius=radius_km, unit="km",
+            sort="ASC", count=limit * 2, withdist=True,
+        )
+        if not found:
+            return []
+        seen = await self.redis.zmscore(self.keys[0], [member for member, _ in found])
+        cutoff = time.time() - self.ttl_seconds
+        live = [(member, float(dist)) for (member, dist), at in zip(found, seen) if at is not None and at > cutoff]
+        return live[:limit]
+
+    async def all_online(self) -> List[str]:
+        return await self.redis.zrangebyscore(self.keys[0], time.time() - self.ttl_seconds, "+inf")
+
+    async def sweep(self) -> Tuple[List[str], List[str]]:
+        """Expire stale members and return (joined, left) since the previous sweep."""
+        joined, left = await self._sweep(keys=self.keys, args=[time.time() - self.ttl_seconds])
+        return list(joined), list(left)
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+class MemoryPresenceStore:
+    """In-process store with the same semantics, for tests and single-worker development."""
+
+    def __init__(self, ttl_seconds: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._seen: Dict[str, float] = {}
+        self._positions: Dict[str, Tuple[float, float]] = {}
+        self._joined: Set[str] = set()
+        self._left: Set[str] = set()
+
+    async def heartbeat(self, user_id: str, latitude: Optional[float] = None, longitude: Optional[float] = None) -> bool:
+        added = user_id not in self._seen
+        self._seen[user_id] = time.time()
+        if added:
+            self._joined.add(user_id)
+        self._left.discard(user_id)
+        if latitude is not None and longitude is not None:
+            self._positions[user_id] = (latitude, longitude)
+        return added
+
+    async def go_offline(self, user_id: str) -> bool:
+        self._positions.pop(user_id, None)
+        if self._seen.pop(user_id, None) is None:
+            return False
+        self._joined.discard(user_id)
+        self._left.add(user_id)
+        return True
+
+    def _live(self) -> Dict[str, float]:
+        cutoff = time.time() - self.ttl_seconds
+        return {user_id: at for user_id, at in self._seen.items() if at > cutoff}
+
+    async def online(self, limit: int) -> List[str]:
+        live = self._live()
+        return sorted(live, key=live.get, reverse=True)[:limit]
+
+    async def nearby(self, latitude: float, longitude: float, radius_km: float, limit: int) -> List[Tuple[str, float]]:
+        live = self._live()
+        found = [
+            (user_id, _distance_km(latitude, longitude, *position))
+            for user_id, position in self._positions.items()
+            if user_id in live
+        ]
+        return sorted((item for item in found if item[1] <= radius_km), key=lambda item: item[1])[:limit]
+
+    async def all_online(self) -> List[str]:
+        return list(self._live())
+
+    async def sweep(self) -> Tuple[List[str], List[str]]:
+        live = self._live()
+        for user_id in [user_id for user_id in self._seen if user_id not in live]:
+            await self.go_offline(user_id)
+        joined, left = sorted(self._joined), sorted(self._left)
+        self._joined.clear()
+        self._left.clear()
+        return joined, left
@@ -0,0 +1,58 @@
+"""QR image rendering.
+
+Kept free of app imports so it can run inside worker processes of the CPU pool.
+"""
+
+import io
+
+import qrcode
+
+QUIET_ZONE = 4
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+
+def _build(data: str, target_px: int) -> qrcode.QRCode:
+    # version=None + fit picks the smallest symbol that holds the data
+    qr = qrcode.QRCode(version=None, box_size=1, border=QUIET_ZONE)
+    qr.add_data(data)
+    qr.make(fit=True)
+    qr.box_size = max(1, target_px // (qr.modules_count + 2 * QUIET_ZONE))
+    return qr
+
+
+def _svg(qr: qrcode.QRCode, target_px: int) -> bytes:
+    # One path of horizontal runs in module units; much smaller than per-module rects
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    runs = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < size:
+            if row[x]:
+                start = x
+                while x < size and row[x]:
+                    x += 1
+                runs.append(f"M{start} {y}h{x - start}v1h-{x - start}z")
+            else:
+                x += 1
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{target_px}" height="{target_px}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{"".join(runs)}" fill="#000"/></svg>'
+    ).encode()
+
+
+def render_qr(data: str, fmt: str = "png", target_px: int = 320) -> bytes:
+    """Render ``data`` as PNG (1-bit) or SVG path bytes close to ``target_px`` wide."""
+    qr = _build(data, target_px)
+    if fmt == "svg":
+        return _svg(qr, target_px)
+    buffer = io.BytesIO()
+    img = qr.make_image(fill_color="black", back_color="white")
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -0,0 +1,186 @@
+"""Opt-in query profiler fed by ``InstrumentedCursor``.
+
+Statements are grouped by fingerprint (literals, placeholders and IN-lists replaced
+by ``?``) so f-string SQL with inlined values still aggregates. Slow statements are
+logged, and a sample of slow SELECTs can be re-run under ``EXPLAIN (ANALYZE, BUFFERS)``.
+"""
+
+import logging
+import math
+import random
+import re
+import time
+from collections import deque
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional
+
+from cachetools import LRUCache
+
+from .config import CFG
+
+logger = logging.getLogger(__name__)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_PARAMS = re.compile(r"%\(\w+\)s|%s")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.I)
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACES = re.compile(r"\s+")
+
+SAMPLES_PER_FINGERPRINT = 200
+EXPLAIN_INTERVAL_SECONDS = 300
+MAX_EXAMPLE_LENGTH = 2000
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """``SELECT * FROM jobs WHERE id = 'x' LIMIT 20`` -> ``select * from jobs where id = ? limit ?``."""
+    text = _COMMENTS.sub(" ", statement)
+    text = _STRINGS.sub("?", text)
+    text = _PARAMS.sub("?", text)
+    text = _NUMBERS.sub("?", text)
+    text = _SPACES.sub(" ", text).strip().lower()
+    text = _LISTS.sub("(?+)", text)
+    return _ROWS.sub("(?+), ...", text)
+
+
+class QueryStats:
+    def __init__(self, example: str) -> None:
+        self.example = example[:MAX_EXAMPLE_LENGTH]
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.samples: Deque[float] = deque(maxlen=SAMPLES_PER_FINGERPRINT)
+        self.plan: Optional[str] = None
+        self.explained_at = 0.0
+
+    def add(self, seconds: float, rows: int) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += max(rows, 0)
+        self.samples.append(seconds)
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+    def as_dict(self, query: str) -> Dict[str, Any]:
+        return {
+            "fingerprint": query,
+            "example": self.example,
+            "count": self.count,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "mean_ms": round(self.total_seconds / self.count * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+            "mean_rows": round(self.rows / self.count, 2),
+            "plan": self.plan,
+        }
+
+
+SORT_KEYS = {
+    "total": lambda stats: stats.total_seconds,
+    "mean": lambda stats: stats.total_seconds / stats.count,
+    "p95": lambda stats: stats.percentile(0.95),
+    "count": lambda stats: stats.count,
+    "rows": lambda stats: stats.rows,
+}
+
+
+class QueryProfiler:
+    """Per-fingerprint count, total/mean/p95 time and rows in a bounded LRU table."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_fingerprints: int = 500,
+        slow_ms: float = 200.0,
+        explain_rate: float = 0.0,
+    ) -> None:
+        self.enabled = enabled
+        self.slow_seconds = slow_ms / 1000
+        self.explain_rate = explain_rate
+        self._stats: LRUCache = LRUCache(maxsize=max_fingerprints)
+        self._lock = Lock()
+
+    def observe(self, cursor, statement, params, seconds: float, explain: bool = True) -> None:
+        if isinstance(statement, bytes):
+            statement = statement.decode("utf-8", "replace")
+        statement = str(statement)
+        query = fingerprint(statement)
+        rows = cursor.rowcount
+        with self._lock:
+            stats = self._stats.get(query)
+            if stats is None:
+                stats = self._stats[query] = QueryStats(statement)
+            stats.add(seconds, rows)
+            explain = explain and self._should_explain(stats, query, seconds)
+        if seconds < self.slow_seconds:
+            return
+        logger.warning(f"Slow query {seconds * 1000:.1f}ms ({rows} rows): {query[:500]}")
+        if explain:
+            plan = self._explain(cursor, statement, params)
+            if plan is not None:
+                stats.plan = plan
+
+    def _should_explain(self, stats: QueryStats, query: str, seconds: float) -> bool:
+        # Only plain SELECTs: EXPLAIN ANALYZE really executes the statement again
+        if seconds < self.slow_seconds or not query.startswith("select"):
+            return False
+        now = time.monotonic()
+        if stats.explained_at and now - stats.explained_at < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        if random.random() >= self.explain_rate:
+            return False
+        stats.explained_at = now
+        return True
+
+    def _explain(self, cursor, statement: str, params) -> Optional[str]:
+        # A separate plain cursor: the caller's rows are already buffered client side,
+        # and a savepoint keeps a failing EXPLAIN from aborting the caller's transaction.
+        conn = cursor.connection
+        use_savepoint = not conn.autocommit
+        explain_cursor = conn.cursor()
+        try:
+            if use_savepoint:
+                explain_cursor.execute("SAVEPOINT query_profiler_explain")
+            explain_cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", params)
+            plan = "\n".join(row[0] for row in explain_cursor.fetchall())
+            if use_savepoint:
+                explain_cursor.execute("RELEASE SAVEPOINT query_profiler_explain")
+            return plan
+        except Exception as exc:
+            logger.warning(f"EXPLAIN failed for sampled slow query: {exc}")
+            if use_savepoint:
+                try:
+                    explain_cursor.execute("ROLLBACK TO SAVEPOINT query_profiler_explain")
+                except Exception:
+                    pass
+            return None
+        finally:
+            explain_cursor.close()
+
+    def snapshot(self, sort: str = "total", limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [(query, stats) for query, stats in self._stats.items()]
+            entries.sort(key=lambda entry: SORT_KEYS[sort](entry[1]), reverse=True)
+            return [stats.as_dict(query) for query, stats in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+QUERY_PROFILER = QueryProfiler(
+    enabled=CFG["QUERY_PROFILER_ENABLED"],
+    max_fingerprints=CFG["QUERY_PROFILER_MAX_FINGERPRINTS"],
+    slow_ms=CFG["QUERY_PROFILER_SLOW_MS"],
+    explain_rate=CFG["QUERY_PROFILER_EXPLAIN_RATE"],
+)
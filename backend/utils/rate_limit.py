@@ -0,0 +1,147 @@
+import math
+import time
+from typing import NamedTuple, Tuple
+
+from cachetools import TLRUCache
+from redis.asyncio import Redis
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    retry_after: int  # seconds, 0 when allowed
+
+
+def _window_position(window: int, now: float) -> Tuple[int, float]:
+    """Index of the current fixed window and the fraction of it already elapsed."""
+    return int(now // window), (now % window) / window
+
+
+def _decide(current: int, previous: int, limit: int, window: int, elapsed: float) -> RateLimitResult:
+    """Sliding window counter: the previous window's count is weighted by how much of it
+    still overlaps the sliding window, so only two counters are kept per key."""
+    if previous * (1 - elapsed) + current + 1 <= limit:
+        return RateLimitResult(True, 0)
+    remaining = window * (1 - elapsed)
+    if current + 1 > limit or previous == 0:
+        # Not enough room until this window's own hits start to age out
+        wait = remaining + window * (current + 1 - limit) / max(current, 1)
+    else:
+        # Wait until enough of the previous window has slid out
+        wait = window * (previous * (1 - elapsed) + current + 1 - limit) / previous
+    return RateLimitResult(False, max(1, math.ceil(min(wait, remaining + window))))
+
+
+SLIDING_WINDOW_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * (1 - tonumber(ARGV[3])) + current + 1 <= tonumber(ARGV[1]) then
+    current = redis.call('INCR', KEYS[1])
+    if current == 1 then
+        redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]) * 2)
+    end
+    return {1, current - 1, previous}
+end
+return {0, current, previous}
+"""
+
+
+class RedisSlidingWindowLimiter:
+    """Sliding window counter shared by all workers; one Lua call (two GETs, one INCR) per hit."""
+
+    def __init__(self, redis: Redis, prefix: str = "rl") -> None:
+        self.prefix = prefix
+        self._script = redis.register_script(SLIDING_WINDOW_SCRIPT)
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        index, elapsed = _window_position(window, time.time())
+        base = f"{self.prefix}:{key}:{window}"
+        allowed, current, previous = await self._script(
+            keys=[f"{base}:{index}", f"{base}:{index - 1}"],
+            args=[limit, window, elapsed],
+        )
+        if allowed:
+            return RateLimitResult(True, 0)
+        return _decide(int(current), int(previous), limit, window, elapsed)
+
+
+class MemorySlidingWindowLimiter:
+    """Per-process sliding window counter with the same semantics (tests, Redis outages)."""
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        # (key, window, index) -> count; entries expire after two windows
+        self._counters: TLRUCache = TLRUCache(
+            maxsize=maxsize,
+            ttu=lambda counter_key, _value, now: now + counter_key[1] * 2,
+            timer=time.time,
+        )
+
+    async def hit(self, key: str, limit: int, window: int) -> RateLimitResult:
+        return self.hit_sync(key, limit, window)
+
+    def hit_sync(self, key: str, limit: int, window: int) -> RateLimitResult:
+        index, elapsed = _window_position(window, time.time())
+        current = self._counters.get((key, window, index), 0)
+        previous = self._counters.get((key, window, index - 1), 0)
+        result = _decide(current, previous, limit, window, elapsed)
+        if result.allowed:
+            self._counters[(key, window, index)] = current + 1
+        return result
+
+
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+def _bucket_result(allowed: bool, tokens: float, rate: float) -> RateLimitResult:
+    if allowed:
+        return RateLimitResult(True, 0)
+    return RateLimitResult(False, max(1, math.ceil((1 - tokens) / rate)))
+
+
+class RedisTokenBucket:
+    """Token bucket shared by all workers; refill and take happen in one Lua call."""
+
+    def __init__(self, redis: Redis, prefix: str = "tb") -> None:
+        self.prefix = prefix
+        self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, capacity: int, rate: float) -> RateLimitResult:
+        allowed, tokens = await self._script(
+            keys=[f"{self.prefix}:{key}"], args=[capacity, rate, time.time()]
+        )
+        return _bucket_result(bool(allowed), float(tokens), rate)
+
+
+class MemoryTokenBucket:
+    """Per-process token bucket, used when Redis is unavailable."""
+
+    def __init__(self, maxsize: int = 100_000) -> None:
+        # key -> (tokens, updated_at, seconds until the bucket is full again)
+        self._buckets: TLRUCache = TLRUCache(
+            maxsize=maxsize, ttu=lambda _key, value, now: now + value[2], timer=time.time
+        )
+
+    def take(self, key: str, capacity: int, rate: float) -> RateLimitResult:
+        now = time.time()
+        tokens, updated_at, _ = self._buckets.get(key) or (capacity, now, 0)
+        tokens = min(capacity, tokens + max(0.0, now - updated_at) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, (capacity - tokens) / rate + 1)
+        return _bucket_result(allowed, tokens, rate)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional, Tuple
+
+from cachetools import TTLCache
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .config import CFG
+from .database import get_redis
+from .metrics import Counter
+from .rate_limit import MemoryTokenBucket, RateLimitResult, RedisTokenBucket
+from .security import decode_token
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED = Counter(
+    "http_rate_limited_total", "Requests rejected by the rate limiter", ("group",)
+)
+RATE_LIMIT_FALLBACKS = Counter(
+    "rate_limit_local_fallback_total", "Rate limit decisions made locally because Redis failed"
+)
+
+# First matching path prefix wins; unmatched paths use the "default" group
+ROUTE_GROUPS: Tuple[Tuple[str, str], ...] = (
+    ("/auth/login", "auth"),
+    ("/auth/register", "auth"),
+    ("/auth/refresh", "auth"),
+    ("/auth/password", "auth"),
+    ("/phone", "auth"),
+    ("/jobs", "search"),
+    ("/messages", "messaging"),
+    ("/files", "uploads"),
+)
+EXEMPT_PREFIXES: Tuple[str, ...] = ("/health", "/metrics", "/uploads", "/payments/webhook")
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """``"auth=10/60,default=600/60"`` -> {group: (bucket capacity, refill tokens per second)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        group, rule = item.split("=")
+        count, seconds = rule.split("/")
+        limits[group.strip()] = (int(count), int(count) / float(seconds))
+    return limits
+
+
+class RateLimitMiddleware:
+    """Token-bucket throttling per route group, keyed by user id (valid bearer token) or client IP.
+
+    Buckets live in Redis so all workers share them. If Redis errors or is slow the
+    decision is made by a per-process bucket and Redis is skipped for a short while.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Optional[Dict[str, Tuple[int, float]]] = None) -> None:
+        self.app = app
+        self.limits = limits or parse_limits(CFG["RATE_LIMITS"])
+        self.redis_timeout = CFG["RATE_LIMIT_REDIS_TIMEOUT_SECONDS"]
+        self.local = MemoryTokenBucket()
+        self._bucket: Optional[RedisTokenBucket] = None
+        self._redis = None
+        self._redis_down_until = 0.0
+        # bearer token -> user id, so signatures are verified once per token
+        self._subjects: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+    def _group(self, path: str) -> Optional[str]:
+        if path.startswith(EXEMPT_PREFIXES):
+            return None
+        for prefix, group in ROUTE_GROUPS:
+            if path.startswith(prefix):
+                return group if group in self.limits else "default"
+        return "default"
+
+    def _identity(self, scope: Scope) -> str:
+        for name, value in scope["headers"]:
+            if name == b"authorization" and value[:7].lower() == b"bearer ":
+                token = value[7:].decode("latin-1")
+                subject = self._subjects.get(token)
+                if subject is None:
+                    try:
+                        subject = str(decode_token(token).get("sub") or "")
+                    except ValueError:
+                        subject = ""
+                    self._subjects[token] = subject
+                if subject:
+                    return f"user:{subject}"
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def _take(self, key: str, capacity: int, rate: float) -> RateLimitResult:
+        if time.monotonic() >= self._redis_down_until:
+            try:
+                redis = await get_redis()
+                if redis is not self._redis:
+                    self._redis, self._bucket = redis, RedisTokenBucket(redis, prefix="rl")
+                return await asyncio.wait_for(self._bucket.take(key, capacity, rate), self.redis_timeout)
+            except Exception as exc:  # throttling must never take the API down
+                logger.warning(f"Rate limiter falling back to local buckets: {exc}")
+                self._redis_down_until = time.monotonic() + CFG["RATE_LIMIT_REDIS_RETRY_SECONDS"]
+        RATE_LIMIT_FALLBACKS.inc()
+        return self.local.take(key, capacity, rate)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+        group = self._group(scope["path"])
+        if group is None or group not in self.limits:
+            await self.app(scope, receive, send)
+            return
+
+        capacity, rate = self.limits[group]
+        result = await self._take(f"{group}:{self._identity(scope)}", capacity, rate)
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMITED.inc(group=group)
+        body = json.dumps({"detail": "Too many requests. Please slow down."}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(result.retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
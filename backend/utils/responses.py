@@ -0,0 +1,56 @@
+from typing import Any, Iterable, Optional, Set, Type, Union
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from schemas.base import PaginatedResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+if orjson is not None:
+    from fastapi.responses import ORJSONResponse as FastJSONResponse
+else:  # pragma: no cover
+    FastJSONResponse = JSONResponse
+
+
+def sparse_fields(
+    fields: Optional[str] = Query(
+        default=None, description="Comma-separated item fields to return, e.g. id,title,hourly_rate"
+    ),
+) -> Optional[Set[str]]:
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(",") if field.strip()}
+
+
+def sparse_response(
+    content: Union[PaginatedResponse, Iterable[Any]],
+    item_model: Type[BaseModel],
+    fields: Optional[Set[str]],
+) -> Any:
+    """Trim list items to ``fields`` (plus ``id``); returns ``content`` untouched when no fields were asked for."""
+    if fields is None:
+        return content
+    unknown = fields - set(item_model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}",
+        )
+    include = fields | ({"id"} & set(item_model.model_fields))
+
+    if isinstance(content, PaginatedResponse):
+        data = content.model_dump(
+            mode="json",
+            include={"items": {"__all__": include}, "total": True, "page": True, "size": True},
+        )
+    else:
+        data = [
+            item_model.model_validate(item).model_dump(mode="json", include=include)
+            for item in content
+        ]
+    return FastJSONResponse(data)
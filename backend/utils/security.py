@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import base64
+import hashlib
+import hmac
+import json
 import secrets
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -44,3 +49,45 @@ def decode_token(token: str) -> Dict[str, Any]:
         return jwt.decode(token, CFG["JWT_SECRET"], algorithms=["HS256"])
     except JWTError as exc:  # pragma: no cover - passthrough
         raise ValueError("Invalid token") from exc
+
+
+def _qr_signing_key() -> bytes:
+    secret = CFG["QR_TOKEN_SECRET"] or CFG["JWT_SECRET"]
+    # Derived key so QR signatures can never be confused with JWT signatures
+    return hmac.new(secret.encode(), b"worknow-qr-token", hashlib.sha256).digest()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(value: str) -> bytes:
+    return base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+
+
+def create_qr_token(assignment_id: str, token_type: str, expires_seconds: int) -> Tuple[str, int]:
+    """Issue a stateless QR token: ``<claims>.<hmac>``. Returns the token and its unix expiry."""
+    expires_at = int(time.time()) + expires_seconds
+    claims = {"a": assignment_id, "t": token_type, "e": expires_at, "n": secrets.token_urlsafe(12)}
+    body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(_qr_signing_key(), body.encode(), hashlib.sha256).digest()[:16]
+    return f"{body}.{_b64encode(signature)}", expires_at
+
+
+def is_signed_qr_token(token: str) -> bool:
+    return "." in token
+
+
+def decode_qr_token(token: str, verify_expiry: bool = True) -> Dict[str, Any]:
+    """Verify a token from ``create_qr_token`` and return its claims."""
+    try:
+        body, signature = token.split(".")
+        expected = hmac.new(_qr_signing_key(), body.encode(), hashlib.sha256).digest()[:16]
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise ValueError("bad signature")
+        claims = json.loads(_b64decode(body))
+    except ValueError as exc:
+        raise ValueError("Invalid QR code or assignment") from exc
+    if verify_expiry and claims["e"] <= time.time():
+        raise ValueError("QR code has expired. Please request a new one.")
+    return claims
@@ -0,0 +1,53 @@
+import os
+import re
+
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """StaticFiles that marks content-addressed files as immutable.
+
+    ETag, If-None-Match and Range requests are handled by Starlette's FileResponse.
+    Content-addressed files under ``private_prefix`` (identity documents) are served
+    ``private, no-store``. Other files are served with ``no-cache`` so clients revalidate them.
+    """
+
+    def __init__(
+        self,
+        *args,
+        immutable_pattern: re.Pattern,
+        max_age: int = 31536000,
+        private_prefix: str = "private/",
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.immutable_pattern = immutable_pattern
+        self.max_age = max_age
+        self.private_prefix = private_prefix
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        # Never expose in-progress uploads or other dot paths
+        if any(part.startswith(".") for part in path.split("/")):
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+
+    def file_response(
+        self,
+        full_path: "os.PathLike[str] | str",
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        path = os.fspath(full_path).replace(os.sep, "/")
+        match = self.immutable_pattern.search(path)
+        if match and match.group(0).startswith(self.private_prefix):
+            response.headers["Cache-Control"] = "private, no-store"
+        elif match:
+            response.headers["Cache-Control"] = f"public, max-age={self.max_age}, immutable"
+        else:
+            response.headers["Cache-Control"] = "no-cache"
+        return response
@@ -0,0 +1,205 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+
+# (recorded_at epoch seconds, latitude, longitude, accuracy_m, speed_mps)
+Point = Tuple[float, float, float, Optional[float], Optional[float]]
+
+
+def _optional(value: str) -> Optional[float]:
+    return float(value) if value else None
+
+
+def encode_point(point: Point) -> str:
+    ts, lat, lng, accuracy, speed = point
+    return (
+        f"{ts:.3f},{lat:.6f},{lng:.6f},"
+        f"{'' if accuracy is None else round(accuracy, 1)},{'' if speed is None else round(speed, 1)}"
+    )
+
+
+def decode_point(value: str) -> Point:
+    ts, lat, lng, accuracy, speed = value.split(",")
+    return float(ts), float(lat), float(lng), _optional(accuracy), _optional(speed)
+
+
+def decode_batch(payload: str) -> List[Point]:
+    return [decode_point(value) for value in payload.split("|")]
+
+
+class _Fanout:
+    """Bounded queue per local subscriber; a slow reader loses its oldest batches, never blocks ingestion."""
+
+    def __init__(self, queue_size: int) -> None:
+        self.queue_size = queue_size
+        self.queues: Dict[str, Set[asyncio.Queue]] = {}
+
+    def add(self, channel: str) -> Tuple[asyncio.Queue, bool]:
+        queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        first = channel not in self.queues
+        self.queues.setdefault(channel, set()).add(queue)
+        return queue, first
+
+    def remove(self, channel: str, queue: asyncio.Queue) -> bool:
+        """True when ``queue`` was the channel's last subscriber."""
+        queues = self.queues.get(channel, set())
+        queues.discard(queue)
+        if queues:
+            return False
+        self.queues.pop(channel, None)
+        return True
+
+    def deliver(self, channel: str, payload: str) -> None:
+        for queue in self.queues.get(channel, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+class RedisTrackBuffer:
+    """Last ``size`` points per assignment in a Redis list, plus pub/sub for live viewers.
+
+    Each process keeps one pub/sub connection and subscribes only to the channels
+    its own SSE clients watch, fanning messages out to them locally.
+    """
+
+    def __init__(self, redis: Redis, size: int, ttl_seconds: int, prefix: str = "track", queue_size: int = 64) -> None:
+        self.redis = redis
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.active_key = f"{prefix}:active"
+        self.persisted_key = f"{prefix}:persisted"
+        self._fanout = _Fanout(queue_size)
+        self._pubsub = None
+        self._reader: Optional[asyncio.Task] = None
+
+    def _points_key(self, assignment_id: str) -> str:
+        return f"{self.prefix}:points:{assignment_id}"
+
+    def _channel(self, assignment_id: str) -> str:
+        return f"{self.prefix}:live:{assignment_id}"
+
+    async def append(self, assignment_id: str, points: List[Point]) -> None:
+        """Buffer a batch and publish it to live viewers, in one round trip."""
+        encoded = [encode_point(point) for point in points]
+        key = self._points_key(assignment_id)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.rpush(key, *encoded)
+        pipe.ltrim(key, -self.size, -1)
+        pipe.expire(key, self.ttl_seconds)
+        pipe.zadd(self.active_key, {assignment_id: time.time()})
+        pipe.publish(self._channel(assignment_id), "|".join(encoded))
+        await pipe.execute()
+
+    async def recent(self, assignment_ids: List[str]) -> Dict[str, List[Point]]:
+        pipe = self.redis.pipeline(transaction=False)
+        for assignment_id in assignment_ids:
+            pipe.lrange(self._points_key(assignment_id), 0, -1)
+        rows = await pipe.execute() if assignment_ids else []
+        return {
+            assignment_id: [decode_point(value) for value in values]
+            for assignment_id, values in zip(assignment_ids, rows)
+        }
+
+    async def active(self, since: float) -> List[str]:
+        """Assignments that received points after ``since``; idle ones are pruned."""
+        stale = await self.redis.zrangebyscore(self.active_key, "-inf", time.time() - self.ttl_seconds)
+        if stale:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zrem(self.active_key, *stale)
+            pipe.hdel(self.persisted_key, *stale)
+            await pipe.execute()
+        return await self.redis.zrangebyscore(self.active_key, f"({since}", "+inf")
+
+    async def markers(self, assignment_ids: List[str]) -> Dict[str, Point]:
+        """Last persisted point of each assignment."""
+        if not assignment_ids:
+            return {}
+        values = await self.redis.hmget(self.persisted_key, assignment_ids)
+        return {
+            assignment_id: decode_point(value)
+            for assignment_id, value in zip(assignment_ids, values)
+            if value
+        }
+
+    async def set_markers(self, markers: Dict[str, Point]) -> None:
+        if markers:
+            await self.redis.hset(
+                self.persisted_key, mapping={key: encode_point(point) for key, point in markers.items()}
+            )
+
+    @asynccontextmanager
+    async def subscribe(self, assignment_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Queue of encoded batches (see ``decode_batch``) published for the assignment."""
+        channel = self._channel(assignment_id)
+        queue, first = self._fanout.add(channel)
+        try:
+            if first:
+                if self._pubsub is None:
+                    self._pubsub = self.redis.pubsub()
+                await self._pubsub.subscribe(channel)
+            if self._reader is None:
+                self._reader = asyncio.create_task(self._read())
+            yield queue
+        finally:
+            if self._fanout.remove(channel, queue) and self._pubsub is not None:
+                await self._pubsub.unsubscribe(channel)
+
+    async def _read(self) -> None:
+        try:
+            while self._fanout.queues:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message and message["type"] == "message":
+                    self._fanout.deliver(message["channel"], message["data"])
+        finally:
+            self._reader = None
+
+
+class MemoryTrackBuffer:
+    """In-process buffer with the same semantics, for tests and single-worker development."""
+
+    def __init__(self, size: int, ttl_seconds: int = 3600, queue_size: int = 64) -> None:
+        self.size = size
+        self.ttl_seconds = ttl_seconds
+        self._points: Dict[str, Deque[str]] = {}
+        self._active: Dict[str, float] = {}
+        self._persisted: Dict[str, str] = {}
+        self._fanout = _Fanout(queue_size)
+
+    async def append(self, assignment_id: str, points: List[Point]) -> None:
+        encoded = [encode_point(point) for point in points]
+        self._points.setdefault(assignment_id, deque(maxlen=self.size)).extend(encoded)
+        self._active[assignment_id] = time.time()
+        self._fanout.deliver(assignment_id, "|".join(encoded))
+
+    async def recent(self, assignment_ids: List[str]) -> Dict[str, List[Point]]:
+        return {
+            assignment_id: [decode_point(value) for value in self._points.get(assignment_id, ())]
+            for assignment_id in assignment_ids
+        }
+
+    async def active(self, since: float) -> List[str]:
+        cutoff = time.time() - self.ttl_seconds
+        for key in [key for key, at in self._active.items() if at <= cutoff]:
+            del self._active[key]
+            self._persisted.pop(key, None)
+        return sorted((key for key, at in self._active.items() if at > since), key=self._active.get)
+
+    async def markers(self, assignment_ids: List[str]) -> Dict[str, Point]:
+        return {key: decode_point(self._persisted[key]) for key in assignment_ids if key in self._persisted}
+
+    async def set_markers(self, markers: Dict[str, Point]) -> None:
+        self._persisted.update({key: encode_point(point) for key, point in markers.items()})
+
+    @asynccontextmanager
+    async def subscribe(self, assignment_id: str) -> AsyncIterator[asyncio.Queue]:
+        queue, _ = self._fanout.add(assignment_id)
+        try:
+            yield queue
+        finally:
+            self._fanout.remove(assignment_id, queue)
@@ -0,0 +1,77 @@
+import hashlib
+import time
+from typing import Tuple
+
+from cachetools import TLRUCache
+from redis.asyncio import Redis
+
+# verify() results
+VERIFIED = "verified"
+INVALID = "invalid"
+EXPIRED = "expired"  # no live code, or it was burnt by too many attempts
+
+
+def _digest(code: str) -> str:
+    return hashlib.sha256(code.encode()).hexdigest()
+
+
+VERIFY_SCRIPT = """
+local stored = redis.call('HGET', KEYS[1], 'code')
+if not stored then
+    return 'expired'
+end
+if stored == ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return 'verified'
+end
+if redis.call('HINCRBY', KEYS[1], 'attempts', 1) >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1])
+end
+return 'invalid'
+"""
+
+
+class RedisVerificationStore:
+    """One-time codes shared by all workers: a hash per subject with TTL and attempt counter."""
+
+    def __init__(self, redis: Redis, prefix: str = "verify") -> None:
+        self.redis = redis
+        self.prefix = prefix
+        self._verify = redis.register_script(VERIFY_SCRIPT)
+
+    async def save(self, subject: str, code: str, ttl_seconds: int) -> None:
+        key = f"{self.prefix}:{subject}"
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"code": _digest(code), "attempts": 0})
+            pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+
+    async def verify(self, subject: str, code: str, max_attempts: int) -> str:
+        return await self._verify(keys=[f"{self.prefix}:{subject}"], args=[_digest(code), max_attempts])
+
+
+class MemoryVerificationStore:
+    """In-process store with the same semantics, for tests and single-worker development."""
+
+    def __init__(self, maxsize: int = 10_000) -> None:
+        # subject -> (code digest, attempts, expires_at)
+        self._codes: TLRUCache = TLRUCache(
+            maxsize=maxsize, ttu=lambda _key, value, _now: value[2], timer=time.time
+        )
+
+    async def save(self, subject: str, code: str, ttl_seconds: int) -> None:
+        self._codes[subject] = (_digest(code), 0, time.time() + ttl_seconds)
+
+    async def verify(self, subject: str, code: str, max_attempts: int) -> str:
+        entry: Tuple[str, int, float] = self._codes.get(subject)
+        if entry is None:
+            return EXPIRED
+        stored, attempts, expires_at = entry
+        if stored == _digest(code):
+            del self._codes[subject]
+            return VERIFIED
+        if attempts + 1 >= max_attempts:
+            del self._codes[subject]
+        else:
+            self._codes[subject] = (stored, attempts + 1, expires_at)
+        return INVALID